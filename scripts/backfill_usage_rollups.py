@@ -0,0 +1,79 @@
+"""Rebuild the day/week/month usage rollups from the raw usage events.
+
+The bot keeps rollups current as events are written, but only from the moment
+rollups were enabled. Run this once after enabling them (and whenever the
+rollup documents are suspected to be off) so /admin period stats cover the
+whole history. Every rollup document with at least one event is overwritten.
+
+Usage:
+    python scripts/backfill_usage_rollups.py [--dry-run]
+
+Events written by the running bot while the backfill reads can be missed in
+the current day/week/month buckets, so run it at a quiet time.
+
+Requires the same credentials the bot uses (GOOGLE_CREDENTIALS_PATH, or
+application default credentials with access to the Firestore database).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+
+from src.config.settings import get_settings
+from src.models.usage_event import UsageEvent
+from src.services.storage.firestore.client import FirestoreClient
+from src.services.storage.firestore.usage_event_repo import UsageEventRepository
+from src.services.storage.firestore.usage_rollup_repo import (
+    UsageRollupRepository,
+    collect_rollups,
+)
+
+HISTORY_START = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="count only, write nothing")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    client = FirestoreClient(settings.google_credentials_path, settings.gcp_project_id)
+    if not client.is_ready:
+        print("ERROR: Firestore is not reachable; check credentials and GCP_PROJECT_ID.")
+        return 2
+
+    events = UsageEventRepository(client)
+    read = 0
+
+    async def pages() -> AsyncIterator[list[UsageEvent]]:
+        nonlocal read
+        until = datetime.now(timezone.utc) + timedelta(minutes=1)
+        async for page in events.iter_between(HISTORY_START, until):
+            read += len(page)
+            yield page
+
+    if args.dry_run:
+        rebuilt = await collect_rollups(pages())
+    else:
+        rebuilt = await UsageRollupRepository(client).rebuild(pages())
+    if events.client is None:
+        print("ERROR: reading usage events failed; nothing was written.")
+        return 1
+
+    by_period = {period: 0 for period in ("day", "week", "month")}
+    for rollup in rebuilt:
+        by_period[rollup.period] += 1
+    action = "Would write" if args.dry_run else "Wrote"
+    print(
+        f"Read {read} events. {action} {len(rebuilt)} rollup documents "
+        f"({by_period['day']} days, {by_period['week']} weeks, {by_period['month']} months)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -80,6 +80,21 @@ CONFIG_APP_ENV_KEYS=(
   REMINDERS_DISPATCH_URL
   REMINDERS_DISPATCH_URL_DEBUG
   REMINDERS_QUEUE_NAME
+  REMINDERS_BACKEND
+  REMINDERS_FANOUT
+  REMINDERS_BUCKET_CONCURRENCY
+  REMINDERS_BUCKET_PAGE_SIZE
+  REMINDERS_BUCKET_MAX_LATENESS_MINUTES
+  TELEGRAM_UPDATE_QUEUE_ENABLED
+  TELEGRAM_UPDATE_QUEUE_WORKERS
+  TELEGRAM_UPDATE_QUEUE_MAX_PENDING
+  TELEGRAM_UPDATE_DEDUPE_SIZE
+  TELEGRAM_BOT_POOL_SIZE
+  BROADCAST_MESSAGES_PER_SECOND
+  BROADCAST_PAGE_SIZE
+  BROADCAST_SLICE_SECONDS
+  BROADCAST_MAX_ATTEMPTS
+  BROADCAST_PROGRESS_INTERVAL_SECONDS
   OPENROUTER_BASE_URL
   LLM_MODEL
   LLM_TEMPERATURE
@@ -89,7 +104,19 @@ CONFIG_APP_ENV_KEYS=(
   FIRESTORE_COLLECTION_SESSIONS
   FIRESTORE_COLLECTION_FEEDBACK
   FIRESTORE_COLLECTION_USAGE_EVENTS
+  FIRESTORE_COLLECTION_SHEET_WRITE_JOURNAL
+  FIRESTORE_COLLECTION_SHEET_LAYOUTS
+  FIRESTORE_COLLECTION_USAGE_ROLLUPS
+  FIRESTORE_COLLECTION_BROADCAST_JOBS
+  FIRESTORE_EXECUTOR_WORKERS
   SESSION_TTL_MINUTES
+  SESSION_DELTA_WRITES
+  USAGE_EVENTS_BUFFER_ENABLED
+  USAGE_EVENTS_FLUSH_INTERVAL_SECONDS
+  USAGE_EVENTS_BUFFER_MAX_EVENTS
+  USAGE_ROLLUPS_ENABLED
+  USER_PROFILE_CACHE_TTL_SECONDS
+  USER_PROFILE_CACHE_MAX_ENTRIES
   RATE_LIMIT_REQUESTS_PER_MINUTE
   REMINDERS_DISPATCH_RATE_LIMIT_PER_MINUTE
   OPERATION_TIMEOUT_SECONDS
@@ -97,6 +124,25 @@ CONFIG_APP_ENV_KEYS=(
   TRANSCRIPTION_TIMEOUT_SECONDS
   LLM_TIMEOUT_SECONDS
   SHEETS_TIMEOUT_SECONDS
+  SHEETS_METADATA_CACHE_TTL_SECONDS
+  SHEETS_WRITE_ACCESS_TTL_SECONDS
+  SHEETS_BACKEND
+  SHEETS_HTTP2
+  SHEETS_MAX_CONNECTIONS
+  SHEETS_EXECUTOR_WORKERS
+  SHEETS_EXECUTOR_MAX_PENDING
+  SHEETS_IO_SLOW_WAIT_SECONDS
+  SHEETS_WRITE_BEHIND_ENABLED
+  SHEETS_WRITE_BEHIND_FLUSH_DELAY_SECONDS
+  SHEETS_WRITE_BEHIND_MAX_ATTEMPTS
+  SHEETS_WRITE_BEHIND_RETRY_BASE_SECONDS
+  SHEETS_WRITE_JOURNAL_TTL_DAYS
+  SHEETS_QUOTA_PROJECT_READS_PER_MINUTE
+  SHEETS_QUOTA_PROJECT_WRITES_PER_MINUTE
+  SHEETS_QUOTA_USER_READS_PER_MINUTE
+  SHEETS_QUOTA_USER_WRITES_PER_MINUTE
+  SHEETS_QUOTA_MAX_WAIT_SECONDS
+  SHEETS_QUOTA_MAX_RETRIES
 )
 
 # Sensitive keys — loaded from Secret Manager when USE_SECRET_MANAGER=true,
@@ -233,9 +279,17 @@ fi
 if [[ ${#SECRET_ARGS[@]} -gt 0 ]]; then
   DEPLOY_ENV_ARGS+=(--set-secrets "$(IFS=,; echo "${SECRET_ARGS[*]}")")
 fi
-CPU_BOOST_ARGS=()
+CPU_ARGS=()
 if [[ "${STARTUP_CPU_BOOST}" == "true" ]]; then
-  CPU_BOOST_ARGS=(--cpu-boost)
+  CPU_ARGS=(--cpu-boost)
+fi
+# Queued Telegram updates, write-behind sheet flushes and buffered usage events
+# are all processed after the request has answered, which needs CPU allocated
+# outside requests.
+if [[ "${TELEGRAM_UPDATE_QUEUE_ENABLED:-true}" == "true" \
+  || "${SHEETS_WRITE_BEHIND_ENABLED:-false}" == "true" \
+  || "${USAGE_EVENTS_BUFFER_ENABLED:-true}" == "true" ]]; then
+  CPU_ARGS+=(--no-cpu-throttling)
 fi
 
 SA_ARGS=()
@@ -256,7 +310,7 @@ gcloud run deploy "${SERVICE_NAME}" \
   --port 8080 \
   --min-instances 0 \
   --max-instances 1 \
-  "${CPU_BOOST_ARGS[@]}" \
+  "${CPU_ARGS[@]}" \
   "${SA_ARGS[@]}" \
   "${DEPLOY_ENV_ARGS[@]}"
 
@@ -25,6 +25,9 @@ DEFAULT_HABIT_SCHEMA = HabitSchema(
     version=1,
 )
 
+# Diary tabs, in the order lookups return them
+ENTRY_SHEET_TABS = ("Habits", "Dreams", "Thoughts", "Reflections")
+
 # Sheet column order
 HABITS_SHEET_COLUMNS = [
     "timestamp",
@@ -238,6 +241,9 @@ MESSAGES_RU = {
     "external_timeout_error": (
         "⚠ Сервис не ответил вовремя. Попробуй ещё раз через минуту."
     ),
+    "sheet_deferred_write_failed": (
+        "⚠ Не удалось сохранить в таблицу записей: {count}. Они не записаны."
+    ),
     "external_response_error": (
         "⚠ Получен некорректный ответ от сервиса. Попробуй ещё раз."
     ),
@@ -571,7 +577,10 @@ MESSAGES_RU = {
     "admin_broadcast_preview": "Предпросмотр рассылки:\n\n{text}\n\nОтправить всем пользователям?",
     "admin_broadcast_cancelled": "Рассылка отменена.",
     "admin_broadcast_empty": "Текст пустой. Отправь сообщение для рассылки или /cancel.",
-    "admin_broadcast_done": "✅ Рассылка завершена. Отправлено: {sent}. Ошибок: {failed}.",
+    "admin_broadcast_started": "📣 Рассылка запущена. Прогресс будет обновляться в этом сообщении.",
+    "admin_broadcast_progress": "📣 Рассылка идёт. Отправлено: {sent}. Ошибок: {failed}. Заблокировали бота: {blocked}.",
+    "admin_broadcast_done": "✅ Рассылка завершена. Отправлено: {sent}. Ошибок: {failed}. Заблокировали бота: {blocked}.",
+    "admin_broadcast_not_queued": "⚠️ Не удалось запустить рассылку: очередь задач недоступна. Попробуй позже.",
     "admin_stats": (
         "📊 Статистика\n"
         "Пользователей: {users_total}\n"
@@ -669,6 +678,7 @@ MESSAGES_EN = {
     ),
     "sheet_write_error": "⚠ Couldn't write to the sheet. Check access and try again.",
     "external_timeout_error": "⚠ The service timed out. Please try again in a minute.",
+    "sheet_deferred_write_failed": "⚠ {count} saved entries could not be written to the sheet.",
     "external_response_error": "⚠ The service returned an invalid response. Please try again.",
     "voice_transcription_error": "⚠ Couldn't transcribe the audio. Please send text.",
     "voice_download_error": "⚠ Couldn't download the voice message. Please retry or send text.",
@@ -994,7 +1004,10 @@ MESSAGES_EN = {
     "admin_broadcast_preview": "Broadcast preview:\n\n{text}\n\nSend this to all users?",
     "admin_broadcast_cancelled": "Broadcast cancelled.",
     "admin_broadcast_empty": "The message is empty. Send broadcast text or /cancel.",
-    "admin_broadcast_done": "✅ Broadcast complete. Sent: {sent}. Failed: {failed}.",
+    "admin_broadcast_started": "📣 Broadcast started. This message will show its progress.",
+    "admin_broadcast_progress": "📣 Broadcast in progress. Sent: {sent}. Failed: {failed}. Blocked: {blocked}.",
+    "admin_broadcast_done": "✅ Broadcast complete. Sent: {sent}. Failed: {failed}. Blocked: {blocked}.",
+    "admin_broadcast_not_queued": "⚠️ The broadcast could not start: the task queue is unavailable. Try again later.",
     "admin_stats": (
         "📊 Stats\n"
         "Users: {users_total}\n"
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -37,6 +37,32 @@ class Settings(BaseSettings):
     reminders_dispatch_url_debug: Optional[str] = None
     reminders_queue_name: str = "reminders"
     reminders_dispatch_secret: str = Field(default="")
+    # "local": an in-process queue persisted to a JSON file, for self-hosting
+    # and local runs without GCP (single instance only).
+    reminders_backend: Literal["cloud_tasks", "local"] = "cloud_tasks"
+    reminders_local_state_path: str = "reminder_tasks.json"
+    # "bucketed": one Cloud Task per (minute, reminder kind) serving every user
+    # due in it, instead of one task per user per reminder.
+    reminders_fanout: Literal["per_user", "bucketed"] = "per_user"
+    reminders_bucket_concurrency: int = 20
+    reminders_bucket_page_size: int = 500
+    # Runs found later than this are rescheduled without sending.
+    reminders_bucket_max_lateness_minutes: int = 60
+    # Webhook updates are acknowledged at once and processed by a worker pool,
+    # in order per user. Needs CPU allocated outside requests on Cloud Run.
+    telegram_update_queue_enabled: bool = True
+    telegram_update_queue_workers: int = 16
+    telegram_update_queue_max_pending: int = 1000
+    telegram_update_dedupe_size: int = 10000
+    # Connections the shared outbound Bot keeps open for reminder dispatches.
+    telegram_bot_pool_size: int = 32
+    # Broadcasts run as persisted jobs, one dispatch task per slice. Telegram
+    # allows about 30 messages a second overall and one a second per chat.
+    broadcast_messages_per_second: int = 30
+    broadcast_page_size: int = 200
+    broadcast_slice_seconds: int = 120
+    broadcast_max_attempts: int = 3
+    broadcast_progress_interval_seconds: int = 15
 
     # OpenRouter / LLM
     openrouter_api_key: str | None = None
@@ -54,9 +80,28 @@ class Settings(BaseSettings):
     firestore_collection_sessions: str = "sessions"
     firestore_collection_feedback: str = "feedback"
     firestore_collection_usage_events: str = "usage_events"
+    firestore_collection_sheet_write_journal: str = "sheet_write_journal"
+    firestore_collection_sheet_layouts: str = "sheet_layouts"
+    firestore_collection_usage_rollups: str = "usage_rollups"
+    firestore_collection_broadcast_jobs: str = "broadcast_jobs"
+    # Threads running blocking Firestore RPCs; bounds RPCs in flight.
+    firestore_executor_workers: int = 16
 
     # Session
     session_ttl_minutes: int = 60
+    # Write only the session fields that changed instead of the whole document.
+    session_delta_writes: bool = True
+
+    # Usage events are buffered in memory and written in batches.
+    usage_events_buffer_enabled: bool = True
+    usage_events_flush_interval_seconds: float = 5.0
+    usage_events_buffer_max_events: int = 5000
+    # Keep day/week/month counters current as events are written (admin stats).
+    usage_rollups_enabled: bool = True
+
+    # User profiles read from Firestore are reused for this long (0 disables).
+    user_profile_cache_ttl_seconds: int = 300
+    user_profile_cache_max_entries: int = 10000
 
     # Rate limiting
     rate_limit_requests_per_minute: int = 30
@@ -71,6 +116,36 @@ class Settings(BaseSettings):
     llm_timeout_seconds: int = 45
     sheets_timeout_seconds: int = 25
 
+    # Google Sheets caching
+    sheets_metadata_cache_ttl_seconds: int = 300
+    # How long a proven write probe is trusted before it is repeated.
+    sheets_write_access_ttl_seconds: int = 3600
+    # "gspread" runs sync gspread calls on worker threads; "httpx" talks to the
+    # REST API natively async over one pooled (HTTP/2 if h2 is installed) client.
+    sheets_backend: Literal["gspread", "httpx"] = "gspread"
+    sheets_http2: bool = True
+    sheets_max_connections: int = 100
+    # Dedicated thread pool for the gspread backend; calls per sheet run in order.
+    sheets_executor_workers: int = 8
+    sheets_executor_max_pending: int = 256
+    sheets_io_slow_wait_seconds: float = 1.0
+    # Write-behind: acknowledge appends once journaled, write them in batches.
+    sheets_write_behind_enabled: bool = False
+    sheets_write_behind_flush_delay_seconds: float = 0.5
+    sheets_write_behind_max_attempts: int = 5
+    sheets_write_behind_retry_base_seconds: float = 2.0
+    # Journal documents carry expires_at so a Firestore TTL policy reaps any
+    # that were never deleted (e.g. the process died mid-delete).
+    sheets_write_journal_ttl_days: int = 7
+    # Client-side Sheets API quota (Google's defaults, per minute). Requests
+    # beyond it are queued; one that would wait past max_wait is rejected.
+    sheets_quota_project_reads_per_minute: int = 300
+    sheets_quota_project_writes_per_minute: int = 300
+    sheets_quota_user_reads_per_minute: int = 60
+    sheets_quota_user_writes_per_minute: int = 60
+    sheets_quota_max_wait_seconds: float = 20.0
+    sheets_quota_max_retries: int = 3
+
     @model_validator(mode="after")
     def apply_legacy_operation_timeout(self) -> "Settings":
         """Use the legacy shared timeout for stages without explicit overrides."""
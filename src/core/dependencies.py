@@ -1,22 +1,28 @@
+from functools import lru_cache
 from typing import Annotated
 
 from fastapi import Depends, Header, HTTPException, Request
 
 from src.config.settings import Settings, get_settings
 from src.services.storage.firestore.user_repo import UserRepository
-from src.services.storage.firestore.client import FirestoreClient
 from src.services.storage.firestore.session_repo import SessionRepository
 from src.services.llm.client import LLMClient
 from src.services.transcription.whisper import WhisperClient
-from src.services.storage.sheets.client import SheetsClient
+from src.services.storage.interfaces import ISheetsClient
+from src.services.telegram.deps import DependencyProvider
+
+
+@lru_cache()
+def get_dependency_provider() -> DependencyProvider:
+    """Process-wide container shared by the webhook and reminder dispatch."""
+
+    return DependencyProvider(get_settings())
 
 
 async def get_user_repo() -> UserRepository:
     """Dependency for user repository."""
 
-    settings = get_settings()
-    client = FirestoreClient(settings.google_credentials_path, settings.gcp_project_id)
-    return UserRepository(client)
+    return get_dependency_provider().user_repo()
 
 async def get_session_repo() -> SessionRepository:
     """Dependency for session repository."""
@@ -36,10 +42,10 @@ async def get_whisper_client() -> WhisperClient:
     return WhisperClient()
 
 
-async def get_sheets_client() -> SheetsClient:
+async def get_sheets_client() -> ISheetsClient:
     """Dependency for Google Sheets client."""
 
-    return SheetsClient()
+    return get_dependency_provider().sheets_client()
 
 
 async def verify_telegram_webhook(
@@ -73,5 +79,6 @@ UserRepoDep = Annotated[UserRepository, Depends(get_user_repo)]
 SessionRepoDep = Annotated[SessionRepository, Depends(get_session_repo)]
 LLMClientDep = Annotated[LLMClient, Depends(get_llm_client)]
 WhisperClientDep = Annotated[WhisperClient, Depends(get_whisper_client)]
-SheetsClientDep = Annotated[SheetsClient, Depends(get_sheets_client)]
+SheetsClientDep = Annotated[ISheetsClient, Depends(get_sheets_client)]
 SettingsDep = Annotated[Settings, Depends(get_settings)]
+DepsDep = Annotated[DependencyProvider, Depends(get_dependency_provider)]
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Hashable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class KeyedLockStats:
+    """Point-in-time view of a ``KeyedLock``, for /health and logs."""
+
+    active: int  # keys held or waited for
+    idle: int  # unused locks kept for reuse
+    acquired: int
+    contended: int  # acquisitions that had to wait for another holder
+    total_wait_seconds: float
+    max_wait_seconds: float
+    evicted: int
+
+
+@dataclass
+class _Entry:
+    lock: asyncio.Lock
+    users: int = 0  # the holder plus waiters
+
+
+class KeyedLock:
+    """One asyncio lock per key, so work on a key is serialized and keys run in parallel.
+
+    Locks are created on first use and counted while held or awaited. A lock
+    nobody uses becomes idle; at most ``max_idle`` idle locks are kept (least
+    recently used first out), so memory follows the number of active keys,
+    not every key ever seen. State is process-local.
+    """
+
+    def __init__(self, *, max_idle: int = 1000, clock: Callable[[], float] | None = None) -> None:
+        self.max_idle = max(0, max_idle)
+        self._clock = clock or time.monotonic
+        self._entries: dict[Hashable, _Entry] = {}
+        self._idle: OrderedDict[Hashable, None] = OrderedDict()
+        self._acquired = 0
+        self._contended = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._evicted = 0
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[float]:
+        """Hold the lock of ``key``; yields how long it took to get it."""
+
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(asyncio.Lock())
+        self._idle.pop(key, None)
+        entry.users += 1
+        contended = entry.lock.locked()
+        started = self._clock()
+        try:
+            await entry.lock.acquire()
+        except BaseException:
+            self._leave(key, entry)
+            raise
+        wait = self._clock() - started
+        self._acquired += 1
+        if contended:
+            self._contended += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+        try:
+            yield wait
+        finally:
+            entry.lock.release()
+            self._leave(key, entry)
+
+    def _leave(self, key: Hashable, entry: _Entry) -> None:
+        entry.users -= 1
+        if entry.users:
+            return
+        self._idle[key] = None
+        while len(self._idle) > self.max_idle:
+            evicted, _ = self._idle.popitem(last=False)
+            del self._entries[evicted]
+            self._evicted += 1
+
+    def stats(self) -> KeyedLockStats:
+        return KeyedLockStats(
+            active=len(self._entries) - len(self._idle),
+            idle=len(self._idle),
+            acquired=self._acquired,
+            contended=self._contended,
+            total_wait_seconds=self._total_wait,
+            max_wait_seconds=self._max_wait,
+            evicted=self._evicted,
+        )
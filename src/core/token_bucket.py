@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+
+class TokenBucket:
+    """Refills ``per_minute`` tokens a minute, holding at most ``capacity``.
+
+    Reservations may drive the balance negative: the caller then waits until
+    its token would have been refilled, which queues bursts in arrival order
+    instead of letting them race for the next free token.
+    """
+
+    def __init__(self, per_minute: int, capacity: int) -> None:
+        self.rate = max(1, per_minute) / 60.0
+        self.capacity = float(max(1, capacity))
+        self.tokens = self.capacity
+        self._updated: float | None = None
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_for(self, now: float) -> float:
+        """Seconds until one more token is available, without taking it."""
+
+        self._refill(now)
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1.0
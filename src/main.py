@@ -1,45 +1,67 @@
-import asyncio
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from typing import Any
 
 from fastapi import Depends, FastAPI, Request
 from fastapi.responses import JSONResponse
-from telegram import Bot
-from telegram.constants import ParseMode
-from telegram.error import BadRequest, TelegramError
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import TelegramError
 
 from src.config.settings import Settings, get_settings
-from src.config.constants import MESSAGES_EN, MESSAGES_RU
-from src.core.dependencies import UserRepoDep, SettingsDep, verify_reminder_dispatch, verify_telegram_webhook
-from src.core.exceptions import ExternalTimeoutError, SheetAccessError, SheetWriteError
+from src.core.dependencies import (
+    DepsDep,
+    SettingsDep,
+    UserRepoDep,
+    get_dependency_provider,
+    verify_reminder_dispatch,
+    verify_telegram_webhook,
+)
 from src.core.logging import get_logger, setup_logging
 from src.core.rate_limit import SlidingWindowRateLimiter
 from functools import lru_cache
-from datetime import datetime, time
+from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from src.services.on_this_day import (
-    assemble_payloads,
-    compute_on_this_day_dates,
-    format_on_this_day_message,
-    should_autopush_skip_for_new_user,
-)
-from src.services.storage.sheets.client import SheetsClient
+from src.services.storage.interfaces import IUserRepository
 from src.services.telegram.bot import TelegramBotService
-from src.services.telegram.utils import resolve_language
+from src.services.telegram.deps import DependencyProvider
 from src.services.reminders import (
     ReminderScheduleError,
-    compute_due_date,
     parse_time_text,
     schedule_on_this_day_task,
     schedule_reminder_task,
     schedule_smart_nudges_task,
 )
+from src.services.reminders.delivery import send_daily_reminder, send_on_this_day, send_smart_nudge
+from src.services.reminders.fanout import ReminderFanout
+from src.services.reminders.schedule_index import NEXT_RUN_FIELDS, ReminderScheduleIndex
 
-app = FastAPI(title="Habits & Diary Bot", version="0.1.0")
 setup_logging()
 logger = get_logger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Warm shared clients before traffic arrives; flush and close them on exit."""
+
+    bot_service = get_bot_service_cached()
+    deps = get_dependency_provider()
+    await deps.startup()
+    try:
+        yield
+    finally:
+        try:
+            # Queued updates still use the shared clients, so they finish first.
+            await bot_service.drain_updates()
+            await bot_service.aclose()
+        finally:
+            await deps.shutdown()
+
+
+app = FastAPI(title="Habits & Diary Bot", version="0.1.0", lifespan=lifespan)
+
+
 @lru_cache()
 def get_dispatch_rate_limiter() -> SlidingWindowRateLimiter:
     """SEC-5: per-user limiter for /reminders/dispatch.
@@ -59,16 +81,37 @@ def get_dispatch_rate_limiter() -> SlidingWindowRateLimiter:
 def get_bot_service_cached() -> TelegramBotService:
     """Singleton bot service to preserve session state across requests."""
 
-    return TelegramBotService(get_settings())
+    return TelegramBotService(get_settings(), deps=get_dependency_provider())
 
 
 def get_bot_service(_: Settings = Depends(get_settings)) -> TelegramBotService:
     return get_bot_service_cached()
 
 
+async def _json_object(request: Request, *, default: dict | None = None) -> dict | None:
+    """The request body as a JSON object; None if it is anything else.
+
+    An empty body gives ``default`` when one is set.
+    """
+
+    body = await request.body()
+    if not body and default is not None:
+        return default
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
 @app.get("/health")
-async def health() -> dict[str, str]:
-    return {"status": "ok"}
+async def health() -> dict[str, Any]:
+    bot_service = get_bot_service_cached()
+    body: dict[str, Any] = {"status": "ok", "user_locks": asdict(bot_service.user_lock_stats())}
+    queue_stats = bot_service.queue_stats()
+    if queue_stats is not None:
+        body["update_queue"] = asdict(queue_stats)
+    return body
 
 
 @app.post("/telegram/webhook")
@@ -77,19 +120,65 @@ async def telegram_webhook(
     bot_service: TelegramBotService = Depends(get_bot_service),
     _: bool = Depends(verify_telegram_webhook),
 ) -> JSONResponse:
-    payload = await request.json()
-    await bot_service.handle_update(payload)
+    payload = await _json_object(request)
+    if payload is None:
+        return JSONResponse({"ok": False, "error": "payload_invalid"}, status_code=400)
+    result = await bot_service.submit_update(payload)
+    if result in ("full", "closed"):
+        # Not acknowledged, so Telegram delivers it again later, to another instance if closed.
+        return JSONResponse({"ok": False, "error": f"queue_{result}"}, status_code=503)
     return JSONResponse({"ok": True})
 
 
+@app.post("/reminders/reindex")
+async def reminders_reindex(
+    request: Request,
+    user_repo: UserRepoDep,
+    settings: SettingsDep,
+    _: bool = Depends(verify_reminder_dispatch),
+) -> JSONResponse:
+    """Recompute stored next runs; meant for a daily Cloud Scheduler job.
+
+    ``{"scope": "dst"}`` recomputes future runs in zones switching offset within
+    two days; ``{"scope": "all"}`` (the default) fills runs missing from older
+    profiles.
+    """
+
+    payload = await _json_object(request, default={})
+    if payload is None:
+        return JSONResponse({"ok": False, "error": "payload_invalid"}, status_code=400)
+    scope = payload.get("scope") or "all"
+    if scope not in ("all", "dst"):
+        return JSONResponse({"ok": False, "error": "scope_invalid"}, status_code=400)
+    index = ReminderScheduleIndex(user_repo, settings)
+    result = await (index.refresh_for_dst() if scope == "dst" else index.refresh())
+    return JSONResponse(
+        {
+            "ok": True,
+            "scanned": result.scanned,
+            "changed": result.changed,
+            "schedule_failed": result.schedule_failed,
+        }
+    )
+
+
 @app.post("/reminders/dispatch")
 async def reminders_dispatch(
     request: Request,
     user_repo: UserRepoDep,
     settings: SettingsDep,
+    deps: DepsDep,
     _: bool = Depends(verify_reminder_dispatch),
 ) -> JSONResponse:
-    payload = await request.json()
+    payload = await _json_object(request)
+    if payload is None:
+        return JSONResponse({"ok": False, "error": "payload_invalid"}, status_code=400)
+    if "bucket" in payload:
+        # Bucket tasks are named per minute and kind, so they need no per-user limit.
+        return await _dispatch_bucket(payload, settings, user_repo, deps)
+    if "broadcast_job" in payload:
+        # Broadcast slices are named per job and slice, so they need no per-user limit.
+        return await _dispatch_broadcast(payload, deps)
     user_id = payload.get("user_id")
     kind = payload.get("kind") or "daily"
     if isinstance(user_id, str) and user_id.isdigit():
@@ -103,11 +192,10 @@ async def reminders_dispatch(
     if not profile:
         return JSONResponse({"ok": True, "skipped": "no_profile"})
 
-    bot_token = settings.get_telegram_bot_token()
-    if not bot_token:
+    bot = deps.bot()
+    if bot is None:
         return JSONResponse({"ok": False, "error": "bot_token_missing"}, status_code=500)
 
-    lang = resolve_language(profile)
     now_local = datetime.now(ZoneInfo(profile.timezone))
 
     if kind == "on_this_day":
@@ -118,55 +206,16 @@ async def reminders_dispatch(
         if not reminder_time:
             return JSONResponse({"ok": True, "skipped": "invalid_time"})
 
-        msgs = MESSAGES_RU if lang == "ru" else MESSAGES_EN
-        today_local = now_local.date()
-
-        sent = False
-        if should_autopush_skip_for_new_user(today_local, profile.created_at):
-            pass  # Less than a year of history — skip send, just reschedule.
-        elif not profile.sheet_id:
-            pass  # No sheet connected — skip send.
-        else:
-            target_dates = compute_on_this_day_dates(today_local)
-            if target_dates:
-                sheets_client = SheetsClient(settings.google_credentials_path)
-                try:
-                    habits_entries, dreams_entries, thoughts_entries, reflection_entries = await asyncio.wait_for(
-                        asyncio.gather(
-                            sheets_client.get_habit_entries_for_dates(profile.sheet_id, target_dates),
-                            sheets_client.get_dream_entries_for_dates(profile.sheet_id, target_dates),
-                            sheets_client.get_thought_entries_for_dates(profile.sheet_id, target_dates),
-                            sheets_client.get_reflection_entries_for_dates(profile.sheet_id, target_dates),
-                        ),
-                        timeout=settings.sheets_timeout_seconds,
-                    )
-                except (SheetAccessError, SheetWriteError, ExternalTimeoutError, asyncio.TimeoutError):
-                    habits_entries = dreams_entries = thoughts_entries = reflection_entries = []
-                payloads = assemble_payloads(
-                    target_dates,
-                    habits_entries,
-                    dreams_entries,
-                    thoughts_entries,
-                    reflection_entries,
-                )
-                if payloads:
-                    text = format_on_this_day_message(today_local, payloads, lang)
-                    try:
-                        bot = Bot(token=bot_token)
-                        try:
-                            await bot.send_message(chat_id=user_id, text=text, parse_mode=ParseMode.MARKDOWN)
-                        except BadRequest:
-                            try:
-                                await bot.send_message(
-                                    chat_id=user_id,
-                                    text=text.replace("_", "\\_"),
-                                    parse_mode=ParseMode.MARKDOWN,
-                                )
-                            except BadRequest:
-                                await bot.send_message(chat_id=user_id, text=text)
-                        sent = True
-                    except TelegramError as exc:
-                        return JSONResponse({"ok": False, "error": str(exc)}, status_code=500)
+        try:
+            sent = await send_on_this_day(
+                bot,
+                deps.sheets_client(),
+                profile,
+                now_local,
+                timeout_seconds=settings.sheets_timeout_seconds,
+            )
+        except TelegramError as exc:
+            return JSONResponse({"ok": False, "error": str(exc)}, status_code=500)
 
         try:
             profile.on_this_day_task_name = schedule_on_this_day_task(
@@ -175,6 +224,7 @@ async def reminders_dispatch(
                 reminder_time,
                 profile.timezone,
                 profile.on_this_day_task_name,
+                profile=profile,
             )
         except ReminderScheduleError:
             profile.on_this_day_task_name = None
@@ -187,37 +237,10 @@ async def reminders_dispatch(
     if kind == "smart_nudge":
         if not profile.smart_nudges_enabled or not profile.smart_nudges_times:
             return JSONResponse({"ok": True, "skipped": "smart_nudges_disabled"})
-        rollover = parse_time_text(profile.smart_nudges_rollover_time) or time(12, 0)
-        due = compute_due_date(now_local, rollover)
-        due_iso = due.isoformat()
-        if profile.last_habits_logged_for_date == due_iso:
-            should_send = False
-        else:
-            should_send = True
-
-        if should_send:
-            is_yesterday = due < now_local.date()
-            msgs = MESSAGES_RU if lang == "ru" else MESSAGES_EN
-            text = msgs["smart_nudge_missing_yesterday"] if is_yesterday else msgs["smart_nudge_missing_today"]
-            markup = InlineKeyboardMarkup(
-                [
-                    [
-                        InlineKeyboardButton(
-                            msgs["smart_nudge_log_now"],
-                            callback_data=f"habits_date:{due_iso}",
-                        ),
-                        InlineKeyboardButton(
-                            msgs["smart_nudge_disable"],
-                            callback_data="smart_nudges:disable",
-                        ),
-                    ]
-                ]
-            )
-            try:
-                bot = Bot(token=bot_token)
-                await bot.send_message(chat_id=user_id, text=text, reply_markup=markup)
-            except TelegramError as exc:
-                return JSONResponse({"ok": False, "error": str(exc)}, status_code=500)
+        try:
+            should_send = await send_smart_nudge(bot, profile, now_local)
+        except TelegramError as exc:
+            return JSONResponse({"ok": False, "error": str(exc)}, status_code=500)
 
         try:
             task_name = schedule_smart_nudges_task(
@@ -227,6 +250,7 @@ async def reminders_dispatch(
                 times=profile.smart_nudges_times,
                 rollover_time=profile.smart_nudges_rollover_time,
                 last_habits_logged_for_date=profile.last_habits_logged_for_date,
+                profile=profile,
             )
             profile.smart_nudges_task_name = task_name
         except ReminderScheduleError:
@@ -245,9 +269,7 @@ async def reminders_dispatch(
         return JSONResponse({"ok": True, "skipped": "invalid_time"})
 
     try:
-        bot = Bot(token=bot_token)
-        text = MESSAGES_RU["reminder_message"] if lang == "ru" else MESSAGES_EN["reminder_message"]
-        await bot.send_message(chat_id=user_id, text=text)
+        await send_daily_reminder(bot, profile)
     except TelegramError as exc:
         return JSONResponse({"ok": False, "error": str(exc)}, status_code=500)
 
@@ -257,6 +279,7 @@ async def reminders_dispatch(
             user_id,
             reminder_time,
             profile.timezone,
+            profile=profile,
         )
         profile.reminder_task_name = task_name
     except ReminderScheduleError:
@@ -266,3 +289,63 @@ async def reminders_dispatch(
 
     await user_repo.update(profile)
     return JSONResponse({"ok": True})
+
+
+async def _dispatch_bucket(
+    payload: dict,
+    settings: Settings,
+    user_repo: IUserRepository,
+    deps: DependencyProvider,
+) -> JSONResponse:
+    """Serve a shared bucket task (REMINDERS_FANOUT=bucketed) for every user due in it."""
+
+    kind = payload.get("kind") or "daily"
+    try:
+        bucket = datetime.fromisoformat(str(payload["bucket"]))
+    except ValueError:
+        return JSONResponse({"ok": False, "error": "bucket_invalid"}, status_code=400)
+    if bucket.tzinfo is None or kind not in NEXT_RUN_FIELDS:
+        return JSONResponse({"ok": False, "error": "bucket_invalid"}, status_code=400)
+
+    bot = deps.bot()
+    if bot is None:
+        return JSONResponse({"ok": False, "error": "bot_token_missing"}, status_code=500)
+
+    fanout = ReminderFanout(settings=settings, user_repo=user_repo, bot=bot, sheets_client=deps.sheets_client)
+    result = await fanout.dispatch(kind, bucket)
+    return JSONResponse(
+        {
+            "ok": True,
+            "due": result.due,
+            "sent": result.sent,
+            "skipped": result.skipped,
+            "failed": result.failed,
+        }
+    )
+
+
+async def _dispatch_broadcast(payload: dict, deps: DependencyProvider) -> JSONResponse:
+    """Run the next slice of a broadcast job; an error response makes the queue retry it."""
+
+    job_id = payload.get("broadcast_job")
+    if not isinstance(job_id, str) or not job_id:
+        return JSONResponse({"ok": False, "error": "broadcast_job_invalid"}, status_code=400)
+    runner = deps.broadcast_runner()
+    if runner is None:
+        return JSONResponse({"ok": False, "error": "bot_token_missing"}, status_code=500)
+    try:
+        job = await runner.run_slice(job_id)
+    except ReminderScheduleError:
+        # The slice is checkpointed; the retry resumes it and queues the next one.
+        return JSONResponse({"ok": False, "error": "broadcast_enqueue_failed"}, status_code=503)
+    if job is None:
+        return JSONResponse({"ok": True, "skipped": "no_job"})
+    return JSONResponse(
+        {
+            "ok": True,
+            "status": job.status.value,
+            "sent": job.sent,
+            "failed": job.failed,
+            "blocked": job.blocked,
+        }
+    )
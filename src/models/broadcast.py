@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class BroadcastStatus(str, Enum):
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"  # its first slice could not be queued; nothing was sent
+
+
+class BroadcastJob(BaseModel):
+    """An admin broadcast, persisted so any instance can pick it up where it stopped.
+
+    ``cursor`` is the last ``telegram_user_id`` of the last page fully sent;
+    the next slice resumes after it.
+    """
+
+    job_id: str
+    text: str
+    admin_chat_id: int
+    language: str = "en"
+    status: BroadcastStatus = BroadcastStatus.RUNNING
+    cursor: Optional[int] = None
+    slices: int = 0
+    sent: int = 0
+    failed: int = 0
+    blocked: int = 0  # the user blocked the bot or deleted their account
+    progress_message_id: Optional[int] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def create(cls, text: str, *, admin_chat_id: int, language: str = "en") -> "BroadcastJob":
+        return cls(job_id=uuid.uuid4().hex, text=text, admin_chat_id=admin_chat_id, language=language)
+
+    @property
+    def is_done(self) -> bool:
+        return self.status == BroadcastStatus.DONE
@@ -2,7 +2,7 @@ from datetime import date, datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class ConversationState(str, Enum):
@@ -50,6 +50,30 @@ class SessionData(BaseModel):
     last_activity: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     expires_at: Optional[datetime] = None
 
+    # JSON view of the fields as last loaded or written; None until persisted.
+    _persisted: Optional[dict[str, Any]] = PrivateAttr(default=None)
+
+    @property
+    def is_persisted(self) -> bool:
+        return self._persisted is not None
+
+    def dirty_fields(self) -> set[str]:
+        """Fields changed since the session was loaded or last written.
+
+        Values are compared as dumped, so in-place edits of ``temp_data`` or
+        ``pending_entry`` count too. A session never persisted is all dirty.
+        """
+
+        current = self.model_dump(mode="json")
+        if self._persisted is None:
+            return set(current)
+        return {name for name, value in current.items() if self._persisted.get(name) != value}
+
+    def mark_clean(self) -> None:
+        """Record the current field values as the persisted state."""
+
+        self._persisted = self.model_dump(mode="json")
+
     def is_expired(self) -> bool:
         if self.expires_at is None:
             return False
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class SheetLayout(BaseModel):
+    """Tabs and headers verified for one spreadsheet, shared across instances.
+
+    ``version`` fingerprints the tab layout the code expects; a record with a
+    different version (or written for another service account) is ignored.
+    """
+
+    sheet_id: str
+    version: str
+    service_email: Optional[str] = None
+    headers: dict[str, list[str]] = Field(default_factory=dict)
+    verified_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import uuid4
+
+from pydantic import BaseModel, Field
+
+from src.models.entry import DreamEntry, HabitEntry, ReflectionEntry, ThoughtEntry
+from src.models.enums import EntryType
+
+
+_ENTRY_MODELS: dict[EntryType, type[BaseModel]] = {
+    EntryType.HABIT: HabitEntry,
+    EntryType.DREAM: DreamEntry,
+    EntryType.THOUGHT: ThoughtEntry,
+    EntryType.REFLECTION: ReflectionEntry,
+}
+
+
+class PendingSheetWrite(BaseModel):
+    """A journaled sheet append that has been acknowledged but not yet written."""
+
+    id: str = Field(default_factory=lambda: uuid4().hex)
+    sheet_id: str
+    entry_type: EntryType
+    payload: dict[str, Any]
+    field_order: list[str] = Field(default_factory=list)
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @classmethod
+    def for_entry(
+        cls,
+        sheet_id: str,
+        entry: HabitEntry | DreamEntry | ThoughtEntry | ReflectionEntry,
+        field_order: list[str] | None = None,
+    ) -> "PendingSheetWrite":
+        entry_type = next(kind for kind, model in _ENTRY_MODELS.items() if isinstance(entry, model))
+        return cls(
+            sheet_id=sheet_id,
+            entry_type=entry_type,
+            payload=entry.model_dump(mode="json"),
+            field_order=list(field_order or []),
+        )
+
+    def entry(self) -> HabitEntry | DreamEntry | ThoughtEntry | ReflectionEntry:
+        return _ENTRY_MODELS[self.entry_type](**self.payload)  # type: ignore[return-value]
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
 
 
 MetadataValue = str | int | bool
@@ -21,6 +22,12 @@ class UsageEvent(BaseModel):
     month: str = ""
     metadata: dict[str, MetadataValue] = Field(default_factory=dict)
 
+    @field_serializer("occurred_at", when_used="json")
+    def _serialize_occurred_at(self, value: datetime) -> str:
+        # Fixed-width UTC ("...T07:00:00.000000Z"): stored strings then sort
+        # like the instants they hold, which range queries rely on.
+        return _as_utc(value).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
     @classmethod
     def create(
         cls,
@@ -45,6 +52,90 @@ class UsageEvent(BaseModel):
         )
 
 
+RollupPeriod = Literal["day", "week", "month"]
+ROLLUP_PERIODS: tuple[RollupPeriod, ...] = ("day", "week", "month")
+
+
+def rollup_id(period: str, bucket: str) -> str:
+    return f"{period}_{bucket}"
+
+
+def _counter_key(event_name: str, suffix: str | None = None) -> str:
+    # Dots would read as nested field paths in Firestore updates.
+    key = event_name.replace(".", "_")
+    return f"{key}__{suffix}" if suffix else key
+
+
+class UsageRollup(BaseModel):
+    """Usage counters for one day, ISO week or month bucket.
+
+    ``counts`` holds one counter per event name and one per event name and
+    feature; ``sums`` totals the integer metadata of each event name; and
+    ``user_ids`` lists the users active in the bucket.
+    """
+
+    period: str
+    bucket: str
+    counts: dict[str, int] = Field(default_factory=dict)
+    sums: dict[str, int] = Field(default_factory=dict)
+    user_ids: set[int] = Field(default_factory=set)
+
+    @property
+    def id(self) -> str:
+        return rollup_id(self.period, self.bucket)
+
+    def count(self, event_name: str, feature: str | None = None) -> int:
+        return self.counts.get(_counter_key(event_name, feature), 0)
+
+    def total(self, event_name: str, metadata_key: str) -> int:
+        return self.sums.get(_counter_key(event_name, metadata_key), 0)
+
+    def add(self, event: UsageEvent) -> None:
+        for key in {_counter_key(event.event_name), _counter_key(event.event_name, event.feature)}:
+            self.counts[key] = self.counts.get(key, 0) + 1
+        for name, value in event.metadata.items():
+            if isinstance(value, int) and not isinstance(value, bool):
+                key = _counter_key(event.event_name, name)
+                self.sums[key] = self.sums.get(key, 0) + value
+        if event.user_id is not None:
+            self.user_ids.add(event.user_id)
+
+    def merge(self, other: UsageRollup) -> None:
+        for key, value in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+        for key, value in other.sums.items():
+            self.sums[key] = self.sums.get(key, 0) + value
+        self.user_ids |= other.user_ids
+
+    @classmethod
+    def from_events(
+        cls,
+        events: Iterable[UsageEvent],
+        period: str = "",
+        bucket: str = "",
+    ) -> UsageRollup:
+        rollup = cls(period=period, bucket=bucket)
+        for event in events:
+            rollup.add(event)
+        return rollup
+
+
+def rollups_for(events: Iterable[UsageEvent]) -> dict[str, UsageRollup]:
+    """Per-bucket rollups of ``events`` for every period, by rollup id."""
+
+    rollups: dict[str, UsageRollup] = {}
+    for event in events:
+        for period in ROLLUP_PERIODS:
+            bucket = getattr(event, period)
+            if not bucket:
+                continue
+            key = rollup_id(period, bucket)
+            if key not in rollups:
+                rollups[key] = UsageRollup(period=period, bucket=bucket)
+            rollups[key].add(event)
+    return rollups
+
+
 def _as_utc(value: datetime) -> datetime:
     if value.tzinfo is None:
         return value.replace(tzinfo=timezone.utc)
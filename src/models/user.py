@@ -1,8 +1,8 @@
 
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from src.models.enums import Language
 from src.models.habit import HabitSchema
@@ -53,6 +53,75 @@ class UserProfile(BaseModel):
     on_this_day_time: Optional[str] = None
     on_this_day_task_name: Optional[str] = None
 
+    # Next due time per reminder kind, in UTC; what bucketed dispatch queries.
+    reminder_next_run_utc: Optional[datetime] = None
+    smart_nudges_next_run_utc: Optional[datetime] = None
+    on_this_day_next_run_utc: Optional[datetime] = None
+
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     onboarding_completed: bool = False
+
+    # JSON view of the fields as last loaded or written; None until persisted.
+    _persisted: Optional[dict[str, Any]] = PrivateAttr(default=None)
+
+    @property
+    def is_persisted(self) -> bool:
+        return self._persisted is not None
+
+    def dirty_fields(self) -> set[str]:
+        """Fields changed since the profile was loaded or last written.
+
+        Values are compared as dumped, so in-place edits of nested fields
+        (``usage_stats``, ``habit_schema``) count too.
+        """
+
+        current = self.model_dump(mode="json")
+        if self._persisted is None:
+            return set(current)
+        return {name for name, value in current.items() if self._persisted.get(name) != value}
+
+    def mark_clean(self) -> None:
+        """Record the current field values as the persisted state."""
+
+        self._persisted = self.model_dump(mode="json")
+
+
+class UserSummary(BaseModel):
+    """The profile fields admin stats and broadcasts need, read by a projected scan."""
+
+    telegram_user_id: int
+    language: str = Language.EN.value
+    sheet_id: Optional[str] = None
+    usage_stats: UsageStats = Field(default_factory=UsageStats)
+    created_at: Optional[datetime] = None
+
+
+USER_SUMMARY_FIELDS: tuple[str, ...] = tuple(UserSummary.model_fields)
+
+
+class UserReminders(BaseModel):
+    """The profile fields reminder scheduling reads, for projected reindex scans."""
+
+    telegram_user_id: int
+    timezone: str = "Europe/Moscow"
+    reminder_time: Optional[str] = None
+    reminder_enabled: bool = False
+    reminder_task_name: Optional[str] = None
+
+    smart_nudges_enabled: bool = False
+    smart_nudges_times: list[str] = Field(default_factory=list)
+    smart_nudges_rollover_time: str = "12:00"
+    smart_nudges_task_name: Optional[str] = None
+    last_habits_logged_for_date: Optional[str] = None
+
+    on_this_day_enabled: bool = False
+    on_this_day_time: Optional[str] = None
+    on_this_day_task_name: Optional[str] = None
+
+    reminder_next_run_utc: Optional[datetime] = None
+    smart_nudges_next_run_utc: Optional[datetime] = None
+    on_this_day_next_run_utc: Optional[datetime] = None
+
+
+USER_REMINDER_FIELDS: tuple[str, ...] = tuple(UserReminders.model_fields)
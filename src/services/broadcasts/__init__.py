@@ -0,0 +1,9 @@
+from src.services.broadcasts.jobs import BroadcastRunner, broadcast_task_id, schedule_broadcast_task
+from src.services.broadcasts.limiter import TelegramSendLimiter
+
+__all__ = [
+    "BroadcastRunner",
+    "TelegramSendLimiter",
+    "broadcast_task_id",
+    "schedule_broadcast_task",
+]
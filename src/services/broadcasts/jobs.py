@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from telegram import Bot
+from telegram.error import Forbidden, RetryAfter, TelegramError
+
+from src.config.constants import MESSAGES_EN, MESSAGES_RU
+from src.config.settings import Settings
+from src.core.logging import get_logger
+from src.models.broadcast import BroadcastJob, BroadcastStatus
+from src.models.usage_event import UsageEvent
+from src.services.broadcasts.limiter import TelegramSendLimiter
+from src.services.reminders.scheduler import (
+    ReminderScheduleError,
+    ReminderTasksNotConfiguredError,
+    schedule_reminders_task_at,
+)
+from src.services.storage.firestore.broadcast_job_repo import BroadcastJobRepository
+from src.services.storage.interfaces import IUserRepository
+
+logger = get_logger(__name__)
+
+BroadcastEnqueue = Callable[[Settings, BroadcastJob], str]
+
+_ENQUEUE_ATTEMPTS = 3
+_ENQUEUE_RETRY_SECONDS = 0.5  # doubled after each failed attempt
+
+
+def broadcast_task_id(job: BroadcastJob) -> str:
+    """Named per job and slice, so a retried dispatch never queues a slice twice."""
+
+    return f"broadcast-{job.job_id}-{job.slices}"
+
+
+def schedule_broadcast_task(settings: Settings, job: BroadcastJob) -> str:
+    """Queue the next slice of ``job`` on the reminders dispatch queue, to run now."""
+
+    return schedule_reminders_task_at(
+        settings=settings,
+        schedule_time_utc=datetime.now(timezone.utc),
+        payload={"broadcast_job": job.job_id},
+        task_id=broadcast_task_id(job),
+    )
+
+
+def _retry_after_seconds(exc: RetryAfter) -> float:
+    value = exc.retry_after
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+class BroadcastRunner:
+    """Sends admin broadcasts as persisted, resumable jobs.
+
+    ``start`` saves a job and queues its first slice as a dispatch task. Each
+    slice (``run_slice``) walks users in id order from the job's cursor,
+    sends a page concurrently through the shared ``TelegramSendLimiter``,
+    and checkpoints the cursor and counts after every page. After
+    ``slice_seconds`` it queues the next slice and returns, so no request
+    outlives the dispatch deadline. A slice cut short by a restart is
+    retried by the task queue and resumes from the last checkpoint, which
+    may resend at most one page.
+
+    ``RetryAfter`` pauses every send for the time Telegram asks and retries
+    the message; users who blocked the bot are counted and not retried.
+    Without a task queue (no dispatch URL configured) slices run in the
+    background of this process instead, and are not resumed after a restart.
+    A configured queue that keeps failing is retried with backoff and then
+    reported: a dispatch slice fails so the queue retries it, and a job
+    whose first slice cannot be queued is marked failed.
+    """
+
+    def __init__(
+        self,
+        *,
+        settings: Settings,
+        jobs: BroadcastJobRepository,
+        user_repo: IUserRepository,
+        bot: Bot,
+        limiter: TelegramSendLimiter | None = None,
+        usage_repo=None,
+        enqueue: BroadcastEnqueue | None = None,
+        clock: Callable[[], float] | None = None,
+        enqueue_retry_seconds: float = _ENQUEUE_RETRY_SECONDS,
+    ) -> None:
+        self.settings = settings
+        self.jobs = jobs
+        self.user_repo = user_repo
+        self.bot = bot
+        self.limiter = limiter or TelegramSendLimiter(settings.broadcast_messages_per_second)
+        self.usage_repo = usage_repo
+        self.page_size = max(1, settings.broadcast_page_size)
+        self.slice_seconds = settings.broadcast_slice_seconds
+        self.max_attempts = max(1, settings.broadcast_max_attempts)
+        self.progress_interval_seconds = settings.broadcast_progress_interval_seconds
+        self._enqueue = enqueue or schedule_broadcast_task
+        self._clock = clock or time.monotonic
+        self._enqueue_retry_seconds = enqueue_retry_seconds
+        self._inline: set[asyncio.Task[None]] = set()
+
+    async def start(self, text: str, *, admin_chat_id: int, language: str = "en") -> BroadcastJob:
+        job = BroadcastJob.create(text, admin_chat_id=admin_chat_id, language=language)
+        try:
+            message = await self.bot.send_message(
+                chat_id=admin_chat_id, text=_messages(language)["admin_broadcast_started"]
+            )
+            job.progress_message_id = message.message_id
+        except TelegramError as exc:
+            logger.warning("broadcast_progress_failed", job_id=job.job_id, error=str(exc))
+        await self.jobs.save(job)
+        logger.info("broadcast_started", job_id=job.job_id, admin_chat_id=admin_chat_id)
+        try:
+            await self._continue(job)
+        except ReminderScheduleError:
+            job.status = BroadcastStatus.FAILED
+            job.finished_at = datetime.now(timezone.utc)
+            await self.jobs.save(job)
+            await self._report(job, "admin_broadcast_not_queued")
+        return job
+
+    async def run_slice(self, job_id: str) -> BroadcastJob | None:
+        """Send the next stretch of ``job_id``; queues the following slice if unfinished."""
+
+        job = await self.jobs.get(job_id)
+        if job is None or job.status != BroadcastStatus.RUNNING:
+            return job
+        started = reported = self._clock()
+        pages = 0
+        async for users in self.user_repo.iter_summaries(self.page_size, after=job.cursor):
+            if pages and self._clock() - started >= self.slice_seconds:
+                break  # this page is sent by the next slice
+            pages += 1
+            outcomes = await asyncio.gather(
+                *(self._deliver(user.telegram_user_id, job.text) for user in users)
+            )
+            job.sent += outcomes.count("sent")
+            job.failed += outcomes.count("failed")
+            job.blocked += outcomes.count("blocked")
+            job.cursor = users[-1].telegram_user_id
+            await self.jobs.save(job)
+            now = self._clock()
+            if now - reported >= self.progress_interval_seconds:
+                reported = now
+                await self._report(job, "admin_broadcast_progress")
+        else:
+            await self._finish(job)
+            return job
+        job.slices += 1
+        await self.jobs.save(job)
+        await self._continue(job)
+        return job
+
+    async def _deliver(self, chat_id: int, text: str) -> str:
+        for attempt in range(1, self.max_attempts + 1):
+            await self.limiter.acquire(chat_id)
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text)
+                return "sent"
+            except RetryAfter as exc:
+                delay = _retry_after_seconds(exc)
+                self.limiter.pause(delay)
+                logger.warning(
+                    "broadcast_flood_control", chat_id=chat_id, retry_after=delay, attempt=attempt
+                )
+            except Forbidden:
+                return "blocked"
+            except TelegramError as exc:
+                logger.warning("broadcast_send_failed", chat_id=chat_id, error=str(exc))
+                return "failed"
+        return "failed"
+
+    async def _finish(self, job: BroadcastJob) -> None:
+        job.status = BroadcastStatus.DONE
+        job.finished_at = datetime.now(timezone.utc)
+        await self.jobs.save(job)
+        logger.info(
+            "broadcast_finished",
+            job_id=job.job_id,
+            sent=job.sent,
+            failed=job.failed,
+            blocked=job.blocked,
+            slices=job.slices + 1,
+        )
+        await self._report(job, "admin_broadcast_progress")
+        try:
+            await self.bot.send_message(
+                chat_id=job.admin_chat_id,
+                text=_format(job, "admin_broadcast_done"),
+            )
+        except TelegramError as exc:
+            logger.warning("broadcast_progress_failed", job_id=job.job_id, error=str(exc))
+        if self.usage_repo is not None:
+            await self.usage_repo.create(
+                UsageEvent.create(
+                    "broadcast.sent",
+                    user_id=job.admin_chat_id,
+                    feature="broadcast",
+                    metadata={
+                        "sent": job.sent,
+                        "failed": job.failed + job.blocked,
+                        "blocked": job.blocked,
+                    },
+                )
+            )
+
+    async def _report(self, job: BroadcastJob, key: str) -> None:
+        """Update the admin's progress message; progress is best effort."""
+
+        if job.progress_message_id is None:
+            return
+        try:
+            await self.bot.edit_message_text(
+                chat_id=job.admin_chat_id,
+                message_id=job.progress_message_id,
+                text=_format(job, key),
+            )
+        except TelegramError as exc:
+            logger.info("broadcast_progress_failed", job_id=job.job_id, error=str(exc))
+
+    async def _continue(self, job: BroadcastJob) -> None:
+        """Queue the next slice of ``job``, or run it here when no queue is configured.
+
+        Queue errors are retried with backoff; the last one is raised.
+        """
+
+        for attempt in range(1, _ENQUEUE_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(self._enqueue, self.settings, job)
+                return
+            except ReminderTasksNotConfiguredError as exc:
+                logger.warning("broadcast_running_inline", job_id=job.job_id, error=str(exc))
+                task = asyncio.create_task(self._run_inline(job.job_id))
+                self._inline.add(task)
+                task.add_done_callback(self._inline.discard)
+                return
+            except ReminderScheduleError as exc:
+                if attempt == _ENQUEUE_ATTEMPTS:
+                    logger.error(
+                        "broadcast_enqueue_failed", job_id=job.job_id, attempts=attempt, error=str(exc)
+                    )
+                    raise
+                logger.warning(
+                    "broadcast_enqueue_retry", job_id=job.job_id, attempt=attempt, error=str(exc)
+                )
+                await asyncio.sleep(self._enqueue_retry_seconds * 2 ** (attempt - 1))
+
+    async def _run_inline(self, job_id: str) -> None:
+        try:
+            await self.run_slice(job_id)
+        except Exception:
+            logger.exception("broadcast_slice_failed", job_id=job_id)
+
+    async def aclose(self) -> None:
+        """Stop slices running in this process; their jobs stay where they checkpointed."""
+
+        tasks = list(self._inline)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _messages(language: str) -> dict[str, str]:
+    return MESSAGES_RU if language == "ru" else MESSAGES_EN
+
+
+def _format(job: BroadcastJob, key: str) -> str:
+    return _messages(job.language)[key].format(sent=job.sent, failed=job.failed, blocked=job.blocked)
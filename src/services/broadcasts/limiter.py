@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+
+from src.core.token_bucket import TokenBucket
+
+
+class TelegramSendLimiter:
+    """Paces outbound messages to Telegram's bot limits.
+
+    A token bucket holds the whole bot to ``per_second`` messages (about 30
+    for broadcasts), and each chat gets at most one message every
+    ``per_chat_interval`` seconds. A flood-control error (``RetryAfter``)
+    applies to the whole bot, so ``pause`` holds every sender until it is
+    over. Reservations are handed out in arrival order; callers then sleep
+    off their own wait, so many sends can be in flight while the rate stays
+    capped. State is process-local.
+    """
+
+    def __init__(
+        self,
+        per_second: int = 30,
+        *,
+        per_chat_interval: float = 1.0,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        per_second = max(1, per_second)
+        self._bucket = TokenBucket(per_second * 60, per_second)
+        self.per_chat_interval = per_chat_interval
+        self._clock = clock or time.monotonic
+        self._paused_until = 0.0
+        self._chat_ready: dict[int, float] = {}
+
+    def reserve(self, chat_id: int) -> float:
+        """Take a slot for ``chat_id``; return how long to wait before sending."""
+
+        now = self._clock()
+        wait = max(
+            0.0,
+            self._paused_until - now,
+            self._chat_ready.get(chat_id, now) - now,
+            self._bucket.wait_for(now),
+        )
+        self._bucket.take(now)
+        self._chat_ready[chat_id] = now + wait + self.per_chat_interval
+        if len(self._chat_ready) > 10_000:
+            self._chat_ready = {
+                chat: ready for chat, ready in self._chat_ready.items() if ready > now
+            }
+        return wait
+
+    async def acquire(self, chat_id: int) -> None:
+        wait = self.reserve(chat_id)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every sender for ``seconds``, e.g. the ``retry_after`` of a flood error."""
+
+        self._paused_until = max(self._paused_until, self._clock() + max(0.0, seconds))
@@ -1,5 +1,13 @@
+from src.services.reminders.backends import (
+    CloudTasksBackend,
+    LocalTaskBackend,
+    ReminderTask,
+    ReminderTaskBackend,
+    get_reminder_task_backend,
+)
 from src.services.reminders.scheduler import (
     ReminderScheduleError,
+    ReminderTasksNotConfiguredError,
     build_dispatch_url,
     compute_next_run,
     delete_reminder_task,
@@ -18,7 +26,13 @@ from src.services.reminders.smart_nudges import (
 )
 
 __all__ = [
+    "CloudTasksBackend",
+    "LocalTaskBackend",
+    "ReminderTask",
+    "ReminderTaskBackend",
+    "get_reminder_task_backend",
     "ReminderScheduleError",
+    "ReminderTasksNotConfiguredError",
     "build_dispatch_url",
     "compute_next_run",
     "delete_reminder_task",
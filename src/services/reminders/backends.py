@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any
+
+import httpx
+
+try:
+    from google.api_core.exceptions import AlreadyExists as AlreadyExistsType
+    from google.api_core.exceptions import GoogleAPIError as GoogleAPIErrorType
+    from google.api_core.exceptions import NotFound as NotFoundType
+    from google.cloud import tasks_v2 as tasks_v2_module
+    from google.protobuf import timestamp_pb2 as timestamp_pb2_module  # type: ignore[import-untyped]
+except Exception:  # pragma: no cover - optional dependency
+    AlreadyExistsType: Any = None  # type: ignore[no-redef]
+    GoogleAPIErrorType: Any = None  # type: ignore[no-redef]
+    NotFoundType: Any = None  # type: ignore[no-redef]
+    tasks_v2_module: Any = None  # type: ignore[no-redef]
+    timestamp_pb2_module: Any = None  # type: ignore[no-redef]
+
+from src.config.settings import Settings, get_settings
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ReminderScheduleError(RuntimeError):
+    pass
+
+
+class ReminderTasksNotConfiguredError(ReminderScheduleError):
+    """No task can be queued until configuration changes; retrying will not help."""
+
+
+@dataclass(frozen=True)
+class ReminderTask:
+    """An HTTP dispatch to deliver at ``schedule_time_utc``, as Cloud Tasks models it."""
+
+    url: str
+    headers: dict[str, str]
+    body: bytes
+    schedule_time_utc: datetime
+    task_id: str | None = None  # named tasks are created at most once
+
+
+class ReminderTaskBackend(ABC):
+    """Where reminder dispatch tasks are queued.
+
+    ``create_task`` and ``delete_task`` are synchronous: handlers call them
+    inline and bucketed fan-out calls them from a worker thread, so
+    implementations must be thread-safe.
+    """
+
+    @abstractmethod
+    def create_task(self, task: ReminderTask) -> str:
+        """Queue ``task`` and return its name; an existing named task is reused."""
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_task(self, name: str) -> None:
+        """Drop a queued task; unknown names are ignored."""
+
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        return None
+
+
+class CloudTasksBackend(ReminderTaskBackend):
+    """Google Cloud Tasks queue, through one client (and gRPC channel) per process."""
+
+    def __init__(self, settings: Settings) -> None:
+        self.project_id = settings.gcp_project_id
+        self.location = settings.gcp_region
+        self.queue_name = settings.reminders_queue_name
+        self._client: Any = None
+        self._lock = threading.Lock()
+
+    def _get_client(self) -> Any:
+        if tasks_v2_module is None or timestamp_pb2_module is None:
+            raise ReminderTasksNotConfiguredError("google-cloud-tasks not available")
+        with self._lock:
+            if self._client is None:
+                self._client = tasks_v2_module.CloudTasksClient()
+            return self._client
+
+    def create_task(self, task: ReminderTask) -> str:
+        client = self._get_client()
+        if not self.project_id:
+            raise ReminderTasksNotConfiguredError("GCP project id not configured")
+
+        schedule_timestamp = timestamp_pb2_module.Timestamp()
+        schedule_timestamp.FromDatetime(task.schedule_time_utc.astimezone(timezone.utc))
+        parent = client.queue_path(self.project_id, self.location, self.queue_name)
+        request: dict[str, Any] = {
+            "schedule_time": schedule_timestamp,
+            "http_request": {
+                "http_method": tasks_v2_module.HttpMethod.POST,
+                "url": task.url,
+                "headers": task.headers,
+                "body": task.body,
+            },
+        }
+        if task.task_id:
+            request["name"] = client.task_path(self.project_id, self.location, self.queue_name, task.task_id)
+
+        try:
+            response = client.create_task(parent=parent, task=request)
+        except Exception as exc:
+            if task.task_id and AlreadyExistsType is not None and isinstance(exc, AlreadyExistsType):
+                return request["name"]
+            if GoogleAPIErrorType is not None and isinstance(exc, GoogleAPIErrorType):
+                logger.warning("Failed to schedule reminder", error=str(exc))
+            else:
+                logger.warning("Failed to schedule reminder (unexpected)", error=str(exc))
+            raise ReminderScheduleError("Failed to schedule reminder") from exc
+        return response.name
+
+    def delete_task(self, name: str) -> None:
+        if tasks_v2_module is None:
+            logger.warning("google-cloud-tasks not available; cannot delete reminder task")
+            return
+        try:
+            self._get_client().delete_task(name=name)
+        except Exception as exc:
+            if NotFoundType is not None and isinstance(exc, NotFoundType):
+                return
+            logger.warning("Failed to delete reminder task", error=str(exc))
+
+    async def aclose(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.transport.close()
+            except Exception as exc:
+                logger.warning("Failed to close Cloud Tasks client", error=str(exc))
+
+
+@dataclass
+class LocalTask:
+    name: str
+    run_at: float  # epoch seconds, so the state file survives restarts
+    url: str
+    headers: dict[str, str]
+    body: str
+    attempts: int = 0
+
+
+TaskSender = Callable[[LocalTask], Awaitable[int]]
+
+
+@dataclass(order=True)
+class _HeapItem:
+    run_at: float
+    seq: int
+    name: str = field(compare=False)
+
+
+class LocalTaskBackend(ReminderTaskBackend):
+    """In-process task queue: a heap of due times served by an asyncio runner.
+
+    Tasks are POSTed to their dispatch URL like Cloud Tasks would, retried
+    with exponential backoff on failure, and dropped after ``max_attempts``.
+    The queue is written to ``state_path`` (JSON, owner-only) on every change
+    and reloaded on start, so reminders survive restarts of self-hosted
+    deployments. Serves a single process; run one instance with it.
+    """
+
+    def __init__(
+        self,
+        state_path: str | None = None,
+        *,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 10.0,
+        concurrency: int = 10,
+        sender: TaskSender | None = None,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self.state_path = state_path
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_seconds = retry_base_seconds
+        self.concurrency = max(1, concurrency)
+        self._sender = sender
+        self._clock = clock or time.time
+        self._lock = threading.Lock()
+        self._tasks: dict[str, LocalTask] = {}
+        self._heap: list[_HeapItem] = []
+        self._seq = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._runner: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()
+        self._http: httpx.AsyncClient | None = None
+        self._load()
+
+    def create_task(self, task: ReminderTask) -> str:
+        name = f"local/{task.task_id or uuid.uuid4().hex}"
+        with self._lock:
+            if name in self._tasks:
+                return name
+            self._push(
+                LocalTask(
+                    name=name,
+                    run_at=task.schedule_time_utc.timestamp(),
+                    url=task.url,
+                    headers=dict(task.headers),
+                    body=task.body.decode("utf-8"),
+                )
+            )
+            self._save()
+        self._notify()
+        return name
+
+    def delete_task(self, name: str) -> None:
+        with self._lock:
+            if self._tasks.pop(name, None) is not None:
+                self._save()
+
+    def pending(self) -> list[LocalTask]:
+        with self._lock:
+            return sorted(self._tasks.values(), key=lambda task: task.run_at)
+
+    async def start(self) -> None:
+        if self._runner is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._runner = asyncio.create_task(self._run())
+        logger.info("local_reminder_backend_started", pending=len(self._tasks), state_path=self.state_path)
+
+    async def aclose(self) -> None:
+        runner, self._runner = self._runner, None
+        tasks = [task for task in (runner, *self._in_flight) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        with self._lock:
+            self._save()
+
+    async def run_due(self) -> int:
+        """Fire every task that is due now and wait for them; returns how many ran."""
+
+        due = self._pop_due()
+        await asyncio.gather(*(self._fire(task) for task in due))
+        return len(due)
+
+    def _push(self, task: LocalTask) -> None:
+        self._tasks[task.name] = task
+        self._seq += 1
+        heapq.heappush(self._heap, _HeapItem(task.run_at, self._seq, task.name))
+
+    def _pop_due(self, limit: int | None = None) -> list[LocalTask]:
+        now = self._clock()
+        due: list[LocalTask] = []
+        with self._lock:
+            while self._heap and self._heap[0].run_at <= now and (limit is None or len(due) < limit):
+                item = heapq.heappop(self._heap)
+                task = self._tasks.get(item.name)
+                if task is None or task.run_at != item.run_at:
+                    continue  # deleted or rescheduled since it was pushed
+                due.append(task)
+        return due
+
+    def _next_wait(self) -> float | None:
+        with self._lock:
+            while self._heap and self._heap[0].name not in self._tasks:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0].run_at - self._clock())
+
+    def _notify(self) -> None:
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None or loop.is_closed():
+            return
+        try:
+            if asyncio.get_running_loop() is loop:
+                wake.set()
+                return
+        except RuntimeError:
+            pass
+        loop.call_soon_threadsafe(wake.set)
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            free = self.concurrency - len(self._in_flight)
+            for task in self._pop_due(limit=free) if free > 0 else []:
+                fire = asyncio.create_task(self._fire(task))
+                self._in_flight.add(fire)
+                fire.add_done_callback(self._fired)
+            wait = self._next_wait() if free > 0 else None
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fired(self, fire: asyncio.Task) -> None:
+        self._in_flight.discard(fire)
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _fire(self, task: LocalTask) -> None:
+        try:
+            status = await self._send(task)
+            error = None if 200 <= status < 300 else f"HTTP {status}"
+        except Exception as exc:
+            error = str(exc) or type(exc).__name__
+        with self._lock:
+            if self._tasks.get(task.name) is not task:
+                return  # deleted while in flight
+            if error is None:
+                del self._tasks[task.name]
+            else:
+                task.attempts += 1
+                if task.attempts >= self.max_attempts:
+                    del self._tasks[task.name]
+                    logger.warning("local_reminder_task_dropped", name=task.name, attempts=task.attempts, error=error)
+                else:
+                    task.run_at = self._clock() + self.retry_base_seconds * 2 ** (task.attempts - 1)
+                    self._seq += 1
+                    heapq.heappush(self._heap, _HeapItem(task.run_at, self._seq, task.name))
+                    logger.warning("local_reminder_task_retry", name=task.name, attempts=task.attempts, error=error)
+            self._save()
+
+    async def _send(self, task: LocalTask) -> int:
+        if self._sender is not None:
+            return await self._sender(task)
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=60.0)
+        response = await self._http.post(task.url, headers=task.headers, content=task.body.encode("utf-8"))
+        return response.status_code
+
+    def _load(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding="utf-8") as handle:
+                data = json.load(handle)
+            for raw in data.get("tasks", []):
+                self._push(LocalTask(**raw))
+        except Exception as exc:
+            logger.warning("Failed to load local reminder tasks", error=str(exc), state_path=self.state_path)
+
+    def _save(self) -> None:
+        """Write the queue atomically; the caller holds the lock."""
+
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump({"tasks": [asdict(task) for task in self._tasks.values()]}, handle)
+            os.replace(tmp_path, self.state_path)
+        except OSError as exc:
+            logger.warning("Failed to persist local reminder tasks", error=str(exc), state_path=self.state_path)
+
+
+@lru_cache()
+def get_reminder_task_backend() -> ReminderTaskBackend:
+    """Process-wide task backend chosen by REMINDERS_BACKEND."""
+
+    settings = get_settings()
+    if settings.reminders_backend == "local":
+        return LocalTaskBackend(settings.reminders_local_state_path)
+    return CloudTasksBackend(settings)
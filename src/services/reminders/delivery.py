@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, time
+
+from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.constants import ParseMode
+from telegram.error import BadRequest
+
+from src.config.constants import MESSAGES_EN, MESSAGES_RU
+from src.core.exceptions import ExternalTimeoutError, SheetAccessError, SheetWriteError
+from src.models.user import UserProfile
+from src.services.on_this_day import (
+    assemble_payloads,
+    compute_on_this_day_dates,
+    format_on_this_day_message,
+    should_autopush_skip_for_new_user,
+)
+from src.services.reminders.scheduler import parse_time_text
+from src.services.reminders.smart_nudges import compute_due_date
+from src.services.storage.interfaces import ISheetsClient
+from src.services.telegram.utils import resolve_language
+
+# Senders shared by per-user and bucketed dispatch. Each returns whether a
+# message went out and lets TelegramError propagate to the caller.
+
+
+async def send_daily_reminder(bot: Bot, profile: UserProfile) -> bool:
+    lang = resolve_language(profile)
+    text = MESSAGES_RU["reminder_message"] if lang == "ru" else MESSAGES_EN["reminder_message"]
+    await bot.send_message(chat_id=profile.telegram_user_id, text=text)
+    return True
+
+
+async def send_smart_nudge(bot: Bot, profile: UserProfile, now_local: datetime) -> bool:
+    """Nudge about the due habits day unless it is already logged."""
+
+    rollover = parse_time_text(profile.smart_nudges_rollover_time) or time(12, 0)
+    due = compute_due_date(now_local, rollover)
+    due_iso = due.isoformat()
+    if profile.last_habits_logged_for_date == due_iso:
+        return False
+
+    msgs = MESSAGES_RU if resolve_language(profile) == "ru" else MESSAGES_EN
+    is_yesterday = due < now_local.date()
+    text = msgs["smart_nudge_missing_yesterday"] if is_yesterday else msgs["smart_nudge_missing_today"]
+    markup = InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton(
+                    msgs["smart_nudge_log_now"],
+                    callback_data=f"habits_date:{due_iso}",
+                ),
+                InlineKeyboardButton(
+                    msgs["smart_nudge_disable"],
+                    callback_data="smart_nudges:disable",
+                ),
+            ]
+        ]
+    )
+    await bot.send_message(chat_id=profile.telegram_user_id, text=text, reply_markup=markup)
+    return True
+
+
+async def send_on_this_day(
+    bot: Bot,
+    sheets_client: ISheetsClient,
+    profile: UserProfile,
+    now_local: datetime,
+    *,
+    timeout_seconds: float,
+) -> bool:
+    """Push past entries for today's date, if the user has a year of history."""
+
+    today_local = now_local.date()
+    if should_autopush_skip_for_new_user(today_local, profile.created_at):
+        return False  # Less than a year of history — skip send, just reschedule.
+    if not profile.sheet_id:
+        return False  # No sheet connected — skip send.
+    target_dates = compute_on_this_day_dates(today_local)
+    if not target_dates:
+        return False
+
+    try:
+        entries = await asyncio.wait_for(
+            sheets_client.get_entries_for_dates_multi(profile.sheet_id, target_dates),
+            timeout=timeout_seconds,
+        )
+        habits_entries = entries["Habits"]
+        dreams_entries = entries["Dreams"]
+        thoughts_entries = entries["Thoughts"]
+        reflection_entries = entries["Reflections"]
+    except (SheetAccessError, SheetWriteError, ExternalTimeoutError, asyncio.TimeoutError):
+        habits_entries = dreams_entries = thoughts_entries = reflection_entries = []
+    payloads = assemble_payloads(
+        target_dates,
+        habits_entries,
+        dreams_entries,
+        thoughts_entries,
+        reflection_entries,
+    )
+    if not payloads:
+        return False
+
+    chat_id = profile.telegram_user_id
+    text = format_on_this_day_message(today_local, payloads, resolve_language(profile))
+    try:
+        await bot.send_message(chat_id=chat_id, text=text, parse_mode=ParseMode.MARKDOWN)
+    except BadRequest:
+        try:
+            await bot.send_message(
+                chat_id=chat_id,
+                text=text.replace("_", "\\_"),
+                parse_mode=ParseMode.MARKDOWN,
+            )
+        except BadRequest:
+            await bot.send_message(chat_id=chat_id, text=text)
+    return True
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from telegram import Bot
+from telegram.error import TelegramError
+
+from src.config.settings import Settings
+from src.core.logging import get_logger
+from src.models.user import UserProfile
+from src.services.reminders.delivery import send_daily_reminder, send_on_this_day, send_smart_nudge
+from src.services.reminders.schedule_index import NEXT_RUN_FIELDS, next_run_utc
+from src.services.reminders.scheduler import ReminderScheduleError, bucket_floor, ensure_bucket_task
+from src.services.storage.interfaces import ISheetsClient, IUserRepository
+
+logger = get_logger(__name__)
+
+@dataclass(frozen=True)
+class BucketDispatchResult:
+    """What one bucket dispatch did; returned to Cloud Tasks and logged."""
+
+    kind: str
+    bucket: datetime
+    due: int
+    sent: int
+    skipped: int  # not sent: disabled, nothing to send, or too late
+    failed: int
+    buckets_scheduled: int
+    schedule_failed: int
+
+
+class ReminderFanout:
+    """Serves a bucket task: every user whose ``kind`` run falls in or before a minute.
+
+    Due profiles are read with one range query per page, delivered with at
+    most ``concurrency`` sends in flight, and their next runs are written
+    back in Firestore batches. The bucket tasks those next runs land in are
+    then ensured (named tasks, so concurrent dispatches deduplicate). Users a
+    missed bucket left behind are picked up by the next bucket of the same
+    kind; runs older than ``max_lateness`` are rescheduled without sending.
+    """
+
+    def __init__(
+        self,
+        *,
+        settings: Settings,
+        user_repo: IUserRepository,
+        bot: Bot,
+        sheets_client: Callable[[], ISheetsClient],
+        concurrency: int | None = None,
+        page_size: int | None = None,
+        max_lateness: timedelta | None = None,
+        clock: Callable[[], datetime] | None = None,
+    ) -> None:
+        self.settings = settings
+        self.user_repo = user_repo
+        self.bot = bot
+        self._sheets_client = sheets_client
+        self.concurrency = max(1, concurrency or settings.reminders_bucket_concurrency)
+        self.page_size = max(1, page_size or settings.reminders_bucket_page_size)
+        self.max_lateness = max_lateness or timedelta(minutes=settings.reminders_bucket_max_lateness_minutes)
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+
+    async def dispatch(self, kind: str, bucket: datetime) -> BucketDispatchResult:
+        if kind not in NEXT_RUN_FIELDS:
+            raise ValueError(f"Unknown reminder kind: {kind}")
+        field_name = NEXT_RUN_FIELDS[kind]
+        bucket = bucket_floor(bucket)
+        counts = {"due": 0, "sent": 0, "skipped": 0, "failed": 0}
+        next_buckets: set[datetime] = set()
+        seen: set[int] = set()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        while True:
+            page = await self.user_repo.list_due(field_name, bucket, self.page_size)
+            fresh = [profile for profile in page if profile.telegram_user_id not in seen]
+            if not fresh:
+                break  # only profiles whose write-back failed are left
+            seen.update(profile.telegram_user_id for profile in fresh)
+            counts["due"] += len(fresh)
+            outcomes = await asyncio.gather(
+                *(self._serve(kind, field_name, bucket, profile, semaphore) for profile in fresh)
+            )
+            updates: dict[int, dict[str, Any]] = {}
+            for profile, (outcome, next_run) in zip(fresh, outcomes):
+                counts[outcome] += 1
+                updates[profile.telegram_user_id] = {field_name: next_run}
+                if next_run is not None:
+                    next_buckets.add(bucket_floor(next_run))
+            await self.user_repo.update_fields_many(updates)
+            if len(page) < self.page_size:
+                break
+
+        scheduled, schedule_failed = await self._ensure_buckets(kind, next_buckets)
+        result = BucketDispatchResult(
+            kind=kind,
+            bucket=bucket,
+            buckets_scheduled=scheduled,
+            schedule_failed=schedule_failed,
+            **counts,
+        )
+        logger.info(
+            "reminder_bucket_dispatched",
+            kind=kind,
+            bucket=bucket.isoformat(),
+            due=result.due,
+            sent=result.sent,
+            skipped=result.skipped,
+            failed=result.failed,
+            buckets_scheduled=scheduled,
+            schedule_failed=schedule_failed,
+        )
+        return result
+
+    async def _serve(
+        self,
+        kind: str,
+        field_name: str,
+        bucket: datetime,
+        profile: UserProfile,
+        semaphore: asyncio.Semaphore,
+    ) -> tuple[str, datetime | None]:
+        async with semaphore:
+            now = self._clock()
+            # Never reschedule into the bucket being served, even with a skewed clock.
+            next_run = next_run_utc(profile, kind, max(now, bucket))
+            if next_run is None:
+                return "skipped", None
+            scheduled_for = getattr(profile, field_name)
+            if scheduled_for is not None and now - scheduled_for > self.max_lateness:
+                logger.info("reminder_bucket_too_late", kind=kind, user_id=profile.telegram_user_id)
+                return "skipped", next_run
+            try:
+                sent = await self._deliver(kind, profile, now)
+            except TelegramError as exc:
+                logger.warning(
+                    "reminder_bucket_send_failed",
+                    kind=kind,
+                    user_id=profile.telegram_user_id,
+                    error=str(exc),
+                )
+                return "failed", next_run
+            return ("sent" if sent else "skipped"), next_run
+
+    async def _deliver(self, kind: str, profile: UserProfile, now: datetime) -> bool:
+        now_local = now.astimezone(ZoneInfo(profile.timezone))
+        if kind == "on_this_day":
+            return await send_on_this_day(
+                self.bot,
+                self._sheets_client(),
+                profile,
+                now_local,
+                timeout_seconds=self.settings.sheets_timeout_seconds,
+            )
+        if kind == "smart_nudge":
+            return await send_smart_nudge(self.bot, profile, now_local)
+        return await send_daily_reminder(self.bot, profile)
+
+    async def _ensure_buckets(self, kind: str, buckets: set[datetime]) -> tuple[int, int]:
+        scheduled = failed = 0
+        for bucket in sorted(buckets):
+            try:
+                await asyncio.to_thread(ensure_bucket_task, self.settings, kind, bucket)
+            except ReminderScheduleError as exc:
+                # The users stay due and are served by the next bucket of this kind.
+                logger.warning("reminder_bucket_schedule_failed", kind=kind, bucket=bucket.isoformat(), error=str(exc))
+                failed += 1
+                continue
+            scheduled += 1
+        return scheduled, failed
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Literal
+from zoneinfo import ZoneInfo
+
+from src.config.settings import Settings
+from src.core.logging import get_logger
+from src.models.user import UserProfile, UserReminders
+from src.services.reminders.scheduler import (
+    ReminderScheduleError,
+    bucket_floor,
+    compute_next_run,
+    ensure_bucket_task,
+    parse_time_text,
+)
+from src.services.reminders.smart_nudges import pick_next_run_smart_nudges
+from src.services.storage.interfaces import IUserRepository
+
+logger = get_logger(__name__)
+
+ReminderKind = Literal["daily", "on_this_day", "smart_nudge"]
+
+NEXT_RUN_FIELDS: dict[str, str] = {
+    "daily": "reminder_next_run_utc",
+    "on_this_day": "on_this_day_next_run_utc",
+    "smart_nudge": "smart_nudges_next_run_utc",
+}
+
+# Per-user Cloud Task of each kind; while one is set, that task owns the reminder.
+TASK_NAME_FIELDS: dict[str, str] = {
+    "daily": "reminder_task_name",
+    "on_this_day": "on_this_day_task_name",
+    "smart_nudge": "smart_nudges_task_name",
+}
+
+# A full profile, or just the fields scheduling reads.
+ReminderProfile = UserProfile | UserReminders
+
+
+def next_run_utc(profile: ReminderProfile, kind: str, now: datetime | None = None) -> datetime | None:
+    """When ``kind`` next fires for ``profile``, or None if it is off or misconfigured.
+
+    The local time is resolved for the target date itself, so a run across a
+    DST change lands on the right UTC instant.
+    """
+
+    try:
+        tz = ZoneInfo(profile.timezone)
+    except Exception:
+        return None
+    current = (now or datetime.now(timezone.utc)).astimezone(tz)
+
+    if kind == "smart_nudge":
+        if not profile.smart_nudges_enabled or not profile.smart_nudges_times:
+            return None
+        times = [parse_time_text(raw) for raw in profile.smart_nudges_times]
+        rollover = parse_time_text(profile.smart_nudges_rollover_time)
+        if rollover is None or any(t is None for t in times):
+            return None
+        last_logged: date | None = None
+        if profile.last_habits_logged_for_date:
+            try:
+                last_logged = date.fromisoformat(profile.last_habits_logged_for_date)
+            except ValueError:
+                last_logged = None
+        local = pick_next_run_smart_nudges(
+            times=[t for t in times if t is not None],
+            tz=tz,
+            rollover_time=rollover,
+            last_habits_logged_for_date=last_logged,
+            now=current,
+        )
+        return local.astimezone(timezone.utc)
+
+    if kind == "on_this_day":
+        enabled, raw_time = profile.on_this_day_enabled, profile.on_this_day_time
+    else:
+        enabled, raw_time = profile.reminder_enabled, profile.reminder_time
+    reminder_time = parse_time_text(raw_time) if enabled and raw_time else None
+    if reminder_time is None:
+        return None
+    return compute_next_run(reminder_time, tz, now=current).astimezone(timezone.utc)
+
+
+def refresh_next_runs(profile: ReminderProfile, now: datetime | None = None) -> dict[str, datetime | None]:
+    """Recompute every next-run field of ``profile``; returns the fields that changed."""
+
+    current = now or datetime.now(timezone.utc)
+    changed: dict[str, datetime | None] = {}
+    for kind, field_name in NEXT_RUN_FIELDS.items():
+        value = next_run_utc(profile, kind, current)
+        if getattr(profile, field_name) != value:
+            setattr(profile, field_name, value)
+            changed[field_name] = value
+    return changed
+
+
+def reindex_next_runs(
+    profile: ReminderProfile,
+    now: datetime,
+    *,
+    recompute: bool,
+) -> dict[str, datetime | None]:
+    """The next-run fields a reindex pass may set on ``profile``; returns those changed.
+
+    Missing fields are filled. Stored future runs are recomputed only when
+    ``recompute`` (a DST pass); stored runs already due are left for dispatch
+    to catch up on, and kinds still owned by a per-user task are not touched.
+    """
+
+    changed: dict[str, datetime | None] = {}
+    for kind, field_name in NEXT_RUN_FIELDS.items():
+        if getattr(profile, TASK_NAME_FIELDS[kind]):
+            continue
+        stored = getattr(profile, field_name)
+        if stored is not None and (not recompute or stored <= now):
+            continue
+        value = next_run_utc(profile, kind, now)
+        if stored != value:
+            setattr(profile, field_name, value)
+            changed[field_name] = value
+    return changed
+
+
+def timezones_changing_offset(zones: Iterable[str], start: datetime, end: datetime) -> set[str]:
+    """Zones whose UTC offset differs between ``start`` and ``end`` (a DST switch)."""
+
+    changing: set[str] = set()
+    for name in set(zones):
+        try:
+            tz = ZoneInfo(name)
+        except Exception:
+            continue
+        if start.astimezone(tz).utcoffset() != end.astimezone(tz).utcoffset():
+            changing.add(name)
+    return changing
+
+
+@dataclass(frozen=True)
+class DueReminder:
+    kind: str
+    user_id: int
+    due_at: datetime
+
+
+@dataclass(frozen=True)
+class ReindexResult:
+    scanned: int
+    changed: int
+    buckets_scheduled: int
+    schedule_failed: int
+
+
+class ReminderScheduleIndex:
+    """Stored next runs per reminder kind, in UTC, and queries over them.
+
+    Scheduling keeps the index current on every profile change and dispatch;
+    ``refresh`` fills the fields of profiles written before they existed and
+    ``refresh_for_dst`` recomputes future runs in zones about to switch DST.
+    Queries are range reads on the stored instants, with no timezone work
+    per user.
+    """
+
+    def __init__(self, user_repo: IUserRepository, settings: Settings) -> None:
+        self.user_repo = user_repo
+        self.settings = settings
+
+    async def due_within(
+        self,
+        minutes: int,
+        *,
+        kinds: Iterable[str] = tuple(NEXT_RUN_FIELDS),
+        now: datetime | None = None,
+        limit: int = 500,
+    ) -> list[DueReminder]:
+        """Reminders due from now through the next ``minutes``, soonest first.
+
+        Runs already past are included: they are what a late dispatch will
+        still catch up on.
+        """
+
+        until = (now or datetime.now(timezone.utc)) + timedelta(minutes=minutes)
+        due: list[DueReminder] = []
+        for kind in kinds:
+            field_name = NEXT_RUN_FIELDS[kind]
+            for profile in await self.user_repo.list_due(field_name, until, limit):
+                due.append(DueReminder(kind, profile.telegram_user_id, getattr(profile, field_name)))
+        due.sort(key=lambda reminder: reminder.due_at)
+        return due[:limit]
+
+    async def refresh(
+        self,
+        *,
+        timezones: Iterable[str] | None = None,
+        now: datetime | None = None,
+    ) -> ReindexResult:
+        """Fill missing next runs (for users in ``timezones`` only, when given)."""
+
+        only = set(timezones) if timezones is not None else None
+        return await self._refresh(
+            self.user_repo.iter_reminders(),
+            now or datetime.now(timezone.utc),
+            lambda profile: only is None or profile.timezone in only,
+            recompute=False,
+        )
+
+    async def refresh_for_dst(
+        self,
+        *,
+        now: datetime | None = None,
+        horizon: timedelta = timedelta(days=2),
+    ) -> ReindexResult:
+        """Recompute future runs of users in zones whose offset changes within ``horizon``."""
+
+        current = now or datetime.now(timezone.utc)
+        changing: dict[str, bool] = {}
+
+        def in_changing_zone(profile: UserReminders) -> bool:
+            if profile.timezone not in changing:
+                changing[profile.timezone] = bool(
+                    timezones_changing_offset([profile.timezone], current, current + horizon)
+                )
+            return changing[profile.timezone]
+
+        return await self._refresh(self.user_repo.iter_reminders(), current, in_changing_zone, recompute=True)
+
+    async def _refresh(
+        self,
+        pages: AsyncIterator[list[UserReminders]],
+        now: datetime,
+        include: Callable[[UserReminders], bool],
+        *,
+        recompute: bool,
+    ) -> ReindexResult:
+        """Refresh the users ``include`` accepts, writing changes a page at a time."""
+
+        scanned = changed = 0
+        new_buckets: set[tuple[str, datetime]] = set()
+        kinds_by_field = {field_name: kind for kind, field_name in NEXT_RUN_FIELDS.items()}
+        async for page in pages:
+            updates: dict[int, dict[str, Any]] = {}
+            for profile in page:
+                if not include(profile):
+                    continue
+                scanned += 1
+                fields = reindex_next_runs(profile, now, recompute=recompute)
+                if not fields:
+                    continue
+                updates[profile.telegram_user_id] = dict(fields)
+                for field_name, value in fields.items():
+                    if value is not None:
+                        new_buckets.add((kinds_by_field[field_name], bucket_floor(value)))
+            if updates:
+                await self.user_repo.update_fields_many(updates)
+                changed += len(updates)
+
+        scheduled = failed = 0
+        if self.settings.reminders_fanout == "bucketed":
+            for kind, bucket in sorted(new_buckets):
+                try:
+                    await asyncio.to_thread(ensure_bucket_task, self.settings, kind, bucket)
+                except ReminderScheduleError as exc:
+                    logger.warning(
+                        "reminder_reindex_schedule_failed",
+                        kind=kind,
+                        bucket=bucket.isoformat(),
+                        error=str(exc),
+                    )
+                    failed += 1
+                    continue
+                scheduled += 1
+        result = ReindexResult(scanned, changed, scheduled, failed)
+        logger.info(
+            "reminder_schedule_reindexed",
+            scanned=result.scanned,
+            changed=result.changed,
+            buckets_scheduled=scheduled,
+            schedule_failed=failed,
+        )
+        return result
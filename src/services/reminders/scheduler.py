@@ -2,32 +2,24 @@ from __future__ import annotations
 
 import json
 from datetime import datetime, time, timedelta, timezone
-from typing import Any
 from zoneinfo import ZoneInfo
 
-try:
-    from google.api_core.exceptions import GoogleAPIError as GoogleAPIErrorType
-    from google.api_core.exceptions import NotFound as NotFoundType
-    from google.cloud import tasks_v2 as tasks_v2_module
-    from google.protobuf import timestamp_pb2 as timestamp_pb2_module  # type: ignore[import-untyped]
-except Exception:  # pragma: no cover - optional dependency
-    GoogleAPIErrorType: Any = None  # type: ignore[no-redef]
-    NotFoundType: Any = None  # type: ignore[no-redef]
-    tasks_v2_module: Any = None  # type: ignore[no-redef]
-    timestamp_pb2_module: Any = None  # type: ignore[no-redef]
-
 from src.config.settings import Settings
 from src.core.logging import get_logger
+from src.models.user import UserProfile
+from src.services.reminders.backends import (
+    ReminderScheduleError,
+    ReminderTask,
+    ReminderTasksNotConfiguredError,
+    get_reminder_task_backend,
+)
 
 
 logger = get_logger(__name__)
 _SECRET_HEADER = "X-Reminder-Secret"
 _WEBHOOK_SUFFIX = "/telegram/webhook"
 _DISPATCH_SUFFIX = "/reminders/dispatch"
-
-
-class ReminderScheduleError(RuntimeError):
-    pass
+_BUCKET_TASK_PREFIX = "bucket-"
 
 
 def parse_time_text(value: str) -> time | None:
@@ -76,20 +68,65 @@ def build_dispatch_url(base_url: str) -> str:
     return f"{trimmed}{_DISPATCH_SUFFIX}"
 
 
+def bucket_floor(moment: datetime) -> datetime:
+    """The UTC minute a run belongs to; bucketed dispatch serves one per task."""
+
+    return moment.astimezone(timezone.utc).replace(second=0, microsecond=0)
+
+
+def bucket_task_id(kind: str, bucket: datetime) -> str:
+    """Deterministic Cloud Tasks id, so every user due in a minute shares one task."""
+
+    return f"{_BUCKET_TASK_PREFIX}{kind.replace('_', '-')}-{bucket_floor(bucket):%Y%m%d%H%M}"
+
+
+def is_bucket_task(task_name: str) -> bool:
+    return task_name.rsplit("/", 1)[-1].startswith(_BUCKET_TASK_PREFIX)
+
+
+def ensure_bucket_task(settings: Settings, kind: str, run_at: datetime) -> str:
+    """Make sure the shared dispatch task for ``kind`` at ``run_at``'s minute exists."""
+
+    bucket = bucket_floor(run_at)
+    return schedule_reminders_task_at(
+        settings=settings,
+        schedule_time_utc=bucket,
+        payload={"kind": kind, "bucket": bucket.isoformat()},
+        task_id=bucket_task_id(kind, bucket),
+    )
+
+
+def _schedule_next_run(
+    settings: Settings,
+    *,
+    kind: str,
+    next_run_utc: datetime,
+    payload: dict,
+    previous_task_name: str | None,
+    profile: UserProfile | None,
+    next_run_field: str,
+) -> str:
+    if profile is not None:
+        setattr(profile, next_run_field, next_run_utc)
+    if settings.reminders_fanout == "bucketed":
+        task_name = ensure_bucket_task(settings, kind, next_run_utc)
+        # A per-user task left over from before the switch would double-send.
+        delete_reminder_task(settings, previous_task_name)
+        return task_name
+    return schedule_reminders_task_at(
+        settings=settings,
+        schedule_time_utc=next_run_utc,
+        payload=payload,
+        previous_task_name=previous_task_name,
+    )
+
+
 def delete_reminder_task(settings: Settings, task_name: str | None) -> None:
     if not task_name:
         return
-    if tasks_v2_module is None:
-        logger.warning("google-cloud-tasks not available; cannot delete reminder task")
-        return
-    try:
-        client = tasks_v2_module.CloudTasksClient()
-        client.delete_task(name=task_name)
-    except Exception as exc:
-        if NotFoundType is not None and isinstance(exc, NotFoundType):
-            return
-        logger.warning("Failed to delete reminder task", error=str(exc))
-        return
+    if is_bucket_task(task_name):
+        return  # shared with other users; it skips users no longer due
+    get_reminder_task_backend().delete_task(task_name)
 
 
 def schedule_reminder_task(
@@ -98,18 +135,24 @@ def schedule_reminder_task(
     reminder_time: time,
     timezone_name: str,
     previous_task_name: str | None = None,
+    *,
+    profile: UserProfile | None = None,
 ) -> str:
+    """Schedule the next daily reminder; records the run on ``profile`` when given."""
+
     try:
         tz = ZoneInfo(timezone_name)
     except Exception as exc:
         raise ReminderScheduleError("Invalid timezone") from exc
     next_run = compute_next_run(reminder_time, tz).astimezone(timezone.utc)
-    payload = {"user_id": user_id}
-    return schedule_reminders_task_at(
-        settings=settings,
-        schedule_time_utc=next_run,
-        payload=payload,
+    return _schedule_next_run(
+        settings,
+        kind="daily",
+        next_run_utc=next_run,
+        payload={"user_id": user_id},
         previous_task_name=previous_task_name,
+        profile=profile,
+        next_run_field="reminder_next_run_utc",
     )
 
 
@@ -119,6 +162,8 @@ def schedule_on_this_day_task(
     reminder_time: time,
     timezone_name: str,
     previous_task_name: str | None = None,
+    *,
+    profile: UserProfile | None = None,
 ) -> str:
     """Schedule the next daily "On this day" push for a user."""
 
@@ -127,12 +172,14 @@ def schedule_on_this_day_task(
     except Exception as exc:
         raise ReminderScheduleError("Invalid timezone") from exc
     next_run = compute_next_run(reminder_time, tz).astimezone(timezone.utc)
-    payload = {"user_id": user_id, "kind": "on_this_day"}
-    return schedule_reminders_task_at(
-        settings=settings,
-        schedule_time_utc=next_run,
-        payload=payload,
+    return _schedule_next_run(
+        settings,
+        kind="on_this_day",
+        next_run_utc=next_run,
+        payload={"user_id": user_id, "kind": "on_this_day"},
         previous_task_name=previous_task_name,
+        profile=profile,
+        next_run_field="on_this_day_next_run_utc",
     )
 
 
@@ -142,53 +189,33 @@ def schedule_reminders_task_at(
     schedule_time_utc: datetime,
     payload: dict,
     previous_task_name: str | None = None,
+    task_id: str | None = None,
 ) -> str:
-    """Schedule a reminders dispatch task at an explicit UTC datetime."""
+    """Schedule a reminders dispatch task at an explicit UTC datetime.
+
+    With ``task_id`` the task is named, and an existing task of that name
+    counts as success, so the backend deduplicates concurrent schedulers.
+    """
 
-    if tasks_v2_module is None or timestamp_pb2_module is None:
-        raise ReminderScheduleError("google-cloud-tasks not available")
     if schedule_time_utc.tzinfo is None:
         raise ReminderScheduleError("schedule_time_utc must be timezone-aware")
     dispatch_base = settings.get_reminders_dispatch_url() or settings.get_telegram_webhook_url()
     if not dispatch_base:
-        raise ReminderScheduleError("Dispatch URL not configured")
+        raise ReminderTasksNotConfiguredError("Dispatch URL not configured")
     if not settings.reminders_dispatch_secret:
-        raise ReminderScheduleError("Dispatch secret not configured")
-    if not settings.gcp_project_id:
-        raise ReminderScheduleError("GCP project id not configured")
-
-    queue_name = settings.reminders_queue_name
-    location = settings.gcp_region
-    dispatch_url = build_dispatch_url(dispatch_base)
-
-    schedule_timestamp = timestamp_pb2_module.Timestamp()
-    schedule_timestamp.FromDatetime(schedule_time_utc.astimezone(timezone.utc))
-
-    client = tasks_v2_module.CloudTasksClient()
-    parent = client.queue_path(settings.gcp_project_id, location, queue_name)
-
-    body = json.dumps(payload).encode("utf-8")
-    task = {
-        "schedule_time": schedule_timestamp,
-        "http_request": {
-            "http_method": tasks_v2_module.HttpMethod.POST,
-            "url": dispatch_url,
-            "headers": {
-                "Content-Type": "application/json",
-                _SECRET_HEADER: settings.reminders_dispatch_secret,
-            },
-            "body": body,
-        },
-    }
+        raise ReminderTasksNotConfiguredError("Dispatch secret not configured")
 
-    try:
-        response = client.create_task(parent=parent, task=task)  # type: ignore[arg-type]
-    except Exception as exc:
-        if GoogleAPIErrorType is not None and isinstance(exc, GoogleAPIErrorType):
-            logger.warning("Failed to schedule reminder", error=str(exc))
-        else:
-            logger.warning("Failed to schedule reminder (unexpected)", error=str(exc))
-        raise ReminderScheduleError("Failed to schedule reminder") from exc
+    task = ReminderTask(
+        url=build_dispatch_url(dispatch_base),
+        headers={
+            "Content-Type": "application/json",
+            _SECRET_HEADER: settings.reminders_dispatch_secret,
+        },
+        body=json.dumps(payload).encode("utf-8"),
+        schedule_time_utc=schedule_time_utc.astimezone(timezone.utc),
+        task_id=task_id,
+    )
+    name = get_reminder_task_backend().create_task(task)
     if previous_task_name:
         delete_reminder_task(settings, previous_task_name)
-    return response.name
+    return name
@@ -5,8 +5,9 @@ from datetime import date, datetime, time, timedelta, timezone
 from zoneinfo import ZoneInfo
 
 from src.services.reminders.scheduler import compute_next_run, parse_time_text
-from src.services.reminders.scheduler import schedule_reminders_task_at, ReminderScheduleError
+from src.services.reminders.scheduler import ReminderScheduleError, _schedule_next_run
 from src.config.settings import Settings
+from src.models.user import UserProfile
 
 
 @dataclass(frozen=True)
@@ -119,6 +120,7 @@ def schedule_smart_nudges_task(
     rollover_time: str,
     last_habits_logged_for_date: str | None,
     previous_task_name: str | None = None,
+    profile: UserProfile | None = None,
 ) -> str:
     """Schedule the next Smart nudges task for a user."""
 
@@ -148,10 +150,12 @@ def schedule_smart_nudges_task(
         rollover_time=rollover,
         last_habits_logged_for_date=last_logged,
     )
-    payload = {"user_id": user_id, "kind": "smart_nudge"}
-    return schedule_reminders_task_at(
-        settings=settings,
-        schedule_time_utc=next_run_local.astimezone(timezone.utc),
-        payload=payload,
+    return _schedule_next_run(
+        settings,
+        kind="smart_nudge",
+        next_run_utc=next_run_local.astimezone(timezone.utc),
+        payload={"user_id": user_id, "kind": "smart_nudge"},
         previous_task_name=previous_task_name,
+        profile=profile,
+        next_run_field="smart_nudges_next_run_utc",
     )
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.config.settings import get_settings
+from src.core.logging import get_logger
+from src.models.broadcast import BroadcastJob
+from src.services.storage.firestore.client import FirestoreClient
+from src.services.storage.firestore.executor import run_firestore
+
+logger = get_logger(__name__)
+
+
+class BroadcastJobRepository:
+    """Firestore store of broadcast jobs, keyed by job id, with in-memory fallback."""
+
+    def __init__(self, client: FirestoreClient | None = None):
+        self.client = client
+        settings = get_settings()
+        self.collection_name = settings.firestore_collection_broadcast_jobs
+        self._store: dict[str, BroadcastJob] = {}
+
+    async def get(self, job_id: str) -> Optional[BroadcastJob]:
+        if self.client and self.client.is_ready:
+            try:
+                doc_ref = self.client.collection(self.collection_name).document(job_id)
+                doc = await run_firestore(doc_ref.get)
+                return BroadcastJob(**doc.to_dict()) if doc.exists else None
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for broadcast jobs; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        job = self._store.get(job_id)
+        return job.model_copy(deep=True) if job else None
+
+    async def save(self, job: BroadcastJob) -> None:
+        job.updated_at = datetime.now(timezone.utc)
+        if self.client and self.client.is_ready:
+            try:
+                doc_ref = self.client.collection(self.collection_name).document(job.job_id)
+                await run_firestore(doc_ref.set, job.model_dump(mode="json"))
+                return
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for broadcast jobs; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        self._store[job.job_id] = job.model_copy(deep=True)
@@ -53,3 +53,8 @@ class FirestoreClient:
         if not self._client:
             raise RuntimeError("Firestore client is not configured")
         return self._client.collection(name)
+
+    def batch(self):
+        if not self._client:
+            raise RuntimeError("Firestore client is not configured")
+        return self._client.batch()
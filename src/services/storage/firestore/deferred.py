@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class DeferredWrites(Generic[T]):
+    """Documents read and saved during one unit of work, by id."""
+
+    def __init__(self) -> None:
+        self.pending: dict[int, T] = {}
+        # Documents already read in this unit of work; None is a known miss.
+        self.loaded: dict[int, Optional[T]] = {}
+        # Set once flushed; a task that copied the context and saves later
+        # must write through instead of into a batch nobody will flush.
+        self.closed = False
+
+    def remember(self, doc_id: int, value: Optional[T]) -> None:
+        self.loaded[doc_id] = value
+
+    def lookup(self, doc_id: int) -> tuple[bool, Optional[T]]:
+        """``(found, value)`` for a document saved or read in this unit of work."""
+
+        if doc_id in self.pending:
+            return True, self.pending[doc_id]
+        if doc_id in self.loaded:
+            return True, self.loaded[doc_id]
+        return False, None
+
+
+class DeferredScope(Generic[T]):
+    """Per-repository, per-task scope in which saves are held back and flushed once."""
+
+    def __init__(self, name: str) -> None:
+        self._var: ContextVar[DeferredWrites[T] | None] = ContextVar(name, default=None)
+
+    def current(self) -> DeferredWrites[T] | None:
+        batch = self._var.get()
+        return batch if batch is not None and not batch.closed else None
+
+    @asynccontextmanager
+    async def open(self, flush: Callable[[T], Awaitable[None]]) -> AsyncIterator[None]:
+        """Hold back saves inside the block and ``flush`` each document on exit.
+
+        The flush also runs when the block raises. Nested blocks join the
+        outer one.
+        """
+
+        if self.current() is not None:
+            yield
+            return
+        batch: DeferredWrites[T] = DeferredWrites()
+        token = self._var.set(batch)
+        try:
+            yield
+        finally:
+            self._var.reset(token)
+            batch.closed = True
+            for value in batch.pending.values():
+                await flush(value)
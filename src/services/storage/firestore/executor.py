@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from src.config.settings import get_settings
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class FirestoreIOStats:
+    """Point-in-time view of the Firestore executor, for logs and admin output."""
+
+    queued: int  # calls waiting for a free worker
+    running: int
+    completed: int
+
+
+class FirestoreExecutor:
+    """Runs blocking Firestore RPCs on a dedicated, sized thread pool.
+
+    The repositories use the synchronous client; awaiting their calls here
+    keeps the event loop free, so concurrent webhooks overlap their Firestore
+    latency instead of queueing behind one another. ``max_workers`` bounds
+    how many RPCs are in flight; further calls wait for a worker. Context
+    variables (log context, request scope) are carried into the worker.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="firestore-io")
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        self._queued += 1
+        started = False
+
+        def call() -> T:
+            nonlocal started
+            started = True
+            loop.call_soon_threadsafe(self._on_started)
+            return context.run(fn, *args)
+
+        def on_done(_future: asyncio.Future[T]) -> None:
+            if started:
+                self._running -= 1
+            else:
+                self._queued -= 1
+            self._completed += 1
+
+        try:
+            future = loop.run_in_executor(self._pool, call)
+        except BaseException:
+            self._queued -= 1
+            raise
+        future.add_done_callback(on_done)
+        return await future
+
+    def _on_started(self) -> None:
+        self._queued -= 1
+        self._running += 1
+
+    def stats(self) -> FirestoreIOStats:
+        return FirestoreIOStats(queued=self._queued, running=self._running, completed=self._completed)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache()
+def get_firestore_executor() -> FirestoreExecutor:
+    """Process-wide executor shared by every Firestore repository."""
+
+    return FirestoreExecutor(get_settings().firestore_executor_workers)
+
+
+async def run_firestore(fn: Callable[..., T], *args: Any) -> T:
+    """Await a blocking Firestore call without blocking the event loop."""
+
+    return await get_firestore_executor().run(fn, *args)
@@ -2,6 +2,7 @@ from src.config.settings import get_settings
 from src.core.logging import get_logger
 from src.models.feedback import FeedbackEntry
 from src.services.storage.firestore.client import FirestoreClient
+from src.services.storage.firestore.executor import run_firestore
 
 logger = get_logger(__name__)
 
@@ -18,7 +19,8 @@ class FeedbackRepository:
         if self.client and self.client.is_ready:
             try:
                 data = entry.model_dump(mode="json")
-                self.client.collection(self.collection_name).document().set(data)
+                doc_ref = self.client.collection(self.collection_name).document()
+                await run_firestore(doc_ref.set, data)
                 return True
             except Exception as exc:
                 logger.warning(
@@ -36,7 +38,8 @@ class FeedbackRepository:
                     .order_by("created_at", direction="DESCENDING")
                     .limit(limit)
                 )
-                return [FeedbackEntry(**doc.to_dict()) for doc in query.stream()]
+                docs = await run_firestore(lambda: list(query.stream()))
+                return [FeedbackEntry(**doc.to_dict()) for doc in docs]
             except Exception as exc:
                 logger.warning(
                     "Firestore unavailable for feedback; cannot list recent entries",
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from src.models.user import UserProfile
+
+# Profiles already read while handling the current update, by telegram id.
+_request_profiles: ContextVar[dict[int, Optional[UserProfile]] | None] = ContextVar(
+    "request_profiles", default=None
+)
+
+
+@contextmanager
+def profile_request_scope() -> Iterator[None]:
+    """Memoise profile reads for the duration of one update (or dispatch).
+
+    Nested scopes share the outer one, so a handler opening its own scope
+    inside ``handle_update`` still sees the profiles read before it.
+    """
+
+    if _request_profiles.get() is not None:
+        yield
+        return
+    token = _request_profiles.set({})
+    try:
+        yield
+    finally:
+        _request_profiles.reset(token)
+
+
+@dataclass(frozen=True)
+class ProfileCacheStats:
+    hits: int
+    misses: int
+    size: int
+
+
+class ProfileCache:
+    """Per-process LRU of user profiles, each kept for at most ``ttl_seconds``.
+
+    Misses are cached too (as None), so updates from users without a profile
+    do not each cost a read. Entries are copies and every read returns a new
+    copy, so a handler mutating its profile without saving cannot leak the
+    change to other requests. The request scope sits in front of the LRU and
+    guarantees one backend read per profile per update even after eviction.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        *,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._clock = clock or time.monotonic
+        self._entries: OrderedDict[int, tuple[float, Optional[UserProfile]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def lookup(self, telegram_id: int) -> tuple[bool, Optional[UserProfile]]:
+        """``(found, profile)``; a found None is a cached "no such user"."""
+
+        scoped = _request_profiles.get()
+        if scoped is not None and telegram_id in scoped:
+            return True, _copy(scoped[telegram_id])
+        if not self.enabled:
+            return False, None
+        with self._lock:
+            entry = self._entries.get(telegram_id)
+            if entry is None or entry[0] <= self._clock():
+                self._entries.pop(telegram_id, None)
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(telegram_id)
+            self._hits += 1
+            profile = entry[1]
+        if scoped is not None:
+            scoped[telegram_id] = profile
+        return True, _copy(profile)
+
+    def put(self, telegram_id: int, profile: Optional[UserProfile]) -> None:
+        stored = _copy(profile)
+        scoped = _request_profiles.get()
+        if scoped is not None:
+            scoped[telegram_id] = stored
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[telegram_id] = (self._clock() + self.ttl_seconds, stored)
+            self._entries.move_to_end(telegram_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, telegram_id: int) -> None:
+        scoped = _request_profiles.get()
+        if scoped is not None:
+            scoped.pop(telegram_id, None)
+        with self._lock:
+            self._entries.pop(telegram_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> ProfileCacheStats:
+        with self._lock:
+            return ProfileCacheStats(hits=self._hits, misses=self._misses, size=len(self._entries))
+
+
+def _copy(profile: Optional[UserProfile]) -> Optional[UserProfile]:
+    return profile.model_copy(deep=True) if profile is not None else None
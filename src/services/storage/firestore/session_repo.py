@@ -1,9 +1,16 @@
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Dict, Optional
 
-from typing import Dict, Optional
+try:
+    from google.api_core.exceptions import NotFound as NotFoundType
+except Exception:  # pragma: no cover - optional dependency
+    NotFoundType: Any = None  # type: ignore[no-redef]
 
 from src.models.session import SessionData
 from src.services.storage.interfaces import ISessionRepository
 from src.services.storage.firestore.client import FirestoreClient
+from src.services.storage.firestore.deferred import DeferredScope
+from src.services.storage.firestore.executor import run_firestore
 from src.config.settings import get_settings
 from src.core.logging import get_logger
 
@@ -18,17 +25,40 @@ class SessionRepository(ISessionRepository):
         settings = get_settings()
         self.collection_name = settings.firestore_collection_sessions
         self.session_ttl_minutes = settings.session_ttl_minutes
+        self.delta_writes = settings.session_delta_writes
         self._store: Dict[int, SessionData] = {}
+        self._deferred: DeferredScope[SessionData] = DeferredScope(f"deferred_sessions_{id(self)}")
+
+    def deferred_writes(self) -> AbstractAsyncContextManager[None]:
+        """Read each session once and write it once for the duration of the block.
+
+        Inside the block every ``get`` of a user returns the same object, and
+        saves are held back and written on exit (also when the block raises).
+        """
+
+        return self._deferred.open(self._write)
 
     async def get(self, user_id: int) -> Optional[SessionData]:
+        batch = self._deferred.current()
+        if batch is None:
+            return await self._load(user_id)
+        found, session = batch.lookup(user_id)
+        if not found:
+            session = await self._load(user_id)
+            batch.remember(user_id, session)
+        return session
+
+    async def _load(self, user_id: int) -> Optional[SessionData]:
         if self.client and self.client.is_ready:
             try:
-                doc = self.client.collection(self.collection_name).document(str(user_id)).get()
+                doc_ref = self.client.collection(self.collection_name).document(str(user_id))
+                doc = await run_firestore(doc_ref.get)
                 if doc.exists:
                     session = SessionData(**doc.to_dict())
                     if session.is_expired():
                         await self.delete(user_id)
                         return None
+                    session.mark_clean()
                     return session
             except Exception as exc:
                 # Fall back to in-memory if Firestore is unavailable/disabled
@@ -42,25 +72,50 @@ class SessionRepository(ISessionRepository):
 
     async def save(self, session: SessionData) -> None:
         session.refresh_expiry(self.session_ttl_minutes)
-        if self.client and self.client.is_ready:
-            try:
-                data = session.model_dump(mode="json")
-                # SEC-4: sessions hold raw diary text in pending_entry/temp_data.
-                # A Firestore TTL policy is what reaps abandoned ones, and TTL only
-                # acts on native timestamp fields — model_dump(mode="json") would
-                # write an ISO string, which Firestore silently ignores.
-                if session.expires_at is not None:
-                    data["expires_at"] = session.expires_at
-                self.client.collection(self.collection_name).document(str(session.user_id)).set(data)
-            except Exception as exc:
-                logger.warning("Firestore unavailable for sessions; falling back to memory", error=str(exc))
-                self.client = None
         self._store[session.user_id] = session
+        batch = self._deferred.current()
+        if batch is not None:
+            batch.pending[session.user_id] = session
+            return
+        await self._write(session)
+
+    async def _write(self, session: SessionData) -> None:
+        if not (self.client and self.client.is_ready):
+            return
+        try:
+            doc_ref = self.client.collection(self.collection_name).document(str(session.user_id))
+            data = session.model_dump(mode="json")
+            # SEC-4: sessions hold raw diary text in pending_entry/temp_data.
+            # A Firestore TTL policy is what reaps abandoned ones, and TTL only
+            # acts on native timestamp fields — model_dump(mode="json") would
+            # write an ISO string, which Firestore silently ignores.
+            if session.expires_at is not None:
+                data["expires_at"] = session.expires_at
+            if self.delta_writes and session.is_persisted:
+                changed = {name: data[name] for name in session.dirty_fields()}
+                try:
+                    await run_firestore(doc_ref.update, changed)
+                except Exception as exc:
+                    # The TTL policy may have reaped the document since it was read.
+                    if NotFoundType is None or not isinstance(exc, NotFoundType):
+                        raise
+                    await run_firestore(doc_ref.set, data)
+            else:
+                await run_firestore(doc_ref.set, data)
+            session.mark_clean()
+        except Exception as exc:
+            logger.warning("Firestore unavailable for sessions; falling back to memory", error=str(exc))
+            self.client = None
 
     async def delete(self, user_id: int) -> None:
+        batch = self._deferred.current()
+        if batch is not None:
+            batch.pending.pop(user_id, None)
+            batch.remember(user_id, None)
         if self.client and self.client.is_ready:
             try:
-                self.client.collection(self.collection_name).document(str(user_id)).delete()
+                doc_ref = self.client.collection(self.collection_name).document(str(user_id))
+                await run_firestore(doc_ref.delete)
             except Exception as exc:
                 logger.warning("Firestore unavailable for sessions; falling back to memory", error=str(exc))
                 self.client = None
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from src.config.settings import get_settings
+from src.core.logging import get_logger
+from src.models.sheet_layout import SheetLayout
+from src.services.storage.firestore.client import FirestoreClient
+from src.services.storage.firestore.executor import run_firestore
+
+logger = get_logger(__name__)
+
+
+class SheetLayoutRepository:
+    """Firestore store of verified sheet layouts, keyed by sheet id, with in-memory fallback."""
+
+    def __init__(self, client: FirestoreClient | None = None):
+        self.client = client
+        settings = get_settings()
+        self.collection_name = settings.firestore_collection_sheet_layouts
+        self._store: dict[str, SheetLayout] = {}
+
+    async def get(self, sheet_id: str) -> Optional[SheetLayout]:
+        if self.client and self.client.is_ready:
+            try:
+                doc_ref = self.client.collection(self.collection_name).document(sheet_id)
+                doc = await run_firestore(doc_ref.get)
+                return SheetLayout(**doc.to_dict()) if doc.exists else None
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for sheet layouts; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        return self._store.get(sheet_id)
+
+    async def save(self, layout: SheetLayout) -> None:
+        if self.client and self.client.is_ready:
+            try:
+                doc_ref = self.client.collection(self.collection_name).document(layout.sheet_id)
+                await run_firestore(doc_ref.set, layout.model_dump(mode="json"))
+                return
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for sheet layouts; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        self._store[layout.sheet_id] = layout
+
+    async def delete(self, sheet_id: str) -> None:
+        if self.client and self.client.is_ready:
+            try:
+                doc_ref = self.client.collection(self.collection_name).document(sheet_id)
+                await run_firestore(doc_ref.delete)
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for sheet layouts; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        self._store.pop(sheet_id, None)
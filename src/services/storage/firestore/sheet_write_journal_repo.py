@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from src.config.settings import get_settings
+from src.core.logging import get_logger
+from src.models.sheet_write import PendingSheetWrite
+from src.services.storage.firestore.client import FirestoreClient
+from src.services.storage.firestore.executor import run_firestore
+
+logger = get_logger(__name__)
+
+
+class SheetWriteJournalRepository:
+    """Firestore journal of acknowledged sheet appends, with in-memory fallback.
+
+    Documents are keyed by ``PendingSheetWrite.id`` and deleted once the row
+    reached the sheet, so the collection only ever holds the backlog. Each also
+    carries an ``expires_at`` timestamp for a Firestore TTL policy, which reaps
+    documents whose delete never happened.
+    """
+
+    def __init__(self, client: FirestoreClient | None = None):
+        self.client = client
+        settings = get_settings()
+        self.collection_name = settings.firestore_collection_sheet_write_journal
+        self.ttl = timedelta(days=settings.sheets_write_journal_ttl_days)
+        self._store: dict[str, PendingSheetWrite] = {}
+
+    async def save(self, write: PendingSheetWrite) -> bool:
+        """Persist (or update) a journaled write; False means memory only."""
+
+        if self.client and self.client.is_ready:
+            try:
+                doc_ref = self.client.collection(self.collection_name).document(write.id)
+                data = write.model_dump(mode="json")
+                # TTL only acts on native timestamps, not ISO strings.
+                data["expires_at"] = write.created_at + self.ttl
+                await run_firestore(doc_ref.set, data)
+                return True
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for sheet write journal; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        self._store[write.id] = write
+        return False
+
+    async def delete(self, write_ids: list[str]) -> None:
+        if self.client and self.client.is_ready:
+            try:
+                collection = self.client.collection(self.collection_name)
+
+                def delete_all() -> None:
+                    for write_id in write_ids:
+                        collection.document(write_id).delete()
+
+                await run_firestore(delete_all)
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for sheet write journal; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        for write_id in write_ids:
+            self._store.pop(write_id, None)
+
+    async def list_pending(self, limit: int = 500) -> list[PendingSheetWrite]:
+        """Oldest journaled writes first, e.g. to resume after a restart."""
+
+        if self.client and self.client.is_ready:
+            try:
+                query = (
+                    self.client.collection(self.collection_name)
+                    .order_by("created_at")
+                    .limit(limit)
+                )
+                docs = await run_firestore(lambda: list(query.stream()))
+                return [PendingSheetWrite(**doc.to_dict()) for doc in docs]
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for sheet write journal; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        return sorted(self._store.values(), key=lambda write: write.created_at)[:limit]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.core.logging import get_logger
+from src.models.usage_event import UsageEvent
+from src.services.storage.firestore.usage_event_repo import BATCH_LIMIT, UsageEventRepository
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class UsageEventBufferStats:
+    buffered: int
+    written: int
+    dropped: int  # rejected because the buffer was full
+    failed: int  # flushed while Firestore was unavailable; kept in memory only
+
+
+class BufferedUsageEventRepository:
+    """Accepts usage events in memory and writes them to Firestore in batches.
+
+    ``create`` only appends to a buffer, so analytics never adds a Firestore
+    round trip to a user's request. The buffer is written every
+    ``flush_interval_seconds``, as soon as it holds a full batch, before any
+    read, and on ``aclose``. At most ``max_buffered`` events are held; while
+    the buffer is full new events are dropped and counted. Events still
+    buffered when the process dies are lost, which is acceptable for
+    content-free statistics.
+    """
+
+    def __init__(
+        self,
+        inner: UsageEventRepository,
+        *,
+        flush_interval_seconds: float = 5.0,
+        max_buffered: int = 5000,
+    ) -> None:
+        self.inner = inner
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffered = max(1, max_buffered)
+        self._buffer: list[UsageEvent] = []
+        self._lock = asyncio.Lock()
+        self._flusher: asyncio.Task[None] | None = None
+        self._eager: set[asyncio.Task[None]] = set()
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+
+    async def create(self, event: UsageEvent) -> bool:
+        """Buffer ``event``; False if it was dropped because the buffer is full."""
+
+        if len(self._buffer) >= self.max_buffered:
+            self._dropped += 1
+            if self._dropped == 1 or self._dropped % 1000 == 0:
+                logger.warning(
+                    "usage_events_dropped", dropped=self._dropped, buffered=len(self._buffer)
+                )
+            return False
+        self._buffer.append(event)
+        self._ensure_flusher()
+        if len(self._buffer) >= BATCH_LIMIT and not self._lock.locked():
+            task = asyncio.create_task(self.flush())
+            self._eager.add(task)
+            task.add_done_callback(self._eager.discard)
+        return True
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("usage_events_flush_failed")
+
+    async def flush(self) -> None:
+        """Write everything buffered so far."""
+
+        async with self._lock:
+            while self._buffer:
+                events = self._buffer[:BATCH_LIMIT]
+                del self._buffer[: len(events)]
+                if await self.inner.create_many(events):
+                    self._written += len(events)
+                else:
+                    self._failed += len(events)
+
+    async def list_between(
+        self,
+        start: datetime,
+        end: datetime,
+        *,
+        event_name: str | None = None,
+    ) -> list[UsageEvent]:
+        await self.flush()
+        return await self.inner.list_between(start, end, event_name=event_name)
+
+    async def count_between(
+        self,
+        start: datetime,
+        end: datetime,
+        *,
+        event_name: str | None = None,
+        feature: str | None = None,
+    ) -> int:
+        await self.flush()
+        return await self.inner.count_between(start, end, event_name=event_name, feature=feature)
+
+    async def user_ids_between(self, start: datetime, end: datetime) -> set[int]:
+        await self.flush()
+        return await self.inner.user_ids_between(start, end)
+
+    def stats(self) -> UsageEventBufferStats:
+        return UsageEventBufferStats(
+            buffered=len(self._buffer),
+            written=self._written,
+            dropped=self._dropped,
+            failed=self._failed,
+        )
+
+    async def aclose(self) -> None:
+        """Stop the periodic flush and write what is left."""
+
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+        stats = self.stats()
+        logger.info(
+            "usage_events_buffer_closed",
+            written=stats.written,
+            dropped=stats.dropped,
+            failed=stats.failed,
+        )
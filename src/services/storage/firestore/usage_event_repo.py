@@ -1,30 +1,53 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
+from typing import Any
+
+try:
+    from google.cloud.firestore_v1.base_query import FieldFilter as FieldFilterType
+except Exception:  # pragma: no cover - optional dependency
+    FieldFilterType: Any = None  # type: ignore[no-redef]
 
 from src.config.settings import get_settings
 from src.core.logging import get_logger
 from src.models.usage_event import UsageEvent
 from src.services.storage.firestore.client import FirestoreClient
+from src.services.storage.firestore.executor import run_firestore
+from src.services.storage.firestore.usage_rollup_repo import UsageRollupRepository
 
 logger = get_logger(__name__)
 
+# Firestore caps a write batch at 500 operations.
+BATCH_LIMIT = 500
+DEFAULT_PAGE_SIZE = 500
+
 
 class UsageEventRepository:
-    """Firestore-backed usage-event repository with in-memory fallback."""
+    """Firestore-backed usage-event repository with in-memory fallback.
 
-    def __init__(self, client: FirestoreClient | None = None):
+    When given ``rollups``, every event written is also counted into its
+    day, week and month rollup documents.
+    """
+
+    def __init__(
+        self,
+        client: FirestoreClient | None = None,
+        rollups: UsageRollupRepository | None = None,
+    ):
         self.client = client
+        self.rollups = rollups
         settings = get_settings()
         self.collection_name = settings.firestore_collection_usage_events
         self._store: list[UsageEvent] = []
 
     async def create(self, event: UsageEvent) -> bool:
+        if self.rollups is not None:
+            await self.rollups.apply([event])
         if self.client and self.client.is_ready:
             try:
-                self.client.collection(self.collection_name).document().set(
-                    event.model_dump(mode="json")
-                )
+                doc_ref = self.client.collection(self.collection_name).document()
+                await run_firestore(doc_ref.set, event.model_dump(mode="json"))
                 self._store.append(event)
                 return True
             except Exception as exc:
@@ -36,29 +59,205 @@ class UsageEventRepository:
         self._store.append(event)
         return False
 
-    async def list_between(self, start: datetime, end: datetime) -> list[UsageEvent]:
-        start_utc = _as_utc(start)
-        end_utc = _as_utc(end)
+    async def create_many(self, events: list[UsageEvent]) -> bool:
+        """Write ``events`` with batched writes of up to ``BATCH_LIMIT`` each."""
+
+        if self.rollups is not None:
+            await self.rollups.apply(events)
+        if self.client and self.client.is_ready:
+            try:
+                client = self.client
+                collection = client.collection(self.collection_name)
+                for start in range(0, len(events), BATCH_LIMIT):
+                    batch = client.batch()
+                    for event in events[start : start + BATCH_LIMIT]:
+                        batch.set(collection.document(), event.model_dump(mode="json"))
+                    await run_firestore(batch.commit)
+                self._store.extend(events)
+                return True
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for usage events; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        self._store.extend(events)
+        return False
+
+    async def list_between(
+        self,
+        start: datetime,
+        end: datetime,
+        *,
+        event_name: str | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> list[UsageEvent]:
+        """Events with ``start <= occurred_at < end``, oldest first."""
+
+        events: list[UsageEvent] = []
+        async for page in self.iter_between(start, end, event_name=event_name, page_size=page_size):
+            events.extend(page)
+        return events
+
+    async def iter_between(
+        self,
+        start: datetime,
+        end: datetime,
+        *,
+        event_name: str | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> AsyncIterator[list[UsageEvent]]:
+        """Pages of the events in ``[start, end)``, filtered by Firestore.
+
+        The range is on ``occurred_at`` and pages follow its order, so the
+        cost grows with the window, not with the collection.
+        """
+
+        if self.client and self.client.is_ready:
+            try:
+                query = self._window(self.client, start, end, event_name=event_name)
+                query = query.order_by("occurred_at")
+                docs = await run_firestore(_stream, query.limit(page_size))
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for usage events; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+            else:
+                while docs:
+                    yield [UsageEvent(**doc.to_dict()) for doc in docs]
+                    if len(docs) < page_size:
+                        return
+                    next_page = query.start_after(docs[-1]).limit(page_size)
+                    docs = await run_firestore(_stream, next_page)
+                return
+        events = self._matching(start, end, event_name=event_name)
+        events.sort(key=lambda event: _as_utc(event.occurred_at))
+        for offset in range(0, len(events), page_size):
+            yield events[offset : offset + page_size]
+
+    async def count_between(
+        self,
+        start: datetime,
+        end: datetime,
+        *,
+        event_name: str | None = None,
+        feature: str | None = None,
+    ) -> int:
+        """Number of matching events in ``[start, end)``, counted by Firestore."""
+
+        if self.client and self.client.is_ready:
+            try:
+                query = self._window(
+                    self.client, start, end, event_name=event_name, feature=feature
+                )
+                aggregation = query.count(alias="count")
+                results = await run_firestore(aggregation.get)
+                return int(results[0][0].value)
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for usage events; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        return len(self._matching(start, end, event_name=event_name, feature=feature))
+
+    async def user_ids_between(
+        self,
+        start: datetime,
+        end: datetime,
+        *,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> set[int]:
+        """Distinct users with an event in ``[start, end)``; reads only ``user_id``.
+
+        The range and order are both on ``occurred_at``, which the automatic
+        single-field index serves; no composite index is needed.
+        """
+
         if self.client and self.client.is_ready:
             try:
-                events = [
-                    UsageEvent(**doc.to_dict())
-                    for doc in self.client.collection(self.collection_name).stream()
-                ]
-                return [
-                    event for event in events if start_utc <= _as_utc(event.occurred_at) < end_utc
-                ]
+                query = (
+                    self._window(self.client, start, end)
+                    .order_by("occurred_at")
+                    .select(["user_id", "occurred_at"])
+                )
+                user_ids: set[int] = set()
+                docs = await run_firestore(_stream, query.limit(page_size))
+                while docs:
+                    for doc in docs:
+                        user_id = (doc.to_dict() or {}).get("user_id")
+                        if user_id is not None:
+                            user_ids.add(int(user_id))
+                    if len(docs) < page_size:
+                        break
+                    next_page = query.start_after(docs[-1]).limit(page_size)
+                    docs = await run_firestore(_stream, next_page)
+                return user_ids
             except Exception as exc:
                 logger.warning(
                     "Firestore unavailable for usage events; falling back to memory",
                     error=str(exc),
                 )
                 self.client = None
+        return {event.user_id for event in self._matching(start, end) if event.user_id is not None}
+
+    def _window(
+        self,
+        client: FirestoreClient,
+        start: datetime,
+        end: datetime,
+        **equal: str | None,
+    ) -> Any:
+        """Query for ``[start, end)`` on ``occurred_at`` plus equality filters.
+
+        ``occurred_at`` is stored as a fixed-width UTC ISO string with
+        microseconds. Each bound is that string without the trailing ``Z``, a
+        prefix of the value stored for the same instant, so the string range
+        matches the time range exactly.
+        """
+
+        filters: list[tuple[str, str, Any]] = [
+            ("occurred_at", ">=", _iso_micro(start)),
+            ("occurred_at", "<", _iso_micro(end)),
+        ]
+        filters.extend((name, "==", value) for name, value in equal.items() if value is not None)
+        query: Any = client.collection(self.collection_name)
+        for field_name, op, value in filters:
+            if FieldFilterType is not None:
+                query = query.where(filter=FieldFilterType(field_name, op, value))
+            else:  # pragma: no cover - older client fallback
+                query = query.where(field_name, op, value)
+        return query
+
+    def _matching(
+        self,
+        start: datetime,
+        end: datetime,
+        *,
+        event_name: str | None = None,
+        feature: str | None = None,
+    ) -> list[UsageEvent]:
+        start_utc = _as_utc(start)
+        end_utc = _as_utc(end)
         return [
-            event for event in self._store if start_utc <= _as_utc(event.occurred_at) < end_utc
+            event
+            for event in self._store
+            if start_utc <= _as_utc(event.occurred_at) < end_utc
+            and (event_name is None or event.event_name == event_name)
+            and (feature is None or event.feature == feature)
         ]
 
 
+def _stream(query: Any) -> list[Any]:
+    return list(query.stream())
+
+
+def _iso_micro(value: datetime) -> str:
+    return _as_utc(value).strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
 def _as_utc(value: datetime) -> datetime:
     if value.tzinfo is None:
         return value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterable, Iterable
+from typing import Any
+
+try:
+    from google.api_core.exceptions import InvalidArgument as InvalidArgumentType
+except Exception:  # pragma: no cover - optional dependency
+    InvalidArgumentType: Any = None  # type: ignore[no-redef]
+
+try:
+    from google.cloud.firestore_v1 import ArrayUnion as ArrayUnionType
+    from google.cloud.firestore_v1 import Increment as IncrementType
+except Exception:  # pragma: no cover - optional dependency
+    ArrayUnionType: Any = None  # type: ignore[no-redef]
+    IncrementType: Any = None  # type: ignore[no-redef]
+
+from src.config.settings import get_settings
+from src.core.logging import get_logger
+from src.models.usage_event import UsageEvent, UsageRollup, rollup_id, rollups_for
+from src.services.storage.firestore.client import FirestoreClient
+from src.services.storage.firestore.executor import run_firestore
+
+logger = get_logger(__name__)
+
+# Firestore caps a write batch at 500 operations.
+_BATCH_LIMIT = 500
+# Active user ids live in this many shard documents under each rollup, so no
+# single document nears Firestore's 1 MiB cap as the user count grows.
+# Changing it strands ids already stored in the shards it no longer names.
+_USER_SHARDS = 16
+_ACTIVE_USERS = "active_users"
+
+
+class UsageRollupRepository:
+    """Per-day, per-week and per-month usage counters, kept current as events are written.
+
+    ``apply`` folds a batch of events into the rollup documents they belong
+    to with one batched write of atomic increments, so concurrent writers
+    never lose counts. ``replace`` overwrites documents wholesale and is what
+    the backfill uses.
+
+    Active users are kept apart from the counters, in ``_USER_SHARDS``
+    documents of an ``active_users`` subcollection per rollup. Should a
+    shard still be refused as too large, its ids are skipped with a warning
+    while counters keep being written.
+    """
+
+    def __init__(self, client: FirestoreClient | None = None):
+        self.client = client
+        settings = get_settings()
+        self.collection_name = settings.firestore_collection_usage_rollups
+        self._store: dict[str, UsageRollup] = {}
+
+    async def apply(self, events: Iterable[UsageEvent]) -> None:
+        deltas = rollups_for(events)
+        if not deltas:
+            return
+        if self.client and self.client.is_ready and IncrementType is not None:
+            try:
+                collection = self.client.collection(self.collection_name)
+                await self._commit(
+                    self.client,
+                    [
+                        (collection.document(rollup.id), _increments(rollup))
+                        for rollup in deltas.values()
+                    ],
+                    merge=True,
+                )
+                await self._commit_active_users(
+                    self.client,
+                    [
+                        (doc, {"user_ids": ArrayUnionType(user_ids)})
+                        for rollup in deltas.values()
+                        for doc, user_ids in _shards(collection, rollup, keep_empty=False)
+                    ],
+                    merge=True,
+                )
+                return
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for usage rollups; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        for key, delta in deltas.items():
+            if key in self._store:
+                self._store[key].merge(delta)
+            else:
+                self._store[key] = delta
+
+    async def replace(self, rollups: Iterable[UsageRollup]) -> None:
+        rollups = list(rollups)
+        if self.client and self.client.is_ready:
+            try:
+                collection = self.client.collection(self.collection_name)
+                await self._commit(
+                    self.client,
+                    [(collection.document(rollup.id), _document(rollup)) for rollup in rollups],
+                    merge=False,
+                )
+                # Every shard is rewritten, so ids left from the old rollup go too.
+                await self._commit_active_users(
+                    self.client,
+                    [
+                        (doc, {"user_ids": user_ids})
+                        for rollup in rollups
+                        for doc, user_ids in _shards(collection, rollup, keep_empty=True)
+                    ],
+                    merge=False,
+                )
+                return
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for usage rollups; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        for rollup in rollups:
+            self._store[rollup.id] = rollup.model_copy(deep=True)
+
+    async def rebuild(self, pages: AsyncIterable[list[UsageEvent]]) -> list[UsageRollup]:
+        """Recompute rollups from raw events and overwrite the stored documents.
+
+        Every bucket an event in ``pages`` falls into is replaced, so ``pages``
+        must hold all the events of those buckets; in practice, the whole
+        history.
+        """
+
+        rollups = await collect_rollups(pages)
+        await self.replace(rollups)
+        return rollups
+
+    async def get_many(self, period: str, buckets: Iterable[str]) -> list[UsageRollup]:
+        """The rollups of ``period`` for ``buckets``; buckets without events are skipped."""
+
+        keys = [rollup_id(period, bucket) for bucket in buckets]
+        if self.client and self.client.is_ready:
+            try:
+                collection = self.client.collection(self.collection_name)
+                rollups = await asyncio.gather(*(_read(collection.document(key)) for key in keys))
+                return [rollup for rollup in rollups if rollup is not None]
+            except Exception as exc:
+                logger.warning(
+                    "Firestore unavailable for usage rollups; falling back to memory",
+                    error=str(exc),
+                )
+                self.client = None
+        return [self._store[key].model_copy(deep=True) for key in keys if key in self._store]
+
+    async def _commit(
+        self,
+        client: FirestoreClient,
+        writes: list[tuple[Any, dict[str, Any]]],
+        *,
+        merge: bool,
+    ) -> None:
+        for start in range(0, len(writes), _BATCH_LIMIT):
+            batch = client.batch()
+            for doc, data in writes[start : start + _BATCH_LIMIT]:
+                batch.set(doc, data, merge=merge)
+            await run_firestore(batch.commit)
+
+    async def _commit_active_users(
+        self,
+        client: FirestoreClient,
+        writes: list[tuple[Any, dict[str, Any]]],
+        *,
+        merge: bool,
+    ) -> None:
+        """Write active-user shards; a shard refused as invalid is skipped, not fatal."""
+
+        try:
+            await self._commit(client, writes, merge=merge)
+        except Exception as exc:
+            if InvalidArgumentType is None or not isinstance(exc, InvalidArgumentType):
+                raise
+            # Union writes are idempotent, so the batches that did commit stay valid.
+            logger.warning("usage_rollup_active_users_skipped", shards=len(writes), error=str(exc))
+
+
+async def collect_rollups(pages: AsyncIterable[list[UsageEvent]]) -> list[UsageRollup]:
+    """Rollups of every bucket the events in ``pages`` fall into."""
+
+    rollups: dict[str, UsageRollup] = {}
+    async for page in pages:
+        for key, rollup in rollups_for(page).items():
+            if key in rollups:
+                rollups[key].merge(rollup)
+            else:
+                rollups[key] = rollup
+    return list(rollups.values())
+
+
+async def _read(doc: Any) -> UsageRollup | None:
+    snapshot = await run_firestore(doc.get)
+    if not snapshot.exists:
+        return None
+    # Documents written before the shards existed may still hold ``user_ids`` inline.
+    rollup = UsageRollup(**snapshot.to_dict())
+    for shard in await run_firestore(_stream, doc.collection(_ACTIVE_USERS)):
+        rollup.user_ids.update((shard.to_dict() or {}).get("user_ids", []))
+    return rollup
+
+
+def _stream(query: Any) -> list[Any]:
+    return list(query.stream())
+
+
+def _shards(collection: Any, rollup: UsageRollup, *, keep_empty: bool) -> list[tuple[Any, list[int]]]:
+    """The active-user shard documents of ``rollup`` with the sorted ids each holds."""
+
+    shards: dict[int, list[int]] = {index: [] for index in range(_USER_SHARDS)} if keep_empty else {}
+    for user_id in sorted(rollup.user_ids):
+        shards.setdefault(user_id % _USER_SHARDS, []).append(user_id)
+    subcollection = collection.document(rollup.id).collection(_ACTIVE_USERS)
+    return [(subcollection.document(f"{index:02d}"), ids) for index, ids in sorted(shards.items())]
+
+
+def _document(rollup: UsageRollup) -> dict[str, Any]:
+    return rollup.model_dump(mode="json", exclude={"user_ids"})
+
+
+def _increments(delta: UsageRollup) -> dict[str, Any]:
+    # Empty maps are left out: merging one would replace the stored map.
+    data: dict[str, Any] = {
+        "period": delta.period,
+        "bucket": delta.bucket,
+        "counts": {key: IncrementType(value) for key, value in delta.counts.items()},
+    }
+    if delta.sums:
+        data["sums"] = {key: IncrementType(value) for key, value in delta.sums.items()}
+    return data
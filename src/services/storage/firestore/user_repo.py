@@ -1,36 +1,133 @@
 
-from typing import Any, Dict, Optional
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, TypeVar
 
 try:
     from google.cloud.firestore_v1.base_query import FieldFilter as FieldFilterType
 except Exception:  # pragma: no cover - optional dependency
     FieldFilterType: Any = None  # type: ignore[no-redef]
 
-from src.models.user import UserProfile
+try:
+    from google.api_core.exceptions import NotFound as NotFoundType
+except Exception:  # pragma: no cover - optional dependency
+    NotFoundType: Any = None  # type: ignore[no-redef]
+
+from pydantic import BaseModel
+
+from src.models.user import (
+    USER_REMINDER_FIELDS,
+    USER_SUMMARY_FIELDS,
+    UsageStats,
+    UserProfile,
+    UserReminders,
+    UserSummary,
+)
 from src.config.settings import get_settings
+from src.core.exceptions import ExternalResponseError
 from src.core.logging import get_logger
 from src.services.storage.firestore.client import FirestoreClient
+from src.services.storage.firestore.deferred import DeferredScope
+from src.services.storage.firestore.executor import run_firestore
+from src.services.storage.firestore.profile_cache import ProfileCache
 from src.services.storage.interfaces import IUserRepository
 
 logger = get_logger(__name__)
 
+# Firestore caps a write batch at 500 operations.
+_BATCH_LIMIT = 500
+_PAGE_SIZE = 500
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _stream(query: Any) -> list[Any]:
+    return list(query.stream())
+
+
+def _update_existing(items: list[tuple[Any, dict[str, Any]]]) -> None:
+    for doc_ref, data in items:
+        try:
+            doc_ref.update(data)
+        except Exception as exc:
+            if NotFoundType is None or not isinstance(exc, NotFoundType):
+                raise
+
+
+def _where(query: Any, field_name: str, op: str, value: Any) -> Any:
+    if FieldFilterType is not None:
+        return query.where(filter=FieldFilterType(field_name, op, value))
+    return query.where(field_name, op, value)  # pragma: no cover - older client fallback
+
+
+async def _aggregate_count(query: Any) -> int:
+    results = await run_firestore(query.count(alias="count").get)
+    return int(results[0][0].value)
+
+
+def _aggregation_failed(exc: Exception) -> ExternalResponseError:
+    # Counting over an in-memory fallback would report a fraction of the
+    # users, so a failed aggregation is surfaced and the client kept.
+    logger.warning("users_aggregation_failed", error=str(exc))
+    return ExternalResponseError("User statistics are unavailable")
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _iso_second(value: datetime) -> str:
+    """A bound for ISO-string ranges: every stored value of that second extends it."""
+
+    return _as_utc(value).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _utc_iso(value: datetime) -> str:
+    """The string ``model_dump(mode="json")`` stores for a whole-second UTC datetime."""
+
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
 
 class UserRepository(IUserRepository):
     """In-memory user repository placeholder."""
 
-    def __init__(self, client: FirestoreClient | None = None):
+    def __init__(self, client: FirestoreClient | None = None, cache: ProfileCache | None = None):
         self.client = client
         settings = get_settings()
         self.collection_name = settings.firestore_collection_users
         self._store: Dict[int, UserProfile] = {}
+        # Read-through for Firestore; writes through this repository keep it current.
+        self.cache = cache or ProfileCache(
+            settings.user_profile_cache_ttl_seconds,
+            max_entries=settings.user_profile_cache_max_entries,
+        )
+        self._deferred: DeferredScope[UserProfile] = DeferredScope(f"deferred_profiles_{id(self)}")
+
+    def deferred_writes(self) -> AbstractAsyncContextManager[None]:
+        """Hold back profile updates inside the block; write each profile once on exit.
+
+        Reads inside the block see the held-back profile through the cache.
+        """
+
+        return self._deferred.open(self._write)
 
     async def get_by_telegram_id(self, telegram_id: int) -> Optional[UserProfile]:
         if self.client and self.client.is_ready:
+            found, cached = self.cache.lookup(telegram_id)
+            if found:
+                return cached if cached is not None else self._store.get(telegram_id)
             try:
                 doc_ref = self.client.collection(self.collection_name).document(str(telegram_id))
-                doc = doc_ref.get()
-                if doc.exists:
-                    return UserProfile(**doc.to_dict())
+                doc = await run_firestore(doc_ref.get)
+                profile = UserProfile(**doc.to_dict()) if doc.exists else None
+                if profile is not None:
+                    profile.mark_clean()
+                self.cache.put(telegram_id, profile)
+                if profile is not None:
+                    return profile
             except Exception as exc:
                 logger.warning("Firestore unavailable for users; falling back to memory", error=str(exc))
                 self.client = None
@@ -52,9 +149,8 @@ class UserRepository(IUserRepository):
                 query = collection.where(filter=FieldFilterType("sheet_id", "==", sheet_id))
             else:  # pragma: no cover - older client fallback
                 query = collection.where("sheet_id", "==", sheet_id)
-            for doc in query.limit(1).stream():
-                return UserProfile(**doc.to_dict())
-            return None
+            docs = await run_firestore(lambda: list(query.limit(1).stream()))
+            return UserProfile(**docs[0].to_dict()) if docs else None
         for profile in self._store.values():
             if profile.sheet_id == sheet_id:
                 return profile
@@ -63,42 +159,268 @@ class UserRepository(IUserRepository):
     async def list_all(self) -> list[UserProfile]:
         if self.client and self.client.is_ready:
             try:
-                profiles: list[UserProfile] = []
-                for doc in self.client.collection(self.collection_name).stream():
-                    profiles.append(UserProfile(**doc.to_dict()))
-                return profiles
+                collection = self.client.collection(self.collection_name)
+                docs = await run_firestore(lambda: list(collection.stream()))
+                return [UserProfile(**doc.to_dict()) for doc in docs]
             except Exception as exc:
                 logger.warning("Firestore unavailable for users; falling back to memory", error=str(exc))
                 self.client = None
         return list(self._store.values())
 
+    async def iter_summaries(
+        self,
+        page_size: int = _PAGE_SIZE,
+        *,
+        after: int | None = None,
+    ) -> AsyncIterator[list[UserSummary]]:
+        """Every user, a page at a time, reading only the ``UserSummary`` fields.
+
+        Users come in ``telegram_user_id`` order, starting after ``after`` when
+        given, so a scan can be resumed from the last id it finished. Memory
+        stays flat however many users there are, and habit schemas and custom
+        questions never leave Firestore.
+        """
+
+        async for page in self._iter_projected(UserSummary, USER_SUMMARY_FIELDS, page_size, after):
+            yield page
+
+    async def iter_reminders(
+        self,
+        page_size: int = _PAGE_SIZE,
+        *,
+        after: int | None = None,
+    ) -> AsyncIterator[list[UserReminders]]:
+        """Like ``iter_summaries``, reading only the ``UserReminders`` fields."""
+
+        async for page in self._iter_projected(UserReminders, USER_REMINDER_FIELDS, page_size, after):
+            yield page
+
+    async def _iter_projected(
+        self,
+        model: type[M],
+        fields: tuple[str, ...],
+        page_size: int,
+        after: int | None,
+    ) -> AsyncIterator[list[M]]:
+        if self.client and self.client.is_ready:
+            try:
+                query = (
+                    self.client.collection(self.collection_name)
+                    .order_by("telegram_user_id")
+                    .select(list(fields))
+                )
+                first = query if after is None else query.start_after({"telegram_user_id": after})
+                docs = await run_firestore(_stream, first.limit(page_size))
+            except Exception as exc:
+                logger.warning("Firestore unavailable for users; falling back to memory", error=str(exc))
+                self.client = None
+            else:
+                while docs:
+                    yield [model(**doc.to_dict()) for doc in docs]
+                    if len(docs) < page_size:
+                        return
+                    docs = await run_firestore(_stream, query.start_after(docs[-1]).limit(page_size))
+                return
+        profiles = sorted(
+            (
+                profile
+                for profile in self._store.values()
+                if after is None or profile.telegram_user_id > after
+            ),
+            key=lambda profile: profile.telegram_user_id,
+        )
+        for offset in range(0, len(profiles), page_size):
+            yield [
+                model(**profile.model_dump(include=set(fields)))
+                for profile in profiles[offset : offset + page_size]
+            ]
+
+    async def count(self, *, with_sheet: bool = False) -> int:
+        """Number of users (with a sheet bound, if ``with_sheet``), counted by Firestore."""
+
+        if self.client and self.client.is_ready:
+            try:
+                query = self.client.collection(self.collection_name)
+                if with_sheet:
+                    query = _where(query, "sheet_id", ">", "")
+                return await _aggregate_count(query)
+            except Exception as exc:
+                raise _aggregation_failed(exc) from exc
+        return sum(1 for profile in self._store.values() if profile.sheet_id or not with_sheet)
+
+    async def count_created_between(self, start: datetime, end: datetime) -> int:
+        """Number of users with ``start <= created_at < end``, at second resolution."""
+
+        if self.client and self.client.is_ready:
+            try:
+                query = self.client.collection(self.collection_name)
+                query = _where(query, "created_at", ">=", _iso_second(start))
+                query = _where(query, "created_at", "<", _iso_second(end))
+                return await _aggregate_count(query)
+            except Exception as exc:
+                raise _aggregation_failed(exc) from exc
+        start_utc, end_utc = _as_utc(start), _as_utc(end)
+        return sum(
+            1 for profile in self._store.values() if start_utc <= _as_utc(profile.created_at) < end_utc
+        )
+
+    async def usage_totals(self) -> UsageStats:
+        """Per-feature usage summed over all users by one Firestore aggregation."""
+
+        if self.client and self.client.is_ready:
+            try:
+                collection = self.client.collection(self.collection_name)
+                names = list(UsageStats.model_fields)
+                aggregation = collection.sum(f"usage_stats.{names[0]}", alias=names[0])
+                for name in names[1:]:
+                    aggregation = aggregation.sum(f"usage_stats.{name}", alias=name)
+                results = await run_firestore(aggregation.get)
+                return UsageStats(**{result.alias: int(result.value) for result in results[0]})
+            except Exception as exc:
+                raise _aggregation_failed(exc) from exc
+        totals = UsageStats()
+        for profile in self._store.values():
+            for name in UsageStats.model_fields:
+                setattr(totals, name, getattr(totals, name) + getattr(profile.usage_stats, name))
+        return totals
+
     async def create(self, user: UserProfile) -> UserProfile:
         if self.client and self.client.is_ready:
             try:
                 data = user.model_dump(mode="json")
-                self.client.collection(self.collection_name).document(str(user.telegram_user_id)).set(data)
+                doc_ref = self.client.collection(self.collection_name).document(str(user.telegram_user_id))
+                await run_firestore(doc_ref.set, data)
+                user.mark_clean()
             except Exception as exc:
                 logger.warning("Firestore unavailable for users; falling back to memory", error=str(exc))
                 self.client = None
         self._store[user.telegram_user_id] = user
+        self.cache.put(user.telegram_user_id, user)
         return user
 
     async def update(self, user: UserProfile) -> UserProfile:
+        batch = self._deferred.current()
+        if batch is not None:
+            # A copy, so edits made after this save are not written unless saved too.
+            batch.pending[user.telegram_user_id] = user.model_copy(deep=True)
+        else:
+            await self._write(user)
+        self._store[user.telegram_user_id] = user
+        self.cache.put(user.telegram_user_id, user)
+        return user
+
+    async def _write(self, user: UserProfile) -> None:
+        """Write the fields changed since ``user`` was loaded; the whole profile if never loaded."""
+
         if self.client and self.client.is_ready:
             try:
                 data = user.model_dump(mode="json")
-                self.client.collection(self.collection_name).document(str(user.telegram_user_id)).set(data)
+                doc_ref = self.client.collection(self.collection_name).document(str(user.telegram_user_id))
+                if user.is_persisted:
+                    changed = {name: data[name] for name in user.dirty_fields()}
+                    if not changed:
+                        return
+                    try:
+                        await run_firestore(doc_ref.update, changed)
+                    except Exception as exc:
+                        # Deleted since it was read: write it back whole, as set() did.
+                        if NotFoundType is None or not isinstance(exc, NotFoundType):
+                            raise
+                        await run_firestore(doc_ref.set, data)
+                else:
+                    await run_firestore(doc_ref.set, data)
+                user.mark_clean()
             except Exception as exc:
                 logger.warning("Firestore unavailable for users; falling back to memory", error=str(exc))
                 self.client = None
-        self._store[user.telegram_user_id] = user
-        return user
 
     async def delete(self, telegram_id: int) -> bool:
+        batch = self._deferred.current()
+        if batch is not None:
+            batch.pending.pop(telegram_id, None)
         if self.client and self.client.is_ready:
             try:
-                self.client.collection(self.collection_name).document(str(telegram_id)).delete()
+                doc_ref = self.client.collection(self.collection_name).document(str(telegram_id))
+                await run_firestore(doc_ref.delete)
             except Exception as exc:
                 logger.warning("Firestore unavailable for users; falling back to memory", error=str(exc))
                 self.client = None
+        self.cache.put(telegram_id, None)
         return self._store.pop(telegram_id, None) is not None
+
+    async def list_due(self, field_name: str, until: datetime, limit: int) -> list[UserProfile]:
+        """Profiles due by ``until`` on a next-run field, oldest first.
+
+        Next runs are stored as ISO strings in UTC, whole minutes, so a string
+        range compares chronologically; profiles without the field never match.
+        """
+
+        if self.client and self.client.is_ready:
+            try:
+                collection = self.client.collection(self.collection_name)
+                bound = _utc_iso(until)
+                if FieldFilterType is not None:
+                    query = collection.where(filter=FieldFilterType(field_name, "<=", bound))
+                else:  # pragma: no cover - older client fallback
+                    query = collection.where(field_name, "<=", bound)
+                ordered = query.order_by(field_name).limit(limit)
+                docs = await run_firestore(lambda: list(ordered.stream()))
+                return [UserProfile(**doc.to_dict()) for doc in docs]
+            except Exception as exc:
+                logger.warning("Firestore unavailable for users; falling back to memory", error=str(exc))
+                self.client = None
+        due = [
+            profile
+            for profile in self._store.values()
+            if getattr(profile, field_name) is not None and getattr(profile, field_name) <= until
+        ]
+        due.sort(key=lambda profile: getattr(profile, field_name))
+        return due[:limit]
+
+    async def update_fields_many(self, updates: dict[int, dict[str, Any]]) -> None:
+        """Update fields of many existing users in batched writes.
+
+        Users deleted since they were read are skipped rather than recreated.
+        A failed batch is logged and left to the caller's next pass; it does
+        not switch the repository to memory.
+        """
+
+        if self.client and self.client.is_ready:
+            client = self.client
+            collection = client.collection(self.collection_name)
+            items = [
+                (
+                    collection.document(str(telegram_id)),
+                    {name: _utc_iso(value) if isinstance(value, datetime) else value for name, value in fields.items()},
+                )
+                for telegram_id, fields in updates.items()
+            ]
+            for start in range(0, len(items), _BATCH_LIMIT):
+                chunk = items[start : start + _BATCH_LIMIT]
+                batch = client.batch()
+                for doc_ref, data in chunk:
+                    batch.update(doc_ref, data)
+                try:
+                    try:
+                        await run_firestore(batch.commit)
+                    except Exception as exc:
+                        if NotFoundType is None or not isinstance(exc, NotFoundType):
+                            raise
+                        # One missing user fails the whole batch: write the
+                        # chunk one by one and skip the users that are gone.
+                        await run_firestore(_update_existing, chunk)
+                except Exception as exc:
+                    logger.warning("users_batch_update_failed", users=len(chunk), error=str(exc))
+        batch = self._deferred.current()
+        for telegram_id, fields in updates.items():
+            held = batch.pending.get(telegram_id) if batch is not None else None
+            for profile in (self._store.get(telegram_id), held):
+                if profile is None:
+                    continue
+                for name, value in fields.items():
+                    setattr(profile, name, value)
+            if held is not None:
+                # Firestore is behind the held-back profile until the flush.
+                self.cache.put(telegram_id, held)
+            else:
+                self.cache.invalidate(telegram_id)
@@ -1,11 +1,13 @@
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from datetime import date
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from typing import Any, Optional
 
+from src.config.constants import ENTRY_SHEET_TABS
 from src.models.entry import HabitEntry, DreamEntry, ThoughtEntry, ReflectionEntry
-from src.models.user import UserProfile
+from src.models.user import UsageStats, UserProfile, UserReminders, UserSummary
 
 
 class IUserRepository(ABC):
@@ -25,6 +27,40 @@ class IUserRepository(ABC):
     async def list_all(self) -> list[UserProfile]:
         raise NotImplementedError
 
+    @abstractmethod
+    def iter_summaries(
+        self,
+        page_size: int = 500,
+        *,
+        after: int | None = None,
+    ) -> AsyncIterator[list[UserSummary]]:
+        """Users in id order after ``after``, a page at a time, as ``UserSummary``."""
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_reminders(
+        self,
+        page_size: int = 500,
+        *,
+        after: int | None = None,
+    ) -> AsyncIterator[list[UserReminders]]:
+        """Users in id order after ``after``, a page at a time, as ``UserReminders``."""
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count(self, *, with_sheet: bool = False) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count_created_between(self, start: datetime, end: datetime) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def usage_totals(self) -> UsageStats:
+        raise NotImplementedError
+
     @abstractmethod
     async def create(self, user: UserProfile) -> UserProfile:
         raise NotImplementedError
@@ -37,6 +73,18 @@ class IUserRepository(ABC):
     async def delete(self, telegram_id: int) -> bool:
         raise NotImplementedError
 
+    @abstractmethod
+    async def list_due(self, field_name: str, until: datetime, limit: int) -> list[UserProfile]:
+        """Profiles whose UTC datetime ``field_name`` is at or before ``until``, oldest first."""
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_fields_many(self, updates: dict[int, dict[str, Any]]) -> None:
+        """Write just the given fields for each telegram id, in bulk."""
+
+        raise NotImplementedError
+
 
 class ISessionRepository(ABC):
     """Interface for conversation session storage."""
@@ -61,6 +109,14 @@ class HabitRowLookup:
     entry_data: dict[str, Any] | None = None
 
 
+@dataclass
+class SheetAppend:
+    """One row for ``ISheetsClient.append_entries``; the entry type picks the tab."""
+
+    entry: HabitEntry | DreamEntry | ThoughtEntry | ReflectionEntry
+    field_order: list[str] = field(default_factory=list)
+
+
 class ISheetsClient(ABC):
     """Interface for working with Google Sheets."""
 
@@ -130,6 +186,24 @@ class ISheetsClient(ABC):
     ) -> list[dict[str, Any]]:
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_entries_for_dates_multi(
+        self,
+        sheet_id: str,
+        dates: list[date],
+        tabs: tuple[str, ...] = ENTRY_SHEET_TABS,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Return entries for ``dates`` from several tabs, keyed by tab name."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def append_entries(self, sheet_id: str, appends: list[SheetAppend]) -> None:
+        """Append rows to several tabs of one sheet in a single write, in order."""
+        raise NotImplementedError
+
     @abstractmethod
     async def ensure_tabs(self, sheet_id: str) -> None:
         raise NotImplementedError
+
+    async def aclose(self) -> None:
+        """Release pooled connections; a no-op for clients that hold none."""
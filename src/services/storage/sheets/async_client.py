@@ -0,0 +1,617 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional
+from urllib.parse import quote
+
+import google.auth
+import httpx
+from google.auth.transport.requests import Request as GoogleAuthRequest
+from google.oauth2.service_account import Credentials
+from gspread.utils import ValueRenderOption, absolute_range_name
+
+from src.config.constants import ENTRY_SHEET_TABS
+from src.config.settings import get_settings
+from src.core.exceptions import ExternalTimeoutError, SheetAccessError, SheetWriteError
+from src.core.keyed_lock import KeyedLock
+from src.core.logging import get_logger
+from src.models.entry import DreamEntry, HabitEntry, ThoughtEntry
+from src.services.storage.firestore.sheet_layout_repo import SheetLayoutRepository
+from src.services.storage.interfaces import HabitRowLookup, ISheetsClient, SheetAppend
+from src.services.storage.sheets.cache import (
+    DateRowIndex,
+    WorksheetMetadata,
+    WorksheetMetadataCache,
+    WriteCapabilityCache,
+)
+from src.services.storage.sheets.client import SheetsClient
+from src.services.storage.sheets.layout import SheetLayoutTracker
+from src.services.storage.sheets.mutations import SheetMutationBatch
+from src.services.storage.sheets.quota import QuotaKind, get_sheets_quota_governor, parse_retry_after
+
+# httpx only speaks HTTP/2 when the optional h2 package is installed.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class WorksheetRef:
+    """The parts of a tab the REST calls need: its numeric id and its title."""
+
+    id: int
+    title: str
+
+
+class AsyncSheetsClient(ISheetsClient):
+    """Google Sheets client speaking the REST API over a shared httpx pool.
+
+    Unlike :class:`SheetsClient`, no call is moved to a worker thread: all
+    requests are awaited on the event loop and share one keep-alive (HTTP/2
+    when ``h2`` is installed) connection pool. Row layout, caching and error
+    semantics match :class:`SheetsClient`, whose helpers are reused here.
+    """
+
+    _BASE_URL = "https://sheets.googleapis.com/v4/"
+    _SCOPES = SheetsClient._SCOPES
+    _WRITE_INPUT_OPTION = "RAW"
+
+    def __init__(
+        self,
+        credentials_path: Optional[str] = None,
+        *,
+        http_client: httpx.AsyncClient | None = None,
+        layouts: SheetLayoutRepository | None = None,
+    ):
+        settings = get_settings()
+        self.credentials_path = credentials_path
+        self.service_email: str | None = None
+        if credentials_path:
+            creds = Credentials.from_service_account_file(credentials_path, scopes=self._SCOPES)
+            self.service_email = creds.service_account_email
+        else:
+            # Use Application Default Credentials (Workload Identity on Cloud Run)
+            creds, _ = google.auth.default(scopes=self._SCOPES)
+        self._credentials: Any = creds
+        self._token_lock = asyncio.Lock()
+        if http_client is None:
+            http2 = settings.sheets_http2 and _HTTP2_AVAILABLE
+            if settings.sheets_http2 and not _HTTP2_AVAILABLE:
+                logger.warning("HTTP/2 requested for Sheets but h2 is not installed; using HTTP/1.1")
+            http_client = httpx.AsyncClient(
+                base_url=self._BASE_URL,
+                http2=http2,
+                timeout=settings.sheets_timeout_seconds,
+                limits=httpx.Limits(
+                    max_connections=settings.sheets_max_connections,
+                    max_keepalive_connections=settings.sheets_max_connections,
+                ),
+            )
+        self._http = http_client
+        self._layout = SheetLayoutTracker(
+            layouts,
+            version=SheetsClient._LAYOUT_VERSION,
+            service_email=self.service_email,
+        )
+        self._worksheet_refs: dict[str, dict[str, WorksheetRef]] = {}
+        # Tab walks and writes of one sheet run one at a time, as on the gspread
+        # backend's executor, so concurrent saves never both add a tab or
+        # rewrite a header from the same stale metadata.
+        self._sheet_locks = KeyedLock()
+        self._metadata = WorksheetMetadataCache(settings.sheets_metadata_cache_ttl_seconds)
+        self._write_access = WriteCapabilityCache(settings.sheets_write_access_ttl_seconds)
+        self._quota = get_sheets_quota_governor()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def _access_token(self, *, force_refresh: bool = False) -> str:
+        """Return a valid bearer token, refreshing it at most once at a time.
+
+        google-auth only refreshes synchronously, so the (hourly) refresh runs
+        on a worker thread; concurrent callers wait for that single refresh.
+        """
+
+        creds = self._credentials
+        if creds.valid and not force_refresh:
+            return creds.token
+        stale_token = creds.token
+        async with self._token_lock:
+            if not creds.valid or (force_refresh and creds.token == stale_token):
+                await asyncio.to_thread(creds.refresh, GoogleAuthRequest())
+            return creds.token
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Any = None,
+        json_body: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        token = await self._access_token()
+        kind: QuotaKind = "read" if method == "GET" else "write"
+        refreshed = False
+        throttles = 0
+        while True:
+            await self._quota.acquire(kind, self.service_email)
+            response = await self._http.request(
+                method,
+                path,
+                params=params,
+                json=json_body,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            if response.status_code == 401 and not refreshed:
+                # Token revoked or expired early: refresh once and retry.
+                refreshed = True
+                token = await self._access_token(force_refresh=True)
+                continue
+            if response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if self._quota.throttled(retry_after, throttles):
+                    throttles += 1
+                    continue
+            elif response.is_success:
+                self._quota.succeeded()
+            response.raise_for_status()
+            return response.json() if response.content else {}
+
+    @staticmethod
+    def _values_path(sheet_id: str, range_name: str, suffix: str = "") -> str:
+        return f"spreadsheets/{sheet_id}/values/{quote(range_name, safe='')}{suffix}"
+
+    async def _batch_get(
+        self,
+        sheet_id: str,
+        ranges: list[str],
+        *,
+        value_render_option: ValueRenderOption | None = None,
+    ) -> list[list[list[Any]]]:
+        """Read several A1 ranges with one values:batchGet, in request order."""
+
+        params: list[tuple[str, str]] = [("ranges", range_name) for range_name in ranges]
+        if value_render_option:
+            params.append(("valueRenderOption", value_render_option.value))
+        response = await self._request("GET", f"spreadsheets/{sheet_id}/values:batchGet", params=params)
+        value_ranges = response.get("valueRanges", [])
+        return [value_range.get("values") or [] for value_range in value_ranges]
+
+    async def _get_row(self, sheet_id: str, tab: str, row_number: int) -> list[Any]:
+        response = await self._request(
+            "GET",
+            self._values_path(sheet_id, absolute_range_name(tab, f"{row_number}:{row_number}")),
+        )
+        values = response.get("values") or []
+        return list(values[0]) if values else []
+
+    async def _refresh_header_for(
+        self, sheet_id: str, tab: str, meta: WorksheetMetadata, appends: list[SheetAppend]
+    ) -> None:
+        # As in SheetsClient: never rewrite row 1 from a header cached minutes ago.
+        if SheetsClient._rewrites_header(meta, appends):
+            SheetsClient._adopt_header(meta, await self._get_row(sheet_id, tab, 1))
+
+    async def _commit_batch(self, sheet_id: str, batch: SheetMutationBatch) -> None:
+        if batch:
+            await self._request("POST", f"spreadsheets/{sheet_id}:batchUpdate", json_body=batch.body())
+
+    @staticmethod
+    def _status(exc: Exception) -> int | None:
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code
+        return None
+
+    @classmethod
+    def _is_permission_error(cls, exc: Exception) -> bool:
+        status = cls._status(exc)
+        if status in {401, 403, 404}:
+            return True
+        if status is not None:
+            message = exc.response.text.lower() if isinstance(exc, httpx.HTTPStatusError) else ""
+            return "permission" in message or "protected" in message or "read-only" in message
+        return False
+
+    @classmethod
+    def _is_timeout_error(cls, exc: Exception) -> bool:
+        if isinstance(exc, (TimeoutError, asyncio.TimeoutError, httpx.TimeoutException)):
+            return True
+        return cls._status(exc) in {408, 429, 500, 502, 503, 504}
+
+    def _raise_mapped_error(self, exc: Exception) -> None:
+        if isinstance(exc, (SheetAccessError, ExternalTimeoutError, SheetWriteError)):
+            raise exc
+        if self._is_permission_error(exc):
+            raise SheetAccessError("Google Sheet access denied") from exc
+        if self._is_timeout_error(exc):
+            raise ExternalTimeoutError("Google Sheets request timed out") from exc
+        raise SheetWriteError("Google Sheets write failed") from exc
+
+    def _forget_tab_state(self, sheet_id: str, tab: str | None, exc: Exception) -> None:
+        """Drop cached knowledge about a tab after a failed Sheets call."""
+
+        self._metadata.invalidate(sheet_id, tab)
+        if tab is None:
+            self._worksheet_refs.pop(sheet_id, None)
+        if isinstance(exc, SheetAccessError) or self._is_permission_error(exc):
+            self._write_access.invalidate(sheet_id)
+        if not isinstance(exc, ExternalTimeoutError) and not self._is_timeout_error(exc):
+            # Tabs may have been renamed, deleted or unshared: walk them again.
+            self._layout.forget(sheet_id)
+
+    async def _load_worksheet_refs(self, sheet_id: str) -> dict[str, WorksheetRef]:
+        response = await self._request(
+            "GET",
+            f"spreadsheets/{sheet_id}",
+            params={"fields": "sheets.properties(sheetId,title)"},
+        )
+        refs = {}
+        for sheet in response.get("sheets", []):
+            props = sheet.get("properties", {})
+            refs[props["title"]] = WorksheetRef(id=props["sheetId"], title=props["title"])
+        self._worksheet_refs[sheet_id] = refs
+        return refs
+
+    async def _worksheet_meta(self, sheet_id: str, tab: str) -> WorksheetMetadata:
+        """Return the cached tab id and header, reading them on a miss."""
+
+        meta = self._metadata.get(sheet_id, tab)
+        if meta is None:
+            refs = self._worksheet_refs.get(sheet_id)
+            if refs is None or tab not in refs:
+                refs = await self._load_worksheet_refs(sheet_id)
+            if tab not in refs:
+                raise SheetWriteError(f"Worksheet {tab!r} not found")
+            header = await self._get_row(sheet_id, tab, 1)
+            meta = self._metadata.put(sheet_id, tab, refs[tab], header)
+        return meta
+
+    async def _add_tabs(self, sheet_id: str, refs: dict[str, WorksheetRef], titles: list[str]) -> None:
+        response = await self._request(
+            "POST",
+            f"spreadsheets/{sheet_id}:batchUpdate",
+            json_body={
+                "requests": [
+                    {
+                        "addSheet": {
+                            "properties": {
+                                "title": title,
+                                "gridProperties": {"rowCount": 1000, "columnCount": 30},
+                            }
+                        }
+                    }
+                    for title in titles
+                ]
+            },
+        )
+        for reply in response.get("replies", []):
+            props = reply.get("addSheet", {}).get("properties", {})
+            if "title" in props:
+                refs[props["title"]] = WorksheetRef(id=props["sheetId"], title=props["title"])
+
+    @classmethod
+    def _is_duplicate_tab_error(cls, exc: Exception) -> bool:
+        if cls._status(exc) != 400 or not isinstance(exc, httpx.HTTPStatusError):
+            return False
+        return "already exists" in exc.response.text.lower()
+
+    async def _ensure_tabs(self, sheet_id: str) -> None:
+        """Create missing tabs and fix headers, usually with at most four API calls."""
+
+        await self._layout.restore(sheet_id)
+        if self._layout.is_verified(sheet_id):
+            return
+        async with self._sheet_locks.hold(sheet_id):
+            # A call that held the lock before this one may have finished the walk.
+            if not self._layout.is_verified(sheet_id):
+                await self._walk_tabs(sheet_id)
+
+    async def _walk_tabs(self, sheet_id: str) -> None:
+        refs = await self._load_worksheet_refs(sheet_id)
+        missing = [title for title, _header in SheetsClient._TAB_HEADERS if title not in refs]
+        if missing:
+            try:
+                await self._add_tabs(sheet_id, refs, missing)
+            except httpx.HTTPStatusError as exc:
+                if not self._is_duplicate_tab_error(exc):
+                    raise
+                # Another instance added a tab first; the batch was rejected whole.
+                refs = await self._load_worksheet_refs(sheet_id)
+                missing = [title for title, _header in SheetsClient._TAB_HEADERS if title not in refs]
+                if missing:
+                    await self._add_tabs(sheet_id, refs, missing)
+        existing = [title for title, _header in SheetsClient._TAB_HEADERS if title not in missing]
+        current_headers = dict(
+            zip(
+                existing,
+                await self._batch_get(sheet_id, [absolute_range_name(title, "1:1") for title in existing])
+                if existing
+                else [],
+            )
+        )
+
+        header_writes: list[dict[str, Any]] = []
+        for title, header in SheetsClient._TAB_HEADERS:
+            values = current_headers.get(title) or []
+            current = list(values[0]) if values else []
+            if not current:
+                header_writes.append({"range": absolute_range_name(title, "A1"), "values": [header]})
+                self._metadata.put(sheet_id, title, refs[title], header, last_row=1)
+                continue
+            new_header = SheetsClient._migrated_header(title, current, header)
+            if new_header != current:
+                header_writes.append({"range": absolute_range_name(title, "1:1"), "values": [new_header]})
+            self._metadata.put(sheet_id, title, refs[title], new_header)
+        if header_writes:
+            await self._request(
+                "POST",
+                f"spreadsheets/{sheet_id}/values:batchUpdate",
+                json_body={"valueInputOption": self._WRITE_INPUT_OPTION, "data": header_writes},
+            )
+        self._layout.mark_verified(sheet_id)
+        await self._layout.save(sheet_id, SheetsClient._verified_headers(self._metadata, sheet_id))
+
+    async def ensure_tabs(self, sheet_id: str) -> None:
+        try:
+            await self._ensure_tabs(sheet_id)
+        except Exception as exc:
+            self._forget_tab_state(sheet_id, None, exc)
+            self._raise_mapped_error(exc)
+            raise
+
+    async def _ensure_write_access(self, sheet_id: str, tab: str, meta: WorksheetMetadata) -> None:
+        """Prove the tab is writable, reusing a recent verdict when A1 is unchanged."""
+
+        a1 = absolute_range_name(tab, "A1")
+        response = await self._request(
+            "GET",
+            self._values_path(sheet_id, a1),
+            params={"valueRenderOption": ValueRenderOption.formula.value},
+        )
+        a1_value = SheetsClient._safe_cell_value(response.get("values"))
+        if a1_value != (meta.header[0] if meta.header else ""):
+            SheetsClient._adopt_header(meta, await self._get_row(sheet_id, tab, 1))
+        if self._write_access.is_proven(
+            sheet_id,
+            tab,
+            service_email=self.service_email,
+            a1_value=a1_value,
+        ):
+            return
+        await self._request(
+            "PUT",
+            self._values_path(sheet_id, a1),
+            params={"valueInputOption": self._WRITE_INPUT_OPTION},
+            json_body={"range": a1, "values": [[a1_value]]},
+        )
+        self._write_access.record(
+            sheet_id,
+            tab,
+            service_email=self.service_email,
+            a1_value=a1_value,
+        )
+
+    async def _date_indices(
+        self,
+        sheet_id: str,
+        lookups: dict[str, tuple[WorksheetMetadata, tuple[str, ...]]],
+    ) -> dict[str, DateRowIndex]:
+        indices, missing, ranges = SheetsClient._plan_date_indices(lookups)
+        if missing:
+            columns = await self._batch_get(sheet_id, ranges, value_render_option=ValueRenderOption.unformatted)
+            indices.update(SheetsClient._store_date_indices(missing, columns))
+        return indices
+
+    async def _collect_entries_for_dates(
+        self,
+        sheet_id: str,
+        dates: list[date],
+        lookups: dict[str, tuple[tuple[str, ...], bool]],
+    ) -> dict[str, list[dict[str, Any]]]:
+        if not dates or not lookups:
+            return {tab: [] for tab in lookups}
+        await self._ensure_tabs(sheet_id)
+        # Index builds and stale-index drops mutate the cached metadata, which
+        # appends on the same sheet also extend: hold the sheet lock throughout.
+        async with self._sheet_locks.hold(sheet_id):
+            metas = {tab: await self._worksheet_meta(sheet_id, tab) for tab in lookups}
+            results, stale = await self._read_entries_for_dates(sheet_id, dates, lookups, metas)
+            if stale:
+                logger.warning("sheet_date_index_stale", sheet_id_suffix=sheet_id[-6:], tabs=stale)
+                retried, _stale = await self._read_entries_for_dates(
+                    sheet_id, dates, {tab: lookups[tab] for tab in stale}, metas
+                )
+                results.update(retried)
+        return results
+
+    async def _read_entries_for_dates(
+        self,
+        sheet_id: str,
+        dates: list[date],
+        lookups: dict[str, tuple[tuple[str, ...], bool]],
+        metas: dict[str, WorksheetMetadata],
+    ) -> tuple[dict[str, list[dict[str, Any]]], list[str]]:
+        indices = await self._date_indices(
+            sheet_id,
+            {tab: (metas[tab], lookups[tab][0]) for tab in lookups if metas[tab].header},
+        )
+        plan, ranges = SheetsClient._plan_row_reads(dates, lookups, indices)
+        rows = await self._batch_get(sheet_id, ranges) if ranges else []
+        results = SheetsClient._entries_from_rows(dates, lookups, metas, indices, plan, rows)
+        return results, [tab for tab, _matches in plan if metas[tab].date_index is None]
+
+    async def _entries_for_dates(
+        self,
+        sheet_id: str,
+        dates: list[date],
+        tabs: tuple[str, ...],
+    ) -> dict[str, list[dict[str, Any]]]:
+        unknown = [tab for tab in tabs if tab not in SheetsClient._DATE_LOOKUPS]
+        if unknown:
+            raise ValueError(f"Unsupported tabs for date lookup: {', '.join(unknown)}")
+        try:
+            return await self._collect_entries_for_dates(
+                sheet_id,
+                dates,
+                {tab: SheetsClient._DATE_LOOKUPS[tab] for tab in tabs},
+            )
+        except Exception as exc:
+            self._forget_tab_state(sheet_id, tabs[0] if len(tabs) == 1 else None, exc)
+            self._raise_mapped_error(exc)
+            raise
+
+    async def get_entries_for_dates_multi(
+        self,
+        sheet_id: str,
+        dates: list[date],
+        tabs: tuple[str, ...] = ENTRY_SHEET_TABS,
+    ) -> dict[str, list[dict[str, Any]]]:
+        return await self._entries_for_dates(sheet_id, dates, tuple(tabs))
+
+    async def get_habit_entries_for_dates(self, sheet_id: str, dates: list[date]) -> list[dict[str, Any]]:
+        return (await self._entries_for_dates(sheet_id, dates, ("Habits",)))["Habits"]
+
+    async def get_dream_entries_for_dates(self, sheet_id: str, dates: list[date]) -> list[dict[str, Any]]:
+        return (await self._entries_for_dates(sheet_id, dates, ("Dreams",)))["Dreams"]
+
+    async def get_thought_entries_for_dates(self, sheet_id: str, dates: list[date]) -> list[dict[str, Any]]:
+        return (await self._entries_for_dates(sheet_id, dates, ("Thoughts",)))["Thoughts"]
+
+    async def get_reflection_entries_for_dates(self, sheet_id: str, dates: list[date]) -> list[dict[str, Any]]:
+        return (await self._entries_for_dates(sheet_id, dates, ("Reflections",)))["Reflections"]
+
+    async def find_latest_habit_entry(
+        self,
+        sheet_id: str,
+        entry_date: date,
+    ) -> HabitRowLookup | None:
+        try:
+            await self._ensure_tabs(sheet_id)
+            async with self._sheet_locks.hold(sheet_id):
+                meta = await self._worksheet_meta(sheet_id, "Habits")
+                if not meta.header:
+                    return None
+                normalized = SheetsClient._normalize_header(meta.header)
+                # The row is later overwritten in place, so a stale index must never
+                # point at another day: verify the fetched date and rebuild once.
+                for _attempt in range(2):
+                    index = (await self._date_indices(sheet_id, {"Habits": (meta, ("date",))})).get("Habits")
+                    if index is None:
+                        return None
+                    matches = index.rows_for([entry_date], latest_only=True)
+                    if not matches:
+                        return None
+                    match_row, _day = matches[-1]
+                    row_values = await self._get_row(sheet_id, "Habits", match_row)
+                    date_cell = row_values[index.date_column] if index.date_column < len(row_values) else None
+                    if SheetsClient._parse_sheet_date(date_cell) == entry_date:
+                        return SheetsClient._habit_lookup(normalized, match_row, row_values)
+                    meta.date_index = None
+                    meta.last_row = None
+                return None
+        except Exception as exc:
+            self._forget_tab_state(sheet_id, "Habits", exc)
+            self._raise_mapped_error(exc)
+            raise
+
+    async def _write_habit_row(
+        self,
+        sheet_id: str,
+        field_order: list[str],
+        entry: HabitEntry,
+        row_index: int | None,
+    ) -> None:
+        try:
+            await self._ensure_tabs(sheet_id)
+            async with self._sheet_locks.hold(sheet_id):
+                meta = await self._worksheet_meta(sheet_id, "Habits")
+                await self._ensure_write_access(sheet_id, "Habits", meta)
+                await self._refresh_header_for(sheet_id, "Habits", meta, [SheetAppend(entry, field_order)])
+                batch, canonical_header, formatted = SheetsClient._habit_row_batch(
+                    meta, field_order, entry, row_index
+                )
+                await self._commit_batch(sheet_id, batch)
+                SheetsClient._record_habit_write(meta, canonical_header, formatted, entry, row_index)
+        except Exception as exc:
+            self._forget_tab_state(sheet_id, "Habits", exc)
+            self._raise_mapped_error(exc)
+            raise
+
+    async def append_habit_entry(self, sheet_id: str, field_order: list[str], entry: HabitEntry) -> None:
+        await self._write_habit_row(sheet_id, field_order, entry, None)
+
+    async def update_habit_entry(
+        self,
+        sheet_id: str,
+        row_index: int,
+        field_order: list[str],
+        entry: HabitEntry,
+    ) -> None:
+        await self._write_habit_row(sheet_id, field_order, entry, row_index)
+
+    async def _append_record(self, sheet_id: str, tab: str, timestamp_iso: str, record: str, day: date) -> None:
+        try:
+            await self._ensure_tabs(sheet_id)
+            async with self._sheet_locks.hold(sheet_id):
+                meta = await self._worksheet_meta(sheet_id, tab)
+                await self._ensure_write_access(sheet_id, tab, meta)
+                tab_range = absolute_range_name(tab)
+                response = await self._request(
+                    "POST",
+                    self._values_path(sheet_id, tab_range, ":append"),
+                    params={"valueInputOption": self._WRITE_INPUT_OPTION},
+                    json_body={"range": tab_range, "values": [[timestamp_iso, record]]},
+                )
+                SheetsClient._record_append(meta, response, day)
+        except Exception as exc:
+            self._forget_tab_state(sheet_id, tab, exc)
+            self._raise_mapped_error(exc)
+            raise
+
+    async def append_dream_entry(self, sheet_id: str, entry: DreamEntry) -> None:
+        await self._append_record(
+            sheet_id, "Dreams", entry.timestamp.isoformat(), entry.record, entry.timestamp.date()
+        )
+
+    async def append_thought_entry(self, sheet_id: str, entry: ThoughtEntry) -> None:
+        await self._append_record(
+            sheet_id, "Thoughts", entry.timestamp.isoformat(), entry.record, entry.timestamp.date()
+        )
+
+    async def append_entries(self, sheet_id: str, appends: list[SheetAppend]) -> None:
+        if not appends:
+            return
+        try:
+            await self._ensure_tabs(sheet_id)
+            async with self._sheet_locks.hold(sheet_id):
+                combined: SheetMutationBatch | None = None
+                for tab, tab_appends in SheetsClient._group_appends(appends).items():
+                    meta = await self._worksheet_meta(sheet_id, tab)
+                    await self._ensure_write_access(sheet_id, tab, meta)
+                    await self._refresh_header_for(sheet_id, tab, meta, tab_appends)
+                    batch = SheetsClient._queue_appends(meta, tab_appends)
+                    combined = batch if combined is None else combined.extend(batch)
+                if combined is not None:
+                    await self._commit_batch(sheet_id, combined)
+        except Exception as exc:
+            self._forget_tab_state(sheet_id, None, exc)
+            self._raise_mapped_error(exc)
+            raise
+
+    async def append_reflection_entry(self, sheet_id: str, entry) -> None:
+        try:
+            await self._ensure_tabs(sheet_id)
+            async with self._sheet_locks.hold(sheet_id):
+                meta = await self._worksheet_meta(sheet_id, "Reflections")
+                await self._ensure_write_access(sheet_id, "Reflections", meta)
+                await self._refresh_header_for(sheet_id, "Reflections", meta, [SheetAppend(entry)])
+                await self._commit_batch(sheet_id, SheetsClient._reflection_row_batch(meta, entry))
+                meta.header = list(SheetsClient._REFLECTIONS_HEADER)
+                SheetsClient._note_appended_row(meta, entry.timestamp.date())
+        except Exception as exc:
+            self._forget_tab_state(sheet_id, "Reflections", exc)
+            self._raise_mapped_error(exc)
+            raise
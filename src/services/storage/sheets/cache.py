@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any
+
+
+@dataclass
+class DateRowIndex:
+    """Sheet row numbers per entry date for one tab, built from its date column."""
+
+    date_column: int
+    rows_by_date: dict[date, list[int]] = field(default_factory=dict)
+
+    def add(self, day: date, row: int) -> None:
+        rows = self.rows_by_date.setdefault(day, [])
+        if row not in rows:
+            rows.append(row)
+            rows.sort()
+
+    def move(self, row: int, day: date) -> None:
+        """Record that ``row`` now holds ``day``, dropping any older mapping."""
+
+        for other_day, rows in list(self.rows_by_date.items()):
+            if row in rows and other_day != day:
+                rows.remove(row)
+                if not rows:
+                    del self.rows_by_date[other_day]
+        self.add(day, row)
+
+    def rows_for(self, dates: list[date], *, latest_only: bool = False) -> list[tuple[int, date]]:
+        """Return ``(row, date)`` matches in sheet order; ``latest_only`` keeps one per date."""
+
+        matches: list[tuple[int, date]] = []
+        for day in set(dates):
+            rows = self.rows_by_date.get(day)
+            if not rows:
+                continue
+            if latest_only:
+                matches.append((rows[-1], day))
+            else:
+                matches.extend((row, day) for row in rows)
+        return sorted(matches)
+
+
+@dataclass
+class WorksheetMetadata:
+    """What we already know about one tab, so writes skip re-reading it."""
+
+    worksheet: Any
+    header: list[str]
+    last_row: int | None
+    expires_at: float
+    date_format_applied: bool = False
+    date_index: DateRowIndex | None = None
+
+
+class WorksheetMetadataCache:
+    """Per-(sheet_id, tab) cache of worksheet handles, headers and last row.
+
+    Entries expire after ``ttl_seconds`` so edits made by hand in the sheet
+    are picked up eventually; callers invalidate explicitly on API errors.
+    State is process-local, like the spreadsheet handle cache it sits next to.
+    Sheets calls run on worker threads, so access is guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        *,
+        max_entries: int = 1024,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._clock = clock or time.monotonic
+        self._entries: OrderedDict[tuple[str, str], WorksheetMetadata] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sheet_id: str, tab: str) -> WorksheetMetadata | None:
+        key = (sheet_id, tab)
+        with self._lock:
+            meta = self._entries.get(key)
+            if meta is None:
+                return None
+            if meta.expires_at <= self._clock():
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return meta
+
+    def put(
+        self,
+        sheet_id: str,
+        tab: str,
+        worksheet: Any,
+        header: list[str],
+        last_row: int | None = None,
+    ) -> WorksheetMetadata:
+        meta = WorksheetMetadata(
+            worksheet=worksheet,
+            header=list(header),
+            last_row=last_row,
+            expires_at=self._clock() + self.ttl_seconds,
+        )
+        key = (sheet_id, tab)
+        with self._lock:
+            self._entries[key] = meta
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return meta
+
+    def invalidate(self, sheet_id: str, tab: str | None = None) -> None:
+        with self._lock:
+            if tab is not None:
+                self._entries.pop((sheet_id, tab), None)
+                return
+            for key in [key for key in self._entries if key[0] == sheet_id]:
+                self._entries.pop(key, None)
+
+
+@dataclass(frozen=True)
+class WriteCapability:
+    """Proof that the service account could write to a tab at some point."""
+
+    service_email: str | None
+    a1_value: str
+    proven_at: float
+
+
+class WriteCapabilityCache:
+    """Per-(sheet_id, tab) record of when write access was last proven.
+
+    A verdict is only reused while it is younger than ``ttl_seconds``, was
+    proven by the same service account, and the tab's A1 cell still holds the
+    value seen at proof time. Callers drop verdicts on 401/403 responses.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        *,
+        max_entries: int = 1024,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._clock = clock or time.monotonic
+        self._entries: OrderedDict[tuple[str, str], WriteCapability] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_proven(
+        self,
+        sheet_id: str,
+        tab: str,
+        *,
+        service_email: str | None,
+        a1_value: str,
+    ) -> bool:
+        key = (sheet_id, tab)
+        with self._lock:
+            verdict = self._entries.get(key)
+            if verdict is None:
+                return False
+            if (
+                verdict.proven_at + self.ttl_seconds <= self._clock()
+                or verdict.service_email != service_email
+                or verdict.a1_value != a1_value
+            ):
+                self._entries.pop(key, None)
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def record(
+        self,
+        sheet_id: str,
+        tab: str,
+        *,
+        service_email: str | None,
+        a1_value: str,
+    ) -> None:
+        key = (sheet_id, tab)
+        verdict = WriteCapability(
+            service_email=service_email,
+            a1_value=a1_value,
+            proven_at=self._clock(),
+        )
+        with self._lock:
+            self._entries[key] = verdict
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, sheet_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == sheet_id]:
+                self._entries.pop(key, None)
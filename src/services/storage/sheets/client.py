@@ -1,7 +1,9 @@
 
 import asyncio
+import hashlib
+from collections.abc import Callable
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, TypeVar
 
 import gspread
 import json
@@ -9,16 +11,33 @@ import requests
 import google.auth
 from google.auth.transport.requests import AuthorizedSession
 from google.oauth2.service_account import Credentials
-from gspread.utils import ValueInputOption, ValueRenderOption
+from gspread.utils import ValueInputOption, ValueRenderOption, absolute_range_name
 
 from src.config.constants import (
     DREAMS_SHEET_COLUMNS,
+    ENTRY_SHEET_TABS,
     THOUGHTS_SHEET_COLUMNS,
 )
+from src.config.settings import get_settings
 from src.core.exceptions import ExternalTimeoutError, SheetAccessError, SheetWriteError
-from src.models.entry import DreamEntry, HabitEntry, ThoughtEntry
-from src.services.storage.interfaces import HabitRowLookup, ISheetsClient
+from src.core.logging import get_logger
+from src.models.entry import DreamEntry, HabitEntry, ReflectionEntry, ThoughtEntry
+from src.services.storage.firestore.sheet_layout_repo import SheetLayoutRepository
+from src.services.storage.interfaces import HabitRowLookup, ISheetsClient, SheetAppend
+from src.services.storage.sheets.cache import (
+    DateRowIndex,
+    WorksheetMetadata,
+    WorksheetMetadataCache,
+    WriteCapabilityCache,
+)
+from src.services.storage.sheets.executor import get_sheet_io_executor
+from src.services.storage.sheets.layout import SheetLayoutTracker
+from src.services.storage.sheets.mutations import SheetMutationBatch
+from src.services.storage.sheets.quota import GovernedHTTPClient, get_sheets_quota_governor
+
+logger = get_logger(__name__)
 
+T = TypeVar("T")
 
 class SheetsClient(ISheetsClient):
     """Google Sheets client using a service account."""
@@ -26,12 +45,39 @@ class SheetsClient(ISheetsClient):
     _SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
     _WRITE_INPUT_OPTION = ValueInputOption.raw
     _SHEETS_DATE_BASE = date(1899, 12, 30)
+    _HABIT_DATE_PATTERN = "dd-mm-yyyy"
+    # tab -> (date column candidates, keep every row per date)
+    _DATE_LOOKUPS: dict[str, tuple[tuple[str, ...], bool]] = {
+        "Habits": (("date",), False),
+        "Dreams": (("timestamp", "date"), True),
+        "Thoughts": (("timestamp", "date"), True),
+        "Reflections": (("timestamp", "date"), True),
+    }
+    _REFLECTIONS_HEADER = ["timestamp", "reflections"]
+    _ENTRY_TABS: tuple[tuple[type, str], ...] = (
+        (HabitEntry, "Habits"),
+        (DreamEntry, "Dreams"),
+        (ThoughtEntry, "Thoughts"),
+        (ReflectionEntry, "Reflections"),
+    )
+    _TAB_HEADERS: tuple[tuple[str, list[str]], ...] = (
+        ("Habits", ["timestamp", "date", "raw_record", "diary"]),  # dynamic fields added on append
+        ("Dreams", DREAMS_SHEET_COLUMNS),
+        ("Thoughts", THOUGHTS_SHEET_COLUMNS),
+        ("Reflections", ["timestamp", "reflections"]),
+    )
+    # Changes whenever the expected tabs or headers do, retiring stored layouts.
+    _LAYOUT_VERSION = hashlib.sha1(json.dumps(_TAB_HEADERS).encode()).hexdigest()[:12]
 
-    def __init__(self, credentials_path: Optional[str] = None):
+    def __init__(
+        self,
+        credentials_path: Optional[str] = None,
+        *,
+        layouts: SheetLayoutRepository | None = None,
+    ):
         self.credentials_path = credentials_path
         self.client: gspread.Client | None = None
         self.service_email: str | None = None
-        self._tabs_ensured: set[str] = set()
         if credentials_path:
             creds = Credentials.from_service_account_file(
                 credentials_path, scopes=self._SCOPES
@@ -40,8 +86,42 @@ class SheetsClient(ISheetsClient):
         else:
             # Use Application Default Credentials (Workload Identity on Cloud Run)
             creds, _ = google.auth.default(scopes=self._SCOPES)
-        self.client = gspread.Client(auth=creds, session=AuthorizedSession(creds))
+        self.client = gspread.Client(
+            auth=creds,
+            session=AuthorizedSession(creds),
+            http_client=GovernedHTTPClient,
+        )
         self._cache: Dict[str, gspread.Spreadsheet] = {}
+        settings = get_settings()
+        self._metadata = WorksheetMetadataCache(settings.sheets_metadata_cache_ttl_seconds)
+        self._write_access = WriteCapabilityCache(settings.sheets_write_access_ttl_seconds)
+        self._io = get_sheet_io_executor()
+        self._quota = get_sheets_quota_governor()
+        self._layout = SheetLayoutTracker(
+            layouts,
+            version=self._LAYOUT_VERSION,
+            service_email=self.service_email,
+        )
+
+    async def _run(self, sheet_id: str, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn`` on the Sheets executor, sharing verified layouts around it."""
+
+        await self._layout.restore(sheet_id)
+        # Wait out quota on the event loop: a job sleeping for tokens on its
+        # worker would hold the sheet's turn and stall every call queued behind it.
+        await self._quota.wait_until_ready(self.service_email)
+        result = await self._io.run(sheet_id, fn, *args)
+        await self._layout.save(sheet_id, self._verified_headers(self._metadata, sheet_id))
+        return result
+
+    @classmethod
+    def _verified_headers(cls, metadata: WorksheetMetadataCache, sheet_id: str) -> dict[str, list[str]]:
+        headers = {}
+        for title, _header in cls._TAB_HEADERS:
+            meta = metadata.get(sheet_id, title)
+            if meta is not None:
+                headers[title] = list(meta.header)
+        return headers
 
     @staticmethod
     def _safe_cell_value(values: list[list[str]] | None) -> str:
@@ -89,14 +169,260 @@ class SheetsClient(ISheetsClient):
     def _sheet_date_serial(cls, value: date) -> int:
         return (value - cls._SHEETS_DATE_BASE).days
 
-    def _format_habit_date_column(self, worksheet: gspread.Worksheet, header: list[str]) -> None:
+    @classmethod
+    def _format_habit_date_column(
+        cls,
+        meta: WorksheetMetadata,
+        header: list[str],
+        batch: SheetMutationBatch,
+    ) -> bool:
+        """Queue the date column format unless the cached header already has it."""
+
         if "date" not in header:
+            return False
+        if meta.date_format_applied and header == meta.header:
+            return False
+        batch.format_date_column(header.index("date"), cls._HABIT_DATE_PATTERN)
+        return True
+
+    @staticmethod
+    def _appended_row_index(response: object) -> int | None:
+        """Return the row an append landed on, from the API's updatedRange."""
+
+        if not isinstance(response, dict):
+            return None
+        updated_range = (response.get("updates") or {}).get("updatedRange")
+        if not isinstance(updated_range, str) or "!" not in updated_range:
+            return None
+        start = updated_range.split("!", 1)[1].split(":", 1)[0]
+        try:
+            row, _col = gspread.utils.a1_to_rowcol(start)
+        except Exception:
+            return None
+        return row
+
+    def _worksheet_meta(self, sheet_id: str, tab: str) -> WorksheetMetadata:
+        """Return the cached handle and header for a tab, reading them on a miss."""
+
+        meta = self._metadata.get(sheet_id, tab)
+        if meta is None:
+            ws = self._open(sheet_id).worksheet(tab)
+            meta = self._metadata.put(sheet_id, tab, ws, ws.row_values(1))
+        return meta
+
+    @classmethod
+    def _rewrites_header(cls, meta: WorksheetMetadata, appends: list[SheetAppend]) -> bool:
+        """Whether writing ``appends`` would rewrite row 1 from the cached header."""
+
+        for append in appends:
+            entry = append.entry
+            if isinstance(entry, HabitEntry):
+                canonical_header, _row = cls._prepare_habit_header_and_row(
+                    meta.header, append.field_order, entry
+                )
+                if canonical_header != meta.header:
+                    return True
+            elif isinstance(entry, ReflectionEntry) and meta.header != cls._REFLECTIONS_HEADER:
+                return True
+        return False
+
+    @staticmethod
+    def _adopt_header(meta: WorksheetMetadata, header: list[str]) -> None:
+        """Take row 1 as just read; cached column positions go if it moved."""
+
+        if header != meta.header:
+            meta.header = list(header)
+            meta.date_index = None
+            meta.date_format_applied = False
+
+    def _refresh_header_for(self, meta: WorksheetMetadata, appends: list[SheetAppend]) -> None:
+        # The cached header may be minutes old: a rewrite built on it would
+        # undo a column edited by hand since and misplace later rows.
+        if self._rewrites_header(meta, appends):
+            self._adopt_header(meta, meta.worksheet.row_values(1))
+
+    @staticmethod
+    def _normalize_header(header: list[str]) -> list[str]:
+        return [("raw_record" if col == "raw_diary" else col) for col in header]
+
+    def _batch_get(
+        self,
+        sheet_id: str,
+        ranges: list[str],
+        *,
+        value_render_option: ValueRenderOption | None = None,
+    ) -> list[list[list[Any]]]:
+        """Read several A1 ranges with one values:batchGet, in request order."""
+
+        params = {"valueRenderOption": value_render_option.value} if value_render_option else None
+        response = self._open(sheet_id).values_batch_get(ranges, params=params)
+        value_ranges = (response or {}).get("valueRanges", [])
+        return [value_range.get("values") or [] for value_range in value_ranges]
+
+    @classmethod
+    def _plan_date_indices(
+        cls,
+        lookups: dict[str, tuple[WorksheetMetadata, tuple[str, ...]]],
+    ) -> tuple[dict[str, DateRowIndex], list[tuple[str, WorksheetMetadata, int]], list[str]]:
+        """Split tabs into usable cached indices and date columns still to read.
+
+        Returns the cached indices, the tabs to build as ``(tab, meta, column)``
+        and the A1 ranges to read for them: column A through the date column,
+        so rows with a timestamp but no date still count toward ``last_row``.
+        Tabs with no date column are left out.
+        """
+
+        indices: dict[str, DateRowIndex] = {}
+        missing: list[tuple[str, WorksheetMetadata, int]] = []
+        for tab, (meta, candidates) in lookups.items():
+            normalized = cls._normalize_header(meta.header)
+            date_idx = next((normalized.index(name) for name in candidates if name in normalized), None)
+            if date_idx is None:
+                continue
+            if meta.date_index is not None and meta.date_index.date_column == date_idx:
+                indices[tab] = meta.date_index
+            else:
+                missing.append((tab, meta, date_idx))
+        ranges = []
+        for tab, _meta, date_idx in missing:
+            col_letter = cls._column_letter(date_idx + 1)
+            ranges.append(absolute_range_name(tab, f"A2:{col_letter}"))
+        return indices, missing, ranges
+
+    @classmethod
+    def _store_date_indices(
+        cls,
+        missing: list[tuple[str, WorksheetMetadata, int]],
+        columns: list[list[list[Any]]],
+    ) -> dict[str, DateRowIndex]:
+        """Build indices from fetched columns and cache them on the tab metadata."""
+
+        indices: dict[str, DateRowIndex] = {}
+        for (tab, meta, date_idx), values in zip(missing, columns):
+            index = DateRowIndex(date_column=date_idx)
+            for row_index, row in enumerate(values, start=2):
+                parsed = cls._parse_sheet_date(row[date_idx] if date_idx < len(row) else None)
+                if parsed is not None:
+                    index.add(parsed, row_index)
+            meta.date_index = index
+            if meta.last_row is None:
+                meta.last_row = len(values) + 1
+            indices[tab] = index
+        return indices
+
+    def _date_indices(
+        self,
+        sheet_id: str,
+        lookups: dict[str, tuple[WorksheetMetadata, tuple[str, ...]]],
+    ) -> dict[str, DateRowIndex]:
+        """Return date -> rows indices for several tabs.
+
+        Tabs without a usable cached index have only their leading columns
+        fetched, up to the date column, all in one batchGet.
+        """
+
+        indices, missing, ranges = self._plan_date_indices(lookups)
+        if missing:
+            columns = self._batch_get(sheet_id, ranges, value_render_option=ValueRenderOption.unformatted)
+            indices.update(self._store_date_indices(missing, columns))
+        return indices
+
+    @staticmethod
+    def _note_appended_row(meta: WorksheetMetadata, day: date) -> None:
+        """Advance the known last row after an append and extend the date index."""
+
+        if meta.last_row is None:
+            meta.date_index = None
             return
-        date_col = self._column_letter(header.index("date") + 1)
-        worksheet.format(
-            f"{date_col}:{date_col}",
-            {"numberFormat": {"type": "DATE", "pattern": "dd-mm-yyyy"}},
-        )
+        meta.last_row += 1
+        if meta.date_index is not None:
+            meta.date_index.add(day, meta.last_row)
+
+    def _commit_batch(self, sheet_id: str, batch: SheetMutationBatch) -> None:
+        if batch:
+            self._open(sheet_id).batch_update(batch.body())
+
+    @classmethod
+    def _habit_row_batch(
+        cls,
+        meta: WorksheetMetadata,
+        field_order: list[str],
+        entry: HabitEntry,
+        row_index: int | None,
+    ) -> tuple[SheetMutationBatch, list[str], bool]:
+        """Queue a habit row plus any header/format fixes.
+
+        ``row_index`` of None appends a new row; otherwise that row is replaced.
+        Returns the batch, the header it writes and whether the date format
+        was queued.
+        """
+
+        header = meta.header
+        canonical_header, row = cls._prepare_habit_header_and_row(header, field_order, entry)
+        batch = SheetMutationBatch(meta.worksheet.id)
+        if header != canonical_header:
+            batch.set_header(canonical_header)
+        formatted = cls._format_habit_date_column(meta, canonical_header, batch)
+        if row_index is None:
+            batch.append_row(row)
+        else:
+            batch.write_row(row_index, row)
+        return batch, canonical_header, formatted
+
+    @classmethod
+    def _record_habit_write(
+        cls,
+        meta: WorksheetMetadata,
+        canonical_header: list[str],
+        formatted: bool,
+        entry: HabitEntry,
+        row_index: int | None,
+    ) -> None:
+        """Bring the cached tab metadata in line with a committed habit batch."""
+
+        if meta.header != canonical_header:
+            meta.header = list(canonical_header)
+            meta.date_format_applied = False
+        if formatted:
+            meta.date_format_applied = True
+        if row_index is None:
+            cls._note_appended_row(meta, entry.date)
+        else:
+            if meta.last_row is not None:
+                meta.last_row = max(meta.last_row, row_index)
+            if meta.date_index is not None:
+                meta.date_index.move(row_index, entry.date)
+
+    def _write_habit_row_sync(
+        self,
+        sheet_id: str,
+        field_order: list[str],
+        entry: HabitEntry,
+        row_index: int | None,
+    ) -> None:
+        """Write a habit row and any header/format fixes in one batchUpdate."""
+
+        self._ensure_tabs_sync(sheet_id)
+        meta = self._worksheet_meta(sheet_id, "Habits")
+        self._ensure_write_access(sheet_id, "Habits", meta)
+        self._refresh_header_for(meta, [SheetAppend(entry, field_order)])
+        batch, canonical_header, formatted = self._habit_row_batch(meta, field_order, entry, row_index)
+        self._commit_batch(sheet_id, batch)
+        self._record_habit_write(meta, canonical_header, formatted, entry, row_index)
+
+    def _append_row(self, meta: WorksheetMetadata, row: list[Any], day: date) -> None:
+        response = meta.worksheet.append_row(row, value_input_option=self._WRITE_INPUT_OPTION)
+        self._record_append(meta, response, day)
+
+    @classmethod
+    def _record_append(cls, meta: WorksheetMetadata, response: object, day: date) -> None:
+        appended_at = cls._appended_row_index(response)
+        if appended_at is None:
+            cls._note_appended_row(meta, day)
+            return
+        meta.last_row = appended_at
+        if meta.date_index is not None:
+            meta.date_index.add(day, appended_at)
 
     @staticmethod
     def _is_permission_error(exc: Exception) -> bool:
@@ -149,68 +475,106 @@ class SheetsClient(ISheetsClient):
                 raise
         return self._cache[sheet_id]
 
-    def _ensure_write_access(self, worksheet: gspread.Worksheet) -> None:
+    def _ensure_write_access(self, sheet_id: str, tab: str, meta: WorksheetMetadata) -> None:
+        """Prove the tab is writable, reusing a recent verdict when nothing changed.
+
+        A1 is read on every check; the probe then rewrites it with its own
+        value. A verdict is keyed on the service account and on that A1
+        value, so a credential swap or a rewritten header cell forces a fresh
+        probe, and a changed A1 also drops the cached header at once.
+        """
+
         try:
-            values = worksheet.get(
+            values = meta.worksheet.get(
                 "A1",
                 value_render_option=ValueRenderOption.formula,
             )
-            value = self._safe_cell_value(values)
-            worksheet.update(
-                values=[[value]],
+            a1_value = self._safe_cell_value(values)
+            if a1_value != (meta.header[0] if meta.header else ""):
+                self._adopt_header(meta, meta.worksheet.row_values(1))
+            if self._write_access.is_proven(
+                sheet_id,
+                tab,
+                service_email=self.service_email,
+                a1_value=a1_value,
+            ):
+                return
+            meta.worksheet.update(
+                values=[[a1_value]],
                 range_name="A1",
                 value_input_option=self._WRITE_INPUT_OPTION,
             )
         except Exception as exc:
             self._raise_mapped_error(exc)
             raise
+        self._write_access.record(
+            sheet_id,
+            tab,
+            service_email=self.service_email,
+            a1_value=a1_value,
+        )
+
+    def _forget_tab_state(self, sheet_id: str, tab: str | None, exc: Exception) -> None:
+        """Drop cached knowledge about a tab after a failed Sheets call."""
+
+        self._metadata.invalidate(sheet_id, tab)
+        if isinstance(exc, SheetAccessError) or self._is_permission_error(exc):
+            self._write_access.invalidate(sheet_id)
+        if not isinstance(exc, ExternalTimeoutError) and not self._is_timeout_error(exc):
+            # Tabs may have been renamed, deleted or unshared: walk them again.
+            self._layout.forget(sheet_id)
+
+    @staticmethod
+    def _migrated_header(title: str, current: list[str], header: list[str]) -> list[str]:
+        """Return the header a tab should have, given what is in row 1 today."""
+
+        # migrate legacy raw_diary -> raw_record if needed
+        migrated = [("raw_record" if col == "raw_diary" else col) for col in current]
+        # migrate reflection date -> timestamp
+        migrated = [
+            ("timestamp" if (title == "Reflections" and col == "date") else col)
+            for col in migrated
+        ]
+        missing = [col for col in header if col not in migrated]
+        # For reflections, enforce the canonical two columns to avoid drift
+        if title == "Reflections":
+            return ["timestamp", "reflections"]
+        return migrated + [m for m in missing if m not in migrated]
 
     def _ensure_tabs_sync(self, sheet_id: str) -> None:
-        if sheet_id in self._tabs_ensured:
+        if self._layout.is_verified(sheet_id):
             return
         try:
             ss = self._open(sheet_id)
             existing = {ws.title: ws for ws in ss.worksheets()}
-            for title, header in [
-                ("Habits", ["timestamp", "date", "raw_record", "diary"]),  # dynamic fields added on append
-                ("Dreams", DREAMS_SHEET_COLUMNS),
-                ("Thoughts", THOUGHTS_SHEET_COLUMNS),
-                ("Reflections", ["timestamp", "reflections"]),
-            ]:
+            for title, header in self._TAB_HEADERS:
                 if title not in existing:
                     ws = ss.add_worksheet(title=title, rows=1000, cols=30)
                     ws.append_row(header, value_input_option=self._WRITE_INPUT_OPTION)
+                    self._metadata.put(sheet_id, title, ws, header, last_row=1)
                 else:
                     ws = existing[title]
                     current = ws.row_values(1)
                     if not current:
                         ws.append_row(header, value_input_option=self._WRITE_INPUT_OPTION)
+                        self._metadata.put(sheet_id, title, ws, header, last_row=1)
                     else:
-                        # migrate legacy raw_diary -> raw_record if needed
-                        migrated = [("raw_record" if col == "raw_diary" else col) for col in current]
-                        # migrate reflection date -> timestamp
-                        migrated = [
-                            ("timestamp" if (title == "Reflections" and col == "date") else col)
-                            for col in migrated
-                        ]
-                        missing = [col for col in header if col not in migrated]
-                        # For reflections, enforce the canonical two columns to avoid drift
-                        if title == "Reflections":
-                            new_header = ["timestamp", "reflections"]
-                        else:
-                            new_header = migrated + [m for m in missing if m not in migrated]
+                        new_header = self._migrated_header(title, current, header)
                         if new_header != current:
                             ws.update("1:1", [new_header], value_input_option=self._WRITE_INPUT_OPTION)
-            self._tabs_ensured.add(sheet_id)
+                        self._metadata.put(sheet_id, title, ws, new_header)
+            self._layout.mark_verified(sheet_id)
         except Exception as exc:
+            self._forget_tab_state(sheet_id, None, exc)
             self._raise_mapped_error(exc)
             raise
 
     async def ensure_tabs(self, sheet_id: str) -> None:
-        await asyncio.to_thread(self._ensure_tabs_sync, sheet_id)
+        await self._run(sheet_id, self._ensure_tabs_sync, sheet_id)
 
+    @classmethod
     def _prepare_habit_header_and_row(
-        self,
+        cls,
         header: list[str],
         field_order: list[str],
         entry: HabitEntry,
@@ -241,7 +605,7 @@ class SheetsClient(ISheetsClient):
             if col == "timestamp":
                 row.append(entry.created_at.isoformat())
             elif col == "date":
-                row.append(self._sheet_date_serial(entry.date))
+                row.append(cls._sheet_date_serial(entry.date))
             elif col == "raw_record":
                 row.append(entry.raw_record)
             elif col == "diary":
@@ -258,23 +622,36 @@ class SheetsClient(ISheetsClient):
         entry: HabitEntry,
     ) -> None:
         try:
-            self._ensure_tabs_sync(sheet_id)
-            ss = self._open(sheet_id)
-            ws = ss.worksheet("Habits")
-            self._ensure_write_access(ws)
-            header = ws.row_values(1)
-            canonical_header, row = self._prepare_habit_header_and_row(header, field_order, entry)
-            if header != canonical_header:
-                ws.update("1:1", [canonical_header], value_input_option=self._WRITE_INPUT_OPTION)
-            self._format_habit_date_column(ws, canonical_header)
-
-            ws.append_row(row, value_input_option=self._WRITE_INPUT_OPTION)
+            self._write_habit_row_sync(sheet_id, field_order, entry, None)
         except Exception as exc:
+            self._forget_tab_state(sheet_id, "Habits", exc)
             self._raise_mapped_error(exc)
             raise
 
     async def append_habit_entry(self, sheet_id: str, field_order: list[str], entry: HabitEntry) -> None:
-        await asyncio.to_thread(self._append_habit_entry_sync, sheet_id, field_order, entry)
+        await self._run(sheet_id, self._append_habit_entry_sync, sheet_id, field_order, entry)
+
+    @staticmethod
+    def _habit_lookup(normalized: list[str], row_index: int, row_values: list[Any]) -> HabitRowLookup:
+        raw_idx = normalized.index("raw_record") if "raw_record" in normalized else None
+        raw_record = ""
+        if raw_idx is not None and raw_idx < len(row_values):
+            raw_record = row_values[raw_idx]
+        entry_data: dict[str, Any] = {}
+        for idx, column in enumerate(normalized):
+            entry_data[column] = row_values[idx] if idx < len(row_values) else ""
+        entry_data["field_order"] = [
+            col
+            for col in normalized
+            if col not in {"timestamp", "date", "raw_record", "diary"}
+        ]
+        if "raw_record" not in entry_data and raw_record:
+            entry_data["raw_record"] = raw_record
+        return HabitRowLookup(
+            row_index=row_index,
+            raw_record=raw_record,
+            entry_data=entry_data,
+        )
 
     def _find_latest_habit_entry_sync(
         self,
@@ -283,52 +660,34 @@ class SheetsClient(ISheetsClient):
     ) -> HabitRowLookup | None:
         try:
             self._ensure_tabs_sync(sheet_id)
-            ss = self._open(sheet_id)
-            ws = ss.worksheet("Habits")
-            header = ws.row_values(1)
-            if not header:
+            meta = self._worksheet_meta(sheet_id, "Habits")
+            if not meta.header:
                 return None
-            normalized = [("raw_record" if col == "raw_diary" else col) for col in header]
-            if "date" not in normalized:
-                return None
-            date_idx = normalized.index("date")
-            raw_idx = normalized.index("raw_record") if "raw_record" in normalized else None
-            if raw_idx is None and "raw_diary" in normalized:
-                raw_idx = normalized.index("raw_diary")
-
-            col_letter = self._column_letter(date_idx + 1)
-            values = ws.get(
-                f"{col_letter}2:{col_letter}",
-                value_render_option="UNFORMATTED_VALUE",
-            )
-            match_row = None
-            for row_index, row in enumerate(values, start=2):
-                value = row[0] if row else None
-                parsed = self._parse_sheet_date(value)
-                if parsed == entry_date:
-                    match_row = row_index
+            normalized = self._normalize_header(meta.header)
+            match_row: int | None = None
+            row_values: list[Any] = []
+            # The row is later overwritten in place, so a stale index must never
+            # point at another day: verify the fetched date and rebuild once.
+            for _attempt in range(2):
+                index = self._date_indices(sheet_id, {"Habits": (meta, ("date",))}).get("Habits")
+                if index is None:
+                    return None
+                matches = index.rows_for([entry_date], latest_only=True)
+                if not matches:
+                    return None
+                match_row, _day = matches[-1]
+                row_values = meta.worksheet.row_values(match_row)
+                date_cell = row_values[index.date_column] if index.date_column < len(row_values) else None
+                if self._parse_sheet_date(date_cell) == entry_date:
+                    break
+                meta.date_index = None
+                meta.last_row = None
+                match_row = None
             if match_row is None:
                 return None
-            row_values = ws.row_values(match_row)
-            raw_record = ""
-            if raw_idx is not None and raw_idx < len(row_values):
-                raw_record = row_values[raw_idx]
-            entry_data: dict[str, Any] = {}
-            for idx, column in enumerate(normalized):
-                entry_data[column] = row_values[idx] if idx < len(row_values) else ""
-            entry_data["field_order"] = [
-                col
-                for col in normalized
-                if col not in {"timestamp", "date", "raw_record", "diary"}
-            ]
-            if "raw_record" not in entry_data and raw_record:
-                entry_data["raw_record"] = raw_record
-            return HabitRowLookup(
-                row_index=match_row,
-                raw_record=raw_record,
-                entry_data=entry_data,
-            )
+            return self._habit_lookup(normalized, match_row, row_values)
         except Exception as exc:
+            self._forget_tab_state(sheet_id, "Habits", exc)
             self._raise_mapped_error(exc)
             raise
 
@@ -337,42 +696,57 @@ class SheetsClient(ISheetsClient):
         sheet_id: str,
         entry_date: date,
     ) -> HabitRowLookup | None:
-        return await asyncio.to_thread(self._find_latest_habit_entry_sync, sheet_id, entry_date)
+        return await self._run(sheet_id, self._find_latest_habit_entry_sync, sheet_id, entry_date)
 
-    def _get_entries_for_dates_sync(
-        self,
-        sheet_id: str,
+    @staticmethod
+    def _plan_row_reads(
         dates: list[date],
-        tab_name: str,
-        date_column_candidates: tuple[str, ...],
-        allow_multiple: bool = False,
-    ) -> list[dict[str, Any]]:
-        try:
-            if not dates:
-                return []
-            self._ensure_tabs_sync(sheet_id)
-            ss = self._open(sheet_id)
-            ws = ss.worksheet(tab_name)
-            values = ws.get_all_values()
-            if not values or len(values) < 2:
-                return []
-            header = values[0]
-            normalized = [("raw_record" if col == "raw_diary" else col) for col in header]
-            date_idx = None
-            for candidate in date_column_candidates:
-                if candidate in normalized:
-                    date_idx = normalized.index(candidate)
-                    break
-            if date_idx is None:
-                return []
-            target_dates = set(dates)
+        lookups: dict[str, tuple[tuple[str, ...], bool]],
+        indices: dict[str, DateRowIndex],
+    ) -> tuple[list[tuple[str, list[tuple[int, date]]]], list[str]]:
+        """Return the matching ``(row, date)`` pairs per tab and their A1 row ranges."""
+
+        plan: list[tuple[str, list[tuple[int, date]]]] = []
+        for tab, index in indices.items():
+            matches = index.rows_for(dates, latest_only=not lookups[tab][1])
+            if matches:
+                plan.append((tab, matches))
+        ranges = [
+            absolute_range_name(tab, f"{row_number}:{row_number}")
+            for tab, matches in plan
+            for row_number, _day in matches
+        ]
+        return plan, ranges
+
+    @classmethod
+    def _entries_from_rows(
+        cls,
+        dates: list[date],
+        lookups: dict[str, tuple[tuple[str, ...], bool]],
+        metas: dict[str, WorksheetMetadata],
+        indices: dict[str, DateRowIndex],
+        plan: list[tuple[str, list[tuple[int, date]]]],
+        rows: list[list[list[Any]]],
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Turn fetched rows back into entries, in the order ``plan`` asked for them."""
+
+        results: dict[str, list[dict[str, Any]]] = {tab: [] for tab in lookups}
+        fetched = iter(rows)
+        for tab, matches in plan:
+            meta = metas[tab]
+            index = indices[tab]
+            allow_multiple = lookups[tab][1]
+            normalized = cls._normalize_header(meta.header)
             entries_by_date: dict[date, dict[str, Any]] = {}
             entries: list[dict[str, Any]] = []
-            for row in values[1:]:
-                if date_idx >= len(row):
-                    continue
-                parsed = self._parse_sheet_date(row[date_idx] if row else None)
-                if parsed is None or parsed not in target_dates:
+            for _row_number, parsed in matches:
+                values = next(fetched, [])
+                row = values[0] if values else []
+                if index.date_column >= len(row) or cls._parse_sheet_date(row[index.date_column]) != parsed:
+                    # Rows moved since the index was built (e.g. edited by hand):
+                    # drop the index and row count so the caller reads them again.
+                    meta.date_index = None
+                    meta.last_row = None
                     continue
                 entry: dict[str, Any] = {}
                 for idx, column in enumerate(normalized):
@@ -383,18 +757,115 @@ class SheetsClient(ISheetsClient):
                 else:
                     entries_by_date[parsed] = entry
             if allow_multiple:
-                return entries
-            return [entries_by_date[d] for d in dates if d in entries_by_date]
+                results[tab] = entries
+            else:
+                results[tab] = [entries_by_date[d] for d in dates if d in entries_by_date]
+        return results
+
+    def _collect_entries_for_dates(
+        self,
+        sheet_id: str,
+        dates: list[date],
+        lookups: dict[str, tuple[tuple[str, ...], bool]],
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Read the rows matching ``dates`` from several tabs with one row batchGet.
+
+        ``lookups`` maps a tab to its date column candidates and whether every
+        row per date is kept (otherwise the latest row per date wins).
+        """
+
+        if not dates or not lookups:
+            return {tab: [] for tab in lookups}
+        self._ensure_tabs_sync(sheet_id)
+        metas = {tab: self._worksheet_meta(sheet_id, tab) for tab in lookups}
+        results, stale = self._read_entries_for_dates(sheet_id, dates, lookups, metas)
+        if stale:
+            logger.warning("sheet_date_index_stale", sheet_id_suffix=sheet_id[-6:], tabs=stale)
+            retried, _stale = self._read_entries_for_dates(
+                sheet_id, dates, {tab: lookups[tab] for tab in stale}, metas
+            )
+            results.update(retried)
+        return results
+
+    def _read_entries_for_dates(
+        self,
+        sheet_id: str,
+        dates: list[date],
+        lookups: dict[str, tuple[tuple[str, ...], bool]],
+        metas: dict[str, WorksheetMetadata],
+    ) -> tuple[dict[str, list[dict[str, Any]]], list[str]]:
+        """One index-and-rows pass; also returns the tabs whose index proved stale."""
+
+        indices = self._date_indices(
+            sheet_id,
+            {tab: (metas[tab], lookups[tab][0]) for tab in lookups if metas[tab].header},
+        )
+        plan, ranges = self._plan_row_reads(dates, lookups, indices)
+        rows = self._batch_get(sheet_id, ranges) if ranges else []
+        results = self._entries_from_rows(dates, lookups, metas, indices, plan, rows)
+        return results, [tab for tab, _matches in plan if metas[tab].date_index is None]
+
+    def _get_entries_for_dates_sync(
+        self,
+        sheet_id: str,
+        dates: list[date],
+        tab_name: str,
+        date_column_candidates: tuple[str, ...],
+        allow_multiple: bool = False,
+    ) -> list[dict[str, Any]]:
+        try:
+            results = self._collect_entries_for_dates(
+                sheet_id,
+                dates,
+                {tab_name: (date_column_candidates, allow_multiple)},
+            )
+            return results[tab_name]
+        except Exception as exc:
+            self._forget_tab_state(sheet_id, tab_name, exc)
+            self._raise_mapped_error(exc)
+            raise
+
+    def _get_entries_for_dates_multi_sync(
+        self,
+        sheet_id: str,
+        dates: list[date],
+        tabs: tuple[str, ...],
+    ) -> dict[str, list[dict[str, Any]]]:
+        try:
+            return self._collect_entries_for_dates(
+                sheet_id,
+                dates,
+                {tab: self._DATE_LOOKUPS[tab] for tab in tabs},
+            )
         except Exception as exc:
+            self._forget_tab_state(sheet_id, None, exc)
             self._raise_mapped_error(exc)
             raise
 
+    async def get_entries_for_dates_multi(
+        self,
+        sheet_id: str,
+        dates: list[date],
+        tabs: tuple[str, ...] = ENTRY_SHEET_TABS,
+    ) -> dict[str, list[dict[str, Any]]]:
+        unknown = [tab for tab in tabs if tab not in self._DATE_LOOKUPS]
+        if unknown:
+            raise ValueError(f"Unsupported tabs for date lookup: {', '.join(unknown)}")
+        return await self._run(
+            sheet_id,
+            self._get_entries_for_dates_multi_sync,
+            sheet_id,
+            dates,
+            tuple(tabs),
+        )
+
     async def get_habit_entries_for_dates(
         self,
         sheet_id: str,
         dates: list[date],
     ) -> list[dict[str, Any]]:
-        return await asyncio.to_thread(
+        return await self._run(
+            sheet_id,
             self._get_entries_for_dates_sync,
             sheet_id,
             dates,
@@ -408,7 +879,8 @@ class SheetsClient(ISheetsClient):
         sheet_id: str,
         dates: list[date],
     ) -> list[dict[str, Any]]:
-        return await asyncio.to_thread(
+        return await self._run(
+            sheet_id,
             self._get_entries_for_dates_sync,
             sheet_id,
             dates,
@@ -422,7 +894,8 @@ class SheetsClient(ISheetsClient):
         sheet_id: str,
         dates: list[date],
     ) -> list[dict[str, Any]]:
-        return await asyncio.to_thread(
+        return await self._run(
+            sheet_id,
             self._get_entries_for_dates_sync,
             sheet_id,
             dates,
@@ -436,7 +909,8 @@ class SheetsClient(ISheetsClient):
         sheet_id: str,
         dates: list[date],
     ) -> list[dict[str, Any]]:
-        return await asyncio.to_thread(
+        return await self._run(
+            sheet_id,
             self._get_entries_for_dates_sync,
             sheet_id,
             dates,
@@ -453,21 +927,9 @@ class SheetsClient(ISheetsClient):
         entry: HabitEntry,
     ) -> None:
         try:
-            self._ensure_tabs_sync(sheet_id)
-            ss = self._open(sheet_id)
-            ws = ss.worksheet("Habits")
-            self._ensure_write_access(ws)
-            header = ws.row_values(1)
-            canonical_header, row = self._prepare_habit_header_and_row(header, field_order, entry)
-            if header != canonical_header:
-                ws.update("1:1", [canonical_header], value_input_option=self._WRITE_INPUT_OPTION)
-            self._format_habit_date_column(ws, canonical_header)
-            ws.update(
-                f"A{row_index}",
-                [row],
-                value_input_option=self._WRITE_INPUT_OPTION,
-            )
+            self._write_habit_row_sync(sheet_id, field_order, entry, row_index)
         except Exception as exc:
+            self._forget_tab_state(sheet_id, "Habits", exc)
             self._raise_mapped_error(exc)
             raise
 
@@ -478,7 +940,8 @@ class SheetsClient(ISheetsClient):
         field_order: list[str],
         entry: HabitEntry,
     ) -> None:
-        await asyncio.to_thread(
+        await self._run(
+            sheet_id,
             self._update_habit_entry_sync,
             sheet_id,
             row_index,
@@ -489,59 +952,124 @@ class SheetsClient(ISheetsClient):
     def _append_dream_entry_sync(self, sheet_id: str, entry: DreamEntry) -> None:
         try:
             self._ensure_tabs_sync(sheet_id)
-            ss = self._open(sheet_id)
-            ws = ss.worksheet("Dreams")
-            self._ensure_write_access(ws)
+            meta = self._worksheet_meta(sheet_id, "Dreams")
+            self._ensure_write_access(sheet_id, "Dreams", meta)
             row = [
                 entry.timestamp.isoformat(),
                 entry.record,
             ]
-            ws.append_row(row, value_input_option=self._WRITE_INPUT_OPTION)
+            self._append_row(meta, row, entry.timestamp.date())
         except Exception as exc:
+            self._forget_tab_state(sheet_id, "Dreams", exc)
             self._raise_mapped_error(exc)
             raise
 
     async def append_dream_entry(self, sheet_id: str, entry: DreamEntry) -> None:
-        await asyncio.to_thread(self._append_dream_entry_sync, sheet_id, entry)
+        await self._run(sheet_id, self._append_dream_entry_sync, sheet_id, entry)
 
     def _append_thought_entry_sync(self, sheet_id: str, entry: ThoughtEntry) -> None:
         try:
             self._ensure_tabs_sync(sheet_id)
-            ss = self._open(sheet_id)
-            ws = ss.worksheet("Thoughts")
-            self._ensure_write_access(ws)
+            meta = self._worksheet_meta(sheet_id, "Thoughts")
+            self._ensure_write_access(sheet_id, "Thoughts", meta)
             row = [
                 entry.timestamp.isoformat(),
                 entry.record,
             ]
-            ws.append_row(row, value_input_option=self._WRITE_INPUT_OPTION)
+            self._append_row(meta, row, entry.timestamp.date())
         except Exception as exc:
+            self._forget_tab_state(sheet_id, "Thoughts", exc)
             self._raise_mapped_error(exc)
             raise
 
     async def append_thought_entry(self, sheet_id: str, entry: ThoughtEntry) -> None:
-        await asyncio.to_thread(self._append_thought_entry_sync, sheet_id, entry)
+        await self._run(sheet_id, self._append_thought_entry_sync, sheet_id, entry)
+
+    @classmethod
+    def _tab_for(cls, entry: object) -> str:
+        for entry_type, tab in cls._ENTRY_TABS:
+            if isinstance(entry, entry_type):
+                return tab
+        raise ValueError(f"Unsupported entry type: {type(entry).__name__}")
+
+    @classmethod
+    def _queue_appends(cls, meta: WorksheetMetadata, appends: list[SheetAppend]) -> SheetMutationBatch:
+        """Queue rows for one tab and advance its cached metadata as if committed.
+
+        Callers must drop the sheet's cached state if the batch then fails.
+        """
+
+        batch = SheetMutationBatch(meta.worksheet.id)
+        for append in appends:
+            entry = append.entry
+            if isinstance(entry, HabitEntry):
+                habit_batch, header, formatted = cls._habit_row_batch(meta, append.field_order, entry, None)
+                batch.extend(habit_batch)
+                cls._record_habit_write(meta, header, formatted, entry, None)
+            elif isinstance(entry, ReflectionEntry):
+                batch.extend(cls._reflection_row_batch(meta, entry))
+                meta.header = list(cls._REFLECTIONS_HEADER)
+                cls._note_appended_row(meta, entry.timestamp.date())
+            else:
+                batch.append_row([entry.timestamp.isoformat(), entry.record])
+                cls._note_appended_row(meta, entry.timestamp.date())
+        return batch
+
+    @classmethod
+    def _group_appends(cls, appends: list[SheetAppend]) -> dict[str, list[SheetAppend]]:
+        grouped: dict[str, list[SheetAppend]] = {}
+        for append in appends:
+            grouped.setdefault(cls._tab_for(append.entry), []).append(append)
+        return grouped
+
+    def _append_entries_sync(self, sheet_id: str, appends: list[SheetAppend]) -> None:
+        try:
+            self._ensure_tabs_sync(sheet_id)
+            combined: SheetMutationBatch | None = None
+            for tab, tab_appends in self._group_appends(appends).items():
+                meta = self._worksheet_meta(sheet_id, tab)
+                self._ensure_write_access(sheet_id, tab, meta)
+                self._refresh_header_for(meta, tab_appends)
+                batch = self._queue_appends(meta, tab_appends)
+                combined = batch if combined is None else combined.extend(batch)
+            if combined is not None:
+                self._commit_batch(sheet_id, combined)
+        except Exception as exc:
+            self._forget_tab_state(sheet_id, None, exc)
+            self._raise_mapped_error(exc)
+            raise
+
+    async def append_entries(self, sheet_id: str, appends: list[SheetAppend]) -> None:
+        if appends:
+            await self._run(sheet_id, self._append_entries_sync, sheet_id, list(appends))
+
+    @classmethod
+    def _reflection_row_batch(cls, meta: WorksheetMetadata, entry) -> SheetMutationBatch:
+        batch = SheetMutationBatch(meta.worksheet.id)
+        if meta.header != cls._REFLECTIONS_HEADER:
+            batch.set_header(cls._REFLECTIONS_HEADER)
+        batch.append_row(
+            [
+                entry.timestamp.isoformat(),
+                json.dumps(entry.answers, ensure_ascii=False),
+            ]
+        )
+        return batch
 
     def _append_reflection_entry_sync(self, sheet_id: str, entry) -> None:
         try:
             self._ensure_tabs_sync(sheet_id)
-            ss = self._open(sheet_id)
-            ws = ss.worksheet("Reflections")
-            self._ensure_write_access(ws)
-            header = ws.row_values(1)
-            canonical_header = ["timestamp", "reflections"]
-            if header != canonical_header:
-                ws.update("1:1", [canonical_header], value_input_option=self._WRITE_INPUT_OPTION)
-            ws.append_row(
-                [
-                    entry.timestamp.isoformat(),
-                    json.dumps(entry.answers, ensure_ascii=False),
-                ],
-                value_input_option=self._WRITE_INPUT_OPTION,
-            )
+            meta = self._worksheet_meta(sheet_id, "Reflections")
+            self._ensure_write_access(sheet_id, "Reflections", meta)
+            self._refresh_header_for(meta, [SheetAppend(entry)])
+            batch = self._reflection_row_batch(meta, entry)
+            self._commit_batch(sheet_id, batch)
+            meta.header = list(self._REFLECTIONS_HEADER)
+            self._note_appended_row(meta, entry.timestamp.date())
         except Exception as exc:
+            self._forget_tab_state(sheet_id, "Reflections", exc)
             self._raise_mapped_error(exc)
             raise
 
     async def append_reflection_entry(self, sheet_id: str, entry) -> None:
-        await asyncio.to_thread(self._append_reflection_entry_sync, sheet_id, entry)
+        await self._run(sheet_id, self._append_reflection_entry_sync, sheet_id, entry)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from src.config.settings import get_settings
+from src.core.exceptions import ExternalTimeoutError
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SheetIOStats:
+    """Point-in-time view of the Sheets executor, for logs and admin output."""
+
+    pending: int  # calls waiting for their sheet's turn or a free worker
+    running: int
+    dispatched: int  # calls that reached a worker thread
+    rejected: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.dispatched if self.dispatched else 0.0
+
+
+class _SheetSlot:
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class SheetIOExecutor:
+    """Runs blocking Sheets calls on a dedicated, sized thread pool.
+
+    Calls for the same ``sheet_id`` run one at a time, in arrival order, so
+    two quick saves to one diary cannot interleave their header rewrite and
+    append. A sheet's turn is only released once its worker thread returns,
+    even if the awaiting coroutine timed out. Calls beyond ``max_pending``
+    are rejected with ``ExternalTimeoutError`` instead of queueing forever.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        *,
+        max_pending: int = 256,
+        slow_wait_seconds: float = 1.0,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.slow_wait_seconds = slow_wait_seconds
+        self._clock = clock or time.monotonic
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sheets-io")
+        self._slots: dict[str, _SheetSlot] = {}
+        self._pending = 0
+        self._running = 0
+        self._dispatched = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def stats(self) -> SheetIOStats:
+        return SheetIOStats(
+            pending=self._pending,
+            running=self._running,
+            dispatched=self._dispatched,
+            rejected=self._rejected,
+            total_wait_seconds=self._total_wait,
+            max_wait_seconds=self._max_wait,
+        )
+
+    async def run(self, sheet_id: str, fn: Callable[..., T], *args: Any) -> T:
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            logger.warning("sheets_io_rejected", sheet_id=sheet_id, pending=self._pending)
+            raise ExternalTimeoutError("Google Sheets is busy")
+
+        loop = asyncio.get_running_loop()
+        enqueued_at = self._clock()
+        slot = self._slots.get(sheet_id)
+        if slot is None:
+            slot = self._slots[sheet_id] = _SheetSlot()
+        slot.users += 1
+        self._pending += 1
+        started = False
+        try:
+            await slot.lock.acquire()
+        except BaseException:
+            self._pending -= 1
+            self._leave(sheet_id, slot)
+            raise
+
+        context = contextvars.copy_context()
+
+        def call() -> T:
+            nonlocal started
+            started = True
+            loop.call_soon_threadsafe(self._on_started, sheet_id, enqueued_at)
+            return context.run(fn, *args)
+
+        try:
+            future = loop.run_in_executor(self._pool, call)
+        except BaseException:
+            self._pending -= 1
+            slot.lock.release()
+            self._leave(sheet_id, slot)
+            raise
+
+        def on_done(_future: asyncio.Future[T]) -> None:
+            if started:
+                self._running -= 1
+            else:
+                self._pending -= 1
+            slot.lock.release()
+            self._leave(sheet_id, slot)
+
+        future.add_done_callback(on_done)
+        # Shield so a caller timeout leaves the sheet locked until the thread ends.
+        return await asyncio.shield(future)
+
+    def _on_started(self, sheet_id: str, enqueued_at: float) -> None:
+        wait = self._clock() - enqueued_at
+        self._pending -= 1
+        self._running += 1
+        self._dispatched += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        if wait >= self.slow_wait_seconds:
+            logger.warning(
+                "sheets_io_slow_wait",
+                sheet_id=sheet_id,
+                wait_seconds=round(wait, 3),
+                pending=self._pending,
+                running=self._running,
+            )
+
+    def _leave(self, sheet_id: str, slot: _SheetSlot) -> None:
+        slot.users -= 1
+        if slot.users == 0 and self._slots.get(sheet_id) is slot:
+            del self._slots[sheet_id]
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache()
+def get_sheet_io_executor() -> SheetIOExecutor:
+    """Process-wide executor shared by every SheetsClient instance."""
+
+    settings = get_settings()
+    return SheetIOExecutor(
+        settings.sheets_executor_workers,
+        max_pending=settings.sheets_executor_max_pending,
+        slow_wait_seconds=settings.sheets_io_slow_wait_seconds,
+    )
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from src.config.settings import Settings, get_settings
+from src.services.storage.firestore.sheet_layout_repo import SheetLayoutRepository
+from src.services.storage.interfaces import ISheetsClient
+
+
+def create_sheets_client(
+    settings: Settings | None = None,
+    *,
+    layouts: SheetLayoutRepository | None = None,
+) -> ISheetsClient:
+    """Build the Sheets backend selected by ``settings.sheets_backend``.
+
+    ``layouts`` shares verified tab layouts with other instances, so a fresh
+    client skips re-checking tabs and headers another one already checked.
+    """
+
+    settings = settings or get_settings()
+    if settings.sheets_backend == "httpx":
+        from src.services.storage.sheets.async_client import AsyncSheetsClient
+
+        return AsyncSheetsClient(settings.google_credentials_path, layouts=layouts)
+
+    from src.services.storage.sheets.client import SheetsClient
+
+    return SheetsClient(settings.google_credentials_path, layouts=layouts)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from src.core.logging import get_logger
+from src.models.sheet_layout import SheetLayout
+from src.services.storage.firestore.sheet_layout_repo import SheetLayoutRepository
+
+logger = get_logger(__name__)
+
+
+class SheetLayoutTracker:
+    """Which sheets have verified tabs and headers, shared through a layout store.
+
+    A sheet counts as verified once this process ran the tab walk, or once
+    another instance (or an earlier cold start) recorded a layout with the
+    same version for the same service account. ``forget`` is safe to call
+    from worker threads; the shared record is then deleted on the next
+    ``restore`` so no instance skips the walk for a sheet that changed.
+    """
+
+    def __init__(
+        self,
+        store: SheetLayoutRepository | None,
+        *,
+        version: str,
+        service_email: str | None = None,
+    ) -> None:
+        self.store = store
+        self.version = version
+        self.service_email = service_email
+        self._verified: set[str] = set()
+        self._saved: set[str] = set()
+        self._stale: set[str] = set()
+
+    def is_verified(self, sheet_id: str) -> bool:
+        return sheet_id in self._verified
+
+    def mark_verified(self, sheet_id: str) -> None:
+        self._verified.add(sheet_id)
+
+    def forget(self, sheet_id: str) -> None:
+        self._verified.discard(sheet_id)
+        self._saved.discard(sheet_id)
+        if self.store is not None:
+            self._stale.add(sheet_id)
+
+    async def restore(self, sheet_id: str) -> None:
+        """Adopt a stored layout for ``sheet_id``, or drop one known to be stale."""
+
+        if self.store is None:
+            return
+        if sheet_id in self._stale:
+            self._stale.discard(sheet_id)
+            await self.store.delete(sheet_id)
+            return
+        if sheet_id in self._verified:
+            return
+        layout = await self.store.get(sheet_id)
+        if layout is None:
+            return
+        if layout.version != self.version or layout.service_email != self.service_email:
+            logger.info("sheet_layout_outdated", sheet_id_suffix=sheet_id[-6:], version=layout.version)
+            return
+        self._verified.add(sheet_id)
+        self._saved.add(sheet_id)
+
+    async def save(self, sheet_id: str, headers: dict[str, list[str]]) -> None:
+        """Record a layout this process verified, once per sheet."""
+
+        if self.store is None or sheet_id not in self._verified or sheet_id in self._saved:
+            return
+        await self.store.save(
+            SheetLayout(
+                sheet_id=sheet_id,
+                version=self.version,
+                service_email=self.service_email,
+                headers=headers,
+            )
+        )
+        self._saved.add(sheet_id)
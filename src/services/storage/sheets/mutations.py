@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+def _cell(value: Any) -> dict[str, Any]:
+    """Build a CellData payload that is stored as-is, never parsed as a formula.
+
+    ``stringValue`` is the batchUpdate equivalent of the RAW value input
+    option: text starting with ``=``, ``+``, ``-`` or ``@`` stays literal.
+    """
+
+    if value is None or value == "":
+        return {"userEnteredValue": {"stringValue": ""}}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    return {"userEnteredValue": {"stringValue": str(value)}}
+
+
+def _row_data(values: list[Any]) -> dict[str, Any]:
+    return {"values": [_cell(value) for value in values]}
+
+
+class SheetMutationBatch:
+    """Collects the mutations of one save into a single spreadsheets.batchUpdate.
+
+    Requests are applied in the order they were added and atomically: if any
+    of them fails, none of them is applied.
+    """
+
+    def __init__(self, worksheet_id: int) -> None:
+        self.worksheet_id = worksheet_id
+        self._requests: list[dict[str, Any]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._requests)
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    def set_header(self, header: list[str]) -> "SheetMutationBatch":
+        return self.write_row(1, header)
+
+    def format_date_column(self, column_index: int, pattern: str) -> "SheetMutationBatch":
+        """Apply a DATE number format to a whole column (``column_index`` is 0-based)."""
+
+        self._requests.append(
+            {
+                "repeatCell": {
+                    "range": {
+                        "sheetId": self.worksheet_id,
+                        "startColumnIndex": column_index,
+                        "endColumnIndex": column_index + 1,
+                    },
+                    "cell": {"userEnteredFormat": {"numberFormat": {"type": "DATE", "pattern": pattern}}},
+                    "fields": "userEnteredFormat.numberFormat",
+                }
+            }
+        )
+        return self
+
+    def append_row(self, row: list[Any]) -> "SheetMutationBatch":
+        self._requests.append(
+            {
+                "appendCells": {
+                    "sheetId": self.worksheet_id,
+                    "rows": [_row_data(row)],
+                    "fields": "userEnteredValue",
+                }
+            }
+        )
+        return self
+
+    def write_row(self, row_index: int, row: list[Any]) -> "SheetMutationBatch":
+        """Overwrite a row starting at column A (``row_index`` is 1-based, like A1)."""
+
+        self._requests.append(
+            {
+                "updateCells": {
+                    "start": {
+                        "sheetId": self.worksheet_id,
+                        "rowIndex": row_index - 1,
+                        "columnIndex": 0,
+                    },
+                    "rows": [_row_data(row)],
+                    "fields": "userEnteredValue",
+                }
+            }
+        )
+        return self
+
+    def extend(self, other: "SheetMutationBatch") -> "SheetMutationBatch":
+        """Add another batch's requests, e.g. for another tab of the same spreadsheet."""
+
+        self._requests.extend(other._requests)
+        return self
+
+    def body(self) -> dict[str, Any]:
+        return {"requests": list(self._requests)}
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Literal
+
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+from requests import Response
+
+from src.config.settings import get_settings
+from src.core.exceptions import ExternalTimeoutError
+from src.core.logging import get_logger
+from src.core.token_bucket import TokenBucket
+
+logger = get_logger(__name__)
+
+QuotaKind = Literal["read", "write"]
+
+
+def parse_retry_after(value: str | None, *, now: datetime | None = None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+@dataclass(frozen=True)
+class SheetQuotaStats:
+    """Point-in-time view of the quota governor, for logs and admin output."""
+
+    tokens: dict[str, float]  # bucket name -> tokens left (negative: queued)
+    granted: int
+    delayed: int  # grants that had to wait for a token or a backoff
+    rejected: int
+    throttled: int  # 429 responses seen
+    total_wait_seconds: float
+    blocked_for_seconds: float  # remaining Retry-After / backoff pause
+
+
+class SheetsQuotaGovernor:
+    """Client-side token buckets for the Sheets API read and write quotas.
+
+    Google meters Sheets requests per minute per project and per minute per
+    user (the authenticated principal, i.e. our service account). Every
+    request takes a token from the project and the principal bucket of its
+    kind; when they are empty the request is scheduled for when a token
+    refills, so a burst such as the 21:00 reminder wave is spread out rather
+    than answered with 429s. A 429 pauses all requests for Retry-After, or a
+    jittered exponential backoff when the header is absent.
+
+    Requests that would wait longer than ``max_wait_seconds`` are rejected
+    with ``ExternalTimeoutError``. Thread-safe, so gspread's worker threads
+    and the event loop share one governor. State is process-local; the quota
+    split assumes a single instance (see ``--max-instances 1`` in
+    scripts/deploy_cloud_run.sh).
+    """
+
+    def __init__(
+        self,
+        *,
+        project_reads_per_minute: int = 300,
+        project_writes_per_minute: int = 300,
+        user_reads_per_minute: int = 60,
+        user_writes_per_minute: int = 60,
+        max_wait_seconds: float = 20.0,
+        max_retries: int = 3,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 32.0,
+        clock: Callable[[], float] | None = None,
+        rng: Callable[[], float] | None = None,
+    ) -> None:
+        self._limits = {
+            ("project", "read"): project_reads_per_minute,
+            ("project", "write"): project_writes_per_minute,
+            ("user", "read"): user_reads_per_minute,
+            ("user", "write"): user_writes_per_minute,
+        }
+        self.max_wait_seconds = max_wait_seconds
+        self.max_retries = max(0, max_retries)
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._clock = clock or time.monotonic
+        self._rng = rng or random.random
+        self._lock = threading.Lock()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._blocked_until = 0.0
+        self._consecutive_throttles = 0
+        self._granted = 0
+        self._delayed = 0
+        self._rejected = 0
+        self._throttled = 0
+        self._total_wait = 0.0
+
+    def _bucket(self, scope: str, kind: QuotaKind, principal: str | None) -> TokenBucket:
+        name = f"{scope}:{kind}" if scope == "project" else f"user:{principal or 'default'}:{kind}"
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            per_minute = self._limits[(scope, kind)]
+            # Half a minute of burst: a full one could meet a fresh Google window
+            # and double up.
+            bucket = self._buckets[name] = TokenBucket(per_minute, per_minute // 2)
+        return bucket
+
+    def reserve(self, kind: QuotaKind, principal: str | None = None) -> float:
+        """Take a token from each bucket of ``kind``; return how long to wait first."""
+
+        with self._lock:
+            now = self._clock()
+            buckets = [self._bucket("project", kind, principal), self._bucket("user", kind, principal)]
+            wait = max(
+                self._blocked_until - now,
+                *(bucket.wait_for(now) for bucket in buckets),
+            )
+            wait = max(0.0, wait)
+            if wait > self.max_wait_seconds:
+                self._rejected += 1
+                logger.warning("sheets_quota_rejected", kind=kind, wait_seconds=round(wait, 3))
+                raise ExternalTimeoutError("Google Sheets quota exhausted")
+            for bucket in buckets:
+                bucket.take(now)
+            self._granted += 1
+            if wait > 0:
+                self._delayed += 1
+                self._total_wait += wait
+            return wait
+
+    async def acquire(self, kind: QuotaKind, principal: str | None = None) -> None:
+        wait = self.reserve(kind, principal)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def ready_in(self, principal: str | None = None) -> float:
+        """Seconds until a read and a write could both be granted without waiting."""
+
+        with self._lock:
+            now = self._clock()
+            buckets = [
+                self._bucket(scope, kind, principal)
+                for scope in ("project", "user")
+                for kind in ("read", "write")
+            ]
+            return max(0.0, self._blocked_until - now, *(bucket.wait_for(now) for bucket in buckets))
+
+    async def wait_until_ready(self, principal: str | None = None) -> None:
+        """Sleep on the event loop, without taking tokens, until ``ready_in`` is zero.
+
+        Called before a blocking job takes its sheet's turn on the executor, so
+        the job does not sit in ``acquire_blocking`` while later calls for the
+        same sheet queue behind it. Gives up after ``max_wait_seconds``, leaving
+        the final say (and any rejection) to ``reserve``.
+        """
+
+        deadline = self._clock() + self.max_wait_seconds
+        while True:
+            wait = min(self.ready_in(principal), deadline - self._clock())
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self, kind: QuotaKind, principal: str | None = None) -> None:
+        """``acquire`` for code already running on a worker thread.
+
+        Callers wait in ``wait_until_ready`` first, so this sleep only covers
+        the tokens other callers took in between, or a 429 backoff mid-job.
+        """
+
+        wait = self.reserve(kind, principal)
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttled(self, retry_after: float | None, attempt: int) -> bool:
+        """Record a 429 and pause everyone; True if attempt ``attempt`` may retry."""
+
+        with self._lock:
+            self._throttled += 1
+            self._consecutive_throttles += 1
+            if retry_after is None:
+                ceiling = min(
+                    self.backoff_max_seconds,
+                    self.backoff_base_seconds * 2 ** (self._consecutive_throttles - 1),
+                )
+                delay = ceiling / 2 + self._rng() * ceiling / 2
+            else:
+                delay = retry_after
+            self._blocked_until = max(self._blocked_until, self._clock() + delay)
+            retry = attempt < self.max_retries and delay <= self.max_wait_seconds
+        logger.warning(
+            "sheets_quota_throttled",
+            delay_seconds=round(delay, 3),
+            retry_after=retry_after,
+            attempt=attempt,
+            retry=retry,
+        )
+        return retry
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self._consecutive_throttles = 0
+
+    def stats(self) -> SheetQuotaStats:
+        with self._lock:
+            now = self._clock()
+            tokens = {}
+            for name, bucket in self._buckets.items():
+                bucket.wait_for(now)
+                tokens[name] = round(bucket.tokens, 3)
+            return SheetQuotaStats(
+                tokens=tokens,
+                granted=self._granted,
+                delayed=self._delayed,
+                rejected=self._rejected,
+                throttled=self._throttled,
+                total_wait_seconds=self._total_wait,
+                blocked_for_seconds=max(0.0, self._blocked_until - now),
+            )
+
+
+class GovernedHTTPClient(HTTPClient):
+    """gspread transport that spends governor tokens and retries 429s."""
+
+    def __init__(self, auth: Any, session: Any = None) -> None:
+        super().__init__(auth, session)
+        self.governor = get_sheets_quota_governor()
+        self.principal: str | None = getattr(auth, "service_account_email", None)
+
+    def request(self, method: str, endpoint: str, *args: Any, **kwargs: Any) -> Response:
+        kind: QuotaKind = "read" if method.lower() == "get" else "write"
+        attempt = 0
+        while True:
+            self.governor.acquire_blocking(kind, self.principal)
+            try:
+                response = super().request(method, endpoint, *args, **kwargs)
+            except APIError as exc:
+                retry_after = parse_retry_after(exc.response.headers.get("Retry-After"))
+                if exc.code != 429 or not self.governor.throttled(retry_after, attempt):
+                    raise
+                attempt += 1
+                continue
+            self.governor.succeeded()
+            return response
+
+
+@lru_cache()
+def get_sheets_quota_governor() -> SheetsQuotaGovernor:
+    """Process-wide governor shared by both Sheets backends."""
+
+    settings = get_settings()
+    return SheetsQuotaGovernor(
+        project_reads_per_minute=settings.sheets_quota_project_reads_per_minute,
+        project_writes_per_minute=settings.sheets_quota_project_writes_per_minute,
+        user_reads_per_minute=settings.sheets_quota_user_reads_per_minute,
+        user_writes_per_minute=settings.sheets_quota_user_writes_per_minute,
+        max_wait_seconds=settings.sheets_quota_max_wait_seconds,
+        max_retries=settings.sheets_quota_max_retries,
+    )
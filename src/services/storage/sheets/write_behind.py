@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date
+from typing import Any
+
+from src.config.constants import ENTRY_SHEET_TABS
+from src.core.exceptions import SheetAccessError
+from src.core.logging import get_logger
+from src.models.entry import DreamEntry, HabitEntry, ReflectionEntry, ThoughtEntry
+from src.models.sheet_write import PendingSheetWrite
+from src.services.storage.firestore.sheet_write_journal_repo import SheetWriteJournalRepository
+from src.services.storage.interfaces import HabitRowLookup, ISheetsClient, SheetAppend
+
+logger = get_logger(__name__)
+
+SheetWriteFailureHandler = Callable[[str, list[PendingSheetWrite], Exception], Awaitable[None]]
+
+_MAX_RETRY_DELAY_SECONDS = 300.0
+
+
+class WriteBehindSheetsClient(ISheetsClient):
+    """Acknowledges appends once journaled and writes them to Sheets in the background.
+
+    Each append is saved to the journal and queued per sheet; after a short
+    delay everything queued for a sheet goes out as one ``append_entries``
+    call. Transient failures retry with exponential backoff. Access errors and
+    writes that run out of attempts are dropped from the journal and handed
+    to ``on_failure`` so the user can be told. Reads and in-place habit
+    updates flush the sheet's queue first, so callers see their own writes.
+
+    A flush that timed out may still have landed and is retried, so a row can
+    occasionally be written twice. The journal is replayed once per process,
+    which assumes a single instance (see ``--max-instances 1`` in
+    scripts/deploy_cloud_run.sh).
+    """
+
+    def __init__(
+        self,
+        inner: ISheetsClient,
+        journal: SheetWriteJournalRepository,
+        *,
+        on_failure: SheetWriteFailureHandler | None = None,
+        flush_delay_seconds: float = 0.5,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 2.0,
+        max_batch_rows: int = 100,
+        timeout_seconds: float = 25.0,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self.inner = inner
+        self.journal = journal
+        self.on_failure = on_failure
+        self.flush_delay_seconds = flush_delay_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_seconds = retry_base_seconds
+        self.max_batch_rows = max(1, max_batch_rows)
+        self.timeout_seconds = timeout_seconds
+        self._clock = clock or time.monotonic
+        self._queues: dict[str, list[PendingSheetWrite]] = {}
+        self._retry_at: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._flushers: dict[str, asyncio.Task[None]] = {}
+        self._recovered = False
+
+    def pending_count(self, sheet_id: str | None = None) -> int:
+        if sheet_id is not None:
+            return len(self._queues.get(sheet_id, []))
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def _recover(self) -> None:
+        """Queue journaled writes left behind by a previous process, once."""
+
+        if self._recovered:
+            return
+        self._recovered = True
+        known = {write.id for queue in self._queues.values() for write in queue}
+        recovered = [write for write in await self.journal.list_pending() if write.id not in known]
+        for write in recovered:
+            self._queues.setdefault(write.sheet_id, []).append(write)
+        if recovered:
+            logger.info("sheet_write_behind_recovered", writes=len(recovered))
+        for sheet_id in list(self._queues):
+            self._ensure_flusher(sheet_id, 0.0)
+
+    async def _enqueue(
+        self,
+        sheet_id: str,
+        entry: HabitEntry | DreamEntry | ThoughtEntry | ReflectionEntry,
+        field_order: list[str] | None = None,
+    ) -> None:
+        await self._recover()
+        write = PendingSheetWrite.for_entry(sheet_id, entry, field_order)
+        await self.journal.save(write)
+        self._queues.setdefault(sheet_id, []).append(write)
+        self._ensure_flusher(sheet_id, self.flush_delay_seconds)
+
+    def _ensure_flusher(self, sheet_id: str, delay: float) -> None:
+        if not self._queues.get(sheet_id):
+            return
+        task = self._flushers.get(sheet_id)
+        if task is not None and not task.done() and task is not asyncio.current_task():
+            return
+        delay = max(delay, self._retry_at.get(sheet_id, 0.0) - self._clock())
+        self._flushers[sheet_id] = asyncio.create_task(self._flush_after(sheet_id, delay))
+
+    async def _flush_after(self, sheet_id: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self.flush(sheet_id)
+
+    async def flush(self, sheet_id: str) -> None:
+        """Write what is queued for ``sheet_id`` unless it is backing off after a failure."""
+
+        lock = self._locks.setdefault(sheet_id, asyncio.Lock())
+        async with lock:
+            queue = self._queues.get(sheet_id)
+            if not queue or self._retry_at.get(sheet_id, 0.0) > self._clock():
+                return
+            batch = queue[: self.max_batch_rows]
+            try:
+                await asyncio.wait_for(
+                    self.inner.append_entries(
+                        sheet_id,
+                        [SheetAppend(entry=write.entry(), field_order=write.field_order) for write in batch],
+                    ),
+                    timeout=self.timeout_seconds,
+                )
+            except Exception as exc:
+                await self._handle_flush_error(sheet_id, queue, batch, exc)
+            else:
+                del queue[: len(batch)]
+                self._retry_at.pop(sheet_id, None)
+                await self.journal.delete([write.id for write in batch])
+            if not queue:
+                self._queues.pop(sheet_id, None)
+        self._ensure_flusher(sheet_id, 0.0)
+
+    async def _handle_flush_error(
+        self,
+        sheet_id: str,
+        queue: list[PendingSheetWrite],
+        batch: list[PendingSheetWrite],
+        exc: Exception,
+    ) -> None:
+        for write in batch:
+            write.attempts += 1
+            write.last_error = type(exc).__name__
+        permanent = isinstance(exc, (SheetAccessError, ValueError))
+        dropped = [write for write in batch if permanent or write.attempts >= self.max_attempts]
+        kept = [write for write in batch if write not in dropped]
+        logger.warning(
+            "sheet_write_behind_flush_failed",
+            sheet_id_suffix=sheet_id[-6:],
+            rows=len(batch),
+            dropped=len(dropped),
+            error_type=type(exc).__name__,
+        )
+        for write in kept:
+            await self.journal.save(write)
+        if kept:
+            attempts = max(write.attempts for write in kept)
+            delay = min(self.retry_base_seconds * 2 ** (attempts - 1), _MAX_RETRY_DELAY_SECONDS)
+            self._retry_at[sheet_id] = self._clock() + delay
+        if not dropped:
+            return
+        dropped_ids = {write.id for write in dropped}
+        queue[:] = [write for write in queue if write.id not in dropped_ids]
+        await self.journal.delete(list(dropped_ids))
+        if self.on_failure is None:
+            return
+        try:
+            await self.on_failure(sheet_id, dropped, exc)
+        except Exception:
+            logger.exception("sheet_write_behind_failure_report_failed", sheet_id_suffix=sheet_id[-6:])
+
+    async def _settle(self, sheet_id: str) -> None:
+        await self._recover()
+        await self.flush(sheet_id)
+
+    async def drain(self) -> None:
+        """Try to write everything queued now, e.g. before shutdown."""
+
+        await self._recover()
+        for sheet_id in list(self._queues):
+            await self.flush(sheet_id)
+
+    async def aclose(self) -> None:
+        await self.drain()
+        for task in self._flushers.values():
+            task.cancel()
+        self._flushers.clear()
+        await self.inner.aclose()
+
+    async def append_habit_entry(self, sheet_id: str, field_order: list[str], entry: HabitEntry) -> None:
+        await self._enqueue(sheet_id, entry, field_order)
+
+    async def append_dream_entry(self, sheet_id: str, entry: DreamEntry) -> None:
+        await self._enqueue(sheet_id, entry)
+
+    async def append_thought_entry(self, sheet_id: str, entry: ThoughtEntry) -> None:
+        await self._enqueue(sheet_id, entry)
+
+    async def append_reflection_entry(self, sheet_id: str, entry: ReflectionEntry) -> None:
+        await self._enqueue(sheet_id, entry)
+
+    async def append_entries(self, sheet_id: str, appends: list[SheetAppend]) -> None:
+        for append in appends:
+            await self._enqueue(sheet_id, append.entry, append.field_order)
+
+    async def update_habit_entry(
+        self,
+        sheet_id: str,
+        row_index: int,
+        field_order: list[str],
+        entry: HabitEntry,
+    ) -> None:
+        # Rewrites target an exact row, so they stay synchronous behind the queue.
+        await self._settle(sheet_id)
+        await self.inner.update_habit_entry(sheet_id, row_index, field_order, entry)
+
+    async def find_latest_habit_entry(self, sheet_id: str, entry_date: date) -> HabitRowLookup | None:
+        await self._settle(sheet_id)
+        return await self.inner.find_latest_habit_entry(sheet_id, entry_date)
+
+    async def get_entries_for_dates_multi(
+        self,
+        sheet_id: str,
+        dates: list[date],
+        tabs: tuple[str, ...] = ENTRY_SHEET_TABS,
+    ) -> dict[str, list[dict[str, Any]]]:
+        await self._settle(sheet_id)
+        return await self.inner.get_entries_for_dates_multi(sheet_id, dates, tabs)
+
+    async def get_habit_entries_for_dates(self, sheet_id: str, dates: list[date]) -> list[dict[str, Any]]:
+        await self._settle(sheet_id)
+        return await self.inner.get_habit_entries_for_dates(sheet_id, dates)
+
+    async def get_dream_entries_for_dates(self, sheet_id: str, dates: list[date]) -> list[dict[str, Any]]:
+        await self._settle(sheet_id)
+        return await self.inner.get_dream_entries_for_dates(sheet_id, dates)
+
+    async def get_thought_entries_for_dates(self, sheet_id: str, dates: list[date]) -> list[dict[str, Any]]:
+        await self._settle(sheet_id)
+        return await self.inner.get_thought_entries_for_dates(sheet_id, dates)
+
+    async def get_reflection_entries_for_dates(self, sheet_id: str, dates: list[date]) -> list[dict[str, Any]]:
+        await self._settle(sheet_id)
+        return await self.inner.get_reflection_entries_for_dates(sheet_id, dates)
+
+    async def ensure_tabs(self, sheet_id: str) -> None:
+        await self.inner.ensure_tabs(sheet_id)
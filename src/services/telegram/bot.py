@@ -18,7 +18,10 @@ from telegram.ext import (
 
 from src.config.constants import MESSAGES_EN, MESSAGES_RU
 from src.config.settings import Settings
+from src.core.exceptions import ExternalTimeoutError, SheetAccessError
+from src.core.keyed_lock import KeyedLock, KeyedLockStats
 from src.core.rate_limit import SlidingWindowRateLimiter
+from src.models.sheet_write import PendingSheetWrite
 from src.models.usage_event import UsageEvent
 from src.services.telegram.handlers.habits import (
     habits_command,
@@ -51,6 +54,8 @@ from src.services.telegram.handlers.questions import (
 )
 from src.services.telegram.deps import DependencyProvider
 from src.services.telegram.handlers.start import start_command
+from src.services.telegram.unit_of_work import update_unit_of_work
+from src.services.telegram.update_queue import SubmitResult, UpdateQueue, UpdateQueueStats
 from src.services.telegram.utils import resolve_language, resolve_user_profile
 
 logger = logging.getLogger(__name__)
@@ -119,14 +124,26 @@ async def handle_telegram_error(
 class TelegramBotService:
     """Wraps python-telegram-bot Application lifecycle for FastAPI webhooks."""
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, deps: DependencyProvider | None = None):
         self.settings = settings
         self.app: Application | None = None
-        self.deps = DependencyProvider(settings)
+        self.deps = deps or DependencyProvider(settings)
+        self.deps.sheet_write_failure_handler = self._notify_sheet_write_failure
         self._rate_limiter = SlidingWindowRateLimiter(
             settings.rate_limit_requests_per_minute,
             window_seconds=60,
         )
+        # Serializes each user's updates, e.g. a double-tapped confirm button.
+        self._user_locks = KeyedLock()
+        self._queue: UpdateQueue | None = None
+        if settings.telegram_update_queue_enabled:
+            self._queue = UpdateQueue(
+                self.handle_update,
+                key=_extract_update_user_id,
+                workers=settings.telegram_update_queue_workers,
+                max_pending=settings.telegram_update_queue_max_pending,
+                dedupe_size=settings.telegram_update_dedupe_size,
+            )
 
     async def _ensure_app(self) -> None:
         if self.app:
@@ -234,6 +251,40 @@ class TelegramBotService:
             self.app = None
             return
 
+    async def drain_updates(self) -> None:
+        """Stop accepting webhook updates and finish the queued ones."""
+
+        if self._queue is not None:
+            await self._queue.aclose()
+
+    async def aclose(self) -> None:
+        """Finish queued updates, then shut the Telegram application down.
+
+        The shared deps are closed separately.
+        """
+
+        await self.drain_updates()
+        if self.app is None or not getattr(self.app, "_initialized", False):
+            return
+        try:
+            await self.app.shutdown()
+        except Exception:
+            logger.exception("Telegram shutdown failed")
+
+    async def submit_update(self, update_payload: dict[str, Any]) -> SubmitResult:
+        """Accept a webhook update: queue it, or process it now when the queue is off."""
+
+        if self._queue is None:
+            await self.handle_update(update_payload)
+            return "processed"
+        return self._queue.submit(update_payload)
+
+    def queue_stats(self) -> UpdateQueueStats | None:
+        return self._queue.stats() if self._queue is not None else None
+
+    def user_lock_stats(self) -> KeyedLockStats:
+        return self._user_locks.stats()
+
     async def handle_update(self, update_payload: dict[str, Any]) -> None:
         user_id = _extract_update_user_id(update_payload)
         if user_id is not None and not self._rate_limiter.allow(user_id):
@@ -245,8 +296,45 @@ class TelegramBotService:
             logger.debug("No Telegram application initialized; skipping update.")
             return
         update = Update.de_json(update_payload, self.app.bot)
+        if user_id is None:
+            await self._process(self.app, update, user_id)
+            return
+        # One update per user at a time; different users run in parallel.
+        async with self._user_locks.hold(user_id) as waited:
+            if waited >= 1.0:
+                logger.info("Update for user %s waited %.1fs for the previous one", user_id, waited)
+            await self._process(self.app, update, user_id)
+
+    async def _process(self, app: Application, update: Update, user_id: int | None) -> None:
         await self._record_command_usage(update)
-        await self.app.process_update(update)
+        # Handlers read and save the session and profile several times; load
+        # each once and write each at most once per update.
+        async with update_unit_of_work(self.deps, user_id):
+            await app.process_update(update)
+
+    async def _notify_sheet_write_failure(
+        self,
+        sheet_id: str,
+        writes: list[PendingSheetWrite],
+        error: Exception,
+    ) -> None:
+        """Tell the sheet owner that acknowledged entries never reached the sheet."""
+
+        logger.warning("Dropped %s deferred sheet writes: %s", len(writes), type(error).__name__)
+        if not self.app:
+            return
+        profile = await self.deps.user_repo().find_by_sheet_id(sheet_id)
+        if profile is None:
+            return
+        messages = MESSAGES_RU if resolve_language(profile) == "ru" else MESSAGES_EN
+        if isinstance(error, SheetAccessError):
+            reason = messages["sheet_permission_error"]
+        elif isinstance(error, (ExternalTimeoutError, asyncio.TimeoutError)):
+            reason = messages["external_timeout_error"]
+        else:
+            reason = messages["sheet_write_error"]
+        text = messages["sheet_deferred_write_failed"].format(count=len(writes))
+        await self.app.bot.send_message(chat_id=profile.telegram_user_id, text=f"{text}\n{reason}")
 
     async def _record_command_usage(self, update: Update) -> None:
         if not update.effective_user or not update.message or not update.message.text:
@@ -3,20 +3,38 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from src.config.settings import Settings
+from src.core.logging import get_logger
 
 if TYPE_CHECKING:
+    from telegram import Bot
+
+    from src.models.sheet_write import PendingSheetWrite
+    from src.services.broadcasts.jobs import BroadcastRunner
     from src.services.llm.client import LLMClient
+    from src.services.storage.firestore.broadcast_job_repo import BroadcastJobRepository
     from src.services.storage.firestore.client import FirestoreClient
     from src.services.storage.firestore.feedback_repo import FeedbackRepository
     from src.services.storage.firestore.session_repo import SessionRepository
+    from src.services.storage.firestore.sheet_layout_repo import SheetLayoutRepository
+    from src.services.storage.firestore.sheet_write_journal_repo import SheetWriteJournalRepository
+    from src.services.storage.firestore.usage_event_buffer import BufferedUsageEventRepository
     from src.services.storage.firestore.usage_event_repo import UsageEventRepository
+    from src.services.storage.firestore.usage_rollup_repo import UsageRollupRepository
     from src.services.storage.firestore.user_repo import UserRepository
-    from src.services.storage.sheets.client import SheetsClient
+    from src.services.storage.interfaces import ISheetsClient
+    from src.services.storage.sheets.write_behind import SheetWriteFailureHandler
     from src.services.transcription.whisper import WhisperClient
 
+logger = get_logger(__name__)
+
 
 class DependencyProvider:
-    """Lazy container for external clients and repositories."""
+    """Lazy container for external clients and repositories.
+
+    One provider is shared by the webhook and reminder dispatch for the life of
+    the process: ``startup`` warms the clients every request needs and
+    ``shutdown`` flushes and closes their pools.
+    """
 
     def __init__(self, settings: Settings):
         self._settings = settings
@@ -24,10 +42,18 @@ class DependencyProvider:
         self._session_repo: SessionRepository | None = None
         self._user_repo: UserRepository | None = None
         self._feedback_repo: FeedbackRepository | None = None
-        self._usage_event_repo: UsageEventRepository | None = None
-        self._sheets_client: SheetsClient | None = None
+        self._usage_event_repo: UsageEventRepository | BufferedUsageEventRepository | None = None
+        self._usage_rollup_repo: UsageRollupRepository | None = None
+        self._sheet_write_journal_repo: SheetWriteJournalRepository | None = None
+        self._sheet_layout_repo: SheetLayoutRepository | None = None
+        self._broadcast_job_repo: BroadcastJobRepository | None = None
+        self._broadcast_runner: BroadcastRunner | None = None
+        self._sheets_client: ISheetsClient | None = None
+        # Told about deferred sheet writes that were given up on (write-behind only).
+        self.sheet_write_failure_handler: SheetWriteFailureHandler | None = None
         self._llm_client: LLMClient | None = None
         self._whisper_client: WhisperClient | None = None
+        self._bot: Bot | None = None
         self._llm_initialized = False
         self._whisper_initialized = False
 
@@ -66,20 +92,186 @@ class DependencyProvider:
             self._feedback_repo = FeedbackRepository(self.firestore_client())
         return self._feedback_repo
 
-    def usage_event_repo(self) -> UsageEventRepository:
+    def usage_event_repo(self) -> UsageEventRepository | BufferedUsageEventRepository:
         if self._usage_event_repo is None:
             from src.services.storage.firestore.usage_event_repo import UsageEventRepository
 
-            self._usage_event_repo = UsageEventRepository(self.firestore_client())
+            repo = UsageEventRepository(self.firestore_client(), rollups=self.usage_rollup_repo())
+            if self._settings.usage_events_buffer_enabled:
+                from src.services.storage.firestore.usage_event_buffer import BufferedUsageEventRepository
+
+                self._usage_event_repo = BufferedUsageEventRepository(
+                    repo,
+                    flush_interval_seconds=self._settings.usage_events_flush_interval_seconds,
+                    max_buffered=self._settings.usage_events_buffer_max_events,
+                )
+            else:
+                self._usage_event_repo = repo
         return self._usage_event_repo
 
-    def sheets_client(self) -> SheetsClient:
+    def usage_rollup_repo(self) -> UsageRollupRepository | None:
+        if not self._settings.usage_rollups_enabled:
+            return None
+        if self._usage_rollup_repo is None:
+            from src.services.storage.firestore.usage_rollup_repo import UsageRollupRepository
+
+            self._usage_rollup_repo = UsageRollupRepository(self.firestore_client())
+        return self._usage_rollup_repo
+
+    def sheet_write_journal_repo(self) -> SheetWriteJournalRepository:
+        if self._sheet_write_journal_repo is None:
+            from src.services.storage.firestore.sheet_write_journal_repo import (
+                SheetWriteJournalRepository,
+            )
+
+            self._sheet_write_journal_repo = SheetWriteJournalRepository(self.firestore_client())
+        return self._sheet_write_journal_repo
+
+    def sheet_layout_repo(self) -> SheetLayoutRepository:
+        if self._sheet_layout_repo is None:
+            from src.services.storage.firestore.sheet_layout_repo import SheetLayoutRepository
+
+            self._sheet_layout_repo = SheetLayoutRepository(self.firestore_client())
+        return self._sheet_layout_repo
+
+    def broadcast_job_repo(self) -> BroadcastJobRepository:
+        if self._broadcast_job_repo is None:
+            from src.services.storage.firestore.broadcast_job_repo import BroadcastJobRepository
+
+            self._broadcast_job_repo = BroadcastJobRepository(self.firestore_client())
+        return self._broadcast_job_repo
+
+    def broadcast_runner(self) -> BroadcastRunner | None:
+        """Process-wide runner, so every broadcast shares one Telegram rate limiter."""
+
+        if self._broadcast_runner is None:
+            bot = self.bot()
+            if bot is None:
+                return None
+            from src.services.broadcasts.jobs import BroadcastRunner
+
+            self._broadcast_runner = BroadcastRunner(
+                settings=self._settings,
+                jobs=self.broadcast_job_repo(),
+                user_repo=self.user_repo(),
+                bot=bot,
+                usage_repo=self.usage_event_repo(),
+            )
+        return self._broadcast_runner
+
+    def sheets_client(self) -> ISheetsClient:
         if self._sheets_client is None:
-            from src.services.storage.sheets.client import SheetsClient
+            from src.services.storage.sheets.factory import create_sheets_client
+
+            client = create_sheets_client(self._settings, layouts=self.sheet_layout_repo())
+            if self._settings.sheets_write_behind_enabled:
+                from src.services.storage.sheets.write_behind import WriteBehindSheetsClient
 
-            self._sheets_client = SheetsClient(self._settings.google_credentials_path)
+                client = WriteBehindSheetsClient(
+                    client,
+                    self.sheet_write_journal_repo(),
+                    on_failure=self._notify_sheet_write_failure,
+                    flush_delay_seconds=self._settings.sheets_write_behind_flush_delay_seconds,
+                    max_attempts=self._settings.sheets_write_behind_max_attempts,
+                    retry_base_seconds=self._settings.sheets_write_behind_retry_base_seconds,
+                    timeout_seconds=self._settings.sheets_timeout_seconds,
+                )
+            self._sheets_client = client
         return self._sheets_client
 
+    async def _notify_sheet_write_failure(
+        self,
+        sheet_id: str,
+        writes: list[PendingSheetWrite],
+        error: Exception,
+    ) -> None:
+        if self.sheet_write_failure_handler is None:
+            logger.warning(
+                "sheet_writes_dropped",
+                sheet_id_suffix=sheet_id[-6:],
+                writes=len(writes),
+                error_type=type(error).__name__,
+            )
+            return
+        await self.sheet_write_failure_handler(sheet_id, writes, error)
+
+    def bot(self) -> Bot | None:
+        """Shared Bot for messages sent outside an update, e.g. reminders."""
+
+        if self._bot is None:
+            token = self._settings.get_telegram_bot_token()
+            if not token:
+                return None
+            from telegram import Bot
+            from telegram.request import HTTPXRequest
+
+            self._bot = Bot(
+                token=token,
+                request=HTTPXRequest(connection_pool_size=self._settings.telegram_bot_pool_size),
+            )
+        return self._bot
+
+    async def startup(self) -> None:
+        """Create the clients dispatch and webhooks use, so no request pays for it."""
+
+        self.user_repo()
+        try:
+            self.sheets_client()
+        except Exception as exc:
+            logger.warning("Sheets client unavailable at startup", error=str(exc))
+        bot = self.bot()
+        if bot is not None:
+            try:
+                await bot.initialize()
+            except Exception as exc:
+                logger.warning("Telegram bot init failed at startup", error=str(exc))
+        from src.services.reminders.backends import get_reminder_task_backend
+
+        await get_reminder_task_backend().start()
+
+    async def shutdown(self) -> None:
+        """Flush and close pooled clients; later calls lazily create new ones."""
+
+        if self._broadcast_runner is not None:
+            try:
+                await self._broadcast_runner.aclose()
+            except Exception:
+                logger.exception("Failed to stop broadcasts")
+            self._broadcast_runner = None
+        if self._sheets_client is not None:
+            try:
+                await self._sheets_client.aclose()
+            except Exception:
+                logger.exception("Failed to close Sheets client")
+            self._sheets_client = None
+        from src.services.storage.firestore.usage_event_buffer import BufferedUsageEventRepository
+
+        if isinstance(self._usage_event_repo, BufferedUsageEventRepository):
+            try:
+                await self._usage_event_repo.aclose()
+            except Exception:
+                logger.exception("Failed to flush usage events")
+            self._usage_event_repo = None
+        if self._bot is not None:
+            try:
+                await self._bot.shutdown()
+            except Exception:
+                logger.exception("Failed to close Telegram bot")
+            self._bot = None
+        from src.services.reminders.backends import get_reminder_task_backend
+        from src.services.storage.firestore.executor import get_firestore_executor
+        from src.services.storage.sheets.executor import get_sheet_io_executor
+
+        if get_reminder_task_backend.cache_info().currsize:
+            await get_reminder_task_backend().aclose()
+            get_reminder_task_backend.cache_clear()
+        if get_sheet_io_executor.cache_info().currsize:
+            get_sheet_io_executor().shutdown()
+            get_sheet_io_executor.cache_clear()
+        if get_firestore_executor.cache_info().currsize:
+            get_firestore_executor().shutdown()
+            get_firestore_executor.cache_clear()
+
     def llm_client(self) -> LLMClient | None:
         if not self._llm_initialized:
             self._llm_initialized = True
@@ -1,28 +1,30 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from telegram import Update
-from telegram.error import TelegramError
 from telegram.ext import ContextTypes
 
 from src.config.constants import BUTTONS_EN, BUTTONS_RU, MESSAGES_EN, MESSAGES_RU
 from src.core.analytics import log_event
+from src.core.exceptions import ExternalResponseError
 from src.models.feedback import FeedbackEntry
 from src.models.session import ConversationState, SessionData
-from src.models.user import UserProfile
+from src.models.usage_event import UsageRollup
 from src.services.telegram.keyboards import (
     build_admin_broadcast_confirm_keyboard,
     build_admin_keyboard,
 )
 from src.services.telegram.utils import (
+    get_broadcast_runner,
     get_feedback_repo,
     get_session_repo,
     get_usage_event_repo,
+    get_usage_rollup_repo,
     get_user_repo,
     is_admin_user,
-    record_usage_event,
     resolve_language,
     resolve_user_profile,
 )
@@ -199,21 +201,15 @@ async def handle_admin_broadcast_callback(update: Update, context: ContextTypes.
         await message.reply_text(msgs["admin_broadcast_empty"])
         return
 
-    sent, failed = await _broadcast_to_users(context, text)
-    await record_usage_event(
-        context,
-        "broadcast.sent",
-        user_id=update.effective_user.id,
-        feature="broadcast",
-        metadata={"sent": sent, "failed": failed},
-    )
+    runner = get_broadcast_runner(context)
+    if runner is None:
+        await message.reply_text(msgs["admin_storage_unavailable"], reply_markup=build_admin_keyboard(lang))
+        return
     session.reset()
     if session_repo:
         await session_repo.save(session)
-    await message.reply_text(
-        msgs["admin_broadcast_done"].format(sent=sent, failed=failed),
-        reply_markup=build_admin_keyboard(lang),
-    )
+    # Sent by dispatch tasks; the runner reports progress and the result to this chat.
+    await runner.start(text, admin_chat_id=update.effective_user.id, language=lang)
 
 
 async def _send_admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -225,13 +221,20 @@ async def _send_admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE)
     if user_repo is None:
         await update.message.reply_text(msgs["admin_storage_unavailable"], reply_markup=build_admin_keyboard(lang))
         return
-    users = await user_repo.list_all()
-    totals = _aggregate_usage(users)
+    try:
+        users_total, users_with_sheet, totals = await asyncio.gather(
+            user_repo.count(),
+            user_repo.count(with_sheet=True),
+            user_repo.usage_totals(),
+        )
+    except ExternalResponseError:
+        await update.message.reply_text(msgs["admin_storage_unavailable"], reply_markup=build_admin_keyboard(lang))
+        return
     await update.message.reply_text(
         msgs["admin_stats"].format(
-            users_total=len(users),
-            users_with_sheet=sum(1 for user in users if user.sheet_id),
-            **totals,
+            users_total=users_total,
+            users_with_sheet=users_with_sheet,
+            **totals.model_dump(),
         ),
         reply_markup=build_admin_keyboard(lang),
     )
@@ -275,11 +278,26 @@ async def _send_period_stats(
         return
 
     start, end, label = _period_range(period_key, lang)
-    events = await usage_repo.list_between(start, end)
-    users = await user_repo.list_all()
-    stats = _aggregate_period_stats(events)
-    stats["new_users"] = _count_users_created_between(users, start, end)
-    stats["users_with_sheet"] = sum(1 for user in users if user.sheet_id)
+    rollup_repo = get_usage_rollup_repo(context)
+    if rollup_repo is not None:
+        period, buckets = _rollup_buckets(period_key)
+        rollup = UsageRollup(period=period, bucket="")
+        for bucket_rollup in await rollup_repo.get_many(period, buckets):
+            rollup.merge(bucket_rollup)
+        stats = _stats_from_rollup(rollup)
+    else:
+        stats = await _collect_period_stats(usage_repo, start, end)
+    try:
+        stats["new_users"], stats["users_with_sheet"] = await asyncio.gather(
+            user_repo.count_created_between(start, end),
+            user_repo.count(with_sheet=True),
+        )
+    except ExternalResponseError:
+        await update.message.reply_text(
+            msgs["admin_analytics_unavailable"],
+            reply_markup=build_admin_keyboard(lang),
+        )
+        return
 
     await update.message.reply_text(
         msgs["admin_period_stats"].format(period=label, **stats),
@@ -299,19 +317,24 @@ async def _send_user_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             reply_markup=build_admin_keyboard(lang),
         )
         return
-    users = await user_repo.list_all()
-    today_start, today_end, _ = _period_range("today", lang)
-    week_start, week_end, _ = _period_range("week", lang)
-    month_start, month_end, _ = _period_range("month", lang)
-    last_30_start, last_30_end, _ = _period_range("last_30", lang)
+    periods = ("today", "week", "month", "last_30")
+    try:
+        users_total, users_with_sheet, *new_users = await asyncio.gather(
+            user_repo.count(),
+            user_repo.count(with_sheet=True),
+            *(user_repo.count_created_between(*_period_range(key, lang)[:2]) for key in periods),
+        )
+    except ExternalResponseError:
+        await update.message.reply_text(
+            msgs["admin_storage_unavailable"],
+            reply_markup=build_admin_keyboard(lang),
+        )
+        return
     await update.message.reply_text(
         msgs["admin_user_stats"].format(
-            users_total=len(users),
-            users_with_sheet=sum(1 for user in users if user.sheet_id),
-            new_today=_count_users_created_between(users, today_start, today_end),
-            new_week=_count_users_created_between(users, week_start, week_end),
-            new_month=_count_users_created_between(users, month_start, month_end),
-            new_last_30=_count_users_created_between(users, last_30_start, last_30_end),
+            users_total=users_total,
+            users_with_sheet=users_with_sheet,
+            **{f"new_{key}": count for key, count in zip(periods, new_users)},
         ),
         reply_markup=build_admin_keyboard(lang),
     )
@@ -332,68 +355,74 @@ async def _start_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     await update.message.reply_text(_messages_for_lang(lang)["admin_broadcast_prompt"])
 
 
-async def _broadcast_to_users(context: ContextTypes.DEFAULT_TYPE, text: str) -> tuple[int, int]:
-    user_repo = get_user_repo(context)
-    if user_repo is None:
-        return 0, 0
-    users = await user_repo.list_all()
-    sent = 0
-    failed = 0
-    for user in users:
-        try:
-            await context.bot.send_message(chat_id=user.telegram_user_id, text=text)
-            sent += 1
-        except TelegramError:
-            failed += 1
-        except Exception:
-            failed += 1
-    return sent, failed
-
-
-def _aggregate_usage(users: list[UserProfile]) -> dict[str, int]:
-    totals = {"habits": 0, "dream": 0, "thought": 0, "reflection": 0}
-    for user in users:
-        totals["habits"] += user.usage_stats.habits
-        totals["dream"] += user.usage_stats.dream
-        totals["thought"] += user.usage_stats.thought
-        totals["reflection"] += user.usage_stats.reflection
-    return totals
+_FEATURES = ("habits", "dream", "thought", "reflection")
+
+
+async def _collect_period_stats(usage_repo, start: datetime, end: datetime) -> dict[str, int]:
+    """Period counters, counted by the store when it supports it.
+
+    Counters are Firestore ``count()`` aggregations over the window. Active
+    users read only ``user_id`` and broadcasts read their few events, so the
+    cost follows the window size, not the event history.
+    """
+
+    if not hasattr(usage_repo, "count_between"):
+        return _aggregate_period_stats(await usage_repo.list_between(start, end))
+
+    def count(event_name: str, feature: str | None = None):
+        return usage_repo.count_between(start, end, event_name=event_name, feature=feature)
+
+    counters = {
+        "feature_total": count("feature.saved"),
+        **{feature: count("feature.saved", feature) for feature in _FEATURES},
+        "voice": count("voice.received"),
+        "feedback": count("feedback.submitted"),
+        "commands": count("command.used"),
+    }
+    *counts, user_ids, broadcasts = await asyncio.gather(
+        *counters.values(),
+        usage_repo.user_ids_between(start, end),
+        usage_repo.list_between(start, end, event_name="broadcast.sent"),
+    )
+    stats = _aggregate_period_stats(broadcasts)
+    stats.update(zip(counters, counts))
+    stats["active_users"] = len(user_ids)
+    return stats
+
+
+def _rollup_buckets(period_key: str, now: datetime | None = None) -> tuple[str, list[str]]:
+    """The rollup period and buckets that make up an admin stats period."""
+
+    today = (now or datetime.now(timezone.utc)).date()
+    if period_key == "today":
+        return "day", [today.isoformat()]
+    if period_key == "week":
+        iso_year, iso_week, _ = today.isocalendar()
+        return "week", [f"{iso_year}-W{iso_week:02d}"]
+    if period_key == "month":
+        return "month", [f"{today.year:04d}-{today.month:02d}"]
+    # Last 30 days: whole days, today included.
+    return "day", [(today - timedelta(days=offset)).isoformat() for offset in range(29, -1, -1)]
 
 
 def _aggregate_period_stats(events) -> dict[str, int]:
-    active_users = {event.user_id for event in events if event.user_id is not None}
-    stats = {
-        "active_users": len(active_users),
+    return _stats_from_rollup(UsageRollup.from_events(events))
+
+
+def _stats_from_rollup(rollup: UsageRollup) -> dict[str, int]:
+    return {
+        "active_users": len(rollup.user_ids),
         "new_users": 0,
         "users_with_sheet": 0,
-        "feature_total": 0,
-        "habits": 0,
-        "dream": 0,
-        "thought": 0,
-        "reflection": 0,
-        "voice": 0,
-        "feedback": 0,
-        "commands": 0,
-        "broadcasts": 0,
-        "broadcast_sent": 0,
-        "broadcast_failed": 0,
+        "feature_total": rollup.count("feature.saved"),
+        **{feature: rollup.count("feature.saved", feature) for feature in _FEATURES},
+        "voice": rollup.count("voice.received"),
+        "feedback": rollup.count("feedback.submitted"),
+        "commands": rollup.count("command.used"),
+        "broadcasts": rollup.count("broadcast.sent"),
+        "broadcast_sent": rollup.total("broadcast.sent", "sent"),
+        "broadcast_failed": rollup.total("broadcast.sent", "failed"),
     }
-    for event in events:
-        if event.event_name == "feature.saved":
-            stats["feature_total"] += 1
-            if event.feature in {"habits", "dream", "thought", "reflection"}:
-                stats[event.feature] += 1
-        elif event.event_name == "voice.received":
-            stats["voice"] += 1
-        elif event.event_name == "feedback.submitted":
-            stats["feedback"] += 1
-        elif event.event_name == "command.used":
-            stats["commands"] += 1
-        elif event.event_name == "broadcast.sent":
-            stats["broadcasts"] += 1
-            stats["broadcast_sent"] += int(event.metadata.get("sent", 0))
-            stats["broadcast_failed"] += int(event.metadata.get("failed", 0))
-    return stats
 
 
 def _period_range(period_key: str, lang: str) -> tuple[datetime, datetime, str]:
@@ -415,16 +444,6 @@ def _period_range(period_key: str, lang: str) -> tuple[datetime, datetime, str]:
     return start, now, "Последние 30 дней" if lang == "ru" else "Last 30 days"
 
 
-def _count_users_created_between(users: list[UserProfile], start: datetime, end: datetime) -> int:
-    return sum(1 for user in users if start <= _as_utc(user.created_at) < end)
-
-
-def _as_utc(value: datetime) -> datetime:
-    if value.tzinfo is None:
-        return value.replace(tzinfo=timezone.utc)
-    return value.astimezone(timezone.utc)
-
-
 def _format_feedback(entry: FeedbackEntry) -> str:
     username = f"@{entry.telegram_username}" if entry.telegram_username else entry.telegram_first_name
     user_label = username or str(entry.telegram_user_id)
@@ -339,6 +339,7 @@ async def handle_timezone_text(update: Update, context: ContextTypes.DEFAULT_TYP
                             parsed,
                             profile.timezone,
                             profile.reminder_task_name,
+                            profile=profile,
                         )
                     except ReminderScheduleError:
                         schedule_error = True
@@ -352,6 +353,7 @@ async def handle_timezone_text(update: Update, context: ContextTypes.DEFAULT_TYP
                         rollover_time=profile.smart_nudges_rollover_time,
                         last_habits_logged_for_date=profile.last_habits_logged_for_date,
                         previous_task_name=profile.smart_nudges_task_name,
+                        profile=profile,
                     )
                 except ReminderScheduleError:
                     schedule_error = True
@@ -365,6 +367,7 @@ async def handle_timezone_text(update: Update, context: ContextTypes.DEFAULT_TYP
                             parsed_otd,
                             profile.timezone,
                             profile.on_this_day_task_name,
+                            profile=profile,
                         )
                     except ReminderScheduleError:
                         schedule_error = True
@@ -492,11 +495,14 @@ async def handle_reminders_menu_callback(update: Update, context: ContextTypes.D
         profile.reminder_enabled = False
         profile.reminder_time = None
         profile.reminder_task_name = None
+        profile.reminder_next_run_utc = None
         profile.smart_nudges_enabled = False
         profile.smart_nudges_task_name = None
+        profile.smart_nudges_next_run_utc = None
         profile.on_this_day_enabled = False
         profile.on_this_day_time = None
         profile.on_this_day_task_name = None
+        profile.on_this_day_next_run_utc = None
         await user_repo.update(profile)
         if query.message:
             await _reply_to_callback(
@@ -585,6 +591,7 @@ async def handle_smart_nudges_callback(update: Update, context: ContextTypes.DEF
         delete_reminder_task(get_settings(), profile.smart_nudges_task_name)
         profile.smart_nudges_enabled = False
         profile.smart_nudges_task_name = None
+        profile.smart_nudges_next_run_utc = None
         await user_repo.update(profile)
         if query.message:
             await _reply_to_callback(
@@ -608,6 +615,7 @@ async def handle_smart_nudges_callback(update: Update, context: ContextTypes.DEF
                 rollover_time=profile.smart_nudges_rollover_time,
                 last_habits_logged_for_date=profile.last_habits_logged_for_date,
                 previous_task_name=profile.smart_nudges_task_name,
+                profile=profile,
             )
             profile.smart_nudges_enabled = True
             await user_repo.update(profile)
@@ -737,6 +745,7 @@ async def handle_reminder_text(update: Update, context: ContextTypes.DEFAULT_TYP
             profile.reminder_enabled = False
             profile.reminder_time = None
             profile.reminder_task_name = None
+            profile.reminder_next_run_utc = None
             await user_repo.update(profile)
         if session:
             session.state = ConversationState.IDLE
@@ -765,6 +774,7 @@ async def handle_reminder_text(update: Update, context: ContextTypes.DEFAULT_TYP
             parsed,
             profile.timezone,
             profile.reminder_task_name,
+            profile=profile,
         )
     except ReminderScheduleError:
         await update.message.reply_text(_messages_for_lang(lang)["reminder_schedule_error"])
@@ -842,6 +852,7 @@ async def handle_smart_nudges_times_text(update: Update, context: ContextTypes.D
                 rollover_time=profile.smart_nudges_rollover_time or _SMART_NUDGES_DEFAULT_ROLLOVER,
                 last_habits_logged_for_date=profile.last_habits_logged_for_date,
                 previous_task_name=profile.smart_nudges_task_name,
+                profile=profile,
             )
         await user_repo.update(profile)
     except ReminderScheduleError:
@@ -903,6 +914,7 @@ async def handle_smart_nudges_rollover_text(update: Update, context: ContextType
                 rollover_time=profile.smart_nudges_rollover_time,
                 last_habits_logged_for_date=profile.last_habits_logged_for_date,
                 previous_task_name=profile.smart_nudges_task_name,
+                profile=profile,
             )
         await user_repo.update(profile)
     except ReminderScheduleError:
@@ -958,6 +970,7 @@ async def handle_on_this_day_text(update: Update, context: ContextTypes.DEFAULT_
             profile.on_this_day_enabled = False
             profile.on_this_day_time = None
             profile.on_this_day_task_name = None
+            profile.on_this_day_next_run_utc = None
             await user_repo.update(profile)
         if session:
             session.state = ConversationState.IDLE
@@ -986,6 +999,7 @@ async def handle_on_this_day_text(update: Update, context: ContextTypes.DEFAULT_
             parsed,
             profile.timezone,
             profile.on_this_day_task_name,
+            profile=profile,
         )
     except ReminderScheduleError:
         await update.message.reply_text(_messages_for_lang(lang)["on_this_day_schedule_error"])
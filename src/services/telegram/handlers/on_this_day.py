@@ -56,15 +56,14 @@ async def collect_on_this_day_payloads(
     if not target_dates:
         return [], today
 
-    habits_entries, dreams_entries, thoughts_entries, reflection_entries = await asyncio.wait_for(
-        asyncio.gather(
-            sheets_client.get_habit_entries_for_dates(sheet_id, target_dates),
-            sheets_client.get_dream_entries_for_dates(sheet_id, target_dates),
-            sheets_client.get_thought_entries_for_dates(sheet_id, target_dates),
-            sheets_client.get_reflection_entries_for_dates(sheet_id, target_dates),
-        ),
+    entries = await asyncio.wait_for(
+        sheets_client.get_entries_for_dates_multi(sheet_id, target_dates),
         timeout=_SHEETS_TIMEOUT,
     )
+    habits_entries = entries["Habits"]
+    dreams_entries = entries["Dreams"]
+    thoughts_entries = entries["Thoughts"]
+    reflection_entries = entries["Reflections"]
     payloads = assemble_payloads(
         target_dates,
         habits_entries,
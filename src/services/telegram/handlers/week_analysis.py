@@ -70,15 +70,14 @@ async def week_analysis_command(update: Update, context: ContextTypes.DEFAULT_TY
 
     progress_message = await update.message.reply_text(msgs["processing"])
     try:
-        habits_entries, dreams_entries, thoughts_entries, reflection_entries = await asyncio.wait_for(
-            asyncio.gather(
-                sheets_client.get_habit_entries_for_dates(sheet_id, target_dates),
-                sheets_client.get_dream_entries_for_dates(sheet_id, target_dates),
-                sheets_client.get_thought_entries_for_dates(sheet_id, target_dates),
-                sheets_client.get_reflection_entries_for_dates(sheet_id, target_dates),
-            ),
+        entries = await asyncio.wait_for(
+            sheets_client.get_entries_for_dates_multi(sheet_id, target_dates),
             timeout=_SHEETS_TIMEOUT,
         )
+        habits_entries = entries["Habits"]
+        dreams_entries = entries["Dreams"]
+        thoughts_entries = entries["Thoughts"]
+        reflection_entries = entries["Reflections"]
     except SheetAccessError:
         await safe_delete_message(progress_message)
         await update.message.reply_text(msgs["sheet_permission_error"])
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from src.models.session import SessionData
+from src.models.user import UserProfile
+from src.services.storage.firestore.profile_cache import profile_request_scope
+
+if TYPE_CHECKING:
+    from src.services.telegram.deps import DependencyProvider
+
+_current: ContextVar[Optional["UpdateUnitOfWork"]] = ContextVar("update_unit_of_work", default=None)
+
+
+@dataclass
+class UpdateUnitOfWork:
+    """The session and profile of the user behind one Telegram update.
+
+    Both are read once, concurrently, when the update starts. While it is
+    handled the repositories serve every read of them from memory and hold
+    back every save; the session and profile are each written at most once
+    when the update finishes. Handlers keep going through the repositories;
+    ``current_unit_of_work()`` exposes the state as loaded at the start.
+    """
+
+    user_id: int
+    session: Optional[SessionData] = None
+    profile: Optional[UserProfile] = None
+
+
+def current_unit_of_work() -> Optional[UpdateUnitOfWork]:
+    return _current.get()
+
+
+@asynccontextmanager
+async def update_unit_of_work(
+    deps: DependencyProvider,
+    user_id: int | None,
+) -> AsyncIterator[UpdateUnitOfWork | None]:
+    """Scope one update's session and profile I/O; yields None for updates without a user."""
+
+    session_repo = deps.session_repo()
+    user_repo = deps.user_repo()
+    with profile_request_scope():
+        async with session_repo.deferred_writes(), user_repo.deferred_writes():
+            if user_id is None:
+                yield None
+                return
+            session, profile = await asyncio.gather(
+                session_repo.get(user_id),
+                user_repo.get_by_telegram_id(user_id),
+            )
+            unit = UpdateUnitOfWork(user_id, session, profile)
+            token = _current.set(unit)
+            try:
+                yield unit
+            finally:
+                _current.reset(token)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, Literal
+
+logger = logging.getLogger(__name__)
+
+SubmitResult = Literal["queued", "processed", "duplicate", "full", "closed"]
+UpdateHandler = Callable[[dict[str, Any]], Awaitable[None]]
+UpdateKey = Callable[[dict[str, Any]], Hashable | None]
+
+
+@dataclass(frozen=True)
+class UpdateQueueStats:
+    """Point-in-time view of the update queue, for /health and logs."""
+
+    depth: int  # accepted, not started yet
+    in_flight: int
+    processed: int
+    failed: int  # the handler raised
+    duplicates: int  # update_id seen before; dropped
+    rejected: int  # queue full; left to Telegram to redeliver
+    oldest_wait_seconds: float  # how long the oldest queued update has waited
+    max_lag_seconds: float  # longest wait between ack and start so far
+
+
+@dataclass
+class _Pending:
+    payload: dict[str, Any]
+    accepted_at: float
+
+
+class UpdateQueue:
+    """Accepts webhook updates at once and processes them on a pool of workers.
+
+    Updates are grouped into lanes by ``key`` (the Telegram user): a lane is
+    served by one worker at a time, so one user's updates run strictly in
+    arrival order while different users run concurrently on up to
+    ``workers`` tasks. Updates without a key get a lane of their own.
+
+    ``update_id``s of the last ``dedupe_size`` accepted updates are kept, and
+    a redelivered update is dropped. At ``max_pending`` queued updates
+    ``submit`` refuses new ones so the webhook can answer with an error and
+    Telegram retries later. Once ``aclose`` starts, ``submit`` refuses
+    updates as ``closed``, so no worker outlives it. Acknowledged updates
+    live only in memory: whatever is still queued when ``aclose`` gives up
+    is lost.
+    """
+
+    def __init__(
+        self,
+        handler: UpdateHandler,
+        *,
+        key: UpdateKey,
+        workers: int = 16,
+        max_pending: int = 1000,
+        dedupe_size: int = 10000,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self._handler = handler
+        self._key = key
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.dedupe_size = max(0, dedupe_size)
+        self._clock = clock or time.monotonic
+        self._lanes: dict[Hashable, deque[_Pending]] = {}
+        self._ready: asyncio.Queue[Hashable] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._seen: OrderedDict[int, None] = OrderedDict()
+        self._depth = 0
+        self._in_flight = 0
+        self._processed = 0
+        self._failed = 0
+        self._duplicates = 0
+        self._rejected = 0
+        self._max_lag = 0.0
+        self._closed = False
+
+    def submit(self, payload: dict[str, Any]) -> SubmitResult:
+        update_id = payload.get("update_id")
+        if isinstance(update_id, int) and update_id in self._seen:
+            self._duplicates += 1
+            return "duplicate"
+        if self._closed:
+            return "closed"
+        if self._depth >= self.max_pending:
+            self._rejected += 1
+            if self._rejected == 1 or self._rejected % 100 == 0:
+                logger.warning("Telegram update queue full; rejected %s updates", self._rejected)
+            return "full"
+        if isinstance(update_id, int) and self.dedupe_size:
+            self._seen[update_id] = None
+            if len(self._seen) > self.dedupe_size:
+                self._seen.popitem(last=False)
+
+        key = self._key(payload)
+        lane_key: Hashable = key if key is not None else ("update", update_id, id(payload))
+        pending = _Pending(payload, self._clock())
+        ready = self._ensure_workers()
+        lane = self._lanes.get(lane_key)
+        if lane is None:
+            self._lanes[lane_key] = deque([pending])
+            ready.put_nowait(lane_key)
+        else:
+            # The lane is queued or being served; its worker picks this up next.
+            lane.append(pending)
+        self._depth += 1
+        return "queued"
+
+    def _ensure_workers(self) -> asyncio.Queue[Hashable]:
+        if self._ready is None:
+            self._ready = asyncio.Queue()
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self.workers:
+            self._workers.append(asyncio.create_task(self._work(self._ready)))
+        return self._ready
+
+    async def _work(self, ready: asyncio.Queue[Hashable]) -> None:
+        while True:
+            lane_key = await ready.get()
+            lane = self._lanes[lane_key]
+            pending = lane.popleft()
+            self._depth -= 1
+            self._in_flight += 1
+            self._max_lag = max(self._max_lag, self._clock() - pending.accepted_at)
+            try:
+                await self._handler(pending.payload)
+                self._processed += 1
+            except Exception:
+                self._failed += 1
+                logger.exception("Failed to process queued Telegram update")
+            finally:
+                self._in_flight -= 1
+                if lane:
+                    ready.put_nowait(lane_key)
+                else:
+                    del self._lanes[lane_key]
+                ready.task_done()
+
+    async def join(self) -> None:
+        """Wait until every accepted update has been processed."""
+
+        if self._ready is not None:
+            await self._ready.join()
+
+    def stats(self) -> UpdateQueueStats:
+        now = self._clock()
+        oldest = min((lane[0].accepted_at for lane in self._lanes.values() if lane), default=now)
+        return UpdateQueueStats(
+            depth=self._depth,
+            in_flight=self._in_flight,
+            processed=self._processed,
+            failed=self._failed,
+            duplicates=self._duplicates,
+            rejected=self._rejected,
+            oldest_wait_seconds=now - oldest,
+            max_lag_seconds=self._max_lag,
+        )
+
+    async def aclose(self, timeout: float = 8.0) -> None:
+        """Refuse new updates, finish queued ones for up to ``timeout`` seconds, then stop."""
+
+        self._closed = True
+        try:
+            await asyncio.wait_for(self.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Stopping Telegram update queue with %s updates unprocessed",
+                self._depth + self._in_flight,
+            )
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -191,6 +191,16 @@ def get_usage_event_repo(context: ContextTypes.DEFAULT_TYPE):
     return deps.usage_event_repo() if deps and hasattr(deps, "usage_event_repo") else None
 
 
+def get_usage_rollup_repo(context: ContextTypes.DEFAULT_TYPE):
+    deps = _get_deps(context)
+    return deps.usage_rollup_repo() if deps and hasattr(deps, "usage_rollup_repo") else None
+
+
+def get_broadcast_runner(context: ContextTypes.DEFAULT_TYPE):
+    deps = _get_deps(context)
+    return deps.broadcast_runner() if deps and hasattr(deps, "broadcast_runner") else None
+
+
 def get_sheets_client(context: ContextTypes.DEFAULT_TYPE):
     deps = _get_deps(context)
     return deps.sheets_client() if deps else None
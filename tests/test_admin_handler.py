@@ -7,10 +7,13 @@ from telegram.error import TelegramError
 
 from src.config.constants import BUTTONS_EN, MESSAGES_EN
 from src.config.settings import Settings
+from src.core.exceptions import ExternalResponseError
 from src.models.feedback import FeedbackEntry
 from src.models.session import ConversationState, SessionData
 from src.models.usage_event import UsageEvent
-from src.models.user import UsageStats, UserProfile
+from src.models.user import UsageStats, UserProfile, UserSummary
+from src.services.broadcasts import BroadcastRunner
+from src.services.storage.firestore.broadcast_job_repo import BroadcastJobRepository
 from src.services.telegram.handlers.admin import (
     admin_command,
     handle_admin_broadcast_callback,
@@ -40,6 +43,27 @@ class FakeUserRepo:
     async def list_all(self) -> list[UserProfile]:
         return self.users
 
+    async def iter_summaries(self, page_size: int = 2, *, after: int | None = None):
+        users = [user for user in self.users if after is None or user.telegram_user_id > after]
+        for start in range(0, len(users), page_size):
+            yield [
+                UserSummary.model_validate(user.model_dump())
+                for user in users[start : start + page_size]
+            ]
+
+    async def count(self, *, with_sheet: bool = False) -> int:
+        return sum(1 for user in self.users if user.sheet_id or not with_sheet)
+
+    async def count_created_between(self, start: datetime, end: datetime) -> int:
+        return sum(1 for user in self.users if start <= user.created_at < end)
+
+    async def usage_totals(self) -> UsageStats:
+        totals = UsageStats()
+        for user in self.users:
+            for field, value in user.usage_stats.model_dump().items():
+                setattr(totals, field, getattr(totals, field) + value)
+        return totals
+
 
 class FakeFeedbackRepo:
     def __init__(self, entries: list[FeedbackEntry]) -> None:
@@ -70,12 +94,14 @@ class FakeDeps:
         user_repo: FakeUserRepo | None = None,
         feedback_repo: FakeFeedbackRepo | None = None,
         usage_event_repo: FakeUsageEventRepo | None = None,
+        broadcast_runner: BroadcastRunner | None = None,
     ) -> None:
         self.settings = settings
         self._session_repo = session_repo
         self._user_repo = user_repo
         self._feedback_repo = feedback_repo
         self._usage_event_repo = usage_event_repo
+        self._broadcast_runner = broadcast_runner
 
     def session_repo(self):
         return self._session_repo
@@ -89,6 +115,9 @@ class FakeDeps:
     def usage_event_repo(self):
         return self._usage_event_repo
 
+    def broadcast_runner(self):
+        return self._broadcast_runner
+
 
 class FakeMessage:
     def __init__(self, text: str = "") -> None:
@@ -109,6 +138,10 @@ class FakeBot:
         if chat_id in self.fail_ids:
             raise TelegramError("send failed")
         self.sent.append((chat_id, text))
+        return SimpleNamespace(message_id=len(self.sent))
+
+    async def edit_message_text(self, text: str, chat_id: int, message_id: int):
+        return None
 
 
 def _context(deps: FakeDeps, bot: FakeBot | None = None):
@@ -167,6 +200,21 @@ async def test_admin_stats_aggregates_users():
     assert "Reflections: 4" in reply
 
 
+@pytest.mark.asyncio
+async def test_admin_stats_reports_unavailable_when_aggregation_fails():
+    user_repo = FakeUserRepo([])
+
+    async def unavailable(*_args, **_kwargs):
+        raise ExternalResponseError("User statistics are unavailable")
+
+    user_repo.usage_totals = unavailable
+    deps = FakeDeps(settings=Settings(admin_telegram_ids="1"), user_repo=user_repo)
+    update = _message_update(BUTTONS_EN["admin_stats"], user_id=1)
+
+    assert await handle_admin_text(update, _context(deps)) is True
+    assert update.message.replies[0][0] == MESSAGES_EN["admin_storage_unavailable"]
+
+
 @pytest.mark.asyncio
 async def test_admin_feedback_lists_recent_entries():
     entry = FeedbackEntry(
@@ -238,20 +286,33 @@ async def test_admin_week_stats_aggregates_period_events():
 
 
 @pytest.mark.asyncio
-async def test_admin_broadcast_requires_confirmation_before_sending():
+async def test_admin_broadcast_requires_confirmation_and_runs_as_a_job():
     session_repo = FakeSessionRepo()
     users = [
         UserProfile(telegram_user_id=1),
         UserProfile(telegram_user_id=2),
         UserProfile(telegram_user_id=3),
     ]
+    settings = Settings(admin_telegram_ids="1")
+    user_repo = FakeUserRepo(users)
+    usage_repo = FakeUsageEventRepo()
+    bot = FakeBot(fail_ids={3})
+    queued: list[str] = []
+    runner = BroadcastRunner(
+        settings=settings,
+        jobs=BroadcastJobRepository(None),
+        user_repo=user_repo,
+        bot=bot,
+        usage_repo=usage_repo,
+        enqueue=lambda _settings, job: queued.append(job.job_id) or job.job_id,
+    )
     deps = FakeDeps(
-        settings=Settings(admin_telegram_ids="1"),
+        settings=settings,
         session_repo=session_repo,
-        user_repo=FakeUserRepo(users),
-        usage_event_repo=FakeUsageEventRepo(),
+        user_repo=user_repo,
+        usage_event_repo=usage_repo,
+        broadcast_runner=runner,
     )
-    bot = FakeBot(fail_ids={3})
     context = _context(deps, bot=bot)
     start_update = _message_update(BUTTONS_EN["admin_broadcast"], user_id=1)
 
@@ -270,8 +331,14 @@ async def test_admin_broadcast_requires_confirmation_before_sending():
     callback_update = _callback_update("admin_broadcast:send", user_id=1, message=callback_message)
     await handle_admin_broadcast_callback(callback_update, context)
 
-    assert bot.sent == [(1, "Hello users"), (2, "Hello users")]
-    assert "Sent: 2. Failed: 1." in callback_message.replies[0][0]
+    assert [text for _chat, text in bot.sent] == [MESSAGES_EN["admin_broadcast_started"]]
+    assert len(queued) == 1
     assert (await session_repo.get(1)).state == ConversationState.IDLE
-    assert deps._usage_event_repo.events[-1].event_name == "broadcast.sent"
-    assert deps._usage_event_repo.events[-1].metadata == {"sent": 2, "failed": 1}
+
+    job = await runner.run_slice(queued[0])
+
+    assert job is not None and job.is_done
+    assert bot.sent[1:3] == [(1, "Hello users"), (2, "Hello users")]
+    assert "Sent: 2. Failed: 1. Blocked: 0." in bot.sent[-1][1]
+    assert usage_repo.events[-1].event_name == "broadcast.sent"
+    assert usage_repo.events[-1].metadata == {"sent": 2, "failed": 1, "blocked": 0}
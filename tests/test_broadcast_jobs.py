@@ -0,0 +1,197 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import Forbidden, RetryAfter, TelegramError
+
+from src.config.settings import Settings
+from src.models.user import UserProfile
+from src.services.broadcasts import BroadcastRunner, TelegramSendLimiter, broadcast_task_id
+from src.models.broadcast import BroadcastStatus
+from src.services.reminders.scheduler import ReminderScheduleError, ReminderTasksNotConfiguredError
+from src.services.storage.firestore.broadcast_job_repo import BroadcastJobRepository
+from src.services.storage.firestore.user_repo import UserRepository
+
+ADMIN = 100
+
+
+class FakeBot:
+    def __init__(self, errors: dict[int, list[Exception]] | None = None) -> None:
+        self.errors = errors or {}
+        self.sent: list[tuple[int, str]] = []
+        self.edits: list[str] = []
+
+    async def send_message(self, chat_id: int, text: str):
+        pending = self.errors.get(chat_id)
+        if pending:
+            raise pending.pop(0)
+        self.sent.append((chat_id, text))
+        return SimpleNamespace(message_id=len(self.sent))
+
+    async def edit_message_text(self, text: str, chat_id: int, message_id: int):
+        self.edits.append(text)
+
+    def recipients(self) -> list[int]:
+        return [chat_id for chat_id, _text in self.sent if chat_id != ADMIN]
+
+
+class FakeLimiter:
+    def __init__(self) -> None:
+        self.acquired: list[int] = []
+        self.pauses: list[float] = []
+
+    async def acquire(self, chat_id: int) -> None:
+        self.acquired.append(chat_id)
+
+    def pause(self, seconds: float) -> None:
+        self.pauses.append(seconds)
+
+
+async def _users(count: int) -> UserRepository:
+    repo = UserRepository(None)
+    for user_id in range(1, count + 1):
+        await repo.create(UserProfile(telegram_user_id=user_id))
+    return repo
+
+
+def _runner(jobs, users, bot, *, queued=None, limiter=None, outages=0, **settings) -> BroadcastRunner:
+    failures = [outages]
+
+    def enqueue(_settings, job):
+        if queued is None:
+            raise ReminderTasksNotConfiguredError("Dispatch URL not configured")
+        if failures[0]:
+            failures[0] -= 1
+            raise ReminderScheduleError("Failed to schedule reminder")
+        queued.append(broadcast_task_id(job))
+        return job.job_id
+
+    return BroadcastRunner(
+        settings=Settings(**settings),
+        jobs=jobs,
+        user_repo=users,
+        bot=bot,
+        limiter=limiter or FakeLimiter(),
+        enqueue=enqueue,
+        enqueue_retry_seconds=0,
+    )
+
+
+def test_limiter_caps_the_global_rate_and_spaces_each_chat():
+    now = [0.0]
+    limiter = TelegramSendLimiter(30, per_chat_interval=1.0, clock=lambda: now[0])
+
+    waits = [limiter.reserve(chat_id) for chat_id in range(31)]
+    assert waits[:30] == [0.0] * 30
+    assert waits[30] == pytest.approx(1 / 30)
+
+    now[0] = 10.0
+    assert limiter.reserve(1) == 0.0
+    assert limiter.reserve(1) == pytest.approx(1.0)
+
+    now[0] = 20.0
+    limiter.pause(5)
+    assert limiter.reserve(2) == pytest.approx(5.0)
+
+
+@pytest.mark.asyncio
+async def test_flood_control_pauses_and_retries_and_blocked_users_are_counted(monkeypatch):
+    monkeypatch.setenv("PTB_TIMEDELTA", "true")
+    bot = FakeBot(
+        {
+            2: [RetryAfter(3)],
+            3: [Forbidden("Forbidden: bot was blocked by the user")],
+            4: [TelegramError("Bad Request: chat not found")],
+        }
+    )
+    limiter = FakeLimiter()
+    queued: list[str] = []
+    runner = _runner(BroadcastJobRepository(None), await _users(4), bot, queued=queued, limiter=limiter)
+
+    job = await runner.start("Hi", admin_chat_id=ADMIN)
+    job = await runner.run_slice(job.job_id)
+
+    assert job is not None and job.is_done
+    assert (job.sent, job.failed, job.blocked) == (2, 1, 1)
+    assert sorted(bot.recipients()) == [1, 2]
+    assert limiter.pauses == [3.0]
+    assert limiter.acquired.count(2) == 2
+    assert "Blocked: 1" in bot.sent[-1][1]
+
+
+@pytest.mark.asyncio
+async def test_slices_checkpoint_and_resume_on_a_fresh_instance():
+    jobs = BroadcastJobRepository(None)
+    users = await _users(5)
+    bot = FakeBot()
+    queued: list[str] = []
+    settings = {"broadcast_page_size": 2, "broadcast_slice_seconds": 0}
+
+    job = await _runner(jobs, users, bot, queued=queued, **settings).start("Hi", admin_chat_id=ADMIN)
+    while not job.is_done:
+        # Every slice runs on a new runner, as after an instance restart.
+        job = await _runner(jobs, users, bot, queued=queued, **settings).run_slice(job.job_id)
+
+    assert bot.recipients() == [1, 2, 3, 4, 5]
+    assert queued == [f"broadcast-{job.job_id}-{index}" for index in range(3)]
+    assert (job.cursor, job.sent, job.slices) == (5, 5, 2)
+    assert bot.edits, "progress is reported on the admin's message"
+
+    assert await _runner(jobs, users, bot, queued=queued).run_slice(job.job_id) == job
+    assert bot.recipients() == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_without_a_task_queue_slices_run_in_the_background():
+    jobs = BroadcastJobRepository(None)
+    bot = FakeBot()
+    runner = _runner(jobs, await _users(3), bot, broadcast_page_size=1, broadcast_slice_seconds=0)
+
+    job = await runner.start("Hi", admin_chat_id=ADMIN)
+    for _ in range(50):
+        if (await jobs.get(job.job_id)).is_done:
+            break
+        await asyncio.sleep(0.01)
+
+    assert (await jobs.get(job.job_id)).is_done
+    assert bot.recipients() == [1, 2, 3]
+    await runner.aclose()
+
+
+@pytest.mark.asyncio
+async def test_queue_errors_are_retried_and_never_fall_back_to_sending_inline():
+    jobs = BroadcastJobRepository(None)
+    users = await _users(3)
+    bot = FakeBot()
+    queued: list[str] = []
+    settings = {"broadcast_page_size": 1, "broadcast_slice_seconds": 0}
+
+    job = await _runner(jobs, users, bot, queued=queued, outages=2, **settings).start("Hi", admin_chat_id=ADMIN)
+    assert queued == [f"broadcast-{job.job_id}-0"]
+
+    runner = _runner(jobs, users, bot, queued=queued, outages=3, **settings)
+    with pytest.raises(ReminderScheduleError):
+        await runner.run_slice(job.job_id)
+    assert not runner._inline
+    assert bot.recipients() == [1]
+
+    # The queue retries the failed slice, which resumes after the checkpoint.
+    job = await _runner(jobs, users, bot, queued=queued, **settings).run_slice(job.job_id)
+    assert bot.recipients() == [1, 2]
+    assert queued[-1] == f"broadcast-{job.job_id}-2"
+
+
+@pytest.mark.asyncio
+async def test_a_broadcast_whose_first_slice_cannot_be_queued_is_failed_and_reported():
+    jobs = BroadcastJobRepository(None)
+    bot = FakeBot()
+    runner = _runner(jobs, await _users(2), bot, queued=[], outages=3)
+
+    job = await runner.start("Hi", admin_chat_id=ADMIN)
+
+    stored = await jobs.get(job.job_id)
+    assert stored.status == BroadcastStatus.FAILED
+    assert bot.recipients() == []
+    assert "could not start" in bot.edits[-1]
+    assert await runner.run_slice(job.job_id) == stored
+    assert bot.recipients() == []
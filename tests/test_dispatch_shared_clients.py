@@ -0,0 +1,156 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src import main as main_module
+from src.config.settings import Settings
+from src.core.dependencies import get_dependency_provider, get_user_repo, verify_reminder_dispatch
+from src.core.rate_limit import SlidingWindowRateLimiter
+from src.models.user import UserProfile
+from src.services.reminders.fanout import BucketDispatchResult
+from src.services.telegram.deps import DependencyProvider
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.sent: list[int] = []
+        self.initialized = False
+        self.closed = False
+
+    async def initialize(self) -> None:
+        self.initialized = True
+
+    async def shutdown(self) -> None:
+        self.closed = True
+
+    async def send_message(self, chat_id: int, text: str, **_kwargs) -> None:
+        self.sent.append(chat_id)
+
+
+class FakeSheets:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class StubUserRepo:
+    async def get_by_telegram_id(self, telegram_id: int):
+        return UserProfile(telegram_user_id=telegram_id, reminder_enabled=True, reminder_time="21:00")
+
+    async def update(self, user):
+        return user
+
+
+def _provider(bot: FakeBot, sheets: FakeSheets | None = None) -> DependencyProvider:
+    deps = DependencyProvider(Settings(telegram_bot_token="token"))
+    deps._bot = bot
+    deps._sheets_client = sheets
+    deps._user_repo = StubUserRepo()
+    return deps
+
+
+@pytest.fixture
+def dispatch_client(monkeypatch):
+    monkeypatch.setattr(
+        main_module,
+        "get_dispatch_rate_limiter",
+        lambda: SlidingWindowRateLimiter(100, window_seconds=60),
+    )
+    monkeypatch.setattr(main_module, "schedule_reminder_task", lambda *args, **kwargs: "task")
+    bot = FakeBot()
+    deps = _provider(bot)
+    main_module.app.dependency_overrides[verify_reminder_dispatch] = lambda: True
+    main_module.app.dependency_overrides[get_user_repo] = lambda: deps.user_repo()
+    main_module.app.dependency_overrides[get_dependency_provider] = lambda: deps
+    try:
+        yield TestClient(main_module.app), bot
+    finally:
+        main_module.app.dependency_overrides.clear()
+
+
+def test_bodies_that_are_not_json_objects_are_rejected(dispatch_client):
+    client, bot = dispatch_client
+
+    for body in ("[1, 2]", "42", "null", "not json"):
+        response = client.post("/reminders/dispatch", content=body)
+        assert response.status_code == 400
+        assert response.json() == {"ok": False, "error": "payload_invalid"}
+    response = client.post("/reminders/reindex", content="[]")
+    assert response.status_code == 400
+    assert bot.sent == []
+
+
+def test_dispatches_share_one_bot(dispatch_client):
+    client, bot = dispatch_client
+
+    for user_id in (1, 2, 3):
+        response = client.post("/reminders/dispatch", json={"user_id": user_id})
+        assert response.json() == {"ok": True}
+
+    assert bot.sent == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_provider_warms_clients_on_startup_and_closes_them_on_shutdown():
+    bot = FakeBot()
+    sheets = FakeSheets()
+    deps = _provider(bot, sheets)
+
+    await deps.startup()
+    assert bot.initialized
+
+    await deps.shutdown()
+    assert bot.closed and sheets.closed
+    assert deps._bot is None and deps._sheets_client is None
+
+
+def test_bucket_dispatch_serves_due_users(dispatch_client, monkeypatch):
+    client, _bot = dispatch_client
+    served = []
+
+    class FakeFanout:
+        def __init__(self, **kwargs) -> None:
+            pass
+
+        async def dispatch(self, kind, bucket):
+            served.append((kind, bucket.isoformat()))
+            return BucketDispatchResult(kind, bucket, 2, 1, 1, 0, 1, 0)
+
+    monkeypatch.setattr(main_module, "ReminderFanout", FakeFanout)
+
+    response = client.post("/reminders/dispatch", json={"kind": "daily", "bucket": "2026-06-02T18:00:00+00:00"})
+    assert response.json() == {"ok": True, "due": 2, "sent": 1, "skipped": 1, "failed": 0}
+    assert served == [("daily", "2026-06-02T18:00:00+00:00")]
+
+    response = client.post("/reminders/dispatch", json={"kind": "daily", "bucket": "2026-06-02T18:00"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_shutdown_drains_queued_updates_before_closing_shared_clients(monkeypatch):
+    calls: list[str] = []
+
+    class FakeBotService:
+        async def drain_updates(self) -> None:
+            calls.append("drain")
+            raise RuntimeError("drain failed")
+
+        async def aclose(self) -> None:
+            calls.append("bot_close")
+
+    class FakeDeps:
+        async def startup(self) -> None:
+            calls.append("startup")
+
+        async def shutdown(self) -> None:
+            calls.append("deps_shutdown")
+
+    monkeypatch.setattr(main_module, "get_bot_service_cached", FakeBotService)
+    monkeypatch.setattr(main_module, "get_dependency_provider", FakeDeps)
+
+    with pytest.raises(RuntimeError):
+        async with main_module.lifespan(main_module.app):
+            calls.append("serving")
+
+    assert calls == ["startup", "serving", "drain", "deps_shutdown"]
@@ -0,0 +1,87 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from src.models.session import SessionData
+from src.services.storage.firestore.executor import FirestoreExecutor
+from src.services.storage.firestore.session_repo import SessionRepository
+
+request_id: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_id", default=None)
+
+
+class SlowDocument:
+    def __init__(self, client: "SlowFirestoreClient", doc_id: str) -> None:
+        self._client = client
+        self._doc_id = doc_id
+
+    def set(self, data: dict) -> None:
+        self._client.arrive()
+        self._client.docs[self._doc_id] = data
+
+    def get(self):
+        raise NotImplementedError
+
+    def delete(self) -> None:
+        self._client.docs.pop(self._doc_id, None)
+
+
+class SlowCollection:
+    def __init__(self, client: "SlowFirestoreClient") -> None:
+        self._client = client
+
+    def document(self, doc_id: str) -> SlowDocument:
+        return SlowDocument(self._client, doc_id)
+
+
+class SlowFirestoreClient:
+    """Every write blocks until ``parties`` writes are in flight at once."""
+
+    is_ready = True
+
+    def __init__(self, parties: int) -> None:
+        self.docs: dict[str, dict] = {}
+        self._barrier = threading.Barrier(parties, timeout=5)
+        self.threads: set[str] = set()
+
+    def arrive(self) -> None:
+        self.threads.add(threading.current_thread().name)
+        self._barrier.wait()
+
+    def collection(self, _name: str) -> SlowCollection:
+        return SlowCollection(self)
+
+
+@pytest.mark.asyncio
+async def test_repository_writes_overlap_off_the_event_loop():
+    client = SlowFirestoreClient(parties=3)
+    repo = SessionRepository(client)
+
+    # With the blocking calls on the loop thread the barrier could never fill.
+    await asyncio.gather(*(repo.save(SessionData(user_id=user_id)) for user_id in (1, 2, 3)))
+
+    assert set(client.docs) == {"1", "2", "3"}
+    assert all(name.startswith("firestore-io") for name in client.threads)
+    assert repo.client is client
+
+
+@pytest.mark.asyncio
+async def test_executor_carries_context_and_counts_calls():
+    executor = FirestoreExecutor(max_workers=1)
+    release = threading.Event()
+    request_id.set("req-1")
+    try:
+        first = asyncio.ensure_future(executor.run(release.wait, 5))
+        second = asyncio.ensure_future(executor.run(request_id.get))
+        while executor.stats().running < 1:
+            await asyncio.sleep(0.001)
+        assert executor.stats().queued == 1
+
+        release.set()
+        assert await first is True
+        assert await second == "req-1"
+        assert executor.stats().completed == 2
+        assert (executor.stats().queued, executor.stats().running) == (0, 0)
+    finally:
+        executor.shutdown()
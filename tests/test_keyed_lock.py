@@ -0,0 +1,115 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from src.config.settings import Settings
+from src.core.keyed_lock import KeyedLock
+from src.services.telegram import bot as bot_module
+
+
+@pytest.mark.asyncio
+async def test_same_key_is_serialized_and_contention_is_counted():
+    now = [0.0]
+    locks = KeyedLock(clock=lambda: now[0])
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def first():
+        async with locks.hold(1):
+            order.append("first")
+            await release.wait()
+            now[0] = 2.0
+            order.append("first done")
+
+    async def second():
+        async with locks.hold(1) as waited:
+            order.append(f"second after {waited}s")
+
+    async def other_key():
+        async with locks.hold(2) as waited:
+            order.append(f"other after {waited}s")
+
+    tasks = [asyncio.create_task(job()) for job in (first, second, other_key)]
+    await asyncio.sleep(0)
+    assert order == ["first", "other after 0.0s"]
+    assert locks.stats().active == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert order[2:] == ["first done", "second after 2.0s"]
+    stats = locks.stats()
+    assert (stats.acquired, stats.contended, stats.max_wait_seconds) == (3, 1, 2.0)
+    assert (stats.active, stats.idle) == (0, 2)
+
+
+@pytest.mark.asyncio
+async def test_idle_locks_are_bounded_and_cancelled_waiters_leave_no_trace():
+    locks = KeyedLock(max_idle=2)
+    for key in range(5):
+        async with locks.hold(key):
+            pass
+    assert (locks.stats().idle, locks.stats().evicted) == (2, 3)
+
+    async with locks.hold("busy"):
+        waiter = asyncio.create_task(locks.hold("busy").__aenter__())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+    assert locks.stats().active == 0
+
+
+@pytest.mark.asyncio
+async def test_bot_serializes_updates_per_user_only(monkeypatch):
+    @asynccontextmanager
+    async def no_unit_of_work(_deps, _user_id):
+        yield
+
+    monkeypatch.setattr(bot_module, "update_unit_of_work", no_unit_of_work)
+    running: dict[int, int] = {}
+    overlaps: list[int] = []
+    gate = asyncio.Event()
+
+    async def process_update(update):
+        user_id = update.effective_user.id
+        running[user_id] = running.get(user_id, 0) + 1
+        if running[user_id] > 1:
+            overlaps.append(user_id)
+        await gate.wait()
+        running[user_id] -= 1
+
+    settings = Settings(
+        _env_file=None,
+        telegram_update_queue_enabled=False,
+        rate_limit_requests_per_minute=100,
+    )
+    service = bot_module.TelegramBotService(settings)
+    service.app = SimpleNamespace(_initialized=True, bot=None, process_update=process_update)
+
+    def update(update_id: int, user_id: int) -> dict:
+        return {
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": {"id": user_id, "is_bot": False, "first_name": "U"},
+                "chat_instance": "c",
+                "data": "habits_confirm:yes",
+            },
+        }
+
+    tasks = [
+        asyncio.create_task(service.handle_update(update(1, 7))),
+        asyncio.create_task(service.handle_update(update(2, 7))),
+        asyncio.create_task(service.handle_update(update(3, 8))),
+    ]
+    await asyncio.sleep(0.01)
+    assert running == {7: 1, 8: 1}
+
+    gate.set()
+    await asyncio.gather(*tasks)
+
+    assert overlaps == []
+    assert service.user_lock_stats().contended == 1
@@ -0,0 +1,170 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from google.api_core.exceptions import AlreadyExists
+
+from src.config.settings import Settings
+from src.services.reminders import backends, scheduler
+from src.services.reminders.backends import CloudTasksBackend, LocalTaskBackend, ReminderTask
+
+RUN_AT = datetime(2026, 6, 2, 18, 0, tzinfo=timezone.utc)
+
+
+def _task(task_id: str | None = None, at: datetime = RUN_AT) -> ReminderTask:
+    return ReminderTask(
+        url="http://localhost:8080/reminders/dispatch",
+        headers={"X-Reminder-Secret": "secret"},
+        body=b'{"user_id": 1}',
+        schedule_time_utc=at,
+        task_id=task_id,
+    )
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = RUN_AT.timestamp() - 60
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSender:
+    def __init__(self, statuses: list[int] | None = None) -> None:
+        self.statuses = statuses or []
+        self.sent: list[str] = []
+
+    async def __call__(self, task) -> int:
+        self.sent.append(task.body)
+        return self.statuses.pop(0) if self.statuses else 200
+
+
+@pytest.mark.asyncio
+async def test_local_backend_fires_due_tasks_only():
+    clock = FakeClock()
+    sender = FakeSender()
+    backend = LocalTaskBackend(sender=sender, clock=clock)
+    backend.create_task(_task())
+    later = backend.create_task(_task(at=datetime(2026, 6, 2, 19, 0, tzinfo=timezone.utc)))
+
+    assert await backend.run_due() == 0
+    clock.now = RUN_AT.timestamp()
+    assert await backend.run_due() == 1
+
+    assert sender.sent == ['{"user_id": 1}']
+    assert [task.name for task in backend.pending()] == [later]
+
+
+@pytest.mark.asyncio
+async def test_local_backend_named_tasks_are_created_once_and_deletable():
+    backend = LocalTaskBackend(sender=FakeSender(), clock=FakeClock())
+
+    first = backend.create_task(_task("bucket-daily-202606021800"))
+    second = backend.create_task(_task("bucket-daily-202606021800"))
+    assert first == second == "local/bucket-daily-202606021800"
+    assert len(backend.pending()) == 1
+
+    backend.delete_task(first)
+    backend.delete_task("local/unknown")
+    assert backend.pending() == []
+
+
+@pytest.mark.asyncio
+async def test_local_backend_retries_with_backoff_then_drops():
+    clock = FakeClock()
+    clock.now = RUN_AT.timestamp()
+    sender = FakeSender([500, 500])
+    backend = LocalTaskBackend(sender=sender, clock=clock, max_attempts=2, retry_base_seconds=10)
+    backend.create_task(_task())
+
+    await backend.run_due()
+    [pending] = backend.pending()
+    assert (pending.attempts, pending.run_at) == (1, clock.now + 10)
+
+    clock.now += 10
+    await backend.run_due()
+    assert backend.pending() == []
+    assert len(sender.sent) == 2
+
+
+@pytest.mark.asyncio
+async def test_local_backend_state_survives_a_restart(tmp_path):
+    state_path = str(tmp_path / "tasks.json")
+    clock = FakeClock()
+    LocalTaskBackend(state_path, sender=FakeSender(), clock=clock).create_task(_task("a"))
+
+    sender = FakeSender()
+    restarted = LocalTaskBackend(state_path, sender=sender, clock=clock)
+    assert [task.name for task in restarted.pending()] == ["local/a"]
+
+    clock.now = RUN_AT.timestamp()
+    await restarted.run_due()
+    assert sender.sent == ['{"user_id": 1}']
+    assert LocalTaskBackend(state_path, clock=clock).pending() == []
+
+
+@pytest.mark.asyncio
+async def test_local_backend_runner_wakes_for_new_tasks():
+    sender = FakeSender()
+    backend = LocalTaskBackend(sender=sender)
+    await backend.start()
+    try:
+        backend.create_task(_task(at=datetime.now(timezone.utc)))
+        for _ in range(50):
+            if sender.sent:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await backend.aclose()
+
+    assert sender.sent == ['{"user_id": 1}']
+
+
+class FakeCloudTasksClient:
+    instances = 0
+
+    def __init__(self) -> None:
+        FakeCloudTasksClient.instances += 1
+        self.created: list[dict] = []
+        self.exists = False
+
+    def queue_path(self, project, location, queue):
+        return f"projects/{project}/locations/{location}/queues/{queue}"
+
+    def task_path(self, project, location, queue, task_id):
+        return f"{self.queue_path(project, location, queue)}/tasks/{task_id}"
+
+    def create_task(self, parent, task):
+        if self.exists:
+            raise AlreadyExists("exists")
+        self.created.append(task)
+        return type("Task", (), {"name": task.get("name") or f"{parent}/tasks/123"})()
+
+
+def test_cloud_tasks_backend_reuses_one_client_and_tolerates_existing_names(monkeypatch):
+    FakeCloudTasksClient.instances = 0
+    monkeypatch.setattr(backends.tasks_v2_module, "CloudTasksClient", FakeCloudTasksClient)
+    backend = CloudTasksBackend(Settings(gcp_project_id="proj", gcp_region="eu"))
+
+    assert backend.create_task(_task()) == "projects/proj/locations/eu/queues/reminders/tasks/123"
+    name = backend.create_task(_task("bucket-daily-202606021800"))
+    backend._client.exists = True
+    assert backend.create_task(_task("bucket-daily-202606021800")) == name
+    assert FakeCloudTasksClient.instances == 1
+
+
+def test_scheduler_queues_through_the_configured_backend(monkeypatch):
+    backend = LocalTaskBackend(sender=FakeSender(), clock=FakeClock())
+    monkeypatch.setattr(scheduler, "get_reminder_task_backend", lambda: backend)
+    settings = Settings(reminders_dispatch_url="http://localhost:8080", reminders_dispatch_secret="s")
+
+    name = scheduler.schedule_reminders_task_at(
+        settings=settings,
+        schedule_time_utc=RUN_AT,
+        payload={"user_id": 1},
+    )
+
+    [task] = backend.pending()
+    assert task.name == name
+    assert task.url == "http://localhost:8080/reminders/dispatch"
+    assert task.headers["X-Reminder-Secret"] == "s"
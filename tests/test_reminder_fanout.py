@@ -0,0 +1,169 @@
+from datetime import datetime, time, timedelta, timezone
+
+import pytest
+from telegram.error import Forbidden
+
+from src.config.settings import Settings
+from src.models.user import UserProfile
+from src.services.reminders import fanout, scheduler
+from src.services.reminders.fanout import ReminderFanout
+from src.services.reminders.schedule_index import next_run_utc
+from src.services.storage.firestore.user_repo import UserRepository
+
+BUCKET = datetime(2026, 6, 2, 18, 0, tzinfo=timezone.utc)
+
+
+class FakeBot:
+    def __init__(self, fail_for: set[int] | None = None) -> None:
+        self.sent: list[int] = []
+        self.fail_for = fail_for or set()
+
+    async def send_message(self, chat_id: int, text: str, **_kwargs) -> None:
+        if chat_id in self.fail_for:
+            raise Forbidden("bot was blocked by the user")
+        self.sent.append(chat_id)
+
+
+class RecordingBackend:
+    def __init__(self) -> None:
+        self.deleted: list[str] = []
+
+    def delete_task(self, name: str) -> None:
+        self.deleted.append(name)
+
+
+def _profile(user_id: int, next_run: datetime | None, **kwargs) -> UserProfile:
+    kwargs.setdefault("reminder_enabled", True)
+    kwargs.setdefault("reminder_time", "21:00")
+    return UserProfile(
+        telegram_user_id=user_id,
+        timezone="Europe/Moscow",
+        reminder_next_run_utc=next_run,
+        **kwargs,
+    )
+
+
+async def _repo(*profiles: UserProfile) -> UserRepository:
+    repo = UserRepository()
+    for profile in profiles:
+        await repo.create(profile)
+    return repo
+
+
+@pytest.fixture
+def ensured(monkeypatch):
+    calls: list[tuple[str, datetime]] = []
+    monkeypatch.setattr(fanout, "ensure_bucket_task", lambda _settings, kind, run_at: calls.append((kind, run_at)))
+    return calls
+
+
+def _fanout(repo: UserRepository, bot: FakeBot, now: datetime = BUCKET, **kwargs) -> ReminderFanout:
+    return ReminderFanout(
+        settings=Settings(),
+        user_repo=repo,
+        bot=bot,
+        sheets_client=lambda: None,
+        clock=lambda: now,
+        **kwargs,
+    )
+
+
+def test_next_run_is_computed_in_the_users_timezone():
+    profile = _profile(1, None)
+
+    assert next_run_utc(profile, "daily", BUCKET) == BUCKET + timedelta(days=1)
+    assert next_run_utc(profile, "daily", BUCKET - timedelta(minutes=1)) == BUCKET
+    assert next_run_utc(profile, "on_this_day", BUCKET) is None
+    assert next_run_utc(_profile(1, None, reminder_enabled=False), "daily", BUCKET) is None
+
+
+@pytest.mark.asyncio
+async def test_bucket_sends_to_due_users_and_moves_their_next_runs(ensured):
+    tomorrow = BUCKET + timedelta(days=1)
+    repo = await _repo(
+        _profile(1, BUCKET),
+        _profile(2, BUCKET, reminder_enabled=False),
+        _profile(3, BUCKET + timedelta(minutes=1)),
+        _profile(4, None),
+    )
+    bot = FakeBot()
+
+    result = await _fanout(repo, bot).dispatch("daily", BUCKET + timedelta(seconds=3))
+
+    assert bot.sent == [1]
+    assert (result.due, result.sent, result.skipped, result.failed) == (2, 1, 1, 0)
+    assert (await repo.get_by_telegram_id(1)).reminder_next_run_utc == tomorrow
+    assert (await repo.get_by_telegram_id(2)).reminder_next_run_utc is None
+    assert (await repo.get_by_telegram_id(3)).reminder_next_run_utc == BUCKET + timedelta(minutes=1)
+    assert ensured == [("daily", tomorrow)]
+
+
+@pytest.mark.asyncio
+async def test_bucket_pages_through_due_users(ensured):
+    repo = await _repo(*(_profile(user_id, BUCKET) for user_id in range(1, 6)))
+    bot = FakeBot()
+
+    result = await _fanout(repo, bot, page_size=2, concurrency=2).dispatch("daily", BUCKET)
+
+    assert sorted(bot.sent) == [1, 2, 3, 4, 5]
+    assert result.due == 5
+    assert len(ensured) == 1
+
+
+@pytest.mark.asyncio
+async def test_missed_runs_are_caught_up_or_skipped_when_too_late(ensured):
+    repo = await _repo(
+        _profile(1, BUCKET - timedelta(minutes=5)),
+        _profile(2, BUCKET - timedelta(hours=3)),
+    )
+    bot = FakeBot()
+
+    result = await _fanout(repo, bot, max_lateness=timedelta(hours=1)).dispatch("daily", BUCKET)
+
+    assert bot.sent == [1]
+    assert result.skipped == 1
+    assert (await repo.get_by_telegram_id(2)).reminder_next_run_utc == BUCKET + timedelta(days=1)
+
+
+@pytest.mark.asyncio
+async def test_failed_sends_are_counted_and_still_rescheduled(ensured):
+    repo = await _repo(_profile(1, BUCKET), _profile(2, BUCKET))
+    bot = FakeBot(fail_for={2})
+
+    result = await _fanout(repo, bot).dispatch("daily", BUCKET)
+
+    assert (result.sent, result.failed) == (1, 1)
+    assert (await repo.get_by_telegram_id(2)).reminder_next_run_utc == BUCKET + timedelta(days=1)
+
+
+def test_bucketed_scheduling_records_the_run_and_shares_a_named_task(monkeypatch):
+    calls = []
+
+    def fake_schedule(**kwargs):
+        calls.append(kwargs)
+        return f"projects/p/locations/l/queues/reminders/tasks/{kwargs['task_id']}"
+
+    backend = RecordingBackend()
+    monkeypatch.setattr(scheduler, "schedule_reminders_task_at", fake_schedule)
+    monkeypatch.setattr(scheduler, "get_reminder_task_backend", lambda: backend)
+    settings = Settings(reminders_fanout="bucketed")
+    profile = _profile(1, None)
+
+    task_name = scheduler.schedule_reminder_task(
+        settings,
+        1,
+        time(21, 0),
+        "Europe/Moscow",
+        "projects/p/locations/l/queues/reminders/tasks/old",
+        profile=profile,
+    )
+
+    [call] = calls
+    next_run = profile.reminder_next_run_utc
+    assert next_run is not None and next_run.astimezone(timezone.utc).minute == 0
+    assert call["task_id"] == f"bucket-daily-{next_run:%Y%m%d%H%M}"
+    assert call["payload"] == {"kind": "daily", "bucket": next_run.isoformat()}
+    assert backend.deleted == ["projects/p/locations/l/queues/reminders/tasks/old"]
+
+    scheduler.delete_reminder_task(settings, task_name)
+    assert len(backend.deleted) == 1  # shared bucket tasks are left alone
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.config.settings import Settings
+from src.models.user import UserProfile
+from src.services.reminders import schedule_index
+from src.services.reminders.schedule_index import (
+    ReminderScheduleIndex,
+    next_run_utc,
+    refresh_next_runs,
+    timezones_changing_offset,
+)
+from src.services.storage.firestore.user_repo import UserRepository
+
+# Central Europe switches to summer time at 01:00 UTC on 2026-03-29.
+BEFORE_DST = datetime(2026, 3, 28, 20, 30, tzinfo=timezone.utc)
+
+
+def _profile(user_id: int, tz: str = "Europe/Berlin", **kwargs) -> UserProfile:
+    kwargs.setdefault("reminder_enabled", True)
+    kwargs.setdefault("reminder_time", "21:00")
+    return UserProfile(telegram_user_id=user_id, timezone=tz, **kwargs)
+
+
+async def _repo(*profiles: UserProfile) -> UserRepository:
+    repo = UserRepository()
+    for profile in profiles:
+        await repo.create(profile)
+    return repo
+
+
+def test_next_run_across_a_dst_switch_keeps_the_local_time():
+    profile = _profile(1)
+
+    # 21:00 CET on the 28th has passed; the next 21:00 is CEST, one hour earlier in UTC.
+    assert next_run_utc(profile, "daily", BEFORE_DST) == datetime(2026, 3, 29, 19, 0, tzinfo=timezone.utc)
+
+
+def test_refresh_next_runs_reports_only_changed_fields():
+    profile = _profile(1, on_this_day_enabled=False)
+
+    changed = refresh_next_runs(profile, BEFORE_DST)
+    assert changed == {"reminder_next_run_utc": datetime(2026, 3, 29, 19, 0, tzinfo=timezone.utc)}
+    assert refresh_next_runs(profile, BEFORE_DST) == {}
+
+
+def test_timezones_changing_offset_finds_zones_about_to_switch():
+    zones = ["Europe/Berlin", "Europe/Moscow", "UTC", "Not/AZone"]
+
+    assert timezones_changing_offset(zones, BEFORE_DST, BEFORE_DST + timedelta(days=2)) == {"Europe/Berlin"}
+    assert timezones_changing_offset(zones, BEFORE_DST, BEFORE_DST + timedelta(hours=1)) == set()
+
+
+@pytest.mark.asyncio
+async def test_due_within_merges_kinds_soonest_first():
+    now = datetime(2026, 6, 2, 17, 50, tzinfo=timezone.utc)
+    repo = await _repo(
+        _profile(1, reminder_next_run_utc=now + timedelta(minutes=10)),
+        _profile(2, smart_nudges_next_run_utc=now + timedelta(minutes=5)),
+        _profile(3, reminder_next_run_utc=now + timedelta(hours=2)),
+    )
+    index = ReminderScheduleIndex(repo, Settings())
+
+    due = await index.due_within(15, now=now)
+
+    assert [(reminder.kind, reminder.user_id) for reminder in due] == [("smart_nudge", 2), ("daily", 1)]
+
+
+@pytest.mark.asyncio
+async def test_refresh_backfills_and_ensures_buckets_when_bucketed(monkeypatch):
+    ensured = []
+    monkeypatch.setattr(schedule_index, "ensure_bucket_task", lambda _s, kind, bucket: ensured.append((kind, bucket)))
+    repo = await _repo(_profile(1), _profile(2, tz="Europe/Moscow"))
+    index = ReminderScheduleIndex(repo, Settings(reminders_fanout="bucketed"))
+
+    result = await index.refresh_for_dst(now=BEFORE_DST)
+
+    assert (result.scanned, result.changed, result.buckets_scheduled) == (1, 1, 1)
+    assert ensured == [("daily", datetime(2026, 3, 29, 19, 0, tzinfo=timezone.utc))]
+    assert (await repo.get_by_telegram_id(2)).reminder_next_run_utc is None
+
+    result = await index.refresh(now=BEFORE_DST)
+    assert (result.scanned, result.changed) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_refresh_walks_projected_pages_instead_of_loading_every_profile(monkeypatch):
+    repo = await _repo(*(_profile(user_id) for user_id in range(1, 6)), _profile(6, tz="UTC"))
+    pages = []
+    iter_reminders = repo.iter_reminders
+
+    async def small_pages(page_size=500, *, after=None):
+        async for page in iter_reminders(2, after=after):
+            pages.append(len(page))
+            yield page
+
+    async def no_full_scan():
+        raise AssertionError("reindex must not load every profile")
+
+    monkeypatch.setattr(repo, "iter_reminders", small_pages)
+    monkeypatch.setattr(repo, "list_all", no_full_scan)
+    index = ReminderScheduleIndex(repo, Settings())
+
+    result = await index.refresh_for_dst(now=BEFORE_DST)
+
+    assert pages == [2, 2, 2]
+    assert (result.scanned, result.changed) == (5, 5)
+    assert (await repo.get_by_telegram_id(5)).reminder_next_run_utc == datetime(
+        2026, 3, 29, 19, 0, tzinfo=timezone.utc
+    )
+    assert (await repo.get_by_telegram_id(6)).reminder_next_run_utc is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_fills_only_missing_runs_and_skips_per_user_tasks():
+    stored = datetime(2026, 3, 30, 18, 0, tzinfo=timezone.utc)
+    repo = await _repo(
+        _profile(1),
+        _profile(2, reminder_next_run_utc=stored),
+        _profile(3, reminder_task_name="projects/p/queues/q/tasks/reminder-3"),
+    )
+    index = ReminderScheduleIndex(repo, Settings())
+
+    result = await index.refresh(now=BEFORE_DST)
+
+    assert result.changed == 1
+    assert (await repo.get_by_telegram_id(1)).reminder_next_run_utc is not None
+    assert (await repo.get_by_telegram_id(2)).reminder_next_run_utc == stored
+    assert (await repo.get_by_telegram_id(3)).reminder_next_run_utc is None
+
+
+@pytest.mark.asyncio
+async def test_dst_refresh_recomputes_future_runs_but_leaves_past_due_ones():
+    past_due = BEFORE_DST - timedelta(minutes=30)
+    stale_future = datetime(2026, 3, 29, 20, 0, tzinfo=timezone.utc)
+    repo = await _repo(
+        _profile(1, reminder_next_run_utc=past_due),
+        _profile(2, reminder_next_run_utc=stale_future),
+    )
+    index = ReminderScheduleIndex(repo, Settings())
+
+    result = await index.refresh_for_dst(now=BEFORE_DST)
+
+    assert result.changed == 1
+    assert (await repo.get_by_telegram_id(1)).reminder_next_run_utc == past_due
+    assert (await repo.get_by_telegram_id(2)).reminder_next_run_utc == datetime(
+        2026, 3, 29, 19, 0, tzinfo=timezone.utc
+    )
@@ -0,0 +1,121 @@
+from datetime import datetime
+
+import pytest
+from google.api_core.exceptions import NotFound
+
+from src.models.session import ConversationState, SessionData
+from src.services.storage.firestore.session_repo import SessionRepository
+
+
+class FakeSnapshot:
+    def __init__(self, data: dict | None) -> None:
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> dict | None:
+        return self._data
+
+
+class FakeDocument:
+    def __init__(self, client: "FakeFirestoreClient", doc_id: str) -> None:
+        self._client = client
+        self._doc_id = doc_id
+
+    def get(self) -> FakeSnapshot:
+        data = self._client.docs.get(self._doc_id)
+        return FakeSnapshot(dict(data) if data is not None else None)
+
+    def set(self, data: dict) -> None:
+        self._client.writes.append(("set", set(data)))
+        self._client.docs[self._doc_id] = dict(data)
+
+    def update(self, data: dict) -> None:
+        if self._doc_id not in self._client.docs:
+            raise NotFound("no document")
+        self._client.writes.append(("update", set(data)))
+        self._client.docs[self._doc_id].update(data)
+
+    def delete(self) -> None:
+        self._client.docs.pop(self._doc_id, None)
+
+
+class FakeCollection:
+    def __init__(self, client: "FakeFirestoreClient") -> None:
+        self._client = client
+
+    def document(self, doc_id: str) -> FakeDocument:
+        return FakeDocument(self._client, doc_id)
+
+
+class FakeFirestoreClient:
+    is_ready = True
+
+    def __init__(self) -> None:
+        self.docs: dict[str, dict] = {}
+        self.writes: list[tuple[str, set[str]]] = []
+
+    def collection(self, _name: str) -> FakeCollection:
+        return FakeCollection(self)
+
+
+def test_dirty_fields_include_in_place_edits():
+    session = SessionData(user_id=1)
+    assert "temp_data" in session.dirty_fields()
+
+    session.mark_clean()
+    assert session.dirty_fields() == set()
+    session.temp_data["draft"] = "text"
+    session.state = ConversationState.DREAM_AWAITING_CONTENT
+    assert session.dirty_fields() == {"temp_data", "state"}
+
+
+@pytest.mark.asyncio
+async def test_loaded_session_writes_only_changed_fields():
+    client = FakeFirestoreClient()
+    repo = SessionRepository(client)
+    await repo.save(SessionData(user_id=1, pending_entry={"raw_record": "long diary text"}))
+
+    session = await repo.get(1)
+    session.state = ConversationState.HABITS_AWAITING_CONFIRMATION
+    await repo.save(session)
+
+    assert client.writes[0][0] == "set"
+    assert client.writes[1] == ("update", {"state", "last_activity", "expires_at"})
+    assert isinstance(client.docs["1"]["expires_at"], datetime)
+    assert client.docs["1"]["pending_entry"] == {"raw_record": "long diary text"}
+
+
+@pytest.mark.asyncio
+async def test_saves_in_a_deferred_block_become_one_write():
+    client = FakeFirestoreClient()
+    repo = SessionRepository(client)
+
+    async with repo.deferred_writes():
+        session = SessionData(user_id=1)
+        await repo.save(session)
+        again = await repo.get(1)
+        assert again is session
+        again.temp_data["step"] = 2
+        await repo.save(again)
+        async with repo.deferred_writes():
+            await repo.save(again)
+        assert client.writes == []
+
+    assert len(client.writes) == 1
+    assert client.docs["1"]["temp_data"] == {"step": 2}
+
+
+@pytest.mark.asyncio
+async def test_update_of_a_reaped_document_falls_back_to_a_full_write():
+    client = FakeFirestoreClient()
+    repo = SessionRepository(client)
+    session = SessionData(user_id=1)
+    await repo.save(session)
+    client.docs.clear()  # removed by the TTL policy
+
+    session.temp_data["step"] = 1
+    await repo.save(session)
+
+    assert client.writes[-1][0] == "set"
+    assert client.docs["1"]["temp_data"] == {"step": 1}
+    assert repo.client is client
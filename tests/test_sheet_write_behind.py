@@ -0,0 +1,251 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.exceptions import ExternalTimeoutError, SheetAccessError
+from src.models.entry import DreamEntry, HabitEntry, ThoughtEntry
+from src.services.storage.firestore.sheet_write_journal_repo import SheetWriteJournalRepository
+from src.services.storage.interfaces import ISheetsClient, SheetAppend
+from src.services.storage.sheets.write_behind import WriteBehindSheetsClient
+
+
+class FakeSheets(ISheetsClient):
+    def __init__(self) -> None:
+        self.batches: list[list[SheetAppend]] = []
+        self.reads: list[str] = []
+        self.fail_with: list[Exception] = []
+        self.closed = False
+
+    async def append_entries(self, sheet_id, appends):
+        if self.fail_with:
+            raise self.fail_with.pop(0)
+        self.batches.append(list(appends))
+
+    async def append_habit_entry(self, sheet_id, field_order, entry):
+        raise AssertionError("appends go through append_entries")
+
+    append_dream_entry = append_thought_entry = append_reflection_entry = append_habit_entry
+
+    async def find_latest_habit_entry(self, sheet_id, entry_date):
+        self.reads.append(f"find {len(self.batches)}")
+        return None
+
+    async def update_habit_entry(self, sheet_id, row_index, field_order, entry):
+        self.reads.append(f"update {len(self.batches)}")
+
+    async def get_habit_entries_for_dates(self, sheet_id, dates):
+        self.reads.append(f"habits {len(self.batches)}")
+        return []
+
+    get_dream_entries_for_dates = get_thought_entries_for_dates = get_habit_entries_for_dates
+    get_reflection_entries_for_dates = get_habit_entries_for_dates
+
+    async def get_entries_for_dates_multi(self, sheet_id, dates, tabs=()):
+        return {}
+
+    async def ensure_tabs(self, sheet_id):
+        return None
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _client(inner: FakeSheets, journal: SheetWriteJournalRepository, **kwargs) -> WriteBehindSheetsClient:
+    kwargs.setdefault("flush_delay_seconds", 60)
+    return WriteBehindSheetsClient(inner, journal, **kwargs)
+
+
+def _dream(record: str) -> DreamEntry:
+    return DreamEntry(timestamp=datetime(2026, 6, 2, 7), record=record)
+
+
+@pytest.mark.asyncio
+async def test_appends_are_acknowledged_then_coalesced_into_one_write():
+    inner = FakeSheets()
+    journal = SheetWriteJournalRepository()
+    client = _client(inner, journal)
+
+    await client.append_habit_entry("sheet", ["mood"], HabitEntry(date=date(2026, 6, 2), raw_record="ok"))
+    await client.append_dream_entry("sheet", _dream("flew"))
+    await client.append_thought_entry("sheet", ThoughtEntry(timestamp=datetime(2026, 6, 2, 9), record="hm"))
+
+    assert inner.batches == []
+    assert len(await journal.list_pending()) == 3
+
+    await client.flush("sheet")
+
+    [batch] = inner.batches
+    assert [type(append.entry).__name__ for append in batch] == ["HabitEntry", "DreamEntry", "ThoughtEntry"]
+    assert batch[0].field_order == ["mood"]
+    assert await journal.list_pending() == []
+    await client.aclose()
+    assert inner.closed
+
+
+@pytest.mark.asyncio
+async def test_flush_runs_in_background_after_the_delay():
+    inner = FakeSheets()
+    client = _client(inner, SheetWriteJournalRepository(), flush_delay_seconds=0)
+
+    await client.append_dream_entry("sheet", _dream("flew"))
+    await asyncio.sleep(0.01)
+
+    assert len(inner.batches) == 1
+    assert client.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_backs_off_and_keeps_the_journal_entry():
+    inner = FakeSheets()
+    journal = SheetWriteJournalRepository()
+    clock = FakeClock()
+    client = _client(inner, journal, retry_base_seconds=2.0, clock=clock)
+    await client.append_dream_entry("sheet", _dream("flew"))
+    inner.fail_with = [ExternalTimeoutError("slow")]
+
+    await client.flush("sheet")
+    [pending] = await journal.list_pending()
+    assert (pending.attempts, pending.last_error) == (1, "ExternalTimeoutError")
+
+    await client.flush("sheet")  # still backing off
+    assert inner.batches == []
+
+    clock.now = 2.0
+    await client.flush("sheet")
+    assert len(inner.batches) == 1
+    assert await journal.list_pending() == []
+
+
+@pytest.mark.asyncio
+async def test_access_error_drops_writes_and_notifies():
+    inner = FakeSheets()
+    journal = SheetWriteJournalRepository()
+    failures = []
+
+    async def on_failure(sheet_id, writes, error):
+        failures.append((sheet_id, [write.payload["record"] for write in writes], type(error)))
+
+    client = _client(inner, journal, on_failure=on_failure)
+    await client.append_dream_entry("sheet", _dream("flew"))
+    inner.fail_with = [SheetAccessError("no access")]
+
+    await client.flush("sheet")
+
+    assert failures == [("sheet", ["flew"], SheetAccessError)]
+    assert client.pending_count() == 0
+    assert await journal.list_pending() == []
+
+
+@pytest.mark.asyncio
+async def test_writes_are_given_up_after_max_attempts():
+    inner = FakeSheets()
+    clock = FakeClock()
+    failures = []
+
+    async def on_failure(sheet_id, writes, error):
+        failures.append(len(writes))
+
+    client = _client(inner, SheetWriteJournalRepository(), on_failure=on_failure, max_attempts=2, clock=clock)
+    await client.append_dream_entry("sheet", _dream("flew"))
+    inner.fail_with = [ExternalTimeoutError("slow"), ExternalTimeoutError("slow")]
+
+    await client.flush("sheet")
+    clock.now = 100.0
+    await client.flush("sheet")
+
+    assert failures == [1]
+    assert client.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_reads_and_updates_flush_pending_writes_first():
+    inner = FakeSheets()
+    client = _client(inner, SheetWriteJournalRepository())
+
+    await client.append_dream_entry("sheet", _dream("flew"))
+    await client.get_dream_entries_for_dates("sheet", [date(2026, 6, 2)])
+    await client.append_habit_entry("sheet", [], HabitEntry(date=date(2026, 6, 2), raw_record="ok"))
+    await client.update_habit_entry("sheet", 2, [], HabitEntry(date=date(2026, 6, 2), raw_record="ok"))
+
+    assert inner.reads == ["habits 1", "update 2"]
+
+
+@pytest.mark.asyncio
+async def test_journaled_writes_are_recovered_by_a_new_client():
+    journal = SheetWriteJournalRepository()
+    await _client(FakeSheets(), journal).append_dream_entry("sheet", _dream("flew"))
+
+    inner = FakeSheets()
+    client = _client(inner, journal)
+    await client.drain()
+
+    [[append]] = inner.batches
+    assert append.entry.record == "flew"
+    assert await journal.list_pending() == []
+
+
+class FakeJournalDocument:
+    def __init__(self, docs: dict, doc_id: str) -> None:
+        self._docs = docs
+        self._doc_id = doc_id
+
+    def set(self, data: dict) -> None:
+        self._docs[self._doc_id] = dict(data)
+
+    def delete(self) -> None:
+        self._docs.pop(self._doc_id, None)
+
+
+class FakeJournalCollection:
+    def __init__(self, docs: dict) -> None:
+        self._docs = docs
+
+    def document(self, doc_id: str) -> FakeJournalDocument:
+        return FakeJournalDocument(self._docs, doc_id)
+
+    def order_by(self, _field: str) -> "FakeJournalCollection":
+        return self
+
+    def limit(self, _count: int) -> "FakeJournalCollection":
+        return self
+
+    def stream(self):
+        return [SimpleNamespace(to_dict=lambda data=data: dict(data)) for data in self._docs.values()]
+
+
+class FakeJournalFirestore:
+    is_ready = True
+
+    def __init__(self) -> None:
+        self.docs: dict[str, dict] = {}
+
+    def collection(self, _name: str) -> FakeJournalCollection:
+        return FakeJournalCollection(self.docs)
+
+
+@pytest.mark.asyncio
+async def test_journal_documents_expire_and_are_deleted_once_flushed():
+    firestore = FakeJournalFirestore()
+    journal = SheetWriteJournalRepository(firestore)
+    journal.ttl = timedelta(days=7)
+    client = _client(FakeSheets(), journal)
+
+    await client.append_dream_entry("sheet", _dream("flew"))
+    [doc] = firestore.docs.values()
+    assert isinstance(doc["expires_at"], datetime)
+    assert doc["expires_at"] - datetime.fromisoformat(doc["created_at"]) == timedelta(days=7)
+
+    await client.flush("sheet")
+
+    assert firestore.docs == {}
+    assert journal.client is firestore
@@ -0,0 +1,420 @@
+import asyncio
+import json
+from datetime import date, datetime
+
+import httpx
+import pytest
+
+from src.core.exceptions import ExternalTimeoutError, SheetAccessError
+from src.core.keyed_lock import KeyedLock
+from src.models.entry import DreamEntry, HabitEntry
+from src.services.storage.firestore.sheet_layout_repo import SheetLayoutRepository
+from src.services.storage.interfaces import SheetAppend
+from src.services.storage.sheets.async_client import AsyncSheetsClient
+from src.services.storage.sheets.cache import WorksheetMetadataCache, WriteCapabilityCache
+from src.services.storage.sheets.layout import SheetLayoutTracker
+from src.services.storage.sheets.quota import SheetsQuotaGovernor
+
+
+def _col(letters: str) -> int:
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - ord("A") + 1
+    return index - 1
+
+
+class FakeSheetsApi:
+    """In-memory Sheets REST API: just enough of v4 for the client's calls."""
+
+    def __init__(self, tabs: dict[str, list[list]] | None = None) -> None:
+        self.tabs: dict[str, list[list]] = tabs or {}
+        self.ids = {title: idx for idx, title in enumerate(self.tabs)}
+        self.calls: list[str] = []
+        self.fail_with: list[int] = []
+        self.added_elsewhere: list[str] = []  # tabs another instance adds first
+
+    def _tab(self, range_name: str) -> tuple[str, str]:
+        tab, _, a1 = range_name.partition("!")
+        return tab.strip("'"), a1
+
+    def _read(self, range_name: str) -> list[list]:
+        tab, a1 = self._tab(range_name)
+        rows = self.tabs[tab]
+        start, _, _end = a1.partition(":")
+        if start.isdigit():
+            index = int(start)
+            return [list(rows[index - 1])] if index <= len(rows) and rows[index - 1] else []
+        letters = start.rstrip("0123456789")
+        first_row = int(start[len(letters):] or 1)
+        col = _col(letters)
+        last_col = _col(_end.rstrip("0123456789")) if _end else col
+        values = [list(row[col : last_col + 1]) for row in rows[first_row - 1:]]
+        for row in values:
+            while row and row[-1] in ("", None):
+                row.pop()
+        if _end:
+            while values and not values[-1]:
+                values.pop()
+            return values
+        return values[:1]
+
+    def _write_row(self, tab: str, row_index: int, values: list) -> None:
+        rows = self.tabs[tab]
+        while len(rows) < row_index:
+            rows.append([])
+        rows[row_index - 1] = list(values)
+
+    def _title(self, sheet_id: int) -> str:
+        return next(title for title, idx in self.ids.items() if idx == sheet_id)
+
+    @staticmethod
+    def _cells(row_data: dict) -> list:
+        return [next(iter(cell["userEnteredValue"].values())) for cell in row_data["values"]]
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.removeprefix("/v4/spreadsheets/")
+        self.calls.append(f"{request.method} {path.split('/', 1)[-1] if '/' in path else path}")
+        if self.fail_with:
+            status = self.fail_with.pop(0)
+            return httpx.Response(status, json={"error": {"code": status}})
+        body = json.loads(request.content) if request.content else {}
+        if request.method == "GET" and "/" not in path:
+            sheets = [{"properties": {"sheetId": self.ids[t], "title": t}} for t in self.tabs]
+            return httpx.Response(200, json={"sheets": sheets})
+        if path.endswith(":batchUpdate") and "/values" not in path:
+            for title in self.added_elsewhere:
+                self.tabs[title] = []
+                self.ids[title] = len(self.ids)
+            self.added_elsewhere = []
+            added = [req["addSheet"]["properties"]["title"] for req in body["requests"] if "addSheet" in req]
+            if any(title in self.tabs for title in added):
+                message = "Invalid requests[0].addSheet: A sheet with that name already exists."
+                return httpx.Response(400, json={"error": {"code": 400, "message": message}})
+            replies = []
+            for req in body["requests"]:
+                if "addSheet" in req:
+                    title = req["addSheet"]["properties"]["title"]
+                    self.tabs[title] = []
+                    self.ids[title] = len(self.ids)
+                    replies.append({"addSheet": {"properties": {"sheetId": self.ids[title], "title": title}}})
+                    continue
+                if "appendCells" in req:
+                    tab = self._title(req["appendCells"]["sheetId"])
+                    self.tabs[tab].append(self._cells(req["appendCells"]["rows"][0]))
+                elif "updateCells" in req:
+                    start = req["updateCells"]["start"]
+                    tab = self._title(start["sheetId"])
+                    self._write_row(tab, start["rowIndex"] + 1, self._cells(req["updateCells"]["rows"][0]))
+                replies.append({})
+            return httpx.Response(200, json={"replies": replies})
+        if path.endswith("/values:batchGet"):
+            ranges = request.url.params.get_list("ranges")
+            return httpx.Response(
+                200, json={"valueRanges": [{"range": r, "values": self._read(r)} for r in ranges]}
+            )
+        if path.endswith("/values:batchUpdate"):
+            for item in body["data"]:
+                tab, _a1 = self._tab(item["range"])
+                self._write_row(tab, 1, item["values"][0])
+            return httpx.Response(200, json={})
+        range_name = path.split("/values/", 1)[1]
+        if range_name.endswith(":append"):
+            tab, _a1 = self._tab(range_name.removesuffix(":append"))
+            self.tabs[tab].append(list(body["values"][0]))
+            row = len(self.tabs[tab])
+            return httpx.Response(200, json={"updates": {"updatedRange": f"'{tab}'!A{row}:B{row}"}})
+        if request.method == "PUT":
+            return httpx.Response(200, json={})
+        return httpx.Response(200, json={"values": self._read(range_name)})
+
+
+class FakeCredentials:
+    def __init__(self) -> None:
+        self.valid = True
+        self.token = "token-1"
+        self.refreshes = 0
+
+    def refresh(self, _request) -> None:
+        self.refreshes += 1
+        self.token = f"token-{self.refreshes + 1}"
+        self.valid = True
+
+
+def _client(api: FakeSheetsApi) -> AsyncSheetsClient:
+    client = object.__new__(AsyncSheetsClient)
+    client.credentials_path = None
+    client.service_email = None
+    client._credentials = FakeCredentials()
+    client._token_lock = asyncio.Lock()
+    client._http = httpx.AsyncClient(
+        base_url=AsyncSheetsClient._BASE_URL,
+        transport=httpx.MockTransport(api.handler),
+    )
+    client._layout = SheetLayoutTracker(None, version="test")
+    client._worksheet_refs = {}
+    client._sheet_locks = KeyedLock()
+    client._metadata = WorksheetMetadataCache(300)
+    client._write_access = WriteCapabilityCache(3600)
+    client._quota = SheetsQuotaGovernor(backoff_base_seconds=0.0)
+    return client
+
+
+def _habit_tabs(*days: date) -> dict[str, list[list]]:
+    habits = [["timestamp", "date", "raw_record", "diary"]]
+    habits += [[f"{d.isoformat()}T20:00:00", (d - date(1899, 12, 30)).days, f"record {d}", ""] for d in days]
+    return {
+        "Habits": habits,
+        "Dreams": [["timestamp", "record"]],
+        "Thoughts": [["timestamp", "record"]],
+        "Reflections": [["timestamp", "reflections"]],
+    }
+
+
+@pytest.mark.asyncio
+async def test_ensure_tabs_creates_missing_tabs_and_headers_in_batches():
+    api = FakeSheetsApi({"Habits": [["timestamp", "date", "raw_diary", "diary"]]})
+    client = _client(api)
+
+    await client.ensure_tabs("sheet")
+    await client.ensure_tabs("sheet")
+
+    assert api.calls == [
+        "GET sheet",
+        "POST sheet:batchUpdate",
+        "GET values:batchGet",
+        "POST values:batchUpdate",
+    ]
+    assert api.tabs["Habits"][0] == ["timestamp", "date", "raw_record", "diary"]
+    assert api.tabs["Reflections"] == [["timestamp", "reflections"]]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_writes_walk_the_tabs_once():
+    api = FakeSheetsApi()
+    client = _client(api)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0)  # let the other save run up to its next request
+        return api.handler(request)
+
+    client._http = httpx.AsyncClient(base_url=AsyncSheetsClient._BASE_URL, transport=httpx.MockTransport(handler))
+    await asyncio.gather(
+        client.append_dream_entry("sheet", DreamEntry(timestamp=datetime(2026, 6, 2, 7), record="flew")),
+        client.append_dream_entry("sheet", DreamEntry(timestamp=datetime(2026, 6, 2, 8), record="swam")),
+    )
+
+    assert api.calls.count("POST sheet:batchUpdate") == 1
+    assert [row[1] for row in api.tabs["Dreams"][1:]] == ["flew", "swam"]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_tab_added_by_another_instance_is_adopted():
+    api = FakeSheetsApi()
+    api.added_elsewhere = ["Dreams"]
+    client = _client(api)
+
+    await client.ensure_tabs("sheet")
+
+    assert api.calls == [
+        "GET sheet",
+        "POST sheet:batchUpdate",
+        "GET sheet",
+        "POST sheet:batchUpdate",
+        "GET values:batchGet",
+        "POST values:batchUpdate",
+    ]
+    assert sorted(api.tabs) == ["Dreams", "Habits", "Reflections", "Thoughts"]
+    assert api.tabs["Dreams"] == [["timestamp", "record"]]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_repeated_writes_reuse_cached_tab_state():
+    api = FakeSheetsApi(_habit_tabs(date(2026, 6, 1)))
+    client = _client(api)
+    entry = HabitEntry(date=date(2026, 6, 2), raw_record="new", created_at=datetime(2026, 6, 2, 21))
+
+    await client.append_habit_entry("sheet", [], entry)
+    api.calls.clear()
+    await client.append_dream_entry("sheet", DreamEntry(timestamp=datetime(2026, 6, 2, 7), record="flew"))
+    api.calls.clear()
+    await client.append_dream_entry("sheet", DreamEntry(timestamp=datetime(2026, 6, 3, 7), record="swam"))
+
+    # Tabs and headers are cached and the write verdict holds while A1 is
+    # unchanged: one A1 read and the append.
+    assert api.calls == ["GET values/'Dreams'!A1", "POST values/'Dreams':append"]
+    assert api.tabs["Habits"][2][2] == "new"
+    assert [row[1] for row in api.tabs["Dreams"][1:]] == ["flew", "swam"]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_multi_tab_lookup_uses_one_column_and_one_row_batch_get():
+    api = FakeSheetsApi(_habit_tabs(date(2025, 6, 2), date(2024, 6, 2)))
+    api.tabs["Dreams"].append(["2025-06-02T07:00:00", "flew"])
+    client = _client(api)
+    await client.ensure_tabs("sheet")
+    api.calls.clear()
+
+    entries = await client.get_entries_for_dates_multi("sheet", [date(2025, 6, 2), date(2024, 6, 2)])
+
+    assert api.calls == ["GET values:batchGet", "GET values:batchGet"]
+    assert [entry["date"] for entry in entries["Habits"]] == ["2025-06-02", "2024-06-02"]
+    assert [entry["record"] for entry in entries["Dreams"]] == ["flew"]
+    assert entries["Thoughts"] == entries["Reflections"] == []
+
+    lookup = await client.find_latest_habit_entry("sheet", date(2024, 6, 2))
+    assert lookup is not None
+    assert lookup.row_index == 3
+    assert lookup.raw_record == "record 2024-06-02"
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_lookup_and_append_on_one_sheet_keep_the_date_index_consistent():
+    api = FakeSheetsApi(_habit_tabs(date(2026, 6, 1)))
+    client = _client(api)
+    await client.ensure_tabs("sheet")
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        response = api.handler(request)
+        if request.url.path.endswith("values:batchGet"):
+            for _ in range(10):  # the column snapshot arrives after the append lands
+                await asyncio.sleep(0)
+        return response
+
+    client._http = httpx.AsyncClient(base_url=AsyncSheetsClient._BASE_URL, transport=httpx.MockTransport(handler))
+    entry = HabitEntry(date=date(2026, 6, 2), raw_record="new", created_at=datetime(2026, 6, 2, 21))
+    await asyncio.gather(
+        client.get_habit_entries_for_dates("sheet", [date(2026, 6, 1)]),
+        client.append_habit_entry("sheet", [], entry),
+    )
+
+    meta = client._metadata.get("sheet", "Habits")
+    assert meta.last_row == len(api.tabs["Habits"])
+    lookup = await client.find_latest_habit_entry("sheet", date(2026, 6, 2))
+    assert lookup is not None
+    assert lookup.row_index == 3
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_refreshed_and_request_retried():
+    api = FakeSheetsApi(_habit_tabs())
+    client = _client(api)
+    api.fail_with = [401]
+
+    await client.ensure_tabs("sheet")
+
+    assert client._credentials.refreshes == 1
+    assert api.calls[:2] == ["GET sheet", "GET sheet"]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_request_is_retried_through_the_quota_governor():
+    api = FakeSheetsApi(_habit_tabs())
+    client = _client(api)
+    api.fail_with = [429]
+
+    await client.ensure_tabs("sheet")
+
+    assert api.calls[:2] == ["GET sheet", "GET sheet"]
+    assert client._quota.stats().throttled == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_http_errors_map_to_domain_errors():
+    api = FakeSheetsApi(_habit_tabs())
+    client = _client(api)
+    await client.ensure_tabs("sheet")
+    entry = DreamEntry(timestamp=datetime(2026, 6, 2, 7), record="flew")
+    await client.append_dream_entry("sheet", entry)
+
+    api.fail_with = [403]
+    with pytest.raises(SheetAccessError):
+        await client.append_dream_entry("sheet", entry)
+    assert not client._write_access.is_proven("sheet", "Dreams", service_email=None, a1_value="timestamp")
+
+    api.fail_with = [429] * 4  # the first try plus every quota retry
+    with pytest.raises(ExternalTimeoutError):
+        await client.get_dream_entries_for_dates("sheet", [date(2026, 6, 2)])
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_append_entries_writes_all_tabs_in_one_batch_update():
+    api = FakeSheetsApi(_habit_tabs(date(2026, 6, 1)))
+    client = _client(api)
+    await client.append_dream_entry("sheet", DreamEntry(timestamp=datetime(2026, 6, 2, 7), record="warmup"))
+    api.calls.clear()
+
+    await client.append_entries(
+        "sheet",
+        [
+            SheetAppend(entry=HabitEntry(date=date(2026, 6, 2), raw_record="new", created_at=datetime(2026, 6, 2, 21))),
+            SheetAppend(entry=DreamEntry(timestamp=datetime(2026, 6, 3, 7), record="flew")),
+            SheetAppend(entry=DreamEntry(timestamp=datetime(2026, 6, 4, 7), record="swam")),
+        ],
+    )
+
+    # Habits still needs its write probe; all three rows then go out together.
+    assert api.calls[-1] == "POST sheet:batchUpdate"
+    assert api.calls.count("POST sheet:batchUpdate") == 1
+    assert api.tabs["Habits"][2][2] == "new"
+    assert [row[1] for row in api.tabs["Dreams"][1:]] == ["warmup", "flew", "swam"]
+    await client.aclose()
+
+
+
+def _shared_client(api: FakeSheetsApi, layouts: SheetLayoutRepository, version: str = "v1") -> AsyncSheetsClient:
+    client = _client(api)
+    client._layout = SheetLayoutTracker(layouts, version=version)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_verified_layout_is_shared_with_fresh_clients_until_an_error():
+    api = FakeSheetsApi(_habit_tabs())
+    layouts = SheetLayoutRepository()
+    await _shared_client(api, layouts).ensure_tabs("sheet")
+    stored = await layouts.get("sheet")
+    assert stored is not None
+    assert stored.headers["Reflections"] == ["timestamp", "reflections"]
+
+    api.calls.clear()
+    fresh = _shared_client(api, layouts)
+    await fresh.ensure_tabs("sheet")
+    assert api.calls == []
+
+    # Another layout version does not trust the record.
+    await _shared_client(api, layouts, version="v2").ensure_tabs("sheet")
+    assert api.calls[0] == "GET sheet"
+
+    # A failed call drops the record; the next call walks the tabs again.
+    api.fail_with = [404]
+    with pytest.raises(SheetAccessError):
+        await fresh.get_dream_entries_for_dates("sheet", [date(2026, 6, 2)])
+    api.calls.clear()
+    await fresh.ensure_tabs("sheet")
+    assert api.calls[0] == "GET sheet"
+    assert (await layouts.get("sheet")).version == "v1"
+    await fresh.aclose()
+
+
+@pytest.mark.asyncio
+async def test_error_responses_do_not_reset_the_throttle_backoff():
+    api = FakeSheetsApi(_habit_tabs())
+    client = _client(api)
+    await client.ensure_tabs("sheet")
+    client._quota._consecutive_throttles = 2
+    api.fail_with = [500]
+
+    with pytest.raises(ExternalTimeoutError):
+        await client.get_habit_entries_for_dates("sheet", [date(2026, 6, 2)])
+
+    assert client._quota._consecutive_throttles == 2
+    await client.aclose()
@@ -0,0 +1,254 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.models.entry import DreamEntry, HabitEntry
+from src.services.storage.sheets.cache import (
+    DateRowIndex,
+    WorksheetMetadataCache,
+    WriteCapabilityCache,
+)
+from src.services.storage.sheets.client import SheetsClient
+from src.services.storage.sheets.layout import SheetLayoutTracker
+
+
+class GridWorksheet:
+    """Worksheet fake backed by a list of rows; row 1 is the header."""
+
+    def __init__(self, title: str, rows: list[list]) -> None:
+        self.title = title
+        self.id = 0
+        self.rows = rows
+        self.column_fetches: list[str] = []
+
+    def get(self, range_name, value_render_option=None):
+        return [[self.rows[0][0]]]
+
+    def column_values(self, a1: str):
+        start, end = a1.split(":", 1)
+        first = ord(start.rstrip("0123456789")) - ord("A")
+        last = ord(end) - ord("A")
+        self.column_fetches.append(a1)
+        values = [list(row[first : last + 1]) for row in self.rows[1:]]
+        for row in values:
+            while row and row[-1] in ("", None):
+                row.pop()
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def update(self, range_name, values, value_input_option=None):
+        return None
+
+    def row_values(self, index: int):
+        return list(self.rows[index - 1]) if index <= len(self.rows) else []
+
+    def append_row(self, row, value_input_option=None):
+        self.rows.append(list(row))
+        return {"updates": {"updatedRange": f"{self.title}!A{len(self.rows)}:B{len(self.rows)}"}}
+
+
+class GridSpreadsheet:
+    def __init__(self, tabs: dict[str, GridWorksheet]) -> None:
+        self.tabs = tabs
+        self.batch_gets: list[list[str]] = []
+
+    def worksheets(self):
+        return list(self.tabs.values())
+
+    def worksheet(self, title: str):
+        return self.tabs[title]
+
+    def batch_update(self, body):
+        for request in body["requests"]:
+            if "appendCells" in request:
+                cells = request["appendCells"]["rows"][0]["values"]
+                row = [next(iter(cell["userEnteredValue"].values())) for cell in cells]
+                self.tabs["Habits"].rows.append(row)
+
+    def values_batch_get(self, ranges, params=None):
+        self.batch_gets.append(list(ranges))
+        value_ranges = []
+        for range_name in ranges:
+            tab, a1 = range_name.split("!", 1)
+            worksheet = self.tabs[tab.strip("'")]
+            start = a1.split(":", 1)[0]
+            if start.isdigit():
+                values = [worksheet.row_values(int(start))]
+            else:
+                values = worksheet.column_values(a1)
+            value_ranges.append({"range": range_name, "values": values})
+        return {"valueRanges": value_ranges}
+
+
+def _serial(value: date) -> int:
+    return (value - date(1899, 12, 30)).days
+
+
+def _client(spreadsheet: GridSpreadsheet) -> SheetsClient:
+    client = object.__new__(SheetsClient)
+    client._layout = SheetLayoutTracker(None, version="test")
+    client._cache = {}
+    client._metadata = WorksheetMetadataCache(300)
+    client._write_access = WriteCapabilityCache(3600)
+    client.credentials_path = None
+    client.client = SimpleNamespace()
+    client.service_email = None
+    client._open = lambda _sheet_id: spreadsheet
+    return client
+
+
+def _spreadsheet(habit_days: list[date]) -> GridSpreadsheet:
+    header = ["timestamp", "date", "raw_record", "diary"]
+    habit_rows = [header] + [
+        [f"{day.isoformat()}T20:00:00", _serial(day), f"record {day.isoformat()}", ""]
+        for day in habit_days
+    ]
+    return GridSpreadsheet(
+        {
+            "Habits": GridWorksheet("Habits", habit_rows),
+            "Dreams": GridWorksheet("Dreams", [["timestamp", "record"]]),
+            "Thoughts": GridWorksheet("Thoughts", [["timestamp", "record"]]),
+            "Reflections": GridWorksheet("Reflections", [["timestamp", "reflections"]]),
+        }
+    )
+
+
+def test_lookup_fetches_date_column_and_only_matching_rows():
+    days = [date(2020 + offset, 6, 2) for offset in range(6)]
+    spreadsheet = _spreadsheet(days)
+    client = _client(spreadsheet)
+
+    entries = client._get_entries_for_dates_sync(
+        "sheet", [date(2021, 6, 2), date(2024, 6, 2), date(2019, 6, 2)], "Habits", ("date",)
+    )
+    client._get_entries_for_dates_sync("sheet", [date(2022, 6, 2)], "Habits", ("date",))
+
+    assert [entry["date"] for entry in entries] == ["2021-06-02", "2024-06-02"]
+    assert entries[0]["raw_record"] == "record 2021-06-02"
+    # One date-column fetch builds the index; later lookups reuse it.
+    assert spreadsheet.tabs["Habits"].column_fetches == ["A2:B"]
+    assert spreadsheet.batch_gets == [
+        ["'Habits'!A2:B"],
+        ["'Habits'!3:3", "'Habits'!6:6"],
+        ["'Habits'!4:4"],
+    ]
+
+
+def test_index_is_extended_by_appends_without_refetching_the_column():
+    spreadsheet = _spreadsheet([date(2026, 6, 1)])
+    client = _client(spreadsheet)
+    assert client._find_latest_habit_entry_sync("sheet", date(2026, 6, 2)) is None
+
+    client._append_habit_entry_sync(
+        "sheet",
+        [],
+        HabitEntry(date=date(2026, 6, 2), raw_record="new", created_at=datetime(2026, 6, 2, 21)),
+    )
+    lookup = client._find_latest_habit_entry_sync("sheet", date(2026, 6, 2))
+
+    assert lookup is not None
+    assert lookup.row_index == 3
+    assert lookup.raw_record == "new"
+    assert spreadsheet.tabs["Habits"].column_fetches == ["A2:B"]
+
+
+def test_dream_appends_extend_the_timestamp_index():
+    spreadsheet = _spreadsheet([])
+    client = _client(spreadsheet)
+    assert client._get_entries_for_dates_sync(
+        "sheet", [date(2026, 6, 2)], "Dreams", ("timestamp", "date"), True
+    ) == []
+
+    client._append_dream_entry_sync("sheet", DreamEntry(timestamp=datetime(2026, 6, 2, 7), record="flew"))
+    entries = client._get_entries_for_dates_sync(
+        "sheet", [date(2026, 6, 2)], "Dreams", ("timestamp", "date"), True
+    )
+
+    assert [entry["record"] for entry in entries] == ["flew"]
+    assert spreadsheet.tabs["Dreams"].column_fetches == ["A2:A"]
+
+
+def test_stale_index_is_rebuilt_before_returning_a_row_to_overwrite():
+    spreadsheet = _spreadsheet([date(2026, 6, 1), date(2026, 6, 2)])
+    client = _client(spreadsheet)
+    assert client._find_latest_habit_entry_sync("sheet", date(2026, 6, 2)).row_index == 3
+
+    # Someone deletes the first data row by hand: 2026-06-02 moves up to row 2.
+    del spreadsheet.tabs["Habits"].rows[1]
+    lookup = client._find_latest_habit_entry_sync("sheet", date(2026, 6, 2))
+
+    assert lookup is not None
+    assert lookup.row_index == 2
+    assert spreadsheet.tabs["Habits"].column_fetches == ["A2:B", "A2:B"]
+
+
+def test_rows_with_a_blank_date_still_count_toward_last_row():
+    spreadsheet = _spreadsheet([date(2026, 6, 1)])
+    spreadsheet.tabs["Habits"].rows.append(["2026-06-02T20:00:00", "", "no date", ""])
+    client = _client(spreadsheet)
+
+    client._get_entries_for_dates_sync("sheet", [date(2026, 6, 1)], "Habits", ("date",))
+
+    assert client._metadata.get("sheet", "Habits").last_row == 3
+
+
+def test_stale_index_is_dropped_and_the_lookup_retried():
+    spreadsheet = _spreadsheet([date(2026, 6, 1), date(2026, 6, 2)])
+    client = _client(spreadsheet)
+    client._get_entries_for_dates_sync("sheet", [date(2026, 6, 2)], "Habits", ("date",))
+
+    del spreadsheet.tabs["Habits"].rows[1]
+    entries = client._get_entries_for_dates_sync("sheet", [date(2026, 6, 2)], "Habits", ("date",))
+
+    assert [entry["raw_record"] for entry in entries] == ["record 2026-06-02"]
+    assert spreadsheet.tabs["Habits"].column_fetches == ["A2:B", "A2:B"]
+
+
+def test_date_row_index_move_relabels_a_row():
+    index = DateRowIndex(date_column=1)
+    index.add(date(2026, 6, 1), 2)
+    index.add(date(2026, 6, 1), 5)
+
+    index.move(5, date(2026, 6, 3))
+
+    assert index.rows_for([date(2026, 6, 1), date(2026, 6, 3)]) == [
+        (2, date(2026, 6, 1)),
+        (5, date(2026, 6, 3)),
+    ]
+    assert index.rows_for([date(2026, 6, 1)], latest_only=True) == [(2, date(2026, 6, 1))]
+
+
+def test_multi_tab_lookup_reads_all_tabs_with_one_row_batch_get():
+    spreadsheet = _spreadsheet([date(2025, 6, 2), date(2024, 6, 2)])
+    spreadsheet.tabs["Dreams"].rows.append(["2025-06-02T07:00:00", "flew"])
+    spreadsheet.tabs["Dreams"].rows.append(["2025-06-02T08:00:00", "swam"])
+    spreadsheet.tabs["Reflections"].rows.append(["2024-06-02T22:00:00", '{"q": "a"}'])
+    client = _client(spreadsheet)
+    dates = [date(2025, 6, 2), date(2024, 6, 2)]
+
+    results = client._get_entries_for_dates_multi_sync(
+        "sheet", dates, ("Habits", "Dreams", "Thoughts", "Reflections")
+    )
+
+    assert [entry["date"] for entry in results["Habits"]] == ["2025-06-02", "2024-06-02"]
+    assert [entry["record"] for entry in results["Dreams"]] == ["flew", "swam"]
+    assert results["Thoughts"] == []
+    assert results["Reflections"][0]["reflections"] == '{"q": "a"}'
+    column_batch, row_batch = spreadsheet.batch_gets
+    assert column_batch == ["'Habits'!A2:B", "'Dreams'!A2:A", "'Thoughts'!A2:A", "'Reflections'!A2:A"]
+    assert row_batch == ["'Habits'!2:2", "'Habits'!3:3", "'Dreams'!2:2", "'Dreams'!3:3", "'Reflections'!2:2"]
+
+    client._get_entries_for_dates_multi_sync("sheet", dates, ("Habits", "Dreams", "Thoughts", "Reflections"))
+
+    # Warm indices: the repeat lookup is a single row batchGet.
+    assert len(spreadsheet.batch_gets) == 3
+
+
+@pytest.mark.asyncio
+async def test_multi_tab_lookup_rejects_unknown_tabs():
+    client = _client(_spreadsheet([]))
+
+    with pytest.raises(ValueError):
+        await client.get_entries_for_dates_multi("sheet", [date(2026, 6, 2)], ("Habits", "Notes"))
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.core.exceptions import ExternalTimeoutError
+from src.services.storage.sheets.executor import SheetIOExecutor
+
+
+@pytest.mark.asyncio
+async def test_calls_for_one_sheet_run_in_order_and_other_sheets_in_parallel():
+    executor = SheetIOExecutor(4)
+    release_first = threading.Event()
+    events: list[str] = []
+
+    def slow(name: str) -> str:
+        events.append(f"start {name}")
+        release_first.wait(timeout=5)
+        events.append(f"end {name}")
+        return name
+
+    def quick(name: str) -> str:
+        events.append(f"run {name}")
+        return name
+
+    first = asyncio.create_task(executor.run("diary", slow, "a1"))
+    await asyncio.sleep(0.05)
+    second = asyncio.create_task(executor.run("diary", quick, "a2"))
+    other = asyncio.create_task(executor.run("other", quick, "b1"))
+    assert await other == "b1"
+    assert "run a2" not in events
+
+    release_first.set()
+    assert await asyncio.gather(first, second) == ["a1", "a2"]
+    assert events == ["start a1", "run b1", "end a1", "run a2"]
+    stats = executor.stats()
+    assert (stats.pending, stats.running, stats.dispatched) == (0, 0, 3)
+    assert executor._slots == {}
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_caller_keeps_sheet_locked_until_thread_returns():
+    executor = SheetIOExecutor(2)
+    release = threading.Event()
+    order: list[str] = []
+
+    def blocking() -> None:
+        release.wait(timeout=5)
+        order.append("first done")
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(executor.run("diary", blocking), timeout=0.05)
+    follower = asyncio.create_task(executor.run("diary", order.append, "second"))
+    await asyncio.sleep(0.05)
+    assert order == []
+
+    release.set()
+    await follower
+    assert order == ["first done", "second"]
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_calls_beyond_max_pending_are_rejected():
+    executor = SheetIOExecutor(1, max_pending=1)
+    release = threading.Event()
+    running = asyncio.create_task(executor.run("a", release.wait, 5))
+    await asyncio.sleep(0.05)
+    queued = asyncio.create_task(executor.run("b", lambda: "b"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ExternalTimeoutError):
+        await executor.run("c", lambda: "c")
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert executor.stats().rejected == 1
+    executor.shutdown()
@@ -0,0 +1,184 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.exceptions import SheetWriteError
+from src.models.entry import DreamEntry, HabitEntry
+from src.services.storage.firestore.sheet_layout_repo import SheetLayoutRepository
+from src.services.storage.sheets.cache import WorksheetMetadataCache, WriteCapabilityCache
+from src.services.storage.sheets.client import SheetsClient
+from src.services.storage.sheets.executor import SheetIOExecutor
+from src.services.storage.sheets.layout import SheetLayoutTracker
+from src.services.storage.sheets.quota import SheetsQuotaGovernor
+
+
+class CountingWorksheet:
+    def __init__(self, title: str, header: list[str]) -> None:
+        self.title = title
+        self.id = 0
+        self.header = header
+        self.rows = 1
+        self.row_values_calls = 0
+        self.fail_next_append = False
+
+    def get(self, *_args, **_kwargs):
+        return [["timestamp"]]
+
+    def update(self, range_name, values, value_input_option=None):
+        if range_name == "1:1":
+            self.header = values[0]
+
+    def row_values(self, index: int):
+        self.row_values_calls += 1
+        return self.header if index == 1 else []
+
+    def append_row(self, row, value_input_option=None):
+        if self.fail_next_append:
+            self.fail_next_append = False
+            raise RuntimeError("boom")
+        self.rows += 1
+        return {"updates": {"updatedRange": f"{self.title}!A{self.rows}:D{self.rows}"}}
+
+
+class CountingSpreadsheet:
+    def __init__(self) -> None:
+        self.worksheet_calls = 0
+        self.worksheets_by_title = {
+            "Habits": CountingWorksheet("Habits", ["timestamp", "date", "raw_record", "diary"]),
+            "Dreams": CountingWorksheet("Dreams", ["timestamp", "record"]),
+            "Thoughts": CountingWorksheet("Thoughts", ["timestamp", "record"]),
+            "Reflections": CountingWorksheet("Reflections", ["timestamp", "reflections"]),
+        }
+
+        self.batches: list[dict] = []
+
+    def worksheets(self):
+        return list(self.worksheets_by_title.values())
+
+    def batch_update(self, body):
+        self.batches.append(body)
+        return {"replies": []}
+
+    def worksheet(self, title: str):
+        self.worksheet_calls += 1
+        return self.worksheets_by_title[title]
+
+
+def _client(clock=None):
+    client = object.__new__(SheetsClient)
+    client._layout = SheetLayoutTracker(None, version="test")
+    client._cache = {}
+    client._metadata = WorksheetMetadataCache(300, clock=clock)
+    client._write_access = WriteCapabilityCache(3600)
+    client._io = SheetIOExecutor(2)
+    client._quota = SheetsQuotaGovernor()
+    client.credentials_path = None
+    client.client = SimpleNamespace()
+    client.service_email = None
+    spreadsheet = CountingSpreadsheet()
+    client._open = lambda _sheet_id: spreadsheet
+    return client, spreadsheet
+
+
+def _habit(day: int) -> HabitEntry:
+    return HabitEntry(
+        date=date(2026, 6, day),
+        raw_record="record",
+        created_at=datetime(2026, 6, day, 12, 0),
+    )
+
+
+def test_repeated_habit_appends_reuse_cached_header_and_worksheet():
+    client, spreadsheet = _client()
+    habits = spreadsheet.worksheet("Habits")
+    spreadsheet.worksheet_calls = 0
+
+    client._append_habit_entry_sync("sheet", ["sleep"], _habit(1))
+    row_values_after_first = habits.row_values_calls
+    client._append_habit_entry_sync("sheet", ["sleep"], _habit(2))
+    client._append_habit_entry_sync("sheet", ["sleep"], _habit(3))
+
+    # Header is read while ensuring tabs and once more before the first append
+    # rewrites it; later appends add no columns and use the cache.
+    assert habits.row_values_calls == row_values_after_first == 2
+    assert spreadsheet.worksheet_calls == 0
+    request_kinds = [
+        [next(iter(request)) for request in batch["requests"]] for batch in spreadsheet.batches
+    ]
+    # Header fix and date format ride along with the first append only.
+    assert request_kinds == [
+        ["updateCells", "repeatCell", "appendCells"],
+        ["appendCells"],
+        ["appendCells"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_api_runs_on_the_executor_and_records_the_layout():
+    client, spreadsheet = _client()
+    layouts = SheetLayoutRepository(None)
+    client._layout = SheetLayoutTracker(layouts, version="test")
+
+    await client.ensure_tabs("sheet")
+    await client.append_dream_entry(
+        "sheet", DreamEntry(timestamp=datetime(2026, 6, 2, 12, 0), record="flew")
+    )
+
+    stored = await layouts.get("sheet")
+    assert stored is not None and set(stored.headers) == {"Habits", "Dreams", "Thoughts", "Reflections"}
+    assert client._io.stats().dispatched == 2
+    assert spreadsheet.worksheet("Dreams").rows == 2
+
+
+def test_header_is_reread_before_a_rewrite_so_manual_edits_survive():
+    client, spreadsheet = _client()
+    habits = spreadsheet.worksheet("Habits")
+    client._append_habit_entry_sync("sheet", [], _habit(1))
+
+    # Someone adds a column by hand while the old header is still cached.
+    habits.header = ["timestamp", "date", "raw_record", "diary", "mood"]
+    client._append_habit_entry_sync("sheet", ["sleep"], _habit(2))
+
+    header_cells = spreadsheet.batches[-1]["requests"][0]["updateCells"]["rows"][0]["values"]
+    written = [next(iter(cell["userEnteredValue"].values())) for cell in header_cells]
+    assert written == ["timestamp", "date", "raw_record", "diary", "mood", "sleep"]
+
+
+def test_api_error_invalidates_cached_tab_metadata():
+    client, spreadsheet = _client()
+    dreams = spreadsheet.worksheet("Dreams")
+    entry = DreamEntry(timestamp=datetime(2026, 6, 2, 12, 0), record="flew")
+    client._append_dream_entry_sync("sheet", entry)
+    assert client._metadata.get("sheet", "Dreams") is not None
+
+    dreams.fail_next_append = True
+    with pytest.raises(SheetWriteError):
+        client._append_dream_entry_sync("sheet", entry)
+
+    assert client._metadata.get("sheet", "Dreams") is None
+    client._append_dream_entry_sync("sheet", entry)
+    assert dreams.row_values_calls == 2
+
+
+def test_metadata_cache_entries_expire_after_ttl():
+    now = [0.0]
+    cache = WorksheetMetadataCache(10, clock=lambda: now[0])
+    cache.put("sheet", "Habits", object(), ["timestamp"])
+
+    now[0] = 9.9
+    assert cache.get("sheet", "Habits") is not None
+    now[0] = 10.0
+    assert cache.get("sheet", "Habits") is None
+
+
+def test_metadata_cache_evicts_least_recently_used_entry():
+    cache = WorksheetMetadataCache(60, max_entries=2)
+    cache.put("a", "Habits", object(), [])
+    cache.put("b", "Habits", object(), [])
+    cache.get("a", "Habits")
+    cache.put("c", "Habits", object(), [])
+
+    assert cache.get("a", "Habits") is not None
+    assert cache.get("b", "Habits") is None
+    assert cache.get("c", "Habits") is not None
@@ -0,0 +1,28 @@
+from src.services.storage.sheets.mutations import SheetMutationBatch
+
+
+def test_empty_batch_is_falsy():
+    assert not SheetMutationBatch(7)
+
+
+def test_write_row_targets_zero_based_grid_row():
+    batch = SheetMutationBatch(7).write_row(5, ["2026-06-02T12:00:00", 46175, "", True])
+
+    [request] = batch.body()["requests"]
+    update = request["updateCells"]
+    assert update["start"] == {"sheetId": 7, "rowIndex": 4, "columnIndex": 0}
+    assert update["fields"] == "userEnteredValue"
+    assert [cell["userEnteredValue"] for cell in update["rows"][0]["values"]] == [
+        {"stringValue": "2026-06-02T12:00:00"},
+        {"numberValue": 46175},
+        {"stringValue": ""},
+        {"boolValue": True},
+    ]
+
+
+def test_header_fix_is_written_to_first_row():
+    batch = SheetMutationBatch(3).set_header(["timestamp", "reflections"])
+
+    [request] = batch.body()["requests"]
+    assert request["updateCells"]["start"]["rowIndex"] == 0
+    assert len(batch) == 1
@@ -0,0 +1,142 @@
+from datetime import datetime, timezone
+
+import pytest
+from requests import Response
+
+from src.core.exceptions import ExternalTimeoutError
+from src.services.storage.sheets.quota import GovernedHTTPClient, SheetsQuotaGovernor, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _governor(clock: FakeClock, **kwargs) -> SheetsQuotaGovernor:
+    kwargs.setdefault("user_reads_per_minute", 60)
+    kwargs.setdefault("user_writes_per_minute", 60)
+    return SheetsQuotaGovernor(clock=clock, **kwargs)
+
+
+def test_burst_beyond_bucket_is_scheduled_at_the_refill_rate():
+    clock = FakeClock()
+    governor = _governor(clock)
+
+    waits = [governor.reserve("write", "bot@example") for _ in range(32)]
+
+    # 60/min keeps 30 tokens of burst, then one token per second.
+    assert waits[:30] == [0.0] * 30
+    assert waits[30:] == pytest.approx([1.0, 2.0])
+    assert governor.reserve("read", "bot@example") == 0.0  # reads have their own bucket
+    stats = governor.stats()
+    assert (stats.granted, stats.delayed) == (33, 2)
+    assert stats.tokens["user:bot@example:write"] == pytest.approx(-2.0)
+
+
+def test_project_bucket_is_shared_between_principals():
+    clock = FakeClock()
+    governor = _governor(clock, project_writes_per_minute=4)
+
+    assert governor.reserve("write", "a") == 0.0
+    assert governor.reserve("write", "b") == 0.0
+    assert governor.reserve("write", "c") == pytest.approx(15.0)
+
+
+def test_waits_past_the_limit_are_rejected_without_spending_tokens():
+    clock = FakeClock()
+    governor = _governor(clock, user_writes_per_minute=2, max_wait_seconds=10)
+
+    governor.reserve("write")
+    with pytest.raises(ExternalTimeoutError):
+        governor.reserve("write")
+
+    clock.now = 30.0
+    assert governor.reserve("write") == 0.0
+    assert governor.stats().rejected == 1
+
+
+def test_retry_after_pauses_every_request():
+    clock = FakeClock()
+    governor = _governor(clock)
+
+    assert governor.throttled(5.0, attempt=0) is True
+    assert governor.reserve("read") == pytest.approx(5.0)
+    assert governor.stats().blocked_for_seconds == pytest.approx(5.0)
+    assert governor.throttled(60.0, attempt=0) is False  # longer than max_wait
+
+
+def test_backoff_without_retry_after_is_jittered_and_grows():
+    clock = FakeClock()
+    governor = _governor(clock, backoff_base_seconds=2.0, rng=lambda: 1.0)
+
+    governor.throttled(None, attempt=0)
+    assert governor.stats().blocked_for_seconds == pytest.approx(2.0)
+    governor.throttled(None, attempt=1)
+    assert governor.stats().blocked_for_seconds == pytest.approx(4.0)
+    assert governor.throttled(None, attempt=3) is False  # out of retries
+
+    governor.succeeded()
+    clock.now = 100.0
+    governor._rng = lambda: 0.0
+    governor.throttled(None, attempt=0)
+    assert governor.stats().blocked_for_seconds == pytest.approx(1.0)
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    now = datetime(2026, 6, 2, 21, 0, tzinfo=timezone.utc)
+
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Tue, 02 Jun 2026 21:00:30 GMT", now=now) == 30.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+class FakeSession:
+    def __init__(self, statuses: list[int]) -> None:
+        self.statuses = statuses
+        self.requests = 0
+
+    def request(self, *args, **kwargs) -> Response:
+        self.requests += 1
+        response = Response()
+        response.status_code = self.statuses.pop(0)
+        response._content = b'{"error": {"code": %d, "message": "quota"}}' % response.status_code
+        response.headers["Retry-After"] = "0"
+        return response
+
+
+def test_gspread_transport_retries_429_after_retry_after():
+    session = FakeSession([429, 200])
+    http = object.__new__(GovernedHTTPClient)
+    http.session = session
+    http.timeout = None
+    http.governor = SheetsQuotaGovernor()
+    http.principal = None
+
+    response = http.request("get", "https://sheets.googleapis.com/v4/spreadsheets/sheet")
+
+    assert response.status_code == 200
+    assert session.requests == 2
+    assert http.governor.stats().throttled == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_until_ready_sleeps_off_the_backoff_without_spending_tokens(monkeypatch):
+    clock = FakeClock()
+    governor = _governor(clock)
+    governor.throttled(3.0, attempt=0)
+    sleeps: list[float] = []
+
+    async def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr("src.services.storage.sheets.quota.asyncio.sleep", fake_sleep)
+    await governor.wait_until_ready("bot@example")
+
+    assert sleeps == [pytest.approx(3.0)]
+    assert governor.stats().granted == 0
+    assert governor.reserve("write", "bot@example") == 0.0
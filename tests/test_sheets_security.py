@@ -5,19 +5,22 @@ import pytest
 
 from src.core.exceptions import SheetAccessError
 from src.models.entry import DreamEntry, HabitEntry, ReflectionEntry, ThoughtEntry
+from src.services.storage.sheets.cache import WorksheetMetadataCache, WriteCapabilityCache
 from src.services.storage.sheets.client import SheetsClient
+from src.services.storage.sheets.layout import SheetLayoutTracker
 
 
 class FakeWorksheet:
-    def __init__(self, title: str, header: list[str]) -> None:
+    def __init__(self, title: str, header: list[str], worksheet_id: int = 0) -> None:
         self.title = title
+        self.id = worksheet_id
         self.header = header
         self.appended: list[tuple[list[str], str | None]] = []
         self.updated: list[tuple[str, list[list[str]], str | None]] = []
         self.formatted: list[tuple[str, dict]] = []
 
     def get(self, *_args, **_kwargs):
-        return [["timestamp"]]
+        return [[self.header[0]]] if self.header else []
 
     def update(self, range_name, values, value_input_option=None):
         self.updated.append((range_name, values, value_input_option))
@@ -37,11 +40,16 @@ class FakeWorksheet:
 class FakeSpreadsheet:
     def __init__(self) -> None:
         self.worksheets_by_title = {
-            "Habits": FakeWorksheet("Habits", ["timestamp", "date", "raw_record", "diary"]),
-            "Dreams": FakeWorksheet("Dreams", ["timestamp", "record"]),
-            "Thoughts": FakeWorksheet("Thoughts", ["timestamp", "record"]),
-            "Reflections": FakeWorksheet("Reflections", ["timestamp", "reflections"]),
+            "Habits": FakeWorksheet("Habits", ["timestamp", "date", "raw_record", "diary"], 1),
+            "Dreams": FakeWorksheet("Dreams", ["timestamp", "record"], 2),
+            "Thoughts": FakeWorksheet("Thoughts", ["timestamp", "record"], 3),
+            "Reflections": FakeWorksheet("Reflections", ["timestamp", "reflections"], 4),
         }
+        self.batches: list[dict] = []
+
+    def batch_update(self, body):
+        self.batches.append(body)
+        return {"replies": [{} for _ in body["requests"]]}
 
     def worksheets(self):
         return list(self.worksheets_by_title.values())
@@ -52,8 +60,10 @@ class FakeSpreadsheet:
 
 def _client_with_fake_spreadsheet():
     client = object.__new__(SheetsClient)
-    client._tabs_ensured = set()
+    client._layout = SheetLayoutTracker(None, version="test")
     client._cache = {}
+    client._metadata = WorksheetMetadataCache(300)
+    client._write_access = WriteCapabilityCache(3600)
     client.credentials_path = None
     client.client = SimpleNamespace()
     client.service_email = None
@@ -73,14 +83,23 @@ def test_habit_entries_are_written_raw_to_prevent_formula_execution():
 
     client._append_habit_entry_sync("sheet", [], entry)
 
-    row, value_input_option = spreadsheet.worksheet("Habits").appended[0]
-    assert value_input_option == "RAW"
-    assert row[1] == 46175
-    assert row[2].startswith("=")
-    assert row[3].startswith("+")
-    assert spreadsheet.worksheet("Habits").formatted == [
-        ("B:B", {"numberFormat": {"type": "DATE", "pattern": "dd-mm-yyyy"}})
-    ]
+    [batch] = spreadsheet.batches
+    format_request, append_request = batch["requests"]
+    assert format_request["repeatCell"]["range"] == {
+        "sheetId": 1,
+        "startColumnIndex": 1,
+        "endColumnIndex": 2,
+    }
+    assert format_request["repeatCell"]["cell"] == {
+        "userEnteredFormat": {"numberFormat": {"type": "DATE", "pattern": "dd-mm-yyyy"}}
+    }
+    cells = [cell["userEnteredValue"] for cell in append_request["appendCells"]["rows"][0]["values"]]
+    # stringValue is never evaluated, the batchUpdate equivalent of RAW input.
+    assert all("formulaValue" not in cell for cell in cells)
+    assert cells[1] == {"numberValue": 46175}
+    assert cells[2]["stringValue"].startswith("=")
+    assert cells[3]["stringValue"].startswith("+")
+    assert spreadsheet.worksheet("Habits").appended == []
 
 
 def test_habit_entry_sheet_row_uses_numeric_date_for_raw_writes():
@@ -111,7 +130,10 @@ def test_other_entry_types_are_written_raw_to_prevent_formula_execution():
 
     assert spreadsheet.worksheet("Dreams").appended[0][1] == "RAW"
     assert spreadsheet.worksheet("Thoughts").appended[0][1] == "RAW"
-    assert spreadsheet.worksheet("Reflections").appended[0][1] == "RAW"
+    [reflection_batch] = spreadsheet.batches
+    [append_request] = reflection_batch["requests"]
+    cells = [cell["userEnteredValue"] for cell in append_request["appendCells"]["rows"][0]["values"]]
+    assert cells[1] == {"stringValue": '{"q": "=1+1"}'}
 
 
 def test_mapped_sheet_errors_are_not_reclassified_as_write_errors():
@@ -120,3 +142,64 @@ def test_mapped_sheet_errors_are_not_reclassified_as_write_errors():
 
     with pytest.raises(SheetAccessError):
         client._ensure_tabs_sync("sheet")
+
+
+def _a1_probe_count(worksheet: FakeWorksheet) -> int:
+    return sum(1 for range_name, _values, _option in worksheet.updated if range_name == "A1")
+
+
+def test_write_access_probe_is_reused_across_writes():
+    client, spreadsheet = _client_with_fake_spreadsheet()
+    entry = DreamEntry(timestamp=datetime(2026, 6, 2, 12, 0), record="flew")
+
+    client._append_dream_entry_sync("sheet", entry)
+    client._append_dream_entry_sync("sheet", entry)
+
+    dreams = spreadsheet.worksheet("Dreams")
+    assert _a1_probe_count(dreams) == 1
+    assert len(dreams.appended) == 2
+
+
+def test_write_access_is_reproven_when_a1_changes():
+    client, spreadsheet = _client_with_fake_spreadsheet()
+    entry = DreamEntry(timestamp=datetime(2026, 6, 2, 12, 0), record="flew")
+    client._append_dream_entry_sync("sheet", entry)
+
+    # Edited in the sheet, while the old header is still cached.
+    spreadsheet.worksheet("Dreams").header = ["rewritten", "record"]
+    client._append_dream_entry_sync("sheet", entry)
+
+    assert _a1_probe_count(spreadsheet.worksheet("Dreams")) == 2
+    assert client._metadata.get("sheet", "Dreams").header == ["rewritten", "record"]
+
+
+def test_write_access_is_reproven_for_a_different_service_account():
+    client, spreadsheet = _client_with_fake_spreadsheet()
+    entry = DreamEntry(timestamp=datetime(2026, 6, 2, 12, 0), record="flew")
+    client._append_dream_entry_sync("sheet", entry)
+
+    client.service_email = "rotated@example.iam.gserviceaccount.com"
+    client._append_dream_entry_sync("sheet", entry)
+
+    assert _a1_probe_count(spreadsheet.worksheet("Dreams")) == 2
+
+
+def test_permission_error_drops_cached_write_verdict():
+    client, spreadsheet = _client_with_fake_spreadsheet()
+    entry = DreamEntry(timestamp=datetime(2026, 6, 2, 12, 0), record="flew")
+    client._append_dream_entry_sync("sheet", entry)
+    dreams = spreadsheet.worksheet("Dreams")
+
+    def denied(*_args, **_kwargs):
+        raise SheetAccessError("denied")
+
+    dreams.append_row = denied
+    with pytest.raises(SheetAccessError):
+        client._append_dream_entry_sync("sheet", entry)
+
+    assert not client._write_access.is_proven(
+        "sheet",
+        "Dreams",
+        service_email=None,
+        a1_value="timestamp",
+    )
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from src.services.telegram.bot import _extract_update_user_id
+from src.services.telegram.update_queue import UpdateQueue
+
+
+def _update(update_id: int, user_id: int, text: str = "hi") -> dict:
+    return {"update_id": update_id, "message": {"from": {"id": user_id}, "text": text}}
+
+
+class RecordingHandler:
+    def __init__(self) -> None:
+        self.events: list[tuple[str, int]] = []
+        self.gates: dict[int, asyncio.Event] = {}
+
+    async def __call__(self, payload: dict) -> None:
+        update_id = payload["update_id"]
+        self.events.append(("start", update_id))
+        if update_id in self.gates:
+            await self.gates[update_id].wait()
+        if payload["message"]["text"] == "boom":
+            raise RuntimeError("handler failed")
+        self.events.append(("end", update_id))
+
+
+@pytest.mark.asyncio
+async def test_one_user_runs_in_order_while_other_users_proceed():
+    handler = RecordingHandler()
+    handler.gates[1] = asyncio.Event()
+    queue = UpdateQueue(handler, key=_extract_update_user_id, workers=4)
+
+    assert [queue.submit(update) for update in (_update(1, 7), _update(2, 7), _update(3, 8))] == [
+        "queued",
+        "queued",
+        "queued",
+    ]
+    await asyncio.sleep(0.01)
+
+    # User 7's second update waits for the first; user 8 is not held up.
+    assert ("end", 3) in handler.events
+    assert ("start", 2) not in handler.events
+    assert queue.stats().depth == 1 and queue.stats().in_flight == 1
+
+    handler.gates[1].set()
+    await queue.join()
+
+    assert handler.events.index(("end", 1)) < handler.events.index(("start", 2))
+    assert queue.stats().processed == 3
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_redelivered_updates_are_dropped_and_a_full_queue_refuses():
+    handler = RecordingHandler()
+    queue = UpdateQueue(handler, key=_extract_update_user_id, max_pending=2)
+
+    assert queue.submit(_update(1, 7)) == "queued"
+    assert queue.submit(_update(1, 7)) == "duplicate"
+    assert queue.submit(_update(2, 8)) == "queued"
+    assert queue.submit(_update(3, 9)) == "full"
+    await queue.join()
+
+    # A refused update was not remembered, so Telegram's redelivery is accepted.
+    assert queue.submit(_update(3, 9)) == "queued"
+    await queue.join()
+
+    stats = queue.stats()
+    assert [update_id for kind, update_id in handler.events if kind == "end"] == [1, 2, 3]
+    assert (stats.duplicates, stats.rejected, stats.processed) == (1, 1, 3)
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failures_are_counted_and_lag_is_measured():
+    now = [100.0]
+    handler = RecordingHandler()
+    queue = UpdateQueue(handler, key=_extract_update_user_id, clock=lambda: now[0])
+
+    queue.submit(_update(1, 7, "boom"))
+    queue.submit(_update(2, 7))
+    now[0] = 102.5
+    assert queue.stats().oldest_wait_seconds == pytest.approx(2.5)
+
+    await queue.join()
+
+    stats = queue.stats()
+    assert (stats.failed, stats.processed, stats.depth) == (1, 1, 0)
+    assert stats.max_lag_seconds == pytest.approx(2.5)
+    assert stats.oldest_wait_seconds == 0
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_a_closing_queue_finishes_its_updates_and_refuses_new_ones():
+    handler = RecordingHandler()
+    queue = UpdateQueue(handler, key=_extract_update_user_id, workers=2)
+
+    assert queue.submit(_update(1, 7)) == "queued"
+    await queue.aclose()
+
+    assert handler.events == [("start", 1), ("end", 1)]
+    assert queue.submit(_update(2, 7)) == "closed"
+    assert queue.submit(_update(1, 7)) == "duplicate"
+    await asyncio.sleep(0)
+    assert queue._workers == [] and handler.events[-1] == ("end", 1)
@@ -0,0 +1,165 @@
+from collections import Counter
+
+import pytest
+
+from src.models.session import ConversationState, SessionData
+from src.models.user import UserProfile
+from src.services.storage.firestore.profile_cache import ProfileCache
+from src.services.storage.firestore.session_repo import SessionRepository
+from src.services.storage.firestore.user_repo import UserRepository
+from src.services.telegram.unit_of_work import current_unit_of_work, update_unit_of_work
+
+
+class FakeSnapshot:
+    def __init__(self, data: dict | None) -> None:
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> dict | None:
+        return self._data
+
+
+class FakeDocument:
+    def __init__(self, client: "FakeFirestoreClient", path: tuple[str, str]) -> None:
+        self._client = client
+        self._path = path
+
+    def get(self) -> FakeSnapshot:
+        self._client.ops[("get", self._path[0])] += 1
+        data = self._client.docs.get(self._path)
+        return FakeSnapshot(dict(data) if data is not None else None)
+
+    def set(self, data: dict) -> None:
+        self._client.ops[("write", self._path[0])] += 1
+        self._client.docs[self._path] = dict(data)
+
+    def update(self, data: dict) -> None:
+        self._client.ops[("write", self._path[0])] += 1
+        self._client.docs[self._path].update(data)
+
+    def delete(self) -> None:
+        self._client.docs.pop(self._path, None)
+
+
+class FakeCollection:
+    def __init__(self, client: "FakeFirestoreClient", name: str) -> None:
+        self._client = client
+        self._name = name
+
+    def document(self, doc_id: str) -> FakeDocument:
+        return FakeDocument(self._client, (self._name, doc_id))
+
+
+class FakeFirestoreClient:
+    is_ready = True
+
+    def __init__(self) -> None:
+        self.docs: dict[tuple[str, str], dict] = {}
+        self.ops: Counter = Counter()
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self, name)
+
+
+class FakeDeps:
+    def __init__(self, client: FakeFirestoreClient) -> None:
+        self._sessions = SessionRepository(client)
+        self._users = UserRepository(client, cache=ProfileCache(0))
+
+    def session_repo(self) -> SessionRepository:
+        return self._sessions
+
+    def user_repo(self) -> UserRepository:
+        return self._users
+
+
+async def _handler_step(deps: FakeDeps, user_id: int, step: int) -> None:
+    """What route_text and the habit handlers each do: read, change, save."""
+
+    session = await deps.session_repo().get(user_id) or SessionData(user_id=user_id)
+    session.temp_data["step"] = step
+    await deps.session_repo().save(session)
+    profile = await deps.user_repo().get_by_telegram_id(user_id)
+    profile.timezone = f"Etc/GMT-{step}"
+    await deps.user_repo().update(profile)
+
+
+@pytest.mark.asyncio
+async def test_one_update_reads_and_writes_session_and_profile_once():
+    client = FakeFirestoreClient()
+    deps = FakeDeps(client)
+    await deps.user_repo().create(UserProfile(telegram_user_id=7))
+    client.ops.clear()
+
+    async with update_unit_of_work(deps, 7) as unit:
+        assert current_unit_of_work() is unit
+        assert unit.profile.telegram_user_id == 7 and unit.session is None
+        for step in (1, 2, 3):
+            await _handler_step(deps, 7, step)
+        assert not any(kind == "write" for kind, _ in client.ops)
+
+    assert current_unit_of_work() is None
+    assert client.ops == Counter(
+        {("get", "sessions"): 1, ("get", "users"): 1, ("write", "sessions"): 1, ("write", "users"): 1}
+    )
+    assert client.docs[("sessions", "7")]["temp_data"] == {"step": 3}
+    assert client.docs[("users", "7")]["timezone"] == "Etc/GMT-3"
+
+
+@pytest.mark.asyncio
+async def test_changes_after_the_last_save_are_not_written():
+    client = FakeFirestoreClient()
+    deps = FakeDeps(client)
+    await deps.user_repo().create(UserProfile(telegram_user_id=7))
+    await deps.session_repo().save(SessionData(user_id=7))
+
+    async with update_unit_of_work(deps, 7):
+        profile = await deps.user_repo().get_by_telegram_id(7)
+        profile.language = "ru"
+        await deps.user_repo().update(profile)
+        profile.language = "de"  # never saved
+        session = await deps.session_repo().get(7)
+        session.state = ConversationState.DREAM_AWAITING_CONTENT
+        await deps.session_repo().delete(7)
+
+    assert client.docs[("users", "7")]["language"] == "ru"
+    assert ("sessions", "7") not in client.docs
+
+
+@pytest.mark.asyncio
+async def test_updates_without_a_user_still_get_deferred_writes():
+    client = FakeFirestoreClient()
+    deps = FakeDeps(client)
+
+    async with update_unit_of_work(deps, None) as unit:
+        assert unit is None
+        await deps.session_repo().save(SessionData(user_id=1))
+        assert client.docs == {}
+
+    assert ("sessions", "1") in client.docs
+
+
+@pytest.mark.asyncio
+async def test_profile_flush_writes_only_the_changed_fields(monkeypatch):
+    client = FakeFirestoreClient()
+    deps = FakeDeps(client)
+    await deps.user_repo().create(UserProfile(telegram_user_id=7))
+    updates: list[dict] = []
+    original_update = FakeDocument.update
+
+    def recording_update(self, data: dict) -> None:
+        updates.append(dict(data))
+        original_update(self, data)
+
+    monkeypatch.setattr(FakeDocument, "update", recording_update)
+    async with update_unit_of_work(deps, 7):
+        profile = await deps.user_repo().get_by_telegram_id(7)
+        # Written by a reminder dispatch while this update was handled.
+        client.docs[("users", "7")]["reminder_next_run_utc"] = "2026-06-02T18:00:00Z"
+        profile.language = "ru"
+        profile.usage_stats.habits += 1
+        await deps.user_repo().update(profile)
+
+    assert [set(data) for data in updates] == [{"language", "usage_stats"}]
+    assert client.docs[("users", "7")]["reminder_next_run_utc"] == "2026-06-02T18:00:00Z"
+    assert client.docs[("users", "7")]["language"] == "ru"
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.models.usage_event import UsageEvent
+from src.services.storage.firestore.usage_event_buffer import BufferedUsageEventRepository
+from src.services.storage.firestore.usage_event_repo import UsageEventRepository
+
+
+class FakeSnapshot:
+    def __init__(self, data: dict) -> None:
+        self._data = data
+
+    def to_dict(self) -> dict:
+        return self._data
+
+
+class FakeBatch:
+    def __init__(self, client: "FakeFirestoreClient") -> None:
+        self._client = client
+        self._writes: list[dict] = []
+
+    def set(self, _doc_ref, data: dict) -> None:
+        self._writes.append(data)
+
+    def commit(self) -> None:
+        if self._client.fail:
+            raise RuntimeError("unavailable")
+        self._client.commits.append(len(self._writes))
+        self._client.docs.extend(self._writes)
+
+
+class FakeQuery:
+    """Enough of a Firestore query for ``list_between``: range filters and a limit."""
+
+    def __init__(self, client: "FakeFirestoreClient", filters: tuple = ()) -> None:
+        self._client = client
+        self._filters = filters
+
+    def where(self, *, filter):
+        return FakeQuery(self._client, self._filters + (filter,))
+
+    def order_by(self, _field: str):
+        return self
+
+    def limit(self, _count: int):
+        return self
+
+    def stream(self):
+        ops = {">=": lambda a, b: a >= b, "<": lambda a, b: a < b, "==": lambda a, b: a == b}
+        return [
+            FakeSnapshot(data)
+            for data in self._client.docs
+            if all(ops[f.op_string](data[f.field_path], f.value) for f in self._filters)
+        ]
+
+
+class FakeCollection(FakeQuery):
+    def document(self):
+        return object()
+
+
+class FakeFirestoreClient:
+    is_ready = True
+
+    def __init__(self) -> None:
+        self.docs: list[dict] = []
+        self.commits: list[int] = []
+        self.fail = False
+
+    def collection(self, _name: str) -> FakeCollection:
+        return FakeCollection(self)
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+
+def _event(name: str = "command.used") -> UsageEvent:
+    return UsageEvent.create(name, user_id=1)
+
+
+@pytest.mark.asyncio
+async def test_events_are_written_in_batches_on_flush_and_before_reads():
+    client = FakeFirestoreClient()
+    buffer = BufferedUsageEventRepository(UsageEventRepository(client), flush_interval_seconds=60)
+
+    for _ in range(3):
+        assert await buffer.create(_event()) is True
+    assert client.commits == []
+
+    now = datetime.now(timezone.utc)
+    events = await buffer.list_between(now - timedelta(minutes=1), now + timedelta(minutes=1))
+
+    assert len(events) == 3
+    assert client.commits == [3]
+    await buffer.aclose()
+
+
+@pytest.mark.asyncio
+async def test_full_batch_and_interval_trigger_a_flush():
+    client = FakeFirestoreClient()
+    buffer = BufferedUsageEventRepository(UsageEventRepository(client), flush_interval_seconds=0.01)
+
+    for _ in range(501):
+        await buffer.create(_event())
+    await asyncio.sleep(0.05)
+
+    assert sum(client.commits) == 501
+    assert max(client.commits) == 500
+    assert buffer.stats().written == 501
+    await buffer.aclose()
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_drops_and_counts_new_events():
+    client = FakeFirestoreClient()
+    buffer = BufferedUsageEventRepository(
+        UsageEventRepository(client), flush_interval_seconds=60, max_buffered=2
+    )
+
+    results = [await buffer.create(_event(f"e{index}")) for index in range(4)]
+    await buffer.aclose()
+
+    assert results == [True, True, False, False]
+    assert [doc["event_name"] for doc in client.docs] == ["e0", "e1"]
+    assert buffer.stats().dropped == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_events_in_memory_and_counts_them():
+    client = FakeFirestoreClient()
+    client.fail = True
+    inner = UsageEventRepository(client)
+    buffer = BufferedUsageEventRepository(inner, flush_interval_seconds=60)
+
+    await buffer.create(_event())
+    await buffer.aclose()
+
+    assert buffer.stats().failed == 1
+    assert inner.client is None and len(inner._store) == 1
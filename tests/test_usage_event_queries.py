@@ -0,0 +1,199 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.models.usage_event import UsageEvent
+from src.services.storage.firestore.usage_event_repo import UsageEventRepository
+from src.services.telegram.handlers.admin import _aggregate_period_stats, _collect_period_stats
+
+DAY = datetime(2026, 10, 1, tzinfo=timezone.utc)
+_OPS = {">=": lambda a, b: a >= b, "<": lambda a, b: a < b, "==": lambda a, b: a == b}
+
+
+class FakeSnapshot:
+    def __init__(self, data: dict, position: int, fields: list[str] | None) -> None:
+        self._data = data if fields is None else {name: data.get(name) for name in fields}
+        self.position = position
+
+    def to_dict(self) -> dict:
+        return dict(self._data)
+
+
+class FakeCountResult:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+class FakeAggregation:
+    def __init__(self, query: "FakeQuery") -> None:
+        self._query = query
+
+    def get(self):
+        self._query._client.aggregations += 1
+        return [[FakeCountResult(len(self._query._matching()))]]
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeFirestoreClient", **state) -> None:
+        self._client = client
+        self._state = {"filters": (), "ordered": False, "limit": None, "after": -1, "fields": None}
+        self._state.update(state)
+
+    def _with(self, **changes) -> "FakeQuery":
+        return FakeQuery(self._client, **{**self._state, **changes})
+
+    def where(self, *, filter):
+        return self._with(filters=self._state["filters"] + (filter,))
+
+    def order_by(self, field_name: str):
+        assert field_name == "occurred_at"
+        return self._with(ordered=True)
+
+    def limit(self, count: int):
+        return self._with(limit=count)
+
+    def start_after(self, snapshot: FakeSnapshot):
+        return self._with(after=snapshot.position)
+
+    def select(self, fields: list[str]):
+        return self._with(fields=fields)
+
+    def count(self, alias: str):
+        return FakeAggregation(self)
+
+    def _matching(self) -> list[dict]:
+        docs = [
+            data
+            for data in self._client.docs
+            if all(_OPS[f.op_string](data[f.field_path], f.value) for f in self._state["filters"])
+        ]
+        if self._state["ordered"]:
+            docs.sort(key=lambda data: data["occurred_at"])
+        return docs
+
+    def stream(self):
+        self._client.pages += 1
+        docs = self._matching()
+        start = self._state["after"] + 1
+        stop = None if self._state["limit"] is None else start + self._state["limit"]
+        self._client.docs_read += len(docs[start:stop])
+        return [
+            FakeSnapshot(data, start + offset, self._state["fields"])
+            for offset, data in enumerate(docs[start:stop])
+        ]
+
+
+class FakeCollection(FakeQuery):
+    def document(self):
+        return object()
+
+
+class FakeBatch:
+    def __init__(self, client: "FakeFirestoreClient") -> None:
+        self._client = client
+
+    def set(self, _doc_ref, data: dict) -> None:
+        self._client.docs.append(data)
+
+    def commit(self) -> None:
+        return None
+
+
+class FakeFirestoreClient:
+    is_ready = True
+
+    def __init__(self) -> None:
+        self.docs: list[dict] = []
+        self.pages = 0
+        self.docs_read = 0
+        self.aggregations = 0
+
+    def collection(self, _name: str) -> FakeCollection:
+        return FakeCollection(self)
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+
+def _events() -> list[UsageEvent]:
+    return [
+        UsageEvent.create("command.used", user_id=1, occurred_at=DAY - timedelta(seconds=1)),
+        UsageEvent.create("command.used", user_id=1, occurred_at=DAY + timedelta(microseconds=5)),
+        UsageEvent.create("feature.saved", user_id=2, feature="dream", occurred_at=DAY),
+        UsageEvent.create("feature.saved", user_id=2, feature="habits", occurred_at=DAY),
+        UsageEvent.create("voice.received", user_id=3, occurred_at=DAY + timedelta(hours=5)),
+        UsageEvent.create(
+            "broadcast.sent",
+            occurred_at=DAY + timedelta(hours=6),
+            metadata={"sent": 4, "failed": 1},
+        ),
+        UsageEvent.create("command.used", user_id=4, occurred_at=DAY + timedelta(days=1)),
+    ]
+
+
+async def _repo(client: FakeFirestoreClient | None = None) -> UsageEventRepository:
+    repo = UsageEventRepository(client)
+    await repo.create_many(_events())
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_window_is_filtered_by_firestore_and_read_in_pages():
+    client = FakeFirestoreClient()
+    repo = await _repo(client)
+
+    events = await repo.list_between(DAY, DAY + timedelta(days=1), page_size=2)
+
+    assert [event.event_name for event in events] == [
+        "feature.saved",
+        "feature.saved",
+        "command.used",
+        "voice.received",
+        "broadcast.sent",
+    ]
+    assert client.docs_read == 5
+    assert client.pages == 3
+
+
+@pytest.mark.asyncio
+async def test_counts_are_aggregations_and_user_ids_read_only_the_window():
+    client = FakeFirestoreClient()
+    repo = await _repo(client)
+    end = DAY + timedelta(days=1)
+
+    assert await repo.count_between(DAY, end, event_name="command.used") == 1
+    assert await repo.count_between(DAY, end, event_name="feature.saved", feature="dream") == 1
+    assert client.aggregations == 2 and client.docs_read == 0
+
+    assert await repo.user_ids_between(DAY, end) == {1, 2, 3}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("with_firestore", [True, False])
+async def test_collected_stats_match_aggregating_raw_events(with_firestore):
+    repo = await _repo(FakeFirestoreClient() if with_firestore else None)
+    start, end = DAY, DAY + timedelta(days=1)
+    expected = _aggregate_period_stats(
+        [event for event in _events() if start <= event.occurred_at < end]
+    )
+
+    stats = await _collect_period_stats(repo, start, end)
+
+    assert stats == expected
+    assert (stats["feature_total"], stats["dream"], stats["broadcast_sent"]) == (2, 1, 4)
+
+
+@pytest.mark.asyncio
+async def test_window_bounds_keep_sub_second_precision():
+    client = FakeFirestoreClient()
+    repo = await _repo(client)
+    start = DAY + timedelta(microseconds=1)
+
+    events = await repo.list_between(start, DAY + timedelta(hours=5, microseconds=1))
+
+    # Events at DAY fall before a start one microsecond later; the one at DAY+5µs does not.
+    assert [event.occurred_at for event in events] == [
+        DAY + timedelta(microseconds=5),
+        DAY + timedelta(hours=5),
+    ]
+    assert await repo.count_between(DAY, DAY + timedelta(microseconds=5)) == 2
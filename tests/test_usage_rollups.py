@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from google.api_core.exceptions import InvalidArgument
+from google.cloud.firestore_v1 import ArrayUnion, Increment
+
+from src.models.usage_event import UsageEvent, rollups_for
+from src.services.storage.firestore.usage_event_repo import UsageEventRepository
+from src.services.storage.firestore.usage_rollup_repo import UsageRollupRepository
+from src.services.telegram.handlers.admin import (
+    _aggregate_period_stats,
+    _rollup_buckets,
+    _stats_from_rollup,
+)
+
+MONDAY = datetime(2026, 9, 28, 12, tzinfo=timezone.utc)
+
+
+class FakeSnapshot:
+    def __init__(self, data: dict | None) -> None:
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> dict | None:
+        return self._data
+
+
+class FakeDocument:
+    def __init__(self, client: "FakeFirestoreClient", path: str) -> None:
+        self._client = client
+        self.id = path
+
+    def get(self) -> FakeSnapshot:
+        self._client.reads += 1
+        return FakeSnapshot(self._client.docs.get(self.id))
+
+    def collection(self, name: str) -> "FakeCollection":
+        return FakeCollection(self._client, f"{self.id}/{name}/")
+
+
+class FakeCollection:
+    def __init__(self, client: "FakeFirestoreClient", prefix: str = "") -> None:
+        self._client = client
+        self._prefix = prefix
+
+    def document(self, doc_id: str) -> FakeDocument:
+        return FakeDocument(self._client, self._prefix + doc_id)
+
+    def stream(self) -> list[FakeSnapshot]:
+        self._client.reads += 1
+        return [
+            FakeSnapshot(data)
+            for path, data in sorted(self._client.docs.items())
+            if path.startswith(self._prefix) and "/" not in path[len(self._prefix) :]
+        ]
+
+
+def _merge(stored: dict, data: dict) -> None:
+    """Firestore's set(merge=True) for the transforms the rollups use."""
+
+    for key, value in data.items():
+        if isinstance(value, dict):
+            _merge(stored.setdefault(key, {}), value)
+        elif isinstance(value, Increment):
+            stored[key] = stored.get(key, 0) + value.value
+        elif isinstance(value, ArrayUnion):
+            stored[key] = sorted(set(stored.get(key, [])) | set(value.values))
+        else:
+            stored[key] = value
+
+
+class FakeBatch:
+    def __init__(self, client: "FakeFirestoreClient") -> None:
+        self._client = client
+        self._writes: list[tuple[str, dict, bool]] = []
+
+    def set(self, doc: FakeDocument, data: dict, merge: bool = False) -> None:
+        self._writes.append((doc.id, data, merge))
+
+    def commit(self) -> None:
+        if self._client.max_user_ids is not None and any(
+            isinstance(data.get("user_ids"), ArrayUnion)
+            and len(data["user_ids"].values) > self._client.max_user_ids
+            for _doc_id, data, _merge in self._writes
+        ):
+            raise InvalidArgument("Document exceeds the maximum size")
+        self._client.commits += 1
+        for doc_id, data, merge in self._writes:
+            if merge:
+                _merge(self._client.docs.setdefault(doc_id, {}), data)
+            else:
+                self._client.docs[doc_id] = data
+
+
+class FakeFirestoreClient:
+    is_ready = True
+
+    def __init__(self) -> None:
+        self.docs: dict[str, dict] = {}
+        self.commits = 0
+        self.reads = 0
+        self.max_user_ids: int | None = None
+
+    def collection(self, _name: str) -> FakeCollection:
+        return FakeCollection(self)
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+
+def _events() -> list[UsageEvent]:
+    return [
+        UsageEvent.create("command.used", user_id=1, feature="habits", occurred_at=MONDAY),
+        UsageEvent.create("feature.saved", user_id=1, feature="dream", occurred_at=MONDAY),
+        UsageEvent.create("feature.saved", user_id=2, feature="habits", occurred_at=MONDAY),
+        UsageEvent.create(
+            "broadcast.sent",
+            occurred_at=MONDAY + timedelta(days=3),
+            metadata={"sent": 4, "failed": 1, "dry_run": True},
+        ),
+    ]
+
+
+def test_rollups_count_per_bucket_and_feature():
+    rollups = rollups_for(_events())
+
+    assert sorted(rollups) == [
+        "day_2026-09-28",
+        "day_2026-10-01",
+        "month_2026-09",
+        "month_2026-10",
+        "week_2026-W40",
+    ]
+    week = rollups["week_2026-W40"]
+    assert week.count("feature.saved") == 2
+    assert week.count("feature.saved", "dream") == 1
+    assert week.count("command.used") == 1
+    assert week.total("broadcast.sent", "sent") == 4
+    assert "broadcast_sent__dry_run" not in week.sums
+    assert week.user_ids == {1, 2}
+
+
+@pytest.mark.asyncio
+async def test_written_events_are_rolled_up_with_increments():
+    client = FakeFirestoreClient()
+    rollups = UsageRollupRepository(client)
+    events = UsageEventRepository(None, rollups=rollups)
+
+    await events.create_many(_events()[:2])
+    await events.create(_events()[2])
+    await events.create_many(_events()[3:])
+
+    assert client.commits == 5  # counters, then active-user shards when there are users
+    assert client.docs["week_2026-W40"]["counts"]["feature_saved"] == 2
+    assert "user_ids" not in client.docs["week_2026-W40"]
+    assert client.docs["week_2026-W40/active_users/01"]["user_ids"] == [1]
+    assert client.docs["week_2026-W40/active_users/02"]["user_ids"] == [2]
+
+    week = await rollups.get_many("week", ["2026-W40", "2026-W41"])
+    assert [rollup.bucket for rollup in week] == ["2026-W40"]
+    assert _stats_from_rollup(week[0]) == _aggregate_period_stats(_events())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("with_firestore", [True, False])
+async def test_rebuild_replaces_rollups_from_raw_events(with_firestore):
+    rollups = UsageRollupRepository(FakeFirestoreClient() if with_firestore else None)
+    await rollups.apply(_events() * 3)  # counted too often
+
+    async def pages():
+        yield _events()[:2]
+        yield _events()[2:]
+
+    rebuilt = await rollups.rebuild(pages())
+
+    assert len(rebuilt) == 5
+    (day,) = await rollups.get_many("day", ["2026-09-28"])
+    assert (day.count("feature.saved"), day.user_ids) == (2, {1, 2})
+
+
+@pytest.mark.asyncio
+async def test_oversized_active_user_shards_are_skipped_without_leaving_firestore():
+    client = FakeFirestoreClient()
+    client.max_user_ids = 0
+    rollups = UsageRollupRepository(client)
+
+    await rollups.apply(_events())
+    await rollups.apply(_events())
+
+    assert rollups.client is client
+    (week,) = await rollups.get_many("week", ["2026-W40"])
+    assert (week.count("feature.saved"), week.user_ids) == (4, set())
+
+
+def test_admin_periods_map_to_rollup_buckets():
+    now = datetime(2026, 10, 1, 8, tzinfo=timezone.utc)
+
+    assert _rollup_buckets("today", now) == ("day", ["2026-10-01"])
+    assert _rollup_buckets("week", now) == ("week", ["2026-W40"])
+    assert _rollup_buckets("month", now) == ("month", ["2026-10"])
+    period, days = _rollup_buckets("last_30", now)
+    assert (period, len(days), days[0], days[-1]) == ("day", 30, "2026-09-02", "2026-10-01")
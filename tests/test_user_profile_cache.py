@@ -0,0 +1,121 @@
+import pytest
+
+from src.models.user import UserProfile
+from src.services.storage.firestore.profile_cache import ProfileCache, profile_request_scope
+from src.services.storage.firestore.user_repo import UserRepository
+
+
+class FakeSnapshot:
+    def __init__(self, data: dict | None) -> None:
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> dict | None:
+        return self._data
+
+
+class FakeDocument:
+    def __init__(self, client: "FakeFirestoreClient", doc_id: str) -> None:
+        self._client = client
+        self._doc_id = doc_id
+
+    def get(self) -> FakeSnapshot:
+        self._client.reads += 1
+        return FakeSnapshot(self._client.docs.get(self._doc_id))
+
+    def set(self, data: dict) -> None:
+        self._client.docs[self._doc_id] = data
+
+    def delete(self) -> None:
+        self._client.docs.pop(self._doc_id, None)
+
+
+class FakeCollection:
+    def __init__(self, client: "FakeFirestoreClient") -> None:
+        self._client = client
+
+    def document(self, doc_id: str) -> FakeDocument:
+        return FakeDocument(self._client, doc_id)
+
+
+class FakeFirestoreClient:
+    is_ready = True
+
+    def __init__(self) -> None:
+        self.docs: dict[str, dict] = {}
+        self.reads = 0
+
+    def collection(self, _name: str) -> FakeCollection:
+        return FakeCollection(self)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _repo(ttl_seconds: float = 60, clock: FakeClock | None = None) -> tuple[UserRepository, FakeFirestoreClient]:
+    client = FakeFirestoreClient()
+    client.docs["1"] = UserProfile(telegram_user_id=1, language="ru").model_dump(mode="json")
+    return UserRepository(client, cache=ProfileCache(ttl_seconds, clock=clock)), client
+
+
+@pytest.mark.asyncio
+async def test_profile_is_read_once_and_handed_out_as_copies():
+    repo, client = _repo()
+
+    first = await repo.get_by_telegram_id(1)
+    first.language = "en"  # mutated but never saved
+    second = await repo.get_by_telegram_id(1)
+
+    assert client.reads == 1
+    assert second.language == "ru"
+
+
+@pytest.mark.asyncio
+async def test_writes_go_through_the_cache():
+    repo, client = _repo()
+    profile = await repo.get_by_telegram_id(1)
+
+    profile.language = "en"
+    await repo.update(profile)
+    assert (await repo.get_by_telegram_id(1)).language == "en"
+
+    await repo.delete(1)
+    assert await repo.get_by_telegram_id(1) is None
+    assert client.reads == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_unknown_users_are_cached():
+    clock = FakeClock()
+    repo, client = _repo(ttl_seconds=60, clock=clock)
+
+    assert await repo.get_by_telegram_id(2) is None
+    assert await repo.get_by_telegram_id(2) is None
+    await repo.get_by_telegram_id(1)
+    assert client.reads == 2
+
+    clock.now = 61.0
+    await repo.get_by_telegram_id(1)
+    assert client.reads == 3
+    assert repo.cache.stats().hits == 1
+
+
+@pytest.mark.asyncio
+async def test_request_scope_reads_each_profile_once_even_without_the_cache():
+    repo, client = _repo(ttl_seconds=0)
+
+    with profile_request_scope():
+        for _ in range(3):
+            assert (await repo.get_by_telegram_id(1)).language == "ru"
+        with profile_request_scope():
+            await repo.get_by_telegram_id(1)
+    assert client.reads == 1
+
+    await repo.get_by_telegram_id(1)
+    await repo.get_by_telegram_id(1)
+    assert client.reads == 3
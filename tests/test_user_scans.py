@@ -0,0 +1,241 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from google.api_core.exceptions import NotFound
+
+from src.core.exceptions import ExternalResponseError
+from src.models.user import UsageStats, UserProfile
+from src.services.storage.firestore.user_repo import UserRepository
+
+DAY = datetime(2026, 10, 1, tzinfo=timezone.utc)
+_OPS = {">=": lambda a, b: a >= b, "<": lambda a, b: a < b, ">": lambda a, b: a > b}
+
+
+class FakeSnapshot:
+    def __init__(self, data: dict, position: int, fields: list[str] | None) -> None:
+        self._data = data if fields is None else {name: data[name] for name in fields if name in data}
+        self.position = position
+
+    def to_dict(self) -> dict:
+        return dict(self._data)
+
+
+class FakeAggregateResult:
+    def __init__(self, alias: str, value: int) -> None:
+        self.alias = alias
+        self.value = value
+
+
+class FakeAggregation:
+    def __init__(self, query: "FakeQuery", aggregates: tuple = ()) -> None:
+        self._query = query
+        self._aggregates = aggregates
+
+    def sum(self, field_path: str, alias: str) -> "FakeAggregation":
+        return FakeAggregation(self._query, self._aggregates + (("sum", field_path, alias),))
+
+    def get(self):
+        self._query._client.aggregations += 1
+        docs = self._query._matching()
+        results = []
+        for kind, field_path, alias in self._aggregates:
+            if kind == "count":
+                results.append(FakeAggregateResult(alias, len(docs)))
+            else:
+                group, name = field_path.split(".")
+                results.append(FakeAggregateResult(alias, sum(doc[group][name] for doc in docs)))
+        return [results]
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeFirestoreClient", **state) -> None:
+        self._client = client
+        self._state = {"filters": (), "ordered": False, "limit": None, "after": -1, "fields": None}
+        self._state.update(state)
+
+    def _with(self, **changes) -> "FakeQuery":
+        return FakeQuery(self._client, **{**self._state, **changes})
+
+    def where(self, *, filter):
+        return self._with(filters=self._state["filters"] + (filter,))
+
+    def order_by(self, field_name: str):
+        assert field_name == "telegram_user_id"
+        return self._with(ordered=True)
+
+    def limit(self, count: int):
+        return self._with(limit=count)
+
+    def start_after(self, snapshot: FakeSnapshot):
+        return self._with(after=snapshot.position)
+
+    def select(self, fields: list[str]):
+        return self._with(fields=fields)
+
+    def count(self, alias: str):
+        return FakeAggregation(self, (("count", None, alias),))
+
+    def sum(self, field_path: str, alias: str):
+        return FakeAggregation(self).sum(field_path, alias)
+
+    def _matching(self) -> list[dict]:
+        docs = [
+            data
+            for data in self._client.docs.values()
+            if all(
+                data.get(f.field_path) is not None
+                and _OPS[f.op_string](data[f.field_path], f.value)
+                for f in self._state["filters"]
+            )
+        ]
+        if self._state["ordered"]:
+            docs.sort(key=lambda data: data["telegram_user_id"])
+        return docs
+
+    def stream(self):
+        self._client.pages += 1
+        docs = self._matching()
+        start = self._state["after"] + 1
+        stop = None if self._state["limit"] is None else start + self._state["limit"]
+        return [
+            FakeSnapshot(data, start + offset, self._state["fields"])
+            for offset, data in enumerate(docs[start:stop])
+        ]
+
+
+class FakeDocument:
+    def __init__(self, client: "FakeFirestoreClient", doc_id: str) -> None:
+        self._client = client
+        self._doc_id = doc_id
+
+    def set(self, data: dict) -> None:
+        self._client.docs[self._doc_id] = data
+
+    def update(self, data: dict) -> None:
+        if self._doc_id not in self._client.docs:
+            raise NotFound("no document")
+        self._client.docs[self._doc_id].update(data)
+
+
+class FakeBatch:
+    def __init__(self) -> None:
+        self._updates: list[tuple[FakeDocument, dict]] = []
+
+    def update(self, doc_ref: FakeDocument, data: dict) -> None:
+        self._updates.append((doc_ref, data))
+
+    def commit(self) -> None:
+        # Atomic, like Firestore: one missing document fails every write.
+        for doc_ref, _data in self._updates:
+            if doc_ref._doc_id not in doc_ref._client.docs:
+                raise NotFound("no document")
+        for doc_ref, data in self._updates:
+            doc_ref.update(data)
+
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id: str) -> FakeDocument:
+        return FakeDocument(self._client, doc_id)
+
+
+class FakeFirestoreClient:
+    is_ready = True
+
+    def __init__(self) -> None:
+        self.docs: dict[str, dict] = {}
+        self.pages = 0
+        self.aggregations = 0
+
+    def collection(self, _name: str) -> FakeCollection:
+        return FakeCollection(self)
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch()
+
+
+async def _repo(client: FakeFirestoreClient | None) -> UserRepository:
+    repo = UserRepository(client)
+    for user_id in range(1, 6):
+        await repo.create(
+            UserProfile(
+                telegram_user_id=user_id,
+                sheet_id="sheet" if user_id % 2 else None,
+                usage_stats=UsageStats(habits=user_id, dream=1),
+                created_at=DAY + timedelta(days=user_id - 3),
+            )
+        )
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_summaries_are_paged_and_projected():
+    client = FakeFirestoreClient()
+    repo = await _repo(client)
+
+    pages = [page async for page in repo.iter_summaries(page_size=2)]
+
+    assert [[user.telegram_user_id for user in page] for page in pages] == [[1, 2], [3, 4], [5]]
+    assert pages[0][0].sheet_id == "sheet" and pages[0][0].usage_stats.habits == 1
+    assert client.pages == 3
+
+
+@pytest.mark.asyncio
+async def test_reminder_scans_read_only_the_scheduling_fields():
+    client = FakeFirestoreClient()
+    repo = await _repo(client)
+    client.docs["3"]["reminder_time"] = "21:00"
+
+    pages = [page async for page in repo.iter_reminders(page_size=2)]
+
+    assert [[user.telegram_user_id for user in page] for page in pages] == [[1, 2], [3, 4], [5]]
+    assert client.pages == 3
+    assert pages[1][0].reminder_time == "21:00" and pages[1][0].timezone == "Europe/Moscow"
+    assert "usage_stats" not in pages[1][0].model_dump()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("with_firestore", [True, False])
+async def test_counts_and_totals_match_the_profiles(with_firestore):
+    client = FakeFirestoreClient() if with_firestore else None
+    repo = await _repo(client)
+
+    assert await repo.count() == 5
+    assert await repo.count(with_sheet=True) == 3
+    assert await repo.count_created_between(DAY, DAY + timedelta(days=1)) == 1
+    assert await repo.count_created_between(DAY - timedelta(days=7), DAY) == 2
+    assert await repo.usage_totals() == UsageStats(habits=15, dream=5)
+    if client is not None:
+        assert client.aggregations == 5 and client.pages == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_aggregation_is_raised_and_keeps_firestore(monkeypatch):
+    client = FakeFirestoreClient()
+    repo = await _repo(client)
+
+    def unavailable(self):
+        raise RuntimeError("aggregation unavailable")
+
+    monkeypatch.setattr(FakeAggregation, "get", unavailable)
+    with pytest.raises(ExternalResponseError):
+        await repo.count()
+    with pytest.raises(ExternalResponseError):
+        await repo.usage_totals()
+
+    assert repo.client is client
+    monkeypatch.undo()
+    assert await repo.count() == 5
+
+
+@pytest.mark.asyncio
+async def test_batched_field_updates_skip_deleted_users_and_keep_firestore():
+    client = FakeFirestoreClient()
+    repo = await _repo(client)
+    del client.docs["2"]
+    due = DAY + timedelta(hours=20)
+
+    await repo.update_fields_many({1: {"reminder_next_run_utc": due}, 2: {"reminder_next_run_utc": due}})
+
+    assert repo.client is client
+    assert client.docs["1"]["reminder_next_run_utc"] == "2026-10-01T20:00:00Z"
+    assert "2" not in client.docs